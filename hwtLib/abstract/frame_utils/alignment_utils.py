@@ -11,10 +11,14 @@ def freeze_frame(f: List[List[ByteSrcInfo]])\
     return tuple(tuple(w) for w in f)
 
 
-def count_not_none(items: List[Optional[ByteSrcInfo]]):
-    for i, b in enumerate(items):
-        if b is not None:
-            return i
+def get_end_offset(last_word: Tuple[Optional[ByteSrcInfo], ...]):
+    """
+    :return: the offset of the data after the last word of the frame
+        (= the start offset of the next frame in the joined stream)
+    """
+    for i in range(len(last_word) - 1, -1, -1):
+        if last_word[i] is not None:
+            return (i + 1) % len(last_word)
     return 0
 
 
@@ -36,7 +40,11 @@ def next_frame_offsets(f0_t: HStream, data_width: int):
 class FrameAlignmentUtils():
     """
     :ivar ~.word_bytes: number of bytes in 1 output word
+    :cvar MAX_REPRESENTATIVE_WORDS: the number of words of the representative frame
+        for unaligned frames, the longer frames do not have any new features
     """
+    MAX_REPRESENTATIVE_WORDS = 4
+
     def __init__(self, word_bytes: int, out_offset=0):
         self.word_bytes = word_bytes
         self.out_offset = out_offset
@@ -162,6 +170,10 @@ class FrameAlignmentUtils():
         """
         assert chunk_cnt_min > 0
         assert chunk_cnt_min <= chunk_cnt_max, (chunk_cnt_min, chunk_cnt_max)
+        if offset_in != offset_out:
+            return self._get_important_byte_cnts_unaligned(
+                offset_out, offset_in, chunk_size, chunk_cnt_min, chunk_cnt_max)
+
         if isinstance(chunk_cnt_min, int) and isinstance(chunk_cnt_max, int)\
                 and chunk_cnt_min == chunk_cnt_max:
             _, _, _, min_representative_frame_size = self.get_bytes_in_frame_info(
@@ -170,6 +182,9 @@ class FrameAlignmentUtils():
 
         word_bytes = self.word_bytes
         _chunk_cnt_min = chunk_cnt_min % (2 * word_bytes)
+        if _chunk_cnt_min == 0:
+            # frame can not be empty, use the representative of same size class instead
+            _chunk_cnt_min = 2 * word_bytes
         chunk_cnt_max = _chunk_cnt_min + \
             min((2 * word_bytes), chunk_cnt_max - chunk_cnt_min)
         chunk_cnt_min = _chunk_cnt_min
@@ -187,6 +202,52 @@ class FrameAlignmentUtils():
 
         return sorted(sizes)
 
+    def _get_frame_features(self, offset_out: int, offset_in: int, byte_cnt: int):
+        """
+        :return: tuple of features of the frame which affect the state transitions of the join FSM
+            (number of input and output words, limited to MAX_REPRESENTATIVE_WORDS,
+            and the alignment of the end of the frame in input and output word)
+        """
+        word_bytes = self.word_bytes
+        max_words = self.MAX_REPRESENTATIVE_WORDS
+        in_end = offset_in + byte_cnt
+        out_end = offset_out + byte_cnt
+        return (
+            min((in_end + word_bytes - 1) // word_bytes, max_words),
+            min((out_end + word_bytes - 1) // word_bytes, max_words),
+            in_end % word_bytes,
+            out_end % word_bytes,
+        )
+
+    def _get_important_byte_cnts_unaligned(
+            self, offset_out: int, offset_in: int, chunk_size: int,
+            chunk_cnt_min: Union[int, float], chunk_cnt_max: Union[int, float]):
+        """
+        :see: :meth:`~.get_important_byte_cnts`, variant for offset_in != offset_out
+
+        :note: If the input and output alignment differs the output word is composed of bytes
+            from multiple input words and the body words of input and output
+            have to be present in representative frame. A frame longer than MAX_REPRESENTATIVE_WORDS
+            words has the same features as the frame shorter by word_bytes chunks.
+        """
+        word_bytes = self.word_bytes
+        saturated = (self.MAX_REPRESENTATIVE_WORDS * word_bytes + chunk_size - 1) // chunk_size
+        if chunk_cnt_min > saturated:
+            shift = ((chunk_cnt_min - saturated) // word_bytes) * word_bytes
+        else:
+            shift = 0
+        chunk_cnt_min -= shift
+        chunk_cnt_max = min(chunk_cnt_max - shift,
+                            max(chunk_cnt_min, saturated) + word_bytes)
+
+        sizes = {}
+        for chunk_cnt in range(chunk_cnt_min, chunk_cnt_max + 1):
+            byte_cnt = chunk_cnt * chunk_size
+            f = self._get_frame_features(offset_out, offset_in, byte_cnt)
+            sizes.setdefault(f, byte_cnt)
+
+        return sorted(sizes.values())
+
     def stream_to_all_possible_frame_formats(
             self, t: HStream, stream_i: int, offset_out: int):
         """
@@ -203,11 +264,10 @@ class FrameAlignmentUtils():
                 frames.append(frame)
         return frames
 
-    def streams_to_all_possible_frame_formats(
-            self, streams: List[HStream], offset: int):
+    def _frames_per_stream(self, streams: List[HStream], offset: int):
         """
-        :see: :func:`FrameJoinUtils.stream_to_all_possible_frame_formats`
-            for multiple input streams
+        :return: list of all possible frame formats for each stream
+            (the formats of a stream depend on possible end offsets of the previous stream)
         """
         frames_per_stream = []
         prev_end_offsets = [offset, ]
@@ -227,11 +287,31 @@ class FrameAlignmentUtils():
             # for each frame resolve end alignment of the frames
             for frame in f_frames:
                 last_word = frame[-1]
-                o = count_not_none(last_word)
+                o = get_end_offset(last_word)
                 prev_end_offsets.add(o)
 
             prev_end_offsets = sorted(prev_end_offsets)
 
+        return frames_per_stream
+
+    def estimate_frame_format_cnt(self, streams: List[HStream], offset: int):
+        """
+        Estimate the number of the frame formats which would be generated by
+        :meth:`~.streams_to_all_possible_frame_formats` without generating them.
+        (The complexity of the join FSM is proportional to this number.)
+        """
+        cnt = 1
+        for frames in self._frames_per_stream(streams, offset):
+            cnt *= len(frames)
+        return cnt
+
+    def streams_to_all_possible_frame_formats(
+            self, streams: List[HStream], offset: int):
+        """
+        :see: :func:`FrameJoinUtils.stream_to_all_possible_frame_formats`
+            for multiple input streams
+        """
+        frames_per_stream = self._frames_per_stream(streams, offset)
         res = set()
         for frame_combination in product(*frames_per_stream):
             res_frame = self.join_streams(frame_combination, offset)
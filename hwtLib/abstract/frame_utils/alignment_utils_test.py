@@ -2,6 +2,8 @@ from math import inf
 from typing import Union
 import unittest
 
+from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.stream import HStream
 from hwtLib.abstract.frame_utils.alignment_utils import FrameAlignmentUtils
 
 
@@ -66,7 +68,9 @@ class FrameAlignmentUtilsTC(unittest.TestCase):
 
         res = get_important_byte_cnts(
             1, 0, word_bytes, chunk_size, chunk_cnt_min, chunk_cnt_max)
-        res_ref = [1, 2, 3, 4]
+        # unaligned, all combinations of end alignment and number of words (up to 4)
+        # in input and output
+        res_ref = [1, 2, 3, 4, 5, 6, 7, 8]
 
         self.assertSequenceEqual(res, res_ref)
 
@@ -89,9 +93,29 @@ class FrameAlignmentUtilsTC(unittest.TestCase):
         chunk_cnt_max = inf
         res = get_important_byte_cnts(
             0, 1, word_bytes, chunk_size, chunk_cnt_min, chunk_cnt_max)
-        res_ref = [2, 4]
+        res_ref = [2, 4, 6, 8]
         self.assertSequenceEqual(res, res_ref)
 
+    def test_get_important_chunk_cnts_unaligned_long(self):
+        word_bytes = 2
+        chunk_size = 1
+        # long frames are represented by a shorter frames with same alignment of the end
+        res = get_important_byte_cnts(
+            1, 0, word_bytes, chunk_size, 100, inf)
+        self.assertSequenceEqual(res, [8, 9])
+
+        res = get_important_byte_cnts(
+            1, 0, word_bytes, chunk_size, 101, 101)
+        self.assertSequenceEqual(res, [9])
+
+    def test_end_offset_of_frame(self):
+        fau = FrameAlignmentUtils(2)
+        streams = [HStream(Bits(8), frame_len=(1, inf)), ]
+        f0, f1 = fau._frames_per_stream(streams * 2, 0)
+        # the end of 1B frame is not aligned, the second frame has to be resolved also for offset 1
+        self.assertEqual(len(f1), len(set(f1)))
+        self.assertGreater(len(f1), len(f0))
+
 
 if __name__ == "__main__":
     suite = unittest.TestSuite()
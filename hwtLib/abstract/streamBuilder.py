@@ -29,6 +29,7 @@ class AbstractStreamBuilder(AbstractComponentBuilder):
     JoinPrioritizedCls = NotImplemented
     JoinFairCls = NotImplemented
     RegCls = NotImplemented
+    RegCdcCls = NotImplemented
     ResizerCls = NotImplemented
     SplitCopyCls = NotImplemented
     SplitSelectCls = NotImplemented
@@ -148,7 +149,10 @@ class AbstractStreamBuilder(AbstractComponentBuilder):
 
         :param items: number of items in buffer
         :param latency: latency of buffer (number of clk ticks required to get data
-            from input to input)
+            from input to input), for FIFO (items > latency) the latency 2 is a FIFO
+            with MEM_READ_LATENCY=1 and the latency >= 4 is a FIFO with MEM_READ_LATENCY=latency - 2
+            (the memory read is pipelined, see :class:`hwtLib.handshaked.fifo.HandshakedFifo`),
+            latency 3 is not possible for FIFO
         :param delay: delay of buffer (number of clk ticks required to get data to buffer)
         :note: delay can be used as synchronization method or to solve timing related problems
             because it will split valid signal path
@@ -183,21 +187,32 @@ class AbstractStreamBuilder(AbstractComponentBuilder):
                                          set_params=applyParams)
         else:
             # instantiate buffer as fifo
-            if latency != 2 or delay != 0:
-                raise NotImplementedError()
+            # (latency > 2 means that the memory read is pipelined, see HandshakedFifo.MEM_READ_LATENCY)
+            if latency == 3:
+                raise ValueError("FIFO latency has to be 2 or >= 4 (MEM_READ_LATENCY + 2 for pipelined memory read)",
+                                 items, latency)
+            if delay != 0:
+                raise NotImplementedError("FIFO with delay", items, delay)
 
             def setDepth(u):
                 u.DEPTH = items
+                if latency > 2:
+                    u.MEM_READ_LATENCY = latency - 2
 
             return self._genericInstance(self.FifoCls, "fifo", setDepth)
 
-    def buff_cdc(self, clk, rst, items=1):
+    def buff_cdc(self, clk, rst, items=1, full_throughput=False):
         """
         Instantiate a CDC (Clock Domain Crossing) buffer or AsyncFifo
         on selected interface
 
         :note: if items==1 CDC clock synchronization register is used
             if items>1 asynchronous FIFO is used
+        :param full_throughput: if True and items==1 the CDC is configured to use a small
+            asynchronous FIFO (RegCdcCls.FULL_THROUGHPUT_ASYNC_FIFO_DEPTH) instead of the synchronization by pulses
+            so it can pass 1 item per clock cycle of slower clock
+        :note: the full_throughput mode is not selected automatically even if the clock frequencies differ,
+            the pulse synchronization is smaller and the builder does not know the required throughput
         """
         in_clk = self.getClk()
         in_rst_n = self.getRstn()
@@ -220,8 +235,15 @@ class AbstractStreamBuilder(AbstractComponentBuilder):
                 propagate_clk_rst=False)
         else:
             assert items == 1, items
+            if full_throughput:
+                def configure(u):
+                    u.ASYNC_FIFO_DEPTH = u.FULL_THROUGHPUT_ASYNC_FIFO_DEPTH
+                    set_clk_freq(u)
+            else:
+                configure = set_clk_freq
+
             res = self._genericInstance(
-                self.RegCdcCls, "cdcReg", set_clk_freq,
+                self.RegCdcCls, "cdcReg", configure,
                 propagate_clk_rst=False)
 
         b = res.lastComp
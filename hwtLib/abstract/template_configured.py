@@ -103,6 +103,27 @@ def HdlType_separate(t: HdlType, do_separate_query: Callable[[HdlType], bool])\
         yield (False, t)
 
 
+def HStruct_join_separated(types: List[HStruct]) -> HStruct:
+    """
+    Join the consecutive HStruct types generated by :func:`~.HdlType_separate`
+    back to a single HStruct type.
+    (The fields of the nested HStructs which were split are joined as well.)
+    """
+    fields = []
+    for t in types:
+        for f in t.fields:
+            if fields and f.name is not None and fields[-1].name == f.name\
+                    and isinstance(f.dtype, HStruct)\
+                    and isinstance(fields[-1].dtype, HStruct):
+                _f = copy(fields[-1])
+                _f.dtype = HStruct_join_separated([_f.dtype, f.dtype])
+                fields[-1] = _f
+            else:
+                fields.append(f)
+
+    return HStruct(*fields, name=types[0].name)
+
+
 def separate_streams(t: HdlType):
     """
     Split HStruct type hierarchy on the fields of HStream type.
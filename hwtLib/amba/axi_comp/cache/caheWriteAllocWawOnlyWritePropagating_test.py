@@ -10,6 +10,7 @@ from hwt.serializer.combLoopAnalyzer import CombLoopAnalyzer
 from hwt.simulator.simTestCase import SingleUnitSimTestCase
 from hwtLib.amba.axiLite_comp.sim.utils import axi_randomize_per_channel
 from hwtLib.amba.axi_comp.cache.caheWriteAllocWawOnlyWritePropagating import AxiCaheWriteAllocWawOnlyWritePropagating
+from hwtLib.amba.axi_comp.cache.model import CacheModel
 from hwtLib.amba.constants import RESP_OKAY
 from hwtLib.examples.errors.combLoops import freeze_set_of_sets
 from hwtLib.tools.debug_bus_monitor_ctl import select_bit_range
@@ -227,6 +228,7 @@ class AxiCaheWriteAllocWawOnlyWritePropagatingTC(SingleUnitSimTestCase):
         aw = u.s.aw._ag
         expected = {}
         b_expected = []
+        model = CacheModel.from_addr_type_config(u)
         M = mask(u.CACHE_LINE_SIZE)
         for w in range(u.WAY_CNT):
             for i in range(N_PER_WAY):
@@ -235,6 +237,7 @@ class AxiCaheWriteAllocWawOnlyWritePropagatingTC(SingleUnitSimTestCase):
 
                 if preallocate:
                     self.cacheline_insert(addr, w, 0)
+                    model.insert(addr, w, 0)
 
                 _id = i % ID_MAX
                 req = aw.create_addr_req(addr=addr, _len=self.LEN, _id=_id)
@@ -245,6 +248,7 @@ class AxiCaheWriteAllocWawOnlyWritePropagatingTC(SingleUnitSimTestCase):
                     u.s.w._ag.data.append((d, M, int(w_i == self.LEN)))
                     d_list.append(d)
                 expected[addr] = self.build_cacheline(d_list)
+                model.write(addr, expected[addr])
 
                 b_expected.append((_id, RESP_OKAY))
         if preallocate:
@@ -259,6 +263,7 @@ class AxiCaheWriteAllocWawOnlyWritePropagatingTC(SingleUnitSimTestCase):
             self.assertEmpty(x._ag.data, x)
 
         self.assertDictEqual(self.get_cachelines(), expected)
+        self.assertDictEqual(self.get_cachelines(), model.cachelines())
         self.assertValSequenceEqual(u.s.b._ag.data, b_expected)
 
     def test_write_to_empty(self, N_PER_WAY=8, MAGIC=99, preallocate=False, randomized=False):
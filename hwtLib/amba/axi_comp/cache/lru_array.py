@@ -17,6 +17,7 @@ from hwtLib.amba.axi_comp.cache.pseudo_lru import PseudoLru
 from hwtLib.common_nonstd_interfaces.addr_data_hs import AddrDataHs
 from hwtLib.common_nonstd_interfaces.addr_hs import AddrHs
 from hwtLib.logic.binToOneHot import binToOneHot
+from hwtLib.mem.ramLvt import RamLvtSingleClock
 from hwtLib.mem.ramXor import RamXorSingleClock
 
 
@@ -44,6 +45,9 @@ class AxiCacheLruArray(CacheAddrTypeConfig):
     The set port dissables all discards all pending updates
     and it is ment to be used for an intialization of the array/cache.
 
+    :ivar LRU_MEM_IMPL: "XOR" or "LVT", the implementation of the multiport memory
+        for LRU data (:class:`~.RamXorSingleClock` or :class:`~.RamLvtSingleClock`)
+
     .. figure:: ./_static/AxiCacheLruArray.png
 
     .. hwt-autodoc::
@@ -53,6 +57,7 @@ class AxiCacheLruArray(CacheAddrTypeConfig):
         CacheAddrTypeConfig._config(self)
         self.INCR_PORT_CNT = Param(2)
         self.WAY_CNT = Param(4)
+        self.LRU_MEM_IMPL = Param("XOR")
 
     def _compute_constants(self):
         assert self.WAY_CNT >= 1, self.WAY_CNT
@@ -82,7 +87,13 @@ class AxiCacheLruArray(CacheAddrTypeConfig):
         vd = self.victim_data = Handshaked()._m()
         vd.DATA_WIDTH = log2ceil(self.WAY_CNT - 1)
 
-        m = self.lru_mem = RamXorSingleClock()
+        if self.LRU_MEM_IMPL == "XOR":
+            m = RamXorSingleClock()
+        elif self.LRU_MEM_IMPL == "LVT":
+            m = RamLvtSingleClock()
+        else:
+            raise ValueError("Unknown implementation of multiport memory", self.LRU_MEM_IMPL)
+        self.lru_mem = m
         m.ADDR_WIDTH = self.INDEX_W
         m.DATA_WIDTH = self.LRU_WIDTH
         m.PORT_CNT = (
@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A functional (untimed) model of a set associative cache
+:class:`hwtLib.amba.axi_comp.cache.caheWriteAllocWawOnlyWritePropagating.AxiCaheWriteAllocWawOnlyWritePropagating`.
+
+It is meant for design space exploration (WAY_CNT, CACHE_LINE_SIZE, replacement policy)
+on memory access traces and as a scoreboard in simulation tests.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from hwt.math import isPow2
+from hwtLib.amba.axi_comp.cache.addrTypeConfig import CacheAddrTypeConfig
+from pyMathBitPrecise.bit_utils import mask, apply_set_and_clear
+
+try:
+    import numpy as np
+except ImportError:
+    # numpy is optional, it is used only to speed up the address parsing
+    np = None
+
+
+class CacheReplacementPolicy():
+    """
+    Base class of the cache replacement policies for :class:`~.CacheModel`
+
+    :ivar SET_CNT: number of sets (2**INDEX_W)
+    :ivar WAY_CNT: number of cache lines in a single set
+    """
+
+    def __init__(self, SET_CNT: int, WAY_CNT: int, seed: int=0):
+        self.SET_CNT = SET_CNT
+        self.WAY_CNT = WAY_CNT
+
+    def touch(self, index: int, way: int):
+        """
+        Mark the cache line as just used
+        """
+        pass
+
+    def fill(self, index: int, way: int):
+        """
+        Notify the policy that the new cache line was stored in specified way
+        """
+        pass
+
+    def victim(self, index: int) -> int:
+        """
+        Select the way which should be replaced
+        """
+        raise NotImplementedError("Implement this in your policy", self)
+
+
+class PseudoLruPolicy(CacheReplacementPolicy):
+    """
+    Tree-PLRU, the same algorithm as :class:`hwtLib.amba.axi_comp.cache.pseudo_lru.PseudoLru`
+
+    :ivar lru_regs: list of lists of tree node bits, one list for each set,
+        index of children of node i are 2i+1 (left) and 2i+2 (right),
+        0 in node means that the victim is in the left subtree
+    """
+
+    def __init__(self, SET_CNT: int, WAY_CNT: int, seed: int=0):
+        super(PseudoLruPolicy, self).__init__(SET_CNT, WAY_CNT, seed)
+        assert isPow2(WAY_CNT), WAY_CNT
+        self.NODE_CNT = WAY_CNT - 1
+        self.lru_regs = [[0 for _ in range(self.NODE_CNT)] for _ in range(SET_CNT)]
+
+    def touch(self, index: int, way: int):
+        regs = self.lru_regs[index]
+        node = 0
+        level_items = self.WAY_CNT
+        while node < self.NODE_CNT:
+            level_items //= 2
+            go_right = (way & level_items) != 0
+            # point to an opposite subtree than the accessed one
+            regs[node] = int(not go_right)
+            node = 2 * node + 1 + go_right
+
+    def victim(self, index: int) -> int:
+        regs = self.lru_regs[index]
+        node = 0
+        while node < self.NODE_CNT:
+            node = 2 * node + 1 + regs[node]
+        return node - self.NODE_CNT
+
+
+class LruPolicy(CacheReplacementPolicy):
+    """
+    True LRU (Least Recently Used)
+
+    :ivar order: list of lists of ways, the least recently used first
+    """
+
+    def __init__(self, SET_CNT: int, WAY_CNT: int, seed: int=0):
+        super(LruPolicy, self).__init__(SET_CNT, WAY_CNT, seed)
+        self.order = [list(range(WAY_CNT)) for _ in range(SET_CNT)]
+
+    def touch(self, index: int, way: int):
+        o = self.order[index]
+        o.remove(way)
+        o.append(way)
+
+    def victim(self, index: int) -> int:
+        return self.order[index][0]
+
+
+class FifoPolicy(CacheReplacementPolicy):
+    """
+    Round-robin replacement (the oldest filled cache line is replaced)
+    """
+
+    def __init__(self, SET_CNT: int, WAY_CNT: int, seed: int=0):
+        super(FifoPolicy, self).__init__(SET_CNT, WAY_CNT, seed)
+        self.order = [list(range(WAY_CNT)) for _ in range(SET_CNT)]
+
+    def fill(self, index: int, way: int):
+        o = self.order[index]
+        o.remove(way)
+        o.append(way)
+
+    def victim(self, index: int) -> int:
+        return self.order[index][0]
+
+
+class RandomPolicy(CacheReplacementPolicy):
+    """
+    Pseudo random replacement with a deterministic seed
+    """
+
+    def __init__(self, SET_CNT: int, WAY_CNT: int, seed: int=0):
+        super(RandomPolicy, self).__init__(SET_CNT, WAY_CNT, seed)
+        self.rand = Random(seed)
+
+    def victim(self, index: int) -> int:
+        return self.rand.randrange(self.WAY_CNT)
+
+
+REPLACEMENT_POLICIES = {
+    "plru": PseudoLruPolicy,
+    "lru": LruPolicy,
+    "fifo": FifoPolicy,
+    "random": RandomPolicy,
+}
+
+
+class CacheModelStats():
+    """
+    Counters collected by :class:`~.CacheModel`
+    """
+
+    def __init__(self):
+        self.reads = 0
+        self.read_hits = 0
+        self.writes = 0
+        self.write_hits = 0
+        # number of cache lines flushed to main memory
+        self.write_backs = 0
+
+    @property
+    def accesses(self):
+        return self.reads + self.writes
+
+    @property
+    def hits(self):
+        return self.read_hits + self.write_hits
+
+    @property
+    def hit_rate(self) -> float:
+        a = self.accesses
+        if a == 0:
+            return 0.0
+        return self.hits / a
+
+    def as_dict(self):
+        return {
+            "reads": self.reads,
+            "read_hits": self.read_hits,
+            "writes": self.writes,
+            "write_hits": self.write_hits,
+            "write_backs": self.write_backs,
+            "hit_rate": self.hit_rate,
+        }
+
+    def __repr__(self):
+        return "<%s %s>" % (self.__class__.__name__, ", ".join(
+            "%s=%r" % kv for kv in self.as_dict().items()))
+
+
+class CacheModel():
+    """
+    Functional model of the write allocate, write back, set associative cache
+    (:class:`hwtLib.amba.axi_comp.cache.caheWriteAllocWawOnlyWritePropagating.AxiCaheWriteAllocWawOnlyWritePropagating`)
+
+    * read hit returns data from cache, read miss is forwarded to main memory
+      and the data is not allocated in cache
+    * write hit updates the cache line, write miss allocates the first empty way
+      or a victim selected by replacement policy, the victim is written back
+      to main memory
+
+    The address is split to tag/index/offset in same way as in
+    :class:`hwtLib.amba.axi_comp.cache.addrTypeConfig.CacheAddrTypeConfig`.
+
+    :ivar REPLACEMENT_POLICY: name of the policy from :data:`~.REPLACEMENT_POLICIES`
+        or a :class:`~.CacheReplacementPolicy` subclass
+    :ivar TOUCH_ON_FILL: if True the replacement policy is updated also when new cache line
+        is allocated, the hardware updates the LRU array only on a tag hit (= False)
+    :ivar tags: list of lists of tags (None for an invalid cache line) for each set
+    :ivar data: dictionary {(index, way): cache line data} (used only if data is specified)
+    :ivar main_mem: dictionary {cache line address: data} with written back data
+    """
+
+    def __init__(self, ADDR_WIDTH: int=32, CACHE_LINE_SIZE: int=64,
+                 CACHE_LINE_CNT: int=4096, WAY_CNT: int=4,
+                 REPLACEMENT_POLICY: Union[str, type]="plru",
+                 TOUCH_ON_FILL=False, seed=0):
+        assert CACHE_LINE_CNT > 0, CACHE_LINE_CNT
+        assert WAY_CNT > 0, WAY_CNT
+        assert CACHE_LINE_CNT % WAY_CNT == 0, (CACHE_LINE_CNT, WAY_CNT)
+        self.ADDR_WIDTH = ADDR_WIDTH
+        self.CACHE_LINE_SIZE = CACHE_LINE_SIZE
+        self.CACHE_LINE_CNT = CACHE_LINE_CNT
+        self.WAY_CNT = WAY_CNT
+        self.TOUCH_ON_FILL = TOUCH_ON_FILL
+        CacheAddrTypeConfig._compupte_tag_index_offset_widths(self)
+        self.SET_CNT = 2 ** self.INDEX_W
+
+        if isinstance(REPLACEMENT_POLICY, str):
+            REPLACEMENT_POLICY = REPLACEMENT_POLICIES[REPLACEMENT_POLICY]
+        self.REPLACEMENT_POLICY = REPLACEMENT_POLICY
+        self.policy = REPLACEMENT_POLICY(self.SET_CNT, WAY_CNT, seed)
+
+        self.tags = [[None for _ in range(WAY_CNT)] for _ in range(self.SET_CNT)]
+        self.data = {}
+        self.main_mem = {}
+        self.stats = CacheModelStats()
+
+    @classmethod
+    def from_addr_type_config(cls, cfg: CacheAddrTypeConfig, **kwargs) -> "CacheModel":
+        """
+        Create a model with a configuration of a cache component
+        """
+        return cls(
+            ADDR_WIDTH=int(cfg.ADDR_WIDTH),
+            CACHE_LINE_SIZE=int(cfg.CACHE_LINE_SIZE),
+            CACHE_LINE_CNT=int(cfg.CACHE_LINE_CNT),
+            WAY_CNT=int(cfg.WAY_CNT),
+            **kwargs)
+
+    def parse_addr_int(self, addr: int) -> Tuple[int, int, int]:
+        return CacheAddrTypeConfig.parse_addr_int(self, addr)
+
+    def deparse_addr_int(self, tag: int, index: int, offset: int) -> int:
+        return (((tag << self.INDEX_W) | index) << self.OFFSET_W) | offset
+
+    def _find(self, tag: int, index: int) -> Optional[int]:
+        tags = self.tags[index]
+        if tag in tags:
+            return tags.index(tag)
+        else:
+            return None
+
+    def _allocate(self, tag: int, index: int) -> int:
+        """
+        Select the way for a new cache line and flush the victim if required
+
+        :return: way where the new cache line should be stored
+        """
+        tags = self.tags[index]
+        if None in tags:
+            # the first empty way
+            way = tags.index(None)
+        else:
+            way = self.policy.victim(index)
+            victim_addr = self.deparse_addr_int(tags[way], index, 0)
+            self.stats.write_backs += 1
+            d = self.data.pop((index, way), None)
+            if d is not None:
+                self.main_mem[victim_addr] = d
+
+        tags[way] = tag
+        self.policy.fill(index, way)
+        if self.TOUCH_ON_FILL:
+            self.policy.touch(index, way)
+
+        return way
+
+    def read(self, addr: int) -> Tuple[bool, Optional[int]]:
+        """
+        :return: tuple (hit, data), data is None if it is not known
+        """
+        tag, index, _ = self.parse_addr_int(addr)
+        self.stats.reads += 1
+        way = self._find(tag, index)
+        if way is None:
+            return (False, self.main_mem.get(self.deparse_addr_int(tag, index, 0), None))
+
+        self.stats.read_hits += 1
+        self.policy.touch(index, way)
+        return (True, self.data.get((index, way), None))
+
+    def write(self, addr: int, data: Optional[int]=None, strb: Optional[int]=None) -> bool:
+        """
+        :param data: data of a whole cache line (or None if data is not tracked)
+        :param strb: byte enable mask for data (None = all bytes)
+        :return: True if the write was a cache hit
+        """
+        tag, index, _ = self.parse_addr_int(addr)
+        self.stats.writes += 1
+        way = self._find(tag, index)
+        hit = way is not None
+        if hit:
+            self.stats.write_hits += 1
+            self.policy.touch(index, way)
+        else:
+            way = self._allocate(tag, index)
+
+        if data is not None:
+            if strb is not None and strb != mask(self.CACHE_LINE_SIZE):
+                m = 0
+                for i in range(self.CACHE_LINE_SIZE):
+                    if (strb >> i) & 1:
+                        m |= mask(8) << (i * 8)
+                cur = self.data.get((index, way), 0)
+                data = apply_set_and_clear(cur, data & m, m)
+            self.data[(index, way)] = data
+
+        return hit
+
+    def insert(self, addr: int, way: int, data: Optional[int]=None):
+        """
+        Store the cache line directly to a specified way (to initialize the cache)
+        """
+        tag, index, offset = self.parse_addr_int(addr)
+        assert offset == 0, addr
+        self.tags[index][way] = tag
+        if data is not None:
+            self.data[(index, way)] = data
+
+    def cachelines(self) -> Dict[int, Optional[int]]:
+        """
+        :return: dictionary {cache line address: data} for all valid cache lines
+        """
+        res = {}
+        for index, tags in enumerate(self.tags):
+            for way, tag in enumerate(tags):
+                if tag is not None:
+                    addr = self.deparse_addr_int(tag, index, 0)
+                    res[addr] = self.data.get((index, way), None)
+        return res
+
+    def _split_trace(self, addrs) -> Tuple[List[int], List[int]]:
+        OFFSET_W = self.OFFSET_W
+        INDEX_W = self.INDEX_W
+        if np is not None:
+            addrs = np.asarray(addrs, dtype=np.uint64)
+            tags = (addrs >> np.uint64(INDEX_W + OFFSET_W)).tolist()
+            indexes = ((addrs >> np.uint64(OFFSET_W)) & np.uint64(mask(INDEX_W))).tolist()
+        else:
+            index_mask = mask(INDEX_W)
+            tags = [a >> (INDEX_W + OFFSET_W) for a in addrs]
+            indexes = [(a >> OFFSET_W) & index_mask for a in addrs]
+        return tags, indexes
+
+    def replay(self, is_write: Sequence[bool], addrs: Sequence[int]) -> CacheModelStats:
+        """
+        Replay the trace of accesses without data
+        (optimized version of :meth:`~.read`, :meth:`~.write`)
+
+        :param is_write: flags, True for write, False for read access
+        :param addrs: addresses of the accesses
+        """
+        tags, indexes = self._split_trace(addrs)
+        if np is not None:
+            is_write = np.asarray(is_write, dtype=bool).tolist()
+
+        all_tags = self.tags
+        policy = self.policy
+        touch = policy.touch
+        fill = policy.fill
+        victim = policy.victim
+        TOUCH_ON_FILL = self.TOUCH_ON_FILL
+        data = self.data
+        reads = read_hits = writes = write_hits = write_backs = 0
+        for w, tag, index in zip(is_write, tags, indexes):
+            s = all_tags[index]
+            hit = tag in s
+            if w:
+                writes += 1
+                if hit:
+                    write_hits += 1
+                    touch(index, s.index(tag))
+                else:
+                    if None in s:
+                        way = s.index(None)
+                    else:
+                        way = victim(index)
+                        write_backs += 1
+                        if data:
+                            d = data.pop((index, way), None)
+                            if d is not None:
+                                self.main_mem[self.deparse_addr_int(s[way], index, 0)] = d
+                    s[way] = tag
+                    fill(index, way)
+                    if TOUCH_ON_FILL:
+                        touch(index, way)
+            else:
+                reads += 1
+                if hit:
+                    read_hits += 1
+                    touch(index, s.index(tag))
+
+        st = self.stats
+        st.reads += reads
+        st.read_hits += read_hits
+        st.writes += writes
+        st.write_hits += write_hits
+        st.write_backs += write_backs
+        return st
+
+
+def load_cache_trace(file_name: str) -> Tuple[List[bool], List[int]]:
+    """
+    Load a memory access trace from a text file
+
+    Each line is in format "<R|W> <address>", the address can be in any
+    format accepted by int(x, 0), empty lines and lines starting with # are ignored.
+
+    :return: tuple (is_write flags, addresses)
+    """
+    is_write = []
+    addrs = []
+    with open(file_name) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            op, addr = line.split()
+            op = op.upper()
+            if op == "W":
+                is_write.append(True)
+            elif op == "R":
+                is_write.append(False)
+            else:
+                raise ValueError("Invalid access type", op, line)
+            addrs.append(int(addr, 0))
+
+    if np is not None:
+        return np.array(is_write, dtype=bool), np.array(addrs, dtype=np.uint64)
+    return is_write, addrs
+
+
+_sweep_trace = None
+
+
+def _cache_model_sweep_init(trace):
+    global _sweep_trace
+    _sweep_trace = trace
+
+
+def _cache_model_sweep_run(config: dict) -> CacheModelStats:
+    m = CacheModel(**config)
+    return m.replay(*_sweep_trace)
+
+
+def cache_model_sweep(trace: Union[str, Tuple[Sequence[bool], Sequence[int]]],
+                      configs: List[dict],
+                      max_workers: Optional[int]=None) -> List[Tuple[dict, CacheModelStats]]:
+    """
+    Replay the trace on multiple cache configurations in a process pool
+
+    :param trace: a file name for :func:`~.load_cache_trace` or tuple (is_write flags, addresses)
+    :param configs: list of dictionaries with constructor arguments for :class:`~.CacheModel`
+    :param max_workers: number of processes, None = number of CPUs
+    :return: list of tuples (config, statistics)
+    """
+    if isinstance(trace, str):
+        trace = load_cache_trace(trace)
+
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             initializer=_cache_model_sweep_init,
+                             initargs=(trace,)) as executor:
+        res = list(executor.map(_cache_model_sweep_run, configs))
+
+    return list(zip(configs, res))
+
+
+if __name__ == "__main__":
+    import sys
+    trace = load_cache_trace(sys.argv[1])
+    configs = [
+        {"CACHE_LINE_SIZE": line_size, "CACHE_LINE_CNT": 4096,
+         "WAY_CNT": way_cnt, "REPLACEMENT_POLICY": policy}
+        for line_size in (32, 64, 128)
+        for way_cnt in (1, 2, 4, 8)
+        for policy in ("plru", "lru")
+    ]
+    for cfg, st in cache_model_sweep(trace, configs):
+        print(cfg, st)
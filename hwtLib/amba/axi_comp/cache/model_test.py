@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+from tempfile import TemporaryDirectory
+import unittest
+
+from hwtLib.amba.axi_comp.cache.addrTypeConfig import CacheAddrTypeConfig
+from hwtLib.amba.axi_comp.cache.model import CacheModel, PseudoLruPolicy, \
+    load_cache_trace, cache_model_sweep
+
+
+class CacheModel_TC(unittest.TestCase):
+
+    def test_addr_split(self):
+        cfg = CacheAddrTypeConfig()
+        cfg.WAY_CNT = 4
+        cfg._compupte_tag_index_offset_widths()
+        m = CacheModel.from_addr_type_config(cfg)
+        self.assertEqual((m.TAG_W, m.INDEX_W, m.OFFSET_W),
+                         (cfg.TAG_W, cfg.INDEX_W, cfg.OFFSET_W))
+        for addr in [0, 63, 64, 0x12345678, 0xffffffff]:
+            self.assertEqual(m.parse_addr_int(addr), cfg.parse_addr_int(addr))
+            self.assertEqual(m.deparse_addr_int(*m.parse_addr_int(addr)), addr)
+
+    def test_plru(self):
+        p = PseudoLruPolicy(1, 4)
+        self.assertEqual(p.victim(0), 0)
+        for used, victim in [(0, 2), (2, 1), (1, 3), (3, 0)]:
+            p.touch(0, used)
+            self.assertEqual(p.victim(0), victim)
+
+    def test_read_does_not_allocate(self):
+        m = CacheModel(CACHE_LINE_SIZE=4, CACHE_LINE_CNT=16, WAY_CNT=2)
+        self.assertEqual(m.read(0x10), (False, None))
+        self.assertEqual(m.cachelines(), {})
+        self.assertFalse(m.write(0x10, 5))
+        self.assertEqual(m.read(0x10), (True, 5))
+        self.assertTrue(m.write(0x10, 0xff00, strb=0b0010))
+        self.assertEqual(m.cachelines(), {0x10: 0xff05})
+        st = m.stats
+        self.assertEqual((st.reads, st.read_hits, st.writes, st.write_hits, st.write_backs),
+                         (2, 1, 2, 1, 0))
+
+    def test_write_back(self):
+        m = CacheModel(CACHE_LINE_SIZE=4, CACHE_LINE_CNT=4, WAY_CNT=2,
+                       REPLACEMENT_POLICY="lru", TOUCH_ON_FILL=True)
+        # all addresses are in set 0
+        A = [i * 2 * 4 for i in range(4)]
+        for i, a in enumerate(A):
+            m.write(a, i)
+        self.assertEqual(m.stats.write_backs, 2)
+        self.assertEqual(m.cachelines(), {A[2]: 2, A[3]: 3})
+        self.assertEqual(m.main_mem, {A[0]: 0, A[1]: 1})
+        self.assertEqual(m.read(A[0]), (False, 0))
+
+    def test_replay_same_as_step(self):
+        is_write = [bool(i % 3) for i in range(200)]
+        addrs = [(i * 7919) % 1024 for i in range(200)]
+        for policy in ["plru", "lru", "fifo", "random"]:
+            m0 = CacheModel(ADDR_WIDTH=16, CACHE_LINE_SIZE=8, CACHE_LINE_CNT=16,
+                            WAY_CNT=4, REPLACEMENT_POLICY=policy)
+            m1 = CacheModel(ADDR_WIDTH=16, CACHE_LINE_SIZE=8, CACHE_LINE_CNT=16,
+                            WAY_CNT=4, REPLACEMENT_POLICY=policy)
+            for w, a in zip(is_write, addrs):
+                if w:
+                    m0.write(a)
+                else:
+                    m0.read(a)
+            m1.replay(is_write, addrs)
+            self.assertEqual(m0.stats.as_dict(), m1.stats.as_dict(), policy)
+            self.assertEqual(m0.tags, m1.tags, policy)
+
+    def test_trace_sweep(self):
+        with TemporaryDirectory() as d:
+            f_name = os.path.join(d, "trace.txt")
+            with open(f_name, "w") as f:
+                f.write("# a comment\n")
+                for i in range(64):
+                    f.write("%s 0x%x\n" % ("W" if i % 2 else "r", (i % 16) * 64))
+
+            is_write, addrs = load_cache_trace(f_name)
+            self.assertEqual(len(addrs), 64)
+            configs = [
+                {"CACHE_LINE_CNT": 4, "WAY_CNT": 1},
+                {"CACHE_LINE_CNT": 64, "WAY_CNT": 4},
+            ]
+            res = cache_model_sweep(f_name, configs, max_workers=2)
+
+        self.assertEqual([cfg for cfg, _ in res], configs)
+        small, big = [st for _, st in res]
+        self.assertEqual(big.write_backs, 0)
+        self.assertEqual(big.write_hits, 24)
+        self.assertGreater(big.hit_rate, small.hit_rate)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,7 @@
 
 from math import ceil
 
-from hwt.code import Concat, Or, If
+from hwt.code import Concat, Or
 from hwt.code_utils import rename_signal
 from hwt.hdl.constants import WRITE, READ
 from hwt.hdl.typeShortcuts import vec
@@ -128,9 +128,9 @@ class RamCumulativeMask(RamSingleClock):
             "we_for_we_bytes")
 
         preload = self._reg("preload", def_val=0)
-        If(w.en.vld,
-           preload(~preload & w.do_accumulate & ~w.do_overwrite)
-        )
+        # :note: preload is canceled if the write is not valid any more, because the data
+        #     from the read port are valid only in a clock cycle after the preload
+        preload(w.en.vld & ~preload & w.do_accumulate & ~w.do_overwrite)
         w.en.rd(~w.do_accumulate | w.do_overwrite | preload)
         ram_w.addr(w.addr)
         ram_w.en(w.en.vld & (w.do_overwrite | ~w.do_accumulate | preload))
@@ -146,12 +146,12 @@ class RamCumulativeMask(RamSingleClock):
                 w_mask = rename_signal(self, w_mask, "w_mask")
                 ram_w.din(Concat(w.din, w_mask))
 
+                # the read port is used for preload only in the first clock cycle of the accumulation
                 will_preload_for_accumulate = rename_signal(
-                    self, w.en.vld & w.do_accumulate & ~w.do_overwrite, "will_preload_for_accumulate")
+                    self, w.en.vld & w.do_accumulate & ~w.do_overwrite & ~preload, "will_preload_for_accumulate")
                 ram_r.addr(will_preload_for_accumulate._ternary(w.addr, r.addr))
                 ram_r.en(will_preload_for_accumulate | r.en.vld)
-                # [TODO] check if r.en.rd is according to spec
-                r.en.rd(~will_preload_for_accumulate | preload)
+                r.en.rd(~will_preload_for_accumulate)
                 is_first_read_port = False
             else:
                 ram_r.addr(r.addr)
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from hwt.code import Concat, If, connect
+from hwt.code import If, connect
 from hwt.hdl.types.bits import Bits
 from hwt.interfaces.std import Handshaked, HandshakeSync, VectSignal
 from hwt.interfaces.utils import addClkRstn, propagateClkRstn
@@ -10,6 +10,7 @@ from hwt.serializer.mode import serializeParamsUniq
 from hwt.synthesizer.param import Param
 from hwt.synthesizer.unit import Unit
 from hwtLib.amba.axi_comp.cache.utils import CamWithReadPort
+from hwtLib.amba.axi_comp.lsu.interfaces import AddrDataIntf
 from hwtLib.common_nonstd_interfaces.index_key_hs import IndexKeyHs, \
     IndexKeyInHs
 from hwtLib.handshaked.streamNode import StreamNode
@@ -86,11 +87,12 @@ class FifoOutOfOrderRead(Unit):
         # out of order read confirmation
         pc = self.read_confirm
         pc.rd(1)
-        _vld_next = []
-        _item_write_lock_next = []
+        # :note: assigned bit by bit as a Concat of all items would be too deep for large ITEMS
+        _vld_next = self._sig("item_valid_next", Bits(ITEMS))
+        _item_write_lock_next = self._sig("item_write_lock_next", Bits(ITEMS))
         for i in range(ITEMS):
-            vld_next = self._sig(f"valid_{i:d}_next")
-            item_write_lock_next = self._sig(f"item_write_lock_{i:d}_next")
+            vld_next = _vld_next[i]
+            item_write_lock_next = _item_write_lock_next[i]
             If(pc.vld & pc.data._eq(i),
                # this is an item which we are discarding
                vld_next(0),
@@ -107,11 +109,9 @@ class FifoOutOfOrderRead(Unit):
                vld_next(item_valid[i]),
                item_write_lock_next(item_write_lock[i]),
             )
-            _vld_next.append(vld_next)
-            _item_write_lock_next.append(item_write_lock_next)
 
-        item_valid(Concat(*reversed(_vld_next)))
-        item_write_lock(Concat(*reversed(_item_write_lock_next)))
+        item_valid(_vld_next)
+        item_write_lock(_item_write_lock_next)
 
         return item_valid, item_write_lock, (write_en, write_ptr), (read_en, read_ptr)
 
@@ -131,6 +131,9 @@ class FifoOutOfOrderReadFiltered(FifoOutOfOrderRead):
     * read_execute: the item is locked for updates and is currently being read
     * read_confirm: the item is entirely readed and it is ready to be deallocated
 
+    :ivar HAS_WRITE_PRE_LOOKUP: if False the keys are stored in a memory without comparators
+        (for large number of items where the lookup is done by a parent component)
+        and the write_pre_lookup is replaced by key_read port which reads the key of item by index
 
     .. hwt-autodoc::
     """
@@ -139,12 +142,14 @@ class FifoOutOfOrderReadFiltered(FifoOutOfOrderRead):
         super(FifoOutOfOrderReadFiltered, self)._config()
         self.KEY_WIDTH = 8
         self.HAS_READ_LOOKUP = Param(False)
+        self.HAS_WRITE_PRE_LOOKUP = Param(True)
 
     def _declr(self) -> None:
         assert self.KEY_WIDTH > 0
         super(FifoOutOfOrderReadFiltered, self)._declr()
 
         if self.HAS_READ_LOOKUP:
+            assert self.HAS_WRITE_PRE_LOOKUP, "Read lookup requires the CAM"
             # check if item is stored in CAM
             pl = self.read_lookup = Handshaked()
             pl.DATA_WIDTH = self.KEY_WIDTH
@@ -153,13 +158,14 @@ class FifoOutOfOrderReadFiltered(FifoOutOfOrderRead):
             plr = self.read_lookup_res = Handshaked()._m()
             plr.DATA_WIDTH = self.ITEMS
 
-        # check if item is stored in CAM
-        pl = self.write_pre_lookup = Handshaked()
-        pl.DATA_WIDTH = self.KEY_WIDTH
+        if self.HAS_WRITE_PRE_LOOKUP:
+            # check if item is stored in CAM
+            pl = self.write_pre_lookup = Handshaked()
+            pl.DATA_WIDTH = self.KEY_WIDTH
 
-        # return one-hot encoded index of the previously searched key
-        plr = self.write_pre_lookup_res = Handshaked()._m()
-        plr.DATA_WIDTH = self.ITEMS
+            # return one-hot encoded index of the previously searched key
+            plr = self.write_pre_lookup_res = Handshaked()._m()
+            plr.DATA_WIDTH = self.ITEMS
 
         self.item_valid = VectSignal(self.ITEMS)._m()
         self.item_write_lock = VectSignal(self.ITEMS)._m()
@@ -170,24 +176,47 @@ class FifoOutOfOrderReadFiltered(FifoOutOfOrderRead):
         i.INDEX_WIDTH = self.read_execute.INDEX_WIDTH
         i.KEY_WIDTH = self.KEY_WIDTH
 
-        c = self.tag_cam = CamWithReadPort()
-        c.ITEMS = self.ITEMS
-        c.KEY_WIDTH = self.KEY_WIDTH
-        c.USE_VLD_BIT = False  # we maintaining vld flag separately
-        if self.HAS_READ_LOOKUP:
-            c.MATCH_PORT_CNT = 2
+        if self.HAS_WRITE_PRE_LOOKUP:
+            c = self.tag_cam = CamWithReadPort()
+            c.ITEMS = self.ITEMS
+            c.KEY_WIDTH = self.KEY_WIDTH
+            c.USE_VLD_BIT = False  # we maintaining vld flag separately
+            if self.HAS_READ_LOOKUP:
+                c.MATCH_PORT_CNT = 2
+        else:
+            # read the key of the item by index (combinational)
+            kr = self.key_read = AddrDataIntf()
+            kr.ADDR_WIDTH = self.read_execute.INDEX_WIDTH
+            kr.DATA_WIDTH = self.KEY_WIDTH
+
+    def _impl_without_cam(self, write_ptr, read_ptr):
+        item_key = self._sig("item_key", Bits(self.KEY_WIDTH)[self.ITEMS])
+        write_execute = self.write_execute
+        write_execute.index(write_ptr)
+        write_execute.vld(1)
+        If(self.clk._onRisingEdge(),
+            If(write_execute.rd,
+               item_key[write_ptr](write_execute.key)
+            )
+        )
+        self.read_execute.key(item_key[read_ptr])
+        self.key_read.data(item_key[self.key_read.addr])
 
     def _impl(self):
         item_valid, item_write_lock, (_, write_ptr), (_, read_ptr) = super(FifoOutOfOrderReadFiltered, self)._impl()
         self.item_valid(item_valid)
         self.item_write_lock(item_write_lock)
 
+        if not self.HAS_WRITE_PRE_LOOKUP:
+            self._impl_without_cam(write_ptr, read_ptr)
+            return
+
         tc = self.tag_cam
 
         if self.HAS_READ_LOOKUP:
             tc.match[0](self.write_pre_lookup)
 
-            self.write_pre_lookup_res.data(tc.out[0].data & item_valid & item_write_lock)
+            self.write_pre_lookup_res.data(tc.out[0].data & item_valid)
             StreamNode([tc.out[0]], [self.write_pre_lookup_res]).sync()
 
             tc.match[1](self.read_lookup)
@@ -198,7 +227,7 @@ class FifoOutOfOrderReadFiltered(FifoOutOfOrderRead):
         else:
             tc.match(self.write_pre_lookup)
 
-            self.write_pre_lookup_res.data(tc.out.data & item_valid & item_write_lock)
+            self.write_pre_lookup_res.data(tc.out.data & item_valid)
             StreamNode([tc.out], [self.write_pre_lookup_res]).sync()
 
         write_execute = self.write_execute
@@ -49,7 +49,7 @@ class AxiWriteAggregatorWriteTmpIntf(AxiWriteAggregatorWriteIntf):
     Interface for tmp input register on store buffer write input
 
     :ivar cam_lookup: VectSignal with value of lookup from item cam
-        (1 if cacheline present in store buffer)
+        (1 if cacheline present in store buffer), not present if ITEMS is None
     :ivar mask_byte_unaligned: Signal 1 if any byte of mask is 0 or all 1
 
     .. hwt-autodoc::
@@ -61,7 +61,8 @@ class AxiWriteAggregatorWriteTmpIntf(AxiWriteAggregatorWriteIntf):
 
     def _declr(self):
         AxiWriteAggregatorWriteIntf._declr(self)
-        self.cam_lookup = VectSignal(self.ITEMS)
+        if self.ITEMS is not None:
+            self.cam_lookup = VectSignal(self.ITEMS)
         self.mask_byte_unaligned = Signal()
 
     def _initSimAgent(self, sim: HdlSimulator):
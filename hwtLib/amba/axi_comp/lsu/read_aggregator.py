@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from hwt.code import If, Concat, connect
+from hwt.code import If, connect
 from hwt.code_utils import rename_signal
 from hwt.hdl.types.bits import Bits
 from hwt.interfaces.std import VldSynced
@@ -55,14 +55,20 @@ class AxiReadAggregator(Unit):
                 fb = AxiSRegCopy(Axi4_r)
             self.frame_buff = fb
 
+        self._declr_addr_matcher()
+
+        for i in [self.s, self.m]:
+            i.HAS_W = False
+
+    def _declr_addr_matcher(self):
+        """
+        Declare the memory used to find the transaction which is reading the same address
+        """
         ac = self.addr_cam = Cam()
         ac.ITEMS = 2 ** self.ID_WIDTH
         ac.USE_VLD_BIT = False
         ac.KEY_WIDTH = self.CACHE_LINE_ADDR_WIDTH
 
-        for i in [self.s, self.m]:
-            i.HAS_W = False
-
     def read_data_section(self, read_ack: RtlSignal,
                           waiting_transaction_id: RtlSignal,
                           waiting_transaction_vld: RtlSignal,
@@ -167,9 +173,33 @@ class AxiReadAggregator(Unit):
                s_ar_tmp.dataOut.addr[:self.CACHE_LINE_OFFSET_BITS]._eq(s.ar.addr[:self.CACHE_LINE_OFFSET_BITS])
         ))
         #)
+        self.transaction_state_update(
+            s_ar_tmp, read_ack, ar_ack,
+            match_res != 0, parent_transaction_id,
+            item_vld, waiting_transaction_id, waiting_transaction_vld,
+            data_copy_override)
 
-        item_vld_next = []
-        waiting_transaction_vld_next = []
+    def transaction_state_update(self, s_ar_tmp: AxiSReg,
+                                 read_ack: RtlSignal,
+                                 ar_ack: RtlSignal,
+                                 has_parent: RtlSignal,
+                                 parent_transaction_id: RtlSignal,
+                                 item_vld: RtlSignal,
+                                 waiting_transaction_id: RtlSignal,
+                                 waiting_transaction_vld: RtlSignal,
+                                 data_copy_override: VldSynced):
+        """
+        Update the slot validity flags and the links to a waiting transactions
+
+        :param ar_ack: the transaction from s_ar_tmp is consumed
+        :param has_parent: the transaction in s_ar_tmp reads the same address as the
+            transaction parent_transaction_id which is currently in progress
+        """
+        s = self.s
+        ITEMS = 2 ** self.ID_WIDTH
+        # :note: assigned bit by bit as a Concat of all items would be too deep for large ITEMS
+        item_vld_next = self._sig("item_vld_next", Bits(ITEMS))
+        waiting_transaction_vld_next = self._sig("waiting_transaction_vld_next", Bits(ITEMS))
 
         for trans_id in range(ITEMS):
             # it becomes ready if we are requested for it on "s" interface
@@ -179,11 +209,11 @@ class AxiReadAggregator(Unit):
             this_trans_end = read_ack & s.r.id._eq(trans_id) & s.r.last
             this_trans_end = rename_signal(self, this_trans_end, f"this_trans_end{trans_id:d}")
             this_transaction_vld = apply_set_and_clear(item_vld[trans_id], this_trans_start, this_trans_end)
-            item_vld_next.append(this_transaction_vld)
+            item_vld_next[trans_id](this_transaction_vld)
 
             waiting_transaction_start = (
                 ar_ack &
-                (match_res != 0) &
+                has_parent &
                 parent_transaction_id._eq(trans_id) &
                 ~this_trans_end
             )
@@ -195,13 +225,13 @@ class AxiReadAggregator(Unit):
                 waiting_transaction_start,
                 this_trans_end)
             _waiting_transaction_vld = rename_signal(self, _waiting_transaction_vld, f"waiting_transaction_vld{trans_id:d}")
-            waiting_transaction_vld_next.append(_waiting_transaction_vld)
+            waiting_transaction_vld_next[trans_id](_waiting_transaction_vld)
 
-        item_vld(Concat(*reversed(item_vld_next)))
-        waiting_transaction_vld(Concat(*reversed(waiting_transaction_vld_next)))
+        item_vld(item_vld_next)
+        waiting_transaction_vld(waiting_transaction_vld_next)
 
         If(self.clk._onRisingEdge(),
-            If((match_res != 0) & ar_ack,
+            If(has_parent & ar_ack,
                 waiting_transaction_id[parent_transaction_id](s_ar_tmp.dataOut.id)
             )
         )
@@ -212,14 +242,13 @@ class AxiReadAggregator(Unit):
         data_copy_override.vld(
             s_ar_tmp.dataOut.valid &
             read_ack &
-            (match_res != 0) &
+            has_parent &
             s.r.id._eq(parent_transaction_id) &
             s.r.last)
         data_copy_override.data(s_ar_tmp.dataOut.id)
 
-
     def _impl(self):
-        ITEMS = self.addr_cam.ITEMS
+        ITEMS = 2 ** self.ID_WIDTH
         item_vld = self._reg("item_vld", Bits(ITEMS), def_val=0)
         waiting_transaction_id = self._sig("waiting_transaction_id", self.s.ar.id._dtype[ITEMS])
         waiting_transaction_vld = self._reg("waiting_transaction_vld", Bits(ITEMS), def_val=0)
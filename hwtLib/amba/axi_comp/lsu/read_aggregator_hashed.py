@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.code import If, Concat, Xor, connect
+from hwt.code_utils import rename_signal
+from hwt.hdl.constants import READ, WRITE
+from hwt.hdl.types.bits import Bits
+from hwt.interfaces.std import VldSynced
+from hwt.serializer.mode import serializeParamsUniq
+from hwt.synthesizer.param import Param
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwtLib.amba.axi_comp.lsu.read_aggregator import AxiReadAggregator
+from hwtLib.amba.axis_comp.reg import AxiSReg
+from hwtLib.handshaked.streamNode import StreamNode
+from hwtLib.logic.oneHotToBin import oneHotToBin
+from hwtLib.mem.cam import Cam
+from hwtLib.mem.ram import RamSingleClock
+from pyMathBitPrecise.bit_utils import apply_set_and_clear
+
+
+@serializeParamsUniq
+class AxiReadAggregatorHashed(AxiReadAggregator):
+    """
+    :class:`~.AxiReadAggregator` variant which finds the transaction which is reading the same address
+    using a hash table in BRAM and a small overflow CAM instead of CAM with a record for every slot.
+    This allows for a large number of slots (2**ID_WIDTH) without a large CAM.
+
+    * addr_table is indexed by the hash of the cache line address and it contains the id
+      of the last transaction which reads this address.
+    * slot_addr is a LUTRAM with the cache line address for each slot, it is used
+      to check if the record in addr_table is up to date.
+    * overflow_cam stores the addresses which collided in addr_table.
+
+    If the address is not found and there is not any space in addr_table or overflow_cam
+    the transaction is dispatched without the possibility to be merged with a later transactions.
+
+    :ivar HASH_WIDTH: width of the index to addr_table (addr_table has 2**HASH_WIDTH items),
+        if None the ID_WIDTH + 1 is used
+    :ivar OVERFLOW_CAM_ITEMS: number of items in overflow_cam
+
+    .. hwt-autodoc:: _example_AxiReadAggregatorHashed
+    """
+
+    def _config(self):
+        AxiReadAggregator._config(self)
+        self.HASH_WIDTH = Param(None)
+        self.OVERFLOW_CAM_ITEMS = Param(4)
+
+    def _declr_addr_matcher(self):
+        if self.HASH_WIDTH is None:
+            self.HASH_WIDTH = self.ID_WIDTH + 1
+
+        t = self.addr_table = RamSingleClock()
+        t.PORT_CNT = (READ, WRITE)
+        t.ADDR_WIDTH = self.HASH_WIDTH
+        t.DATA_WIDTH = self.ID_WIDTH
+        t.INIT_DATA = tuple(0 for _ in range(2 ** self.HASH_WIDTH))
+
+        oc = self.overflow_cam = Cam()
+        oc.ITEMS = self.OVERFLOW_CAM_ITEMS
+        oc.USE_VLD_BIT = False
+        oc.KEY_WIDTH = self.CACHE_LINE_ADDR_WIDTH
+
+    def hash_addr(self, cache_line_addr: RtlSignal):
+        """
+        Xor folding of the cache line address to HASH_WIDTH bits
+        """
+        HW = self.HASH_WIDTH
+        W = cache_line_addr._dtype.bit_length()
+        parts = []
+        for low in range(0, W, HW):
+            high = min(low + HW, W)
+            p = cache_line_addr[high:low]
+            if high - low < HW:
+                p = Concat(Bits(HW - (high - low)).from_py(0), p)
+            parts.append(p)
+        if len(parts) == 1:
+            return parts[0]
+        else:
+            return Xor(*parts)
+
+    def read_request_section(self, read_ack: RtlSignal,
+                             item_vld: RtlSignal,
+                             waiting_transaction_id: RtlSignal,
+                             waiting_transaction_vld: RtlSignal,
+                             data_copy_override: VldSynced):
+        s = self.s
+        m = self.m
+        ITEMS = 2 ** self.ID_WIDTH
+        OVF_ITEMS = self.OVERFLOW_CAM_ITEMS
+        CL_OFF = self.CACHE_LINE_OFFSET_BITS
+        cl_addr_t = Bits(self.CACHE_LINE_ADDR_WIDTH)
+        id_t = s.ar.id._dtype
+
+        with self._paramsShared():
+            s_ar_tmp = self.s_ar_tmp = AxiSReg(s.AR_CLS)
+
+        blocking_access = rename_signal(
+            self,
+            s.ar.valid &
+            (
+                item_vld[s.ar.id] |
+                (s_ar_tmp.dataOut.valid & (s.ar.id._eq(s_ar_tmp.dataOut.id)))
+            ),
+            "blocking_access")
+        s_ar_node = StreamNode(
+            [s.ar],
+            [s_ar_tmp.dataIn],
+        )
+        s_ar_node.sync(~blocking_access)
+        connect(s.ar, s_ar_tmp.dataIn, exclude={s.ar.valid, s.ar.ready})
+
+        # the record from addr_table is read together with the load to s_ar_tmp
+        table_r, table_w = self.addr_table.port
+        table_r.en(s_ar_node.ack())
+        table_r.addr(self.hash_addr(s.ar.addr[:CL_OFF]))
+
+        # forwarding of addr_table write which happened together with the read
+        table_fwd_vld = self._reg("table_fwd_vld", def_val=0)
+        table_fwd_id = self._reg("table_fwd_id", id_t)
+        If(table_r.en,
+           table_fwd_vld(table_w.en & table_w.addr._eq(table_r.addr)),
+           table_fwd_id(table_w.din),
+        )
+
+        addr = rename_signal(self, s_ar_tmp.dataOut.addr[:CL_OFF], "addr")
+        addr_hash = rename_signal(self, self.hash_addr(addr), "addr_hash")
+        # cache line address for each slot
+        slot_addr = self._sig("slot_addr", cl_addr_t[ITEMS])
+
+        def is_live_tail(trans_id):
+            return item_vld[trans_id] & ~waiting_transaction_vld[trans_id]
+
+        table_id = rename_signal(
+            self,
+            table_fwd_vld._ternary(table_fwd_id, table_r.dout),
+            "table_id")
+        table_slot_addr = rename_signal(self, slot_addr[table_id], "table_slot_addr")
+        table_match = rename_signal(
+            self,
+            is_live_tail(table_id) & table_slot_addr._eq(addr),
+            "table_match")
+        table_occupied = rename_signal(
+            self,
+            is_live_tail(table_id) & self.hash_addr(table_slot_addr)._eq(addr_hash),
+            "table_occupied")
+
+        # overflow_cam lookup
+        ovf_vld = self._reg("ovf_vld", Bits(OVF_ITEMS), def_val=0)
+        ovf_id = self._sig("ovf_id", id_t[OVF_ITEMS])
+        oc = self.overflow_cam
+        oc.match.vld(s_ar_tmp.dataOut.valid)
+        oc.match.data(addr)
+        oc.out.rd(1)
+        ovf_hit = rename_signal(
+            self,
+            oc.out.data & ovf_vld & Concat(*reversed([
+                ~waiting_transaction_vld[ovf_id[i]]
+                for i in range(OVF_ITEMS)
+            ])),
+            "ovf_hit")
+        ovf_match = rename_signal(self, ovf_hit != 0, "ovf_match")
+        ovf_match_index = oneHotToBin(self, ovf_hit, "ovf_match_index")
+
+        has_parent = rename_signal(self, table_match | ovf_match, "has_parent")
+        parent_transaction_id = rename_signal(
+            self,
+            table_match._ternary(table_id, ovf_id[ovf_match_index]),
+            "parent_transaction_id")
+
+        m_ar_node = StreamNode(
+            [s_ar_tmp.dataOut],
+            [m.ar],
+            extraConds={m.ar: ~has_parent},
+            skipWhen={m.ar: has_parent}
+        )
+        m_ar_node.sync()
+        connect(s_ar_tmp.dataOut, m.ar, exclude={m.ar.valid, m.ar.ready})
+        ar_ack = rename_signal(self, m_ar_node.ack(), "ar_ack")
+        trans_id = s_ar_tmp.dataOut.id
+
+        If(self.clk._onRisingEdge(),
+            If(ar_ack,
+               slot_addr[trans_id](addr)
+            )
+        )
+
+        # the record is updated to point to the last transaction which reads this address
+        table_w.en(ar_ack & (table_match | (~has_parent & ~table_occupied)))
+        table_w.addr(addr_hash)
+        table_w.din(trans_id)
+
+        ovf_free = ~ovf_vld
+        ovf_has_free = rename_signal(self, ovf_free != 0, "ovf_has_free")
+        ovf_free_index = oneHotToBin(self, ovf_free, "ovf_free_index")
+        ovf_insert = rename_signal(
+            self,
+            ar_ack & ~has_parent & table_occupied & ovf_has_free,
+            "ovf_insert")
+        ovf_update = rename_signal(self, ar_ack & ~table_match & ovf_match, "ovf_update")
+        oc.write.addr(ovf_free_index)
+        oc.write.data(addr)
+        oc.write.vld(ovf_insert)
+
+        trans_end = read_ack & s.r.last
+        ovf_vld_next = []
+        for i in range(OVF_ITEMS):
+            this_insert = ovf_insert & ovf_free_index._eq(i)
+            this_update = ovf_update & ovf_match_index._eq(i)
+            If(self.clk._onRisingEdge(),
+                If(this_insert | this_update,
+                   ovf_id[i](trans_id)
+                )
+            )
+            this_end = trans_end & s.r.id._eq(ovf_id[i])
+            ovf_vld_next.append(
+                apply_set_and_clear(ovf_vld[i], this_insert | this_update, this_end)
+            )
+        ovf_vld(Concat(*reversed(ovf_vld_next)))
+
+        self.transaction_state_update(
+            s_ar_tmp, read_ack, ar_ack,
+            has_parent, parent_transaction_id,
+            item_vld, waiting_transaction_id, waiting_transaction_vld,
+            data_copy_override)
+
+
+def _example_AxiReadAggregatorHashed():
+    u = AxiReadAggregatorHashed()
+    u.ID_WIDTH = 8
+    return u
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = _example_AxiReadAggregatorHashed()
+    print(to_rtl_str(u))
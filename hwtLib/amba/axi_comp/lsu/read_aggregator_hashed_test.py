@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from math import ceil
+
+from hwt.pyUtils.arrayQuery import flatten
+from hwt.simulator.utils import allValuesToInts
+from hwtLib.amba.axi_comp.lsu.read_aggregator_hashed import AxiReadAggregatorHashed, \
+    _example_AxiReadAggregatorHashed
+from hwtLib.amba.axi_comp.lsu.read_aggregator_test import AxiReadAggregator_1word_burst_TC
+from hwtLib.amba.constants import RESP_OKAY
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer
+from pyMathBitPrecise.bit_utils import mask
+
+
+class AxiReadAggregatorHashed_1word_burst_TC(AxiReadAggregator_1word_burst_TC):
+
+    @classmethod
+    def getUnit(cls):
+        cls.u = u = AxiReadAggregatorHashed()
+        u.ID_WIDTH = 2
+        u.CACHE_LINE_SIZE = 4
+        u.DATA_WIDTH = 4 * 8
+        # small table to test collisions
+        u.HASH_WIDTH = 1
+        u.OVERFLOW_CAM_ITEMS = 2
+        cls.ID_CNT = 2 ** u.ID_WIDTH
+        cls.WORD_SIZE = u.DATA_WIDTH // 8
+        return u
+
+    def _hash(self, addr: int):
+        """
+        Software model of AxiReadAggregatorHashed.hash_addr
+        """
+        u = self.u
+        cl_addr = addr // u.CACHE_LINE_SIZE
+        h = 0
+        while cl_addr:
+            h ^= cl_addr & mask(u.HASH_WIDTH)
+            cl_addr >>= u.HASH_WIDTH
+        return h
+
+    def _test_merge(self, id_addr_tuples, ar_ref, REF_DATA=0x1000):
+        """
+        The memory responds only after all reads were accepted,
+        so the reads from the same address can be merged
+
+        :param ar_ref: expected list of (id, addr) of the transactions on m.ar
+        """
+        u = self.u
+        trans_len = ceil(u.CACHE_LINE_SIZE / self.WORD_SIZE)
+        for trans_id, addr in id_addr_tuples:
+            trans = u.s._ag.create_addr_req(addr, trans_len - 1, _id=trans_id)
+            u.s.ar._ag.data.append(trans)
+
+        t_respond = (len(id_addr_tuples) + 10) * 2 * CLK_PERIOD
+        ar = []
+
+        def respond():
+            yield Timer(t_respond)
+            for a in u.m.ar._ag.data:
+                _id, addr = int(a[0]), int(a[1])
+                ar.append((_id, addr))
+                for i in range(trans_len):
+                    u.m.r._ag.data.append((_id, addr + i + REF_DATA, RESP_OKAY, int(i == trans_len - 1)))
+
+        self.procs.append(respond())
+        self.runSim(t_respond + (len(id_addr_tuples) * trans_len + 10) * 2 * CLK_PERIOD)
+
+        self.assertSequenceEqual(ar, ar_ref)
+        ref_data = sorted(flatten([
+            [(_id, addr + i + REF_DATA, RESP_OKAY, int(i == trans_len - 1))
+              for i in range(trans_len)]
+            for _id, addr in id_addr_tuples],
+            level=1))
+        data = sorted(allValuesToInts(u.s.r._ag.data))
+        self.assertSequenceEqual(data, ref_data)
+
+    def test_merge_same_addr(self):
+        # all reads are served by a single transaction
+        self._test_merge([(i, 0x0) for i in range(self.ID_CNT)], [(0, 0x0)])
+
+    def test_merge_overflow_cam(self):
+        CL = self.u.CACHE_LINE_SIZE
+        a0 = 0x0
+        # the address with the same hash, it has to be stored in overflow_cam
+        a1 = next(i * CL for i in range(1, 2 ** 16) if self._hash(i * CL) == self._hash(a0))
+        self._test_merge(
+            [(0, a0), (1, a1), (2, a1), (3, a0)],
+            [(0, a0), (1, a1)])
+
+    def test_read_from_random_addr_100x_from_3addresses_4ids(self, randomize=False):
+        self._test_read_from_random_addr_and_id(4, 3, 100, randomize, time_multiplier=3)
+
+    def test_r_read_from_random_addr_100x_from_3addresses_4ids(self, randomize=True):
+        self.test_read_from_random_addr_100x_from_3addresses_4ids(randomize)
+
+
+class AxiReadAggregatorHashed_2word_burst_TC(AxiReadAggregatorHashed_1word_burst_TC):
+
+    @classmethod
+    def getUnit(cls):
+        cls.u = u = AxiReadAggregatorHashed()
+        u.ID_WIDTH = 3
+        u.CACHE_LINE_SIZE = 8
+        u.DATA_WIDTH = 4 * 8
+        cls.ID_CNT = 2 ** u.ID_WIDTH
+        cls.WORD_SIZE = u.DATA_WIDTH // 8
+        return u
+
+
+class AxiReadAggregatorHashed_256slots_TC(AxiReadAggregatorHashed_1word_burst_TC):
+    """
+    The configuration from the example (256 slots, 8 words in cache line)
+    """
+
+    @classmethod
+    def getUnit(cls):
+        cls.u = u = _example_AxiReadAggregatorHashed()
+        cls.ID_CNT = 2 ** u.ID_WIDTH
+        cls.WORD_SIZE = u.DATA_WIDTH // 8
+        return u
+
+    def test_merge_many_slots(self):
+        CL = self.u.CACHE_LINE_SIZE
+        ADDR_CNT = 16
+        # 16 addresses with a different hash, each read by 16 transactions
+        self._test_merge(
+            [(i, (i % ADDR_CNT) * CL) for i in range(self.ID_CNT)],
+            [(i, i * CL) for i in range(ADDR_CNT)])
+
+
+AxiReadAggregatorHashed_TCs = [
+    AxiReadAggregatorHashed_1word_burst_TC,
+    AxiReadAggregatorHashed_2word_burst_TC,
+    AxiReadAggregatorHashed_256slots_TC,
+]
+
+if __name__ == "__main__":
+    import unittest
+    suite = unittest.TestSuite()
+
+    # suite.addTest(AxiReadAggregatorHashed_1word_burst_TC('test_read_from_same_addr_32x'))
+    for tc in AxiReadAggregatorHashed_TCs:
+        suite.addTest(unittest.makeSuite(tc))
+
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
@@ -1,12 +1,15 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from typing import Optional, Tuple
+
 from hwt.code import If, Concat, Switch
 from hwt.code_utils import rename_signal
 from hwt.hdl.constants import READ, WRITE
 from hwt.interfaces.utils import addClkRstn, propagateClkRstn
 from hwt.serializer.mode import serializeParamsUniq
 from hwt.synthesizer.param import Param
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
 from hwt.synthesizer.unit import Unit
 from hwtLib.amba.axi4 import Axi4
 from hwtLib.amba.axi_comp.cache.ram_cumulative_mask import BramPort_withReadMask_withoutClk, \
@@ -75,7 +78,8 @@ class AxiWriteAggregator(Unit):
         dr.HAS_BE = True
         return dr
 
-    def data_insert(self, items: BramPort_withReadMask_withoutClk):
+    def data_insert(self, items: BramPort_withReadMask_withoutClk,
+                    line_lookup: Optional[Tuple[RtlSignal, RtlSignal]]=None):
         """
         * check if this address is already present in address CAM or w_in_reg
         * if it is possible to update data in w_in_reg or in data_ram of this buffer
@@ -86,14 +90,14 @@ class AxiWriteAggregator(Unit):
 
         :note: we must not let data from tmp reg if next w_in has same address (we have to update tmp reg instead)
 
+        :param line_lookup: optional tuple (found, index) of the item which can be updated by the content of w_in_reg,
+            the lookup has to be started on the load of w_in_reg,
+            if None the CAM in ooo_fifo is used
+        :return: tuple (cam_found, cam_found_index, found_in_tmp_reg) for the content of w_in_reg
         """
         w_in = self.w
         w_tmp = self.w_in_reg
         ooo_fifo = self.ooo_fifo
-        write_pre_lookup = ooo_fifo.write_pre_lookup
-        write_pre_lookup_res = ooo_fifo.write_pre_lookup_res
-
-        write_pre_lookup.data(w_in.addr)
         w_tmp_in = w_tmp.dataIn
         w_tmp_out = w_tmp.dataOut
 
@@ -116,18 +120,27 @@ class AxiWriteAggregator(Unit):
             w_tmp_in.mask_byte_unaligned(is_mask_byte_unaligned(w_in.mask))
         )
         w_tmp_in.addr(w_in.addr),
-        w_tmp_in.cam_lookup(write_pre_lookup_res.data)
-
-        StreamNode([w_in], [w_tmp_in, write_pre_lookup]).sync()
-        write_pre_lookup_res.rd(1)
 
-        # CAM insert
-        cam_index_onehot = rename_signal(
-            self,
-            w_tmp_out.cam_lookup & ooo_fifo.item_valid & ~ooo_fifo.item_write_lock,
-            "cam_index_onehot")
-        cam_found = rename_signal(self, cam_index_onehot != 0, "cam_found")
-        cam_found_index = oneHotToBin(self, cam_index_onehot, "cam_found_index")
+        if line_lookup is None:
+            write_pre_lookup = ooo_fifo.write_pre_lookup
+            write_pre_lookup_res = ooo_fifo.write_pre_lookup_res
+            write_pre_lookup.data(w_in.addr)
+            w_tmp_in.cam_lookup(write_pre_lookup_res.data)
+
+            StreamNode([w_in], [w_tmp_in, write_pre_lookup]).sync()
+            write_pre_lookup_res.rd(1)
+
+            # CAM insert
+            cam_index_onehot = rename_signal(
+                self,
+                w_tmp_out.cam_lookup & ooo_fifo.item_valid & ~ooo_fifo.item_write_lock,
+                "cam_index_onehot")
+            cam_found = rename_signal(self, cam_index_onehot != 0, "cam_found")
+            cam_found_index = oneHotToBin(self, cam_index_onehot, "cam_found_index")
+        else:
+            StreamNode([w_in], [w_tmp_in]).sync()
+            cam_found, cam_found_index = line_lookup
+            cam_found = rename_signal(self, cam_found, "cam_found")
 
         write_execute = ooo_fifo.write_execute
         write_execute.key(w_tmp_out.addr)
@@ -150,6 +163,7 @@ class AxiWriteAggregator(Unit):
             item_insert_first(1)
             items.din(w_tmp_out.data)
             items.we(w_tmp_out.mask)
+            found_ptr = cam_found_index
             push_ptr = write_execute.index
         else:
             # iteration over multiple bus words to store a cacheline
@@ -168,7 +182,7 @@ class AxiWriteAggregator(Unit):
             )
             item_insert_last(push_offset._eq(self.WORD_OFFSET_MAX))
             item_insert_first(push_offset._eq(0))
-            cam_found_index = Concat(cam_found_index, push_offset)
+            found_ptr = Concat(cam_found_index, push_offset)
             push_ptr = Concat(write_execute.index, push_offset)
 
             DIN_W = self.DATA_WIDTH
@@ -188,7 +202,7 @@ class AxiWriteAggregator(Unit):
             )
 
         If(w_tmp_out.vld & cam_found,
-            items.addr(cam_found_index)
+            items.addr(found_ptr)
         ).Else(
             items.addr(push_ptr)
         )
@@ -201,7 +215,7 @@ class AxiWriteAggregator(Unit):
             slaves=[items.en],
             extraConds={
                 write_execute: rename_signal(self, will_insert_new_item & item_insert_last, "ac_write_en"),
-                items.en: rename_signal(self, (~w_in.vld | will_insert_new_item | ~item_insert_first) &
+                items.en: rename_signal(self, (~found_in_tmp_reg | will_insert_new_item | ~item_insert_first) &
                     (write_confirm.rd | cam_found), "items_en_en"),
                 w_tmp_out: rename_signal(self, found_in_tmp_reg |
                                          (((write_confirm.rd & current_empty) | cam_found) & item_insert_last),
@@ -214,6 +228,8 @@ class AxiWriteAggregator(Unit):
         ).sync()
         write_confirm.vld(w_tmp_out.vld & will_insert_new_item & item_insert_last & items.en.rd)
 
+        return cam_found, cam_found_index, found_in_tmp_reg
+
     def _impl(self):
         of = self.ooo_fifo
         data_ram = self.data_ram
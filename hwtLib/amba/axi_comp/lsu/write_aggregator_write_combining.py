@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.code import If, Or, connect
+from hwt.code_utils import rename_signal
+from hwt.hdl.constants import READ, WRITE
+from hwt.hdl.types.bits import Bits
+from hwt.interfaces.std import HandshakeSync
+from hwt.interfaces.utils import propagateClkRstn
+from hwt.math import log2ceil
+from hwt.serializer.mode import serializeParamsUniq
+from hwt.synthesizer.param import Param
+from hwtLib.amba.axi_comp.lsu.read_aggregator_hashed import AxiReadAggregatorHashed
+from hwtLib.amba.axi_comp.lsu.write_aggregator import AxiWriteAggregator
+from hwtLib.clocking.clkBuilder import ClkBuilder
+from hwtLib.mem.ram import RamSingleClock
+from pyMathBitPrecise.bit_utils import mask
+
+
+@serializeParamsUniq
+class AxiWriteAggregatorWriteCombining(AxiWriteAggregator):
+    """
+    :class:`~.AxiWriteAggregator` variant which keeps the cache lines in the buffer
+    and merges the writes to them until the flush policy decides that the line
+    should be written to main memory. The oldest line is flushed if any of the enabled conditions is met:
+
+    * FLUSH_ON_FULL_LINE: all bytes of the line were written
+    * FLUSH_TIMEOUT: the line is in the buffer for too long
+    * FLUSH_WATERMARK: the number of lines which are waiting for the flush reached the watermark
+    * HAS_FLUSH: flush of the whole buffer was requested on the flush interface
+
+    The data of the lines is stored in BRAM (data_ram) and the buffer has 2**ID_WIDTH lines
+    (e.g. ID_WIDTH=8 for 256 lines). The lines are written out in the order of the allocation
+    by :class:`~.AxiWriteAggregatorWriteDispatcher`.
+
+    The line with the same address is found using a hash table instead of the CAM with a record for every line:
+
+    * line_table is a BRAM indexed by the hash of the cache line address and it contains the index
+      of the last line allocated for this hash.
+    * the address of the line stored in ooo_fifo is used to check if the record is up to date.
+
+    If the hash of the address collides with an another line which is still in the buffer the new line
+    overwrites the record and the older line can not be updated any more.
+
+    :ivar FLUSH_ON_FULL_LINE: if True the line is flushed once all bytes of the line are written
+    :ivar FLUSH_TIMEOUT: the number of clock cycles after which the line is flushed,
+        the line is flushed in the range of (FLUSH_TIMEOUT, 2 * FLUSH_TIMEOUT] clock cycles after it was allocated
+        (only a two bit age is stored for each line), if None the timeout is disabled
+    :ivar FLUSH_WATERMARK: the number of lines waiting for the flush which causes the flush of the oldest line,
+        if None the 2**ID_WIDTH is used (the line is flushed only if the buffer is full)
+    :ivar HAS_FLUSH: if True the flush interface is present, if flush.vld=1 all lines are flushed
+        and the flush.rd=1 once the buffer is empty (all lines were written and acknowledged)
+    :ivar HASH_WIDTH: width of the index to line_table (line_table has 2**HASH_WIDTH items),
+        if None the ID_WIDTH + 1 is used
+
+    .. hwt-autodoc:: _example_AxiWriteAggregatorWriteCombining
+    """
+
+    def _config(self):
+        AxiWriteAggregator._config(self)
+        self.FLUSH_ON_FULL_LINE = Param(True)
+        self.FLUSH_TIMEOUT = Param(None)
+        self.FLUSH_WATERMARK = Param(None)
+        self.HAS_FLUSH = Param(False)
+        self.HASH_WIDTH = Param(None)
+
+    def _declr(self):
+        AxiWriteAggregator._declr(self)
+        ITEMS = 2 ** self.ID_WIDTH
+        # the lookup is done in line_table instead of the CAM in ooo_fifo
+        self.ooo_fifo.HAS_WRITE_PRE_LOOKUP = False
+        self.w_in_reg.ITEMS = None
+        if self.HASH_WIDTH is None:
+            self.HASH_WIDTH = self.ID_WIDTH + 1
+
+        t = self.line_table = RamSingleClock()
+        t.PORT_CNT = (READ, WRITE)
+        t.ADDR_WIDTH = self.HASH_WIDTH
+        t.DATA_WIDTH = self.ID_WIDTH
+        t.INIT_DATA = tuple(0 for _ in range(2 ** self.HASH_WIDTH))
+
+        if self.FLUSH_WATERMARK is None:
+            self.FLUSH_WATERMARK = ITEMS
+        assert self.FLUSH_WATERMARK >= 1 and self.FLUSH_WATERMARK <= ITEMS, self.FLUSH_WATERMARK
+        assert self.FLUSH_TIMEOUT is None or self.FLUSH_TIMEOUT >= 1, self.FLUSH_TIMEOUT
+        if self.HAS_FLUSH:
+            self.flush = HandshakeSync()
+
+    hash_addr = AxiReadAggregatorHashed.hash_addr
+
+    def line_lookup(self):
+        """
+        Read the record from line_table for the address which is being loaded to w_in_reg
+
+        :return: tuple (line_match, line_index) for the content of w_in_reg,
+            line_match is 1 if the line_index is a valid line with the same address (it may be write locked)
+        """
+        w_in = self.w
+        of = self.ooo_fifo
+        id_t = Bits(self.ID_WIDTH)
+        table_r, table_w = self.line_table.port
+        table_r.en(w_in.vld & w_in.rd)
+        table_r.addr(self.hash_addr(w_in.addr))
+
+        # the record is updated to point to the last allocated line
+        write_execute = of.write_execute
+        table_w.en(write_execute.vld & write_execute.rd)
+        table_w.addr(self.hash_addr(write_execute.key))
+        table_w.din(write_execute.index)
+
+        # forwarding of line_table write which happened together with the read
+        table_fwd_vld = self._reg("table_fwd_vld", def_val=0)
+        table_fwd_id = self._reg("table_fwd_id", id_t)
+        If(table_r.en,
+           table_fwd_vld(table_w.en & table_w.addr._eq(table_r.addr)),
+           table_fwd_id(table_w.din),
+        )
+
+        line_index = rename_signal(
+            self,
+            table_fwd_vld._ternary(table_fwd_id, table_r.dout),
+            "line_index")
+        of.key_read.addr(line_index)
+        line_match = rename_signal(
+            self,
+            of.item_valid[line_index] & of.key_read.data._eq(self.w_in_reg.dataOut.addr),
+            "line_match")
+        return line_match, line_index
+
+    def line_age_timeout(self, line_alloc_en, line_alloc_index):
+        """
+        Two bit age for each line which is incremented on each tick of FLUSH_TIMEOUT timer
+
+        :return: one-hot mask of lines which are older than FLUSH_TIMEOUT
+        """
+        ITEMS = 2 ** self.ID_WIDTH
+        tick = ClkBuilder(self, self.clk).timer(("flush_timeout", self.FLUSH_TIMEOUT))
+        # 1 if the line has seen at least 1 tick of the timer
+        item_age_tick = self._reg("item_age_tick", Bits(ITEMS), def_val=0)
+        # 1 if the line has seen at least 2 ticks of the timer
+        item_timeout = self._reg("item_timeout", Bits(ITEMS), def_val=0)
+
+        age_tick_next = self._sig("item_age_tick_next", Bits(ITEMS))
+        timeout_next = self._sig("item_timeout_next", Bits(ITEMS))
+        for i in range(ITEMS):
+            alloc = line_alloc_en & line_alloc_index._eq(i)
+            age_tick_next[i]((item_age_tick[i] | tick) & ~alloc)
+            timeout_next[i]((item_timeout[i] | (tick & item_age_tick[i])) & ~alloc)
+
+        item_age_tick(age_tick_next)
+        item_timeout(timeout_next)
+        return item_timeout
+
+    def _impl(self):
+        ITEMS = 2 ** self.ID_WIDTH
+        of = self.ooo_fifo
+        data_ram = self.data_ram
+        w_tmp_out = self.w_in_reg.dataOut
+        head = of.read_execute
+
+        line_match, line_index = self.line_lookup()
+        # the oldest line which is not dispatched yet, it is locked only if it is being flushed
+        head_flush = self._sig("head_flush")
+        line_locked = rename_signal(
+            self,
+            of.item_write_lock[line_index] & ~(head.vld & ~head_flush & head.index._eq(line_index)),
+            "line_locked")
+        cam_found, cam_found_index, found_in_tmp_reg = self.data_insert(
+            data_ram.port[0],
+            (line_match & ~line_locked, line_index),
+        )
+
+        write_confirm = of.write_confirm
+        line_alloc_en = rename_signal(self, write_confirm.vld & write_confirm.rd, "line_alloc_en")
+        line_alloc_index = of.write_execute.index
+        head_pop = rename_signal(self, head.vld & head.rd, "head_pop")
+
+        flush_req = []
+        if self.FLUSH_ON_FULL_LINE:
+            # mask of bytes written to each line
+            item_mask = self._sig("item_mask", w_tmp_out.mask._dtype[ITEMS])
+            line_written = rename_signal(self, w_tmp_out.vld & w_tmp_out.rd & ~found_in_tmp_reg, "line_written")
+            If(self.clk._onRisingEdge(),
+                If(line_written,
+                    If(cam_found,
+                       item_mask[cam_found_index](item_mask[cam_found_index] | w_tmp_out.mask)
+                    ).Else(
+                       item_mask[line_alloc_index](w_tmp_out.mask)
+                    )
+                )
+            )
+            flush_req.append(item_mask[head.index]._eq(mask(self.CACHE_LINE_SIZE)))
+
+        if self.FLUSH_TIMEOUT is not None:
+            item_timeout = self.line_age_timeout(line_alloc_en, line_alloc_index)
+            flush_req.append(item_timeout[head.index])
+
+        # number of lines which are not dispatched yet
+        waiting_cnt = self._reg("waiting_cnt", Bits(log2ceil(ITEMS + 1)), def_val=0)
+        If(line_alloc_en & ~head_pop,
+           waiting_cnt(waiting_cnt + 1)
+        ).Elif(~line_alloc_en & head_pop,
+           waiting_cnt(waiting_cnt - 1)
+        )
+        flush_req.append(waiting_cnt >= self.FLUSH_WATERMARK)
+
+        if self.HAS_FLUSH:
+            flush_req.append(self.flush.vld)
+            self.flush.rd(of.item_valid._eq(0) & ~w_tmp_out.vld)
+
+        # the line can not be locked while the data is being merged to it
+        head_merge_pending = rename_signal(
+            self,
+            w_tmp_out.vld & line_match & line_index._eq(head.index),
+            "head_merge_pending")
+        flush_now = rename_signal(
+            self,
+            head.vld & ~head_merge_pending & Or(*flush_req),
+            "flush_now")
+        # the flush of the line was started and it has to be finished
+        head_flush_started = self._reg("head_flush_started", def_val=0)
+        If(head_pop,
+           head_flush_started(0),
+        ).Elif(flush_now,
+           head_flush_started(1),
+        )
+        head_flush(head_flush_started | flush_now)
+
+        wd = self.write_dispatch
+        self.m(wd.m)
+        data_ram.port[1](wd.data)
+        of.read_confirm(wd.read_confirm)
+        connect(head, wd.read_execute, exclude={head.vld, head.rd})
+        wd.read_execute.vld(head.vld & head_flush)
+        head.rd(wd.read_execute.rd & head_flush)
+
+        propagateClkRstn(self)
+
+
+def _example_AxiWriteAggregatorWriteCombining():
+    u = AxiWriteAggregatorWriteCombining()
+    u.ID_WIDTH = 8
+    u.CACHE_LINE_SIZE = 16
+    u.DATA_WIDTH = 64
+    u.MAX_BLOCK_DATA_WIDTH = 8
+    u.FLUSH_TIMEOUT = 1024
+    u.FLUSH_WATERMARK = 192
+    u.HAS_FLUSH = True
+    return u
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+
+    u = _example_AxiWriteAggregatorWriteCombining()
+    print(to_rtl_str(u))
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.pyUtils.arrayQuery import iter_with_last
+from hwt.simulator.simTestCase import SingleUnitSimTestCase
+from hwtLib.amba.axi_comp.lsu.write_aggregator_test import AxiWriteAggregator_1word_per_cachelineTC
+from hwtLib.amba.axi_comp.lsu.write_aggregator_write_combining import AxiWriteAggregatorWriteCombining
+from hwtLib.amba.axi_comp.sim.ram import AxiSimRam
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer
+from pyMathBitPrecise.bit_utils import mask, get_bit_range, set_bit_range
+
+
+class AxiWriteAggregatorWriteCombining_1word_per_cachelineTC(AxiWriteAggregator_1word_per_cachelineTC):
+
+    @classmethod
+    def getUnit(cls):
+        cls.u = u = AxiWriteAggregatorWriteCombining()
+        u.ADDR_WIDTH = 16
+        u.ID_WIDTH = 2
+        u.CACHE_LINE_SIZE = 4
+        u.DATA_WIDTH = 32
+        u.MAX_BLOCK_DATA_WIDTH = 8
+        u.FLUSH_TIMEOUT = 8
+        return u
+
+    def _byte_writes(self, ADDRESSES, BYTES=None):
+        """
+        Write each byte of the cache lines by a separate write,
+        the writes to different cache lines are interleaved
+
+        :return: expected content of the cache lines
+        """
+        u = self.u
+        if BYTES is None:
+            BYTES = u.CACHE_LINE_SIZE
+        expected = {}
+        for B_i in range(BYTES):
+            for a in ADDRESSES:
+                v = (a * 16 + B_i) & 0xff
+                u.w._ag.data.append((a, v << (B_i * 8), 1 << B_i))
+                expected[a] = set_bit_range(expected.get(a, 0), B_i * 8, 8, v)
+        return expected
+
+    def test_combining(self, ADDRESSES=[1, 2, 3], randomized=False, time_multiplier=1):
+        u = self.u
+        mem = AxiSimRam(u.m)
+        expected = self._byte_writes(ADDRESSES)
+        if randomized:
+            self.randomize_all()
+
+        self.runSim((len(u.w._ag.data) * 4 + 4 * u.FLUSH_TIMEOUT) * time_multiplier * CLK_PERIOD)
+        self.assertEmpty(u.w._ag.data)
+        data = mem.getArray(0, u.CACHE_LINE_SIZE, max(ADDRESSES) + 1)
+        for a, v in expected.items():
+            self.assertValEqual(data[a], v)
+
+    def test_combining_randomized(self, ADDRESSES=[1, 2, 3]):
+        self.test_combining(ADDRESSES, randomized=True)
+
+    def test_timeout_flush(self):
+        u = self.u
+        u.w._ag.data.append((1, 0xab << 8, 1 << 1))
+
+        def check_not_flushed():
+            yield Timer(u.FLUSH_TIMEOUT * CLK_PERIOD)
+            self.assertEmpty(u.m.aw._ag.data)
+
+        self.procs.append(check_not_flushed())
+        self.runSim((2 * u.FLUSH_TIMEOUT + 10) * CLK_PERIOD)
+        aw = u.m.aw._ag
+        self.assertValSequenceEqual(aw.data, [
+            aw.create_addr_req(addr=u.CACHE_LINE_SIZE * 1,
+                               _len=u.BUS_WORDS_IN_CACHE_LINE - 1,
+                               _id=0),
+        ])
+        w = u.m.w._ag.data
+        # only a single byte of data is valid
+        self.assertValSequenceEqual([(strb, last) for (_, strb, last) in w], [
+            ((1 << 1) if i == 0 else 0, int(last))
+            for last, i in iter_with_last(range(u.BUS_WORDS_IN_CACHE_LINE))
+        ])
+        self.assertEqual(get_bit_range(w[0][0].val, 8, 8), 0xab)
+
+
+class AxiWriteAggregatorWriteCombining_2words_per_cachelineTC(AxiWriteAggregatorWriteCombining_1word_per_cachelineTC):
+
+    @classmethod
+    def getUnit(cls):
+        cls.u = u = AxiWriteAggregatorWriteCombining()
+        u.ADDR_WIDTH = 16
+        u.ID_WIDTH = 2
+        u.CACHE_LINE_SIZE = 8
+        u.DATA_WIDTH = 32
+        u.MAX_BLOCK_DATA_WIDTH = 8
+        u.FLUSH_TIMEOUT = 8
+        return u
+
+
+class AxiWriteAggregatorWriteCombining_flushTC(AxiWriteAggregatorWriteCombining_1word_per_cachelineTC):
+    """
+    Lines are flushed only if they are full, on explicit flush request or if the buffer is full
+    """
+
+    @classmethod
+    def getUnit(cls):
+        cls.u = u = AxiWriteAggregatorWriteCombining()
+        u.ADDR_WIDTH = 16
+        u.ID_WIDTH = 2
+        u.CACHE_LINE_SIZE = 4
+        u.DATA_WIDTH = 32
+        u.MAX_BLOCK_DATA_WIDTH = 8
+        u.HAS_FLUSH = True
+        return u
+
+    def _flush_req(self, t):
+        u = self.u
+
+        def flush_req():
+            yield Timer(t)
+            u.flush._ag.data.append(None)
+
+        self.procs.append(flush_req())
+
+    def test_nop(self, randomized=False):
+        if randomized:
+            self.randomize(self.u.flush)
+        self.u.flush._ag.data.append(None)
+        AxiWriteAggregatorWriteCombining_1word_per_cachelineTC.test_nop(self, randomized=randomized)
+        self.assertEmpty(self.u.flush._ag.data)
+
+    def test_mergable(self, N=10, ADDRESSES=[0, ], randomized=False):
+        self._flush_req((N * len(ADDRESSES) + 5) * 3 * CLK_PERIOD * self.u.BUS_WORDS_IN_CACHE_LINE)
+        AxiWriteAggregatorWriteCombining_1word_per_cachelineTC.test_mergable(
+            self, N=N, ADDRESSES=ADDRESSES, randomized=randomized)
+        self.assertEmpty(self.u.flush._ag.data)
+
+    def test_mergable2(self, N=10, ADDRESSES=[0, ], randomized=False):
+        self._flush_req((N * len(ADDRESSES) + 5) * 3 * CLK_PERIOD * self.u.BUS_WORDS_IN_CACHE_LINE)
+        AxiWriteAggregatorWriteCombining_1word_per_cachelineTC.test_mergable2(
+            self, N=N, ADDRESSES=ADDRESSES, randomized=randomized)
+        self.assertEmpty(self.u.flush._ag.data)
+
+    def test_combining(self, ADDRESSES=[1, 2, 3], randomized=False):
+        u = self.u
+        expected = self._byte_writes(ADDRESSES)
+        if randomized:
+            self.randomize_all()
+        # the lines are flushed because they are full and there are no other flushes
+        self.runSim((len(u.w._ag.data) * 4 + 20) * CLK_PERIOD)
+        self.assertEmpty(u.w._ag.data)
+        aw = u.m.aw._ag
+        self.assertValSequenceEqual(aw.data, [
+            aw.create_addr_req(addr=u.CACHE_LINE_SIZE * a,
+                               _len=u.BUS_WORDS_IN_CACHE_LINE - 1,
+                               _id=i)
+            for i, a in enumerate(expected.keys())
+        ])
+        self.assertValSequenceEqual(u.m.w._ag.data, [
+            (d, mask(u.DATA_WIDTH // 8), 1)
+            for d in expected.values()
+        ])
+
+    def test_flush(self, ADDRESSES=[1, 2, 3], randomized=False):
+        u = self.u
+        mem = AxiSimRam(u.m)
+        expected = self._byte_writes(ADDRESSES, BYTES=u.CACHE_LINE_SIZE - 1)
+        t = (len(u.w._ag.data) * 4 + 20) * CLK_PERIOD
+
+        def check_not_flushed_and_flush():
+            yield Timer(t)
+            # there is no full line and the buffer does not get full
+            self.assertEmpty(u.w._ag.data)
+            self.assertEmpty(mem.data)
+            u.flush._ag.data.append(None)
+
+        if randomized:
+            self.randomize_all()
+            self.randomize(u.flush)
+        self.procs.append(check_not_flushed_and_flush())
+        self.runSim(t + 40 * CLK_PERIOD)
+        self.assertEmpty(u.flush._ag.data)
+        data = mem.getArray(0, u.CACHE_LINE_SIZE, max(ADDRESSES) + 1)
+        for a, v in expected.items():
+            d = data[a]
+            self.assertEqual(d.vld_mask, mask(8 * (u.CACHE_LINE_SIZE - 1)))
+            self.assertEqual(d.val & d.vld_mask, v)
+
+    def test_flush_randomized(self, ADDRESSES=[1, 2, 3]):
+        self.test_flush(ADDRESSES, randomized=True)
+
+    def test_full_buffer_flush(self):
+        """
+        The oldest lines are flushed if the buffer is full
+        """
+        u = self.u
+        mem = AxiSimRam(u.m)
+        ITEMS = 2 ** u.ID_WIDTH
+        N = ITEMS + 2
+        # the lines are not full, but the buffer is full
+        u.w._ag.data.extend((i, 10 + i, 1) for i in range(N))
+        self.runSim((N + 20) * 2 * CLK_PERIOD)
+        self.assertEmpty(u.w._ag.data)
+        # the last item is in the w_in_reg, the buffer is full once the item is stored
+        self.assertValSequenceEqual(
+            [None if d is None else d.val & 0xff for d in (mem.data.get(i, None) for i in range(N))],
+            [10 + i if i < N - ITEMS else None for i in range(N)])
+
+    def test_timeout_flush(self):
+        u = self.u
+        u.w._ag.data.append((1, 0xab << 8, 1 << 1))
+        self.runSim(50 * CLK_PERIOD)
+        self.assertEmpty(u.m.aw._ag.data)
+
+
+class AxiWriteAggregatorWriteCombining_hashCollisionTC(AxiWriteAggregatorWriteCombining_1word_per_cachelineTC):
+    """
+    All lines share only two records in line_table
+    """
+
+    @classmethod
+    def getUnit(cls):
+        u = super(AxiWriteAggregatorWriteCombining_hashCollisionTC, cls).getUnit()
+        u.HASH_WIDTH = 1
+        return u
+
+    def test_combining_collision(self):
+        # 1 and 3 have the same hash, 2 and 4 have the same hash
+        self.test_combining(ADDRESSES=[1, 2, 3, 4])
+
+    def test_combining_collision_randomized(self):
+        # the lines which lost the record in line_table are flushed on timeout
+        self.test_combining(ADDRESSES=[1, 2, 3, 4], randomized=True, time_multiplier=4)
+
+
+class AxiWriteAggregatorWriteCombining_256linesTC(SingleUnitSimTestCase):
+
+    @classmethod
+    def getUnit(cls):
+        cls.u = u = AxiWriteAggregatorWriteCombining()
+        u.ADDR_WIDTH = 16
+        u.ID_WIDTH = 8
+        u.CACHE_LINE_SIZE = 4
+        u.DATA_WIDTH = 32
+        u.MAX_BLOCK_DATA_WIDTH = 8
+        # all lines stay in the buffer until all writes are merged
+        u.FLUSH_TIMEOUT = 512
+        return u
+
+    def test_combining_many_lines(self):
+        u = self.u
+        ADDRESSES = list(range(1, 512, 3))
+        expected = AxiWriteAggregatorWriteCombining_1word_per_cachelineTC._byte_writes(
+            self, ADDRESSES, BYTES=2)
+        self.runSim((len(u.w._ag.data) * 2 + 4 * u.FLUSH_TIMEOUT) * CLK_PERIOD)
+        self.assertEmpty(u.w._ag.data)
+        # each line is written only once as all writes to the line were merged
+        aw = u.m.aw._ag
+        self.assertValSequenceEqual(aw.data, [
+            aw.create_addr_req(addr=u.CACHE_LINE_SIZE * a, _len=0, _id=i)
+            for i, a in enumerate(ADDRESSES)
+        ])
+        # only the first 2 bytes of each line were written
+        w = [(get_bit_range(d.vld_mask, 0, 16), get_bit_range(d.val, 0, 16), int(strb), int(last))
+             for (d, strb, last) in u.m.w._ag.data]
+        self.assertSequenceEqual(w, [
+            (mask(16), v, mask(2), 1)
+            for v in expected.values()
+        ])
+
+
+AxiWriteAggregatorWriteCombining_TCs = [
+    AxiWriteAggregatorWriteCombining_1word_per_cachelineTC,
+    AxiWriteAggregatorWriteCombining_2words_per_cachelineTC,
+    AxiWriteAggregatorWriteCombining_flushTC,
+    AxiWriteAggregatorWriteCombining_hashCollisionTC,
+    AxiWriteAggregatorWriteCombining_256linesTC,
+]
+
+if __name__ == "__main__":
+    import unittest
+    suite = unittest.TestSuite()
+
+    # suite.addTest(AxiWriteAggregatorWriteCombining_flushTC('test_flush'))
+    for tc in AxiWriteAggregatorWriteCombining_TCs:
+        suite.addTest(unittest.makeSuite(tc))
+
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
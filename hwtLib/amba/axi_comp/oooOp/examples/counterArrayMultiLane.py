@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwtLib.amba.axi_comp.oooOp.examples.counterArray import OooOpExampleCounterArray
+from hwtLib.amba.axi_comp.oooOp.outOfOrderCummulativeOpMultiLane import OutOfOrderCummulativeOpMultiLane
+
+
+class OooOpExampleCounterArrayMultiLane(OutOfOrderCummulativeOpMultiLane):
+    """
+    :class:`~.OooOpExampleCounterArray` which can increment LANE_CNT counters per clock.
+
+    .. hwt-autodoc::
+    """
+
+    def _config(self):
+        OutOfOrderCummulativeOpMultiLane._config(self)
+        self.TRANSACTION_STATE_T = None
+
+    main_op = OooOpExampleCounterArray.main_op
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = OooOpExampleCounterArrayMultiLane()
+    u.ID_WIDTH = 2
+    u.ADDR_WIDTH = 2 + 3
+    u.DATA_WIDTH = u.MAIN_STATE_T.bit_length()
+
+    print(to_rtl_str(u))
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.serializer.combLoopAnalyzer import CombLoopAnalyzer
+from hwt.simulator.simTestCase import SingleUnitSimTestCase
+from hwtLib.amba.axiLite_comp.sim.utils import axi_randomize_per_channel
+from hwtLib.amba.axi_comp.oooOp.examples.counterArrayMultiLane import OooOpExampleCounterArrayMultiLane
+from hwtLib.amba.axi_comp.sim.ram import AxiSimRam
+from hwtLib.examples.errors.combLoops import freeze_set_of_sets
+from hwtLib.types.ctypes import uint32_t
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer, WaitCombStable, WaitWriteOnly
+
+
+class OooOpExampleCounterArrayMultiLane_2lanes_TC(SingleUnitSimTestCase):
+
+    @classmethod
+    def getUnit(cls):
+        u = OooOpExampleCounterArrayMultiLane()
+        u.LANE_CNT = 2
+        u.MAIN_STATE_T = uint32_t
+        u.TRANSACTION_STATE_T = None
+        u.ID_WIDTH = 2
+        u.ADDR_WIDTH = 2 + 3
+        u.DATA_WIDTH = u.MAIN_STATE_T.bit_length()
+        cls.u = u
+        return u
+
+    def setUp(self):
+        SingleUnitSimTestCase.setUp(self)
+        u = self.u
+        # all lanes are accessing the same memory
+        self.m = AxiSimRam(axi=u.m[0])
+        for m in u.m[1:]:
+            AxiSimRam(axi=m, parent=self.m)
+        # clear counters
+        for i in range(2 ** u.ADDR_WIDTH // (u.DATA_WIDTH // 8)):
+            self.m.data[i] = 0
+
+    def test_nop(self):
+        u = self.u
+
+        self.runSim(10 * CLK_PERIOD)
+        for dout, m in zip(u.dataOut, u.m):
+            self.assertEmpty(dout._ag.data)
+            self.assertEmpty(m.aw._ag.data)
+            self.assertEmpty(m.w._ag.data)
+            self.assertEmpty(m.ar._ag.data)
+
+    def _test_incr(self, indexes_per_lane, randomize=False, extra_time=0):
+        u = self.u
+        for din, indexes in zip(u.dataIn, indexes_per_lane):
+            din._ag.data.extend(indexes)
+
+        t = (20 + max(len(indexes) for indexes in indexes_per_lane) * 2) * CLK_PERIOD + extra_time
+        if randomize:
+            for m, din, dout in zip(u.m, u.dataIn, u.dataOut):
+                axi_randomize_per_channel(self, m)
+                self.randomize(din)
+                self.randomize(dout)
+            t *= 20 * 2 ** (u.LANE_CNT - 1)
+
+        self.runSim(t)
+
+        # check if pipeline registers are empty
+        for i in range(u.PIPELINE_CONFIG.WAIT_FOR_WRITE_ACK):
+            for lane in range(u.LANE_CNT):
+                valid = getattr(self.rtl_simulator.model.io, f"st{i:d}_l{lane:d}_valid")
+                self.assertValEqual(valid.read(), 0, (i, lane))
+
+        for lane, m in enumerate(u.m):
+            # check if main state fifo is empty
+            ooo_fifo = getattr(self.rtl_simulator.model, f"ooo_fifo_{lane:d}_inst").io
+            self.assertValEqual(ooo_fifo.item_valid.read(), 0, lane)
+            self.assertValEqual(ooo_fifo.read_wait.read(), 1, lane)
+
+            # check if all transactions on AXI are finished
+            self.assertEmpty(m.b._ag.data)
+            self.assertEmpty(m.r._ag.data)
+
+        # the order of the operations between the lanes is not specified,
+        # but each value of the counter has to be seen exactly once
+        all_indexes = [i for indexes in indexes_per_lane for i in indexes]
+        seen = {}
+        for dout, indexes in zip(u.dataOut, indexes_per_lane):
+            self.assertEqual(len(dout._ag.data), len(indexes))
+            for (addr, v), ref_addr in zip(dout._ag.data, indexes):
+                self.assertValEqual(addr, ref_addr)
+                seen.setdefault(int(addr), []).append(int(v))
+
+        for i in sorted(set(all_indexes)):
+            cnt = all_indexes.count(i)
+            self.assertEqual(sorted(seen[i]), list(range(1, cnt + 1)), i)
+            self.assertValEqual(self.m.data[i], cnt, i)
+
+    def test_incr_1x(self):
+        self._test_incr([[0], []])
+
+    def test_incr_2x_different(self):
+        self._test_incr([[0], [1]])
+
+    def test_incr_2x_same(self):
+        self._test_incr([[1], [1]])
+
+    def test_incr_10x_same(self):
+        self._test_incr([[1 for _ in range(5)] for _ in range(self.u.LANE_CNT)])
+
+    def test_r_incr_10x_same(self):
+        self._test_incr([[1 for _ in range(5)] for _ in range(self.u.LANE_CNT)],
+                        randomize=True)
+
+    def test_r_incr_100x_random(self):
+        index_pool = list(range(2 ** self.u.ID_WIDTH))
+        d = [[self._rand.choice(index_pool) for _ in range(50)]
+             for _ in range(self.u.LANE_CNT)]
+        self._test_incr(d, randomize=True)
+
+    def test_r_incr_100x_random_3_items(self):
+        # a lot of collisions between the lanes with a different read latency
+        d = [[self._rand.choice((0, 1, 2)) for _ in range(50)]
+             for _ in range(self.u.LANE_CNT)]
+        self._test_incr(d, randomize=True)
+
+    def test_no_comb_loops(self):
+        s = CombLoopAnalyzer()
+        s.visit_Unit(self.u)
+        comb_loops = freeze_set_of_sets(s.report())
+        self.assertEqual(comb_loops, frozenset())
+
+
+class OooOpExampleCounterArrayMultiLane_3lanes_TC(OooOpExampleCounterArrayMultiLane_2lanes_TC):
+
+    @classmethod
+    def getUnit(cls):
+        u = OooOpExampleCounterArrayMultiLane_2lanes_TC.getUnit()
+        u.LANE_CNT = 3
+        cls.u = u
+        return u
+
+    def test_incr_1x(self):
+        self._test_incr([[0], [], []])
+
+    def test_incr_2x_different(self):
+        self._test_incr([[0], [1], [2]])
+
+    def test_incr_2x_same(self):
+        self._test_incr([[1], [1], [1]])
+
+
+class OooOpExampleCounterArrayMultiLane_slowLane_TC(SingleUnitSimTestCase):
+    """
+    The read data of one lane are delayed so much that the other lane fills the whole pipeline
+    while its write waits for the delayed read in the write history.
+    """
+
+    @classmethod
+    def getUnit(cls):
+        u = OooOpExampleCounterArrayMultiLane_2lanes_TC.getUnit()
+        u.ID_WIDTH = 4
+        cls.u = u
+        return u
+
+    setUp = OooOpExampleCounterArrayMultiLane_2lanes_TC.setUp
+    _test_incr = OooOpExampleCounterArrayMultiLane_2lanes_TC._test_incr
+
+    def test_incr_force_retire(self):
+        u = self.u
+        PAUSE = 200 * CLK_PERIOD
+        force_retire_cnt = 0
+
+        def pause_lane0_read_data():
+            yield WaitWriteOnly()
+            u.m[0].r._ag.setEnable(False)
+            yield Timer(PAUSE)
+            u.m[0].r._ag.setEnable(True)
+
+        def monitor_force_retire():
+            nonlocal force_retire_cnt
+            force_retire = self.rtl_simulator.model.io.write_history_force_retire
+            yield Timer(CLK_PERIOD // 2)
+            while True:
+                yield Timer(CLK_PERIOD)
+                yield WaitCombStable()
+                v = force_retire.read()
+                if v.vld_mask and v.val:
+                    force_retire_cnt += 1
+
+        self.procs.extend([pause_lane0_read_data(), monitor_force_retire()])
+        # the writes to the index 1 do not remain in the write history as the other lane continues with other index
+        self._test_incr([[1, 2, 1], [1 for _ in range(20)] + [3 for _ in range(30)]], extra_time=PAUSE)
+        self.assertGreater(force_retire_cnt, 0)
+
+
+OooOpExampleCounterArrayMultiLane_TCs = [
+    OooOpExampleCounterArrayMultiLane_2lanes_TC,
+    OooOpExampleCounterArrayMultiLane_3lanes_TC,
+    OooOpExampleCounterArrayMultiLane_slowLane_TC,
+]
+
+if __name__ == "__main__":
+    import unittest
+    suite = unittest.TestSuite()
+    # suite.addTest(OooOpExampleCounterArrayMultiLane_2lanes_TC('test_r_incr_100x_random'))
+    for tc in OooOpExampleCounterArrayMultiLane_TCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
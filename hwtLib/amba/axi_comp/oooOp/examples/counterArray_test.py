@@ -3,12 +3,16 @@
 
 from hwt.serializer.combLoopAnalyzer import CombLoopAnalyzer
 from hwt.simulator.simTestCase import SingleUnitSimTestCase
+from hwtLib.abstract.discoverAddressSpace import AddressSpaceProbe
+from hwtLib.amba.axiLite_comp.endpoint_test import addrGetter
+from hwtLib.amba.axiLite_comp.sim.mem_space_master import AxiLiteMemSpaceMaster
 from hwtLib.amba.axiLite_comp.sim.utils import axi_randomize_per_channel
 from hwtLib.amba.axi_comp.oooOp.examples.counterArray import OooOpExampleCounterArray
 from hwtLib.amba.axi_comp.sim.ram import AxiSimRam
 from hwtLib.examples.errors.combLoops import freeze_set_of_sets
 from hwtLib.types.ctypes import uint32_t
 from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer
 
 
 class OooOpExampleCounterArray_1w_TC(SingleUnitSimTestCase):
@@ -130,9 +134,111 @@ class OooOpExampleCounterArray_2w_TC(OooOpExampleCounterArray_1w_TC):
         return u
 
 
+class OooOpExampleCounterArray_perfCounters_TC(OooOpExampleCounterArray_1w_TC):
+
+    @classmethod
+    def getUnit(cls):
+        u = OooOpExampleCounterArray_1w_TC.getUnit()
+        u.HAS_PERF_COUNTERS = True
+        u.LATENCY_HISTOGRAM_ITEMS = 8
+        u.LATENCY_HISTOGRAM_BIN_SIZE = 2
+        cls.u = u
+        return u
+
+    @classmethod
+    def setUpClass(cls):
+        super(SingleUnitSimTestCase, cls).setUpClass()
+        u = cls.getUnit()
+        cls.compileSim(u, onAfterToRtl=cls.mkRegisterMap)
+
+    @classmethod
+    def mkRegisterMap(cls, u):
+        cls.addrProbe = AddressSpaceProbe(u.perf_cntrl, addrGetter)
+        cls.regs = AxiLiteMemSpaceMaster(u.perf_cntrl, cls.addrProbe.discovered)
+
+    def _read_perf_counters(self, t):
+        """
+        Read all performance counters and the histogram after specified time
+
+        :return: function which returns the tuple (dict of counters, histogram) after the simulation
+        """
+        u = self.u
+        names = [
+            "cycles",
+            "stall_id_exhaustion",
+            "stall_ar",
+            "read_wait",
+            "stall_r",
+            "stall_write_back",
+            "stall_write_ack",
+            *(f"collision_forward_{i:d}"
+              for i in range(u.PIPELINE_CONFIG.WRITE_HISTORY_SIZE + 1)),
+        ]
+
+        def read_regs():
+            yield Timer(t)
+            for n in names:
+                getattr(self.regs, n).read()
+            for i in range(u.LATENCY_HISTOGRAM_ITEMS):
+                self.regs.latency_histogram[i].read()
+
+        self.procs.append(read_regs())
+
+        def get_values():
+            r = u.perf_cntrl._ag.r.data
+            self.assertEqual(len(r), len(names) + u.LATENCY_HISTOGRAM_ITEMS)
+            vals = [int(d) for d, _ in r]
+            return dict(zip(names, vals)), vals[len(names):]
+
+        return get_values
+
+    def test_perf_counters(self, N=10):
+        u = self.u
+        u.dataIn._ag.data.extend(1 for _ in range(N))
+        t = (20 + N * 2) * CLK_PERIOD
+        get_values = self._read_perf_counters(t)
+        self.runSim(t + 200 * CLK_PERIOD)
+
+        self.assertEqual(len(u.dataOut._ag.data), N)
+        self.assertValEqual(self.m.data[1], N)
+        cntrs, histogram = get_values()
+        self.assertGreater(cntrs["cycles"], 0)
+        self.assertLessEqual(cntrs["cycles"], 20 + N * 2)
+        # the memory responds immediately, all transactions are in the first bin
+        self.assertSequenceEqual(histogram, [N] + [0 for _ in range(u.LATENCY_HISTOGRAM_ITEMS - 1)])
+        self.assertEqual(cntrs["read_wait"], 0)
+        self.assertEqual(cntrs["stall_ar"], 0)
+        self.assertEqual(cntrs["stall_write_back"], 0)
+        # there is more operations than transaction ids
+        self.assertGreater(cntrs["stall_id_exhaustion"], 0)
+        # all operations are on same address, the data has to be forwarded
+        fwd = sum(v for k, v in cntrs.items() if k.startswith("collision_forward_"))
+        self.assertGreater(fwd, 0)
+        self.assertLess(fwd, N)
+
+    def test_perf_counters_randomized(self, N=40):
+        u = self.u
+        u.dataIn._ag.data.extend(self._rand.choice([0, 1, 2]) for _ in range(N))
+        axi_randomize_per_channel(self, u.m)
+        self.randomize(u.dataIn)
+        self.randomize(u.dataOut)
+        t = (20 + N * 2) * 5 * CLK_PERIOD
+        get_values = self._read_perf_counters(t)
+        self.runSim(t + 200 * CLK_PERIOD)
+
+        self.assertEqual(len(u.dataOut._ag.data), N)
+        cntrs, histogram = get_values()
+        self.assertEqual(sum(histogram), N)
+        self.assertGreater(sum(histogram[1:]), 0)
+        self.assertGreater(cntrs["stall_ar"], 0)
+        self.assertGreater(cntrs["stall_write_back"], 0)
+        self.assertGreater(cntrs["read_wait"], 0)
+
+
 OooOpExampleCounterArray_TCs = [
     OooOpExampleCounterArray_1w_TC,
     OooOpExampleCounterArray_0_5w_TC,
+    OooOpExampleCounterArray_perfCounters_TC,
     #OooOpExampleCounterArray_2w_TC,
 ]
 
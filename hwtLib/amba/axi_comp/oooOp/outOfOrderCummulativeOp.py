@@ -3,10 +3,13 @@
 
 from typing import List
 
-from hwt.code import If, Concat, SwitchLogic, connect
+from hwt.code import If, Concat, SwitchLogic, connect, Or
 from hwt.code_utils import rename_signal
 from hwt.hdl.constants import WRITE, READ
 from hwt.hdl.typeShortcuts import vec, hBit
+from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.struct import HStruct
+from hwt.interfaces.std import BramPort_withoutClk
 from hwt.interfaces.utils import addClkRstn, propagateClkRstn
 from hwt.math import log2ceil
 from hwt.synthesizer.interfaceLevel.interfaceUtils.utils import packIntf
@@ -14,6 +17,8 @@ from hwt.synthesizer.param import Param
 from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
 from hwt.synthesizer.unit import Unit
 from hwtLib.amba.axi4 import Axi4, Axi4_addr, Axi4_r
+from hwtLib.amba.axi4Lite import Axi4Lite
+from hwtLib.amba.axiLite_comp.endpoint import AxiLiteEndpoint
 from hwtLib.amba.axi_comp.lsu.fifo_oooread import FifoOutOfOrderRead
 from hwtLib.amba.axi_comp.oooOp.utils import OutOfOrderCummulativeOpIntf, \
     OOOOpPipelineStage, does_collinde, OutOfOrderCummulativeOpPipelineConfig
@@ -53,6 +58,13 @@ class OutOfOrderCummulativeOp(Unit):
         for transaction and can be used to modify the behavior of the pipeline
     :type TRANSACTION_STATE_T: Optional[HdlType]
     :type PIPELINE_CONFIG: OutOfOrderCummulativeOpPipelineConfig
+
+    :ivar HAS_PERF_COUNTERS: if True the performance counters and the histogram of the read latency
+        are collected and they are accessible on perf_cntrl AXI-Lite interface (:meth:`~.perf_counters_register_map`),
+        the counters are free running and wrapping, the values should be sampled and subtracted by the software
+    :ivar LATENCY_HISTOGRAM_ITEMS: number of bins in the histogram of the AR-to-R latency (has to be power of 2),
+        the last bin contains also all latencies which are out of range of the histogram
+    :ivar LATENCY_HISTOGRAM_BIN_SIZE: number of clock cycles covered by a single bin of the histogram (has to be power of 2)
     """
 
     def _config(self):
@@ -65,6 +77,11 @@ class OutOfOrderCummulativeOp(Unit):
                 WRITE_HISTORY_SIZE=4 + 1)
         )
         Axi4._config(self)
+        self.HAS_PERF_COUNTERS = Param(False)
+        self.LATENCY_HISTOGRAM_ITEMS = Param(32)
+        self.LATENCY_HISTOGRAM_BIN_SIZE = Param(4)
+        self.PERF_CNTRL_ADDR_WIDTH = Param(None)
+        self.PERF_CNTRL_DATA_WIDTH = Param(32)
 
     def _init_constants(self):
         MAIN_STATE_T = self.MAIN_STATE_T
@@ -95,6 +112,57 @@ class OutOfOrderCummulativeOp(Unit):
         )
 
         self._declr_io()
+        if self.HAS_PERF_COUNTERS:
+            self._declr_perf_counters()
+
+    def perf_counters_register_map(self) -> HStruct:
+        """
+        :return: type of the address space of the perf_cntrl interface
+
+        * cycles: clock cycle counter
+        * stall_id_exhaustion: dataIn.vld but there is no free transaction id
+        * stall_ar: the read request is not accepted by memory
+        * read_wait: there is a read transaction but there is not any read data
+        * stall_r: the read data is not accepted by the pipeline
+        * stall_write_back: the write request is not accepted by memory
+        * stall_write_ack: WAIT_FOR_WRITE_ACK stage can not move (missing write ack or dataOut.rd)
+        * collision_forward_X: number of operations in WRITE_BACK stage which had the data
+          forwarded from the pipeline stage WRITE_BACK + X (slot in write history, 0 is WRITE_BACK stage itself)
+        * latency_histogram: histogram of AR-to-R latency
+        """
+        reg_t = Bits(self.PERF_CNTRL_DATA_WIDTH, const=True)
+        return HStruct(
+            (reg_t, "cycles"),
+            (reg_t, "stall_id_exhaustion"),
+            (reg_t, "stall_ar"),
+            (reg_t, "read_wait"),
+            (reg_t, "stall_r"),
+            (reg_t, "stall_write_back"),
+            (reg_t, "stall_write_ack"),
+            *((reg_t, f"collision_forward_{i:d}")
+              for i in range(self.PIPELINE_CONFIG.WRITE_HISTORY_SIZE + 1)),
+            (reg_t[self.LATENCY_HISTOGRAM_ITEMS], "latency_histogram"),
+        )
+
+    def _declr_perf_counters(self):
+        ITEMS = self.LATENCY_HISTOGRAM_ITEMS
+        assert ITEMS >= 2 and 2 ** log2ceil(ITEMS) == ITEMS, ITEMS
+        BIN_SIZE = self.LATENCY_HISTOGRAM_BIN_SIZE
+        assert BIN_SIZE >= 1 and 2 ** log2ceil(BIN_SIZE) == BIN_SIZE, BIN_SIZE
+        reg_map = self.perf_counters_register_map()
+        if self.PERF_CNTRL_ADDR_WIDTH is None:
+            self.PERF_CNTRL_ADDR_WIDTH = log2ceil(reg_map.bit_length() // 8)
+
+        with self._paramsShared(prefix="PERF_CNTRL_"):
+            self.perf_cntrl = Axi4Lite()
+            self.perf_ep = AxiLiteEndpoint(reg_map)
+
+        h = self.perf_latency_histogram = RamSingleClock()
+        # read for perf_ep, read and write for the update
+        h.PORT_CNT = (READ, READ, WRITE)
+        h.ADDR_WIDTH = log2ceil(ITEMS)
+        h.DATA_WIDTH = self.PERF_CNTRL_DATA_WIDTH
+        h.INIT_DATA = tuple(0 for _ in range(ITEMS))
 
     def _declr_io(self):
         # index of the item to increment
@@ -125,14 +193,23 @@ class OutOfOrderCummulativeOp(Unit):
         """
         Send read request on AXI and store transaction in to state array and ooo_fifo for later wake up
         """
-        ooo_fifo = self.ooo_fifo
-        ar = self.m.ar
         din = self.dataIn
-        assert din.addr._dtype.bit_length() == self.ADDR_WIDTH - self.ADDR_OFFSET_W, (
-            din.addr._dtype.bit_length(), self.ADDR_WIDTH, self.ADDR_OFFSET_W)
         dataIn_reg = HandshakedReg(din.__class__)
         dataIn_reg._updateParamsFrom(din)
         self.dataIn_reg = dataIn_reg
+        self._ar_dispatch(din, dataIn_reg, self.ooo_fifo,
+                          self.m.ar, self.state_array.port[0])
+
+    def _ar_dispatch(self, din: OutOfOrderCummulativeOpIntf,
+                     dataIn_reg: HandshakedReg,
+                     ooo_fifo: FifoOutOfOrderRead,
+                     ar: Axi4_addr,
+                     state_write: BramPort_withoutClk):
+        """
+        :see: :meth:`~.OutOfOrderCummulativeOp.ar_dispatch`
+        """
+        assert din.addr._dtype.bit_length() == self.ADDR_WIDTH - self.ADDR_OFFSET_W, (
+            din.addr._dtype.bit_length(), self.ADDR_WIDTH, self.ADDR_OFFSET_W)
         StreamNode(
             [din],
             [dataIn_reg.dataIn, ooo_fifo.write_confirm]
@@ -145,8 +222,6 @@ class OutOfOrderCummulativeOp(Unit):
         )
         ar_node.sync()
 
-        state_arr = self.state_array
-        state_write = state_arr.port[0]
         state_write.en(ar_node.ack())
         state_write.addr(ooo_fifo.read_execute.index)
 
@@ -404,7 +479,131 @@ class OutOfOrderCummulativeOp(Unit):
 
                 confirm.data(st.id)
 
+    def _perf_counter(self, name: str, en: RtlSignal):
+        c = self._reg(name, Bits(self.PERF_CNTRL_DATA_WIDTH), def_val=0)
+        If(en,
+           c(c + 1)
+        )
+        return c
+
+    def perf_latency_histogram_update(self, time: RtlSignal):
+        """
+        Build the histogram of the latency between AR and the first beat of R of each transaction
+
+        :param time: clock cycle counter used for the timestamps
+        """
+        ar = self.m.ar
+        r = self.m.r
+        ITEMS = self.LATENCY_HISTOGRAM_ITEMS
+        BIN_SHIFT = log2ceil(self.LATENCY_HISTOGRAM_BIN_SIZE)
+        BIN_W = log2ceil(ITEMS)
+
+        # the time when the read transaction was dispatched
+        ar_time = self._sig("perf_ar_time", time._dtype[2 ** self.ID_WIDTH])
+        If(self.clk._onRisingEdge(),
+            If(ar.valid & ar.ready,
+               ar_time[ar.id](time)
+            )
+        )
+        # the latency is measured to the first clock cycle with r.valid=1 (the stall of the pipeline is not included)
+        r_stall = self._reg("perf_r_stall", def_val=0)
+        r_stall(r.valid & ~r.ready)
+        sample_en = rename_signal(self, r.valid & ~r_stall, "perf_latency_sample_en")
+        latency = rename_signal(self, time - ar_time[r.id], "perf_latency")
+        latency_bin = latency[:BIN_SHIFT]
+        sample_bin = rename_signal(
+            self,
+            (latency_bin >= ITEMS - 1)._ternary(vec(ITEMS - 1, BIN_W), latency_bin[BIN_W:]),
+            "perf_latency_bin")
+
+        # read-modify-write of the histogram bin
+        _, h_r, h_w = self.perf_latency_histogram.port
+        h_r.en(sample_en)
+        h_r.addr(sample_bin)
+
+        bin_t = h_w.addr._dtype
+        rd_vld = self._reg("perf_latency_bin_rd_vld", def_val=0)
+        rd_vld(sample_en)
+        rd_bin = self._reg("perf_latency_bin_rd", bin_t)
+        If(sample_en,
+           rd_bin(sample_bin)
+        )
+        # forwarding of the write which happened together with the read
+        wr_vld = self._reg("perf_latency_bin_wr_vld", def_val=0)
+        wr_bin = self._reg("perf_latency_bin_wr", bin_t)
+        wr_data = self._reg("perf_latency_bin_wr_data", h_w.din._dtype)
+        wr_vld(h_w.en)
+        wr_bin(h_w.addr)
+        wr_data(h_w.din)
+        bin_val = (wr_vld & wr_bin._eq(rd_bin))._ternary(wr_data, h_r.dout)
+
+        h_w.en(rd_vld)
+        h_w.addr(rd_bin)
+        h_w.din(bin_val + 1)
+
+    def perf_counters(self):
+        """
+        Instantiate the performance counters and connect them to perf_ep
+        """
+        PIPELINE_CONFIG = self.PIPELINE_CONFIG
+        ep = self.perf_ep
+        ep.bus(self.perf_cntrl)
+        regs = ep.decoded
+        din = self.dataIn
+        m = self.m
+        c = self._perf_counter
+
+        time = self._reg("perf_cycles", Bits(self.PERF_CNTRL_DATA_WIDTH), def_val=0)
+        time(time + 1)
+        regs.cycles(time)
+        regs.stall_id_exhaustion(c("perf_stall_id_exhaustion", din.vld & ~self.ooo_fifo.write_confirm.rd))
+        regs.stall_ar(c("perf_stall_ar", m.ar.valid & ~m.ar.ready))
+
+        # number of read transactions without read data
+        read_pending = self._reg("perf_read_pending", Bits(self.ID_WIDTH + 1), def_val=0)
+        ar_ack = m.ar.valid & m.ar.ready
+        r_ack = m.r.valid & m.r.ready & m.r.last
+        If(ar_ack & ~r_ack,
+           read_pending(read_pending + 1)
+        ).Elif(~ar_ack & r_ack,
+           read_pending(read_pending - 1)
+        )
+        regs.read_wait(c("perf_read_wait", (read_pending != 0) & ~m.r.valid))
+        regs.stall_r(c("perf_stall_r", m.r.valid & ~m.r.ready))
+
+        wb = self.pipeline[PIPELINE_CONFIG.WRITE_BACK]
+        wb_next = self.pipeline[PIPELINE_CONFIG.WRITE_BACK + 1]
+        regs.stall_write_back(c("perf_stall_write_back", wb.valid & wb_next.in_ready & ~wb.out_ready))
+        ack = self.pipeline[PIPELINE_CONFIG.WAIT_FOR_WRITE_ACK]
+        regs.stall_write_ack(c("perf_stall_write_ack", ack.valid & ~ack.out_ready))
+
+        # :note: the data can be forwarded to WRITE_BACK stage only when it is loaded
+        #     and the first source has the priority (same as in apply_data_write_forwarding)
+        wb_prev = self.pipeline[PIPELINE_CONFIG.WRITE_BACK - 1]
+        forwarded = []
+        for i, src_i in enumerate(range(PIPELINE_CONFIG.WRITE_BACK, len(self.pipeline))):
+            cd = wb_prev.collision_detect[src_i]
+            if isinstance(cd, int):
+                assert cd == 0, cd
+                en = hBit(0)
+            elif forwarded:
+                en = wb.load_en & cd & ~Or(*forwarded)
+            else:
+                en = wb.load_en & cd
+            if not isinstance(cd, int):
+                forwarded.append(cd)
+            getattr(regs, f"collision_forward_{i:d}")(
+                c(f"perf_collision_forward_{i:d}", en))
+
+        self.perf_latency_histogram_update(time)
+        h_ep = self.perf_latency_histogram.port[0]
+        h_ep.en(regs.latency_histogram.en)
+        h_ep.addr(regs.latency_histogram.addr)
+        regs.latency_histogram.dout(h_ep.dout)
+
     def _impl(self):
         self.ar_dispatch()
         self.main_pipeline()
+        if self.HAS_PERF_COUNTERS:
+            self.perf_counters()
         propagateClkRstn(self)
@@ -0,0 +1,612 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from copy import copy
+from typing import List, Tuple
+
+from hwt.code import If, Concat, SwitchLogic, Or, And, connect
+from hwt.code_utils import rename_signal
+from hwt.hdl.constants import WRITE, READ
+from hwt.hdl.typeShortcuts import vec, hBit
+from hwt.hdl.types.bits import Bits
+from hwt.interfaces.std import BramPort_withoutClk
+from hwt.interfaces.utils import addClkRstn
+from hwt.synthesizer.hObjList import HObjList
+from hwt.synthesizer.interfaceLevel.interfaceUtils.utils import packIntf
+from hwt.synthesizer.param import Param
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwtLib.amba.axi4 import Axi4, Axi4_addr
+from hwtLib.amba.axi_comp.lsu.fifo_oooread import FifoOutOfOrderRead
+from hwtLib.amba.axi_comp.oooOp.outOfOrderCummulativeOp import OutOfOrderCummulativeOp
+from hwtLib.amba.axi_comp.oooOp.utils import OutOfOrderCummulativeOpIntf, \
+    OOOOpPipelineStage, does_collinde
+from hwtLib.handshaked.reg import HandshakedReg
+from hwtLib.handshaked.streamNode import StreamNode
+from hwtLib.mem.ram import RamSingleClock
+from pyMathBitPrecise.bit_utils import mask
+
+
+class OutOfOrderCummulativeOpMultiLane(OutOfOrderCummulativeOp):
+    """
+    Superscalar version of :class:`~.OutOfOrderCummulativeOp` which can process LANE_CNT
+    read-modify-write operations per clock.
+
+    Each lane has own dataIn/dataOut, AXI interface and ooo_fifo.
+    The state_array is multi-ported, it is banked per lane because each lane uses its own
+    transaction id space and thus there are not any bank conflicts.
+
+    The pipeline stages of all lanes are moving together (the pipeline is composed of rows
+    of OOOOpPipelineStage instances, one for each lane). This means that the position in the pipeline
+    specifies the age of the operation and that the lanes in the same stage are ordered by lane index
+    (the operation in the lane with higher index is newer).
+
+    * The collision detection is performed for each stage before WRITE_BACK against each stage after
+      WRITE_BACK in each lane.
+    * The write history is moving only together with WRITE_BACK stage (if the stages before are not empty).
+    * The operations which are colliding in the same stage are chained on the input of WRITE_BACK stage
+      (the main_op of a lane is applied to result of main_op of previous colliding lane).
+      Only the last write of such a chain is actually performed on AXI.
+    * The read data of the lanes may return with a different latency. Because of this the write is kept
+      in the last stage of the write history until every read which was issued before the write request,
+      in any lane, has returned (:meth:`~.write_history_retention`).
+    * If the pipeline is full and the last write waits for a read which can not enter the pipeline,
+      the write is retired anyway and all outstanding reads are executed again after their data returns
+      (:meth:`~.read_replay`).
+
+    :ivar LANE_CNT: number of parallel lanes
+    :note: The main_op is instantiated LANE_CNT times in series on the input of WRITE_BACK stage.
+        The main_op has to assign a whole dst_stage.data because it is used to drive
+        a combinational signal.
+    :note: self.pipeline is a list of rows of :class:`~.OOOOpPipelineStage`, indexed [stage][lane]
+    :note: The read tracking requires LANE_CNT * 2**ID_WIDTH bits for each stage of the write history
+        and two more for the outstanding and replayed reads.
+    """
+
+    def _config(self):
+        OutOfOrderCummulativeOp._config(self)
+        self.LANE_CNT = Param(2)
+
+    def _declr(self):
+        if self.HAS_PERF_COUNTERS:
+            raise NotImplementedError("Performance counters are not implemented for multi-lane version")
+        addClkRstn(self)
+        self._init_constants()
+        LANE_CNT = self.LANE_CNT
+
+        with self._paramsShared():
+            self.m = HObjList(Axi4()._m() for _ in range(LANE_CNT))
+
+        ooo_fifo = self.ooo_fifo = HObjList(FifoOutOfOrderRead() for _ in range(LANE_CNT))
+        for f in ooo_fifo:
+            f.ITEMS = 2 ** self.ID_WIDTH
+
+        TRANSACTION_STATE_T = self.TRANSACTION_STATE_T
+        state_array = self.state_array = HObjList(RamSingleClock() for _ in range(LANE_CNT))
+        for sa in state_array:
+            # write on read dispatch, read on read data receive, read of the address for read replay
+            sa.PORT_CNT = (WRITE, READ, READ)
+            sa.ADDR_WIDTH = self.ID_WIDTH
+            # address + TRANSACTION_STATE_T
+            sa.DATA_WIDTH = self.MAIN_STATE_INDEX_WIDTH + (
+                0 if TRANSACTION_STATE_T is None else
+                TRANSACTION_STATE_T.bit_length()
+            )
+
+        self._declr_io()
+
+    def _declr_io(self):
+        # index of the item to increment
+        din = self.dataIn = HObjList(OutOfOrderCummulativeOpIntf() for _ in range(self.LANE_CNT))
+        dout = self.dataOut = HObjList(OutOfOrderCummulativeOpIntf() for _ in range(self.LANE_CNT))._m()
+        for i in [*din, *dout]:
+            i.MAIN_STATE_INDEX_WIDTH = self.MAIN_STATE_INDEX_WIDTH
+            i.TRANSACTION_STATE_T = self.TRANSACTION_STATE_T
+        for i in din:
+            i.MAIN_STATE_T = None
+        for i in dout:
+            i.MAIN_STATE_T = self.MAIN_STATE_T
+
+    def ar_dispatch(self):
+        """
+        Send read request on AXI and store transaction in to state array and ooo_fifo for later wake up
+        (for each lane separately)
+        """
+        dataIn_reg = []
+        for din in self.dataIn:
+            r = HandshakedReg(din.__class__)
+            r._updateParamsFrom(din)
+            dataIn_reg.append(r)
+        self.dataIn_reg = HObjList(dataIn_reg)
+
+        # the read which has to be executed again, :see: :meth:`~.read_replay`
+        self.replay = []
+        for lane, (din, r, ooo_fifo, m, sa) in enumerate(zip(self.dataIn, self.dataIn_reg,
+                                                             self.ooo_fifo, self.m, self.state_array)):
+            replay_vld = self._reg(f"l{lane:d}_replay_vld", def_val=0)
+            replay_id = self._reg(f"l{lane:d}_replay_id", Bits(self.ID_WIDTH))
+            replay_addr = sa.port[2].dout[self.MAIN_STATE_INDEX_WIDTH:]
+            self.replay.append((replay_vld, replay_id))
+            self._ar_dispatch(din, r, ooo_fifo, m.ar, sa.port[0], replay_vld, replay_id, replay_addr)
+
+    def _ar_dispatch(self, din: OutOfOrderCummulativeOpIntf,
+                     dataIn_reg: HandshakedReg,
+                     ooo_fifo: FifoOutOfOrderRead,
+                     ar: Axi4_addr,
+                     state_write: BramPort_withoutClk,
+                     replay_vld: RtlSignal,
+                     replay_id: RtlSignal,
+                     replay_addr: RtlSignal):
+        """
+        :see: :meth:`~.OutOfOrderCummulativeOp._ar_dispatch`
+        :note: The replay of the read has priority over a new transaction, the state_array
+            already contains the address and the transaction state of the replayed transaction.
+        """
+        assert din.addr._dtype.bit_length() == self.ADDR_WIDTH - self.ADDR_OFFSET_W, (
+            din.addr._dtype.bit_length(), self.ADDR_WIDTH, self.ADDR_OFFSET_W)
+        StreamNode(
+            [din],
+            [dataIn_reg.dataIn, ooo_fifo.write_confirm]
+        ).sync()
+        connect(din, dataIn_reg.dataIn, exclude=[din.rd, din.vld])
+
+        din_data = dataIn_reg.dataOut
+        read_execute = ooo_fifo.read_execute
+        ar_node = StreamNode(
+            [din_data, read_execute],
+            [ar]
+        )
+        for m in ar_node.masters:
+            m.rd(ar_node.ackForMaster(m) & ~replay_vld)
+        ar.valid(replay_vld | ar_node.ackForSlave(ar))
+
+        state_write.en(ar_node.ack() & ~replay_vld)
+        state_write.addr(read_execute.index)
+        state_write.din(packIntf(din_data, exclude=[din_data.rd, din_data.vld]))
+
+        If(replay_vld,
+            ar.id(replay_id),
+            ar.addr(Concat(replay_addr, vec(0, self.ADDR_OFFSET_W))),
+        ).Else(
+            ar.id(read_execute.index),
+            ar.addr(Concat(din_data.addr, vec(0, self.ADDR_OFFSET_W))),
+        )
+        self._axi_addr_defaults(ar, 1)
+
+    def forwarding_sources(self, pipeline: List[List[OOOOpPipelineStage]])\
+            -> List[Tuple[int, OOOOpPipelineStage]]:
+        """
+        :return: list of tuples (stage index, stage) which can be used as a source of data write forwarding,
+            ordered from the newest to the oldest
+        """
+        WRITE_BACK = self.PIPELINE_CONFIG.WRITE_BACK
+        return [
+            (src_i, src)
+            for src_i in range(WRITE_BACK, len(pipeline))
+            # in the same stage the lane with higher index is the newer one
+            for src in reversed(pipeline[src_i])
+        ]
+
+    def collision_detector(self, pipeline: List[List[OOOOpPipelineStage]]):
+        """
+        Search for address access collisions in pipeline and store the result of colision check to registers for
+        data write forwarding in next clock tick
+
+        :note: st.collision_detect is indexed [src stage index][src lane]
+        """
+        PIPELINE_CONFIG = self.PIPELINE_CONFIG
+
+        for row in pipeline:
+            for dst in row:
+                # construct colision detector flags
+                dst.collision_detect = [
+                    [
+                        0
+                        # because we do not know the address in first stage
+                        # and write history stages do not require an update
+                        # :note: the stage 1 has to be checked as well because
+                        #     it may stall while the colliding write leaves the write history
+                        if (dst.index < 1 or
+                            src_i < PIPELINE_CONFIG.WRITE_BACK or
+                            dst.index >= PIPELINE_CONFIG.WRITE_BACK)
+                        else
+                        self._reg(f"{dst.name:s}_collision_detect_from_{src.name:s}", def_val=0)
+                        for src in src_row
+                    ]
+                    for src_i, src_row in enumerate(pipeline)
+                ]
+
+        for row in pipeline[1:PIPELINE_CONFIG.WRITE_BACK]:
+            for dst in row:
+                dst_prev = pipeline[dst.index - 1][dst.lane]
+                # for each stage in each lane which can potentially update a data in this stage
+                for src_i, src in self.forwarding_sources(pipeline):
+                    src_prev = pipeline[src_i - 1][src.lane]
+                    # :note: the content of the src stage may leave even if the stage itself does not load
+                    #     because the rows are moving together and the stage in previous row may be empty
+                    src_shift = src.load_en | (src.valid & src.out_ready)
+
+                    # :attention: the cd is a register and its value will be checked in next clock cycle
+                    # that means that we need to resolve its value for next clock cycle
+                    cd = dst.collision_detect[src_i][src.lane]
+                    c = self._sig(f"{cd.name:s}_tmp")
+                    # Resolve if dst stage should load from src stage in next clock cycle
+                    If(~dst.load_en & ~src_shift,
+                        c(does_collinde(dst, src)),
+                    ).Elif(~dst.load_en & src_shift,
+                        c(does_collinde(dst, src_prev))
+                    ).Elif(dst.load_en & ~src_shift,
+                        c(does_collinde(dst_prev, src))
+                    ).Elif(dst.load_en & src_shift,
+                        c(does_collinde(dst_prev, src_prev))
+                    ).Else(
+                        c(0)
+                    )
+
+                    cd(c & dst.valid.next)
+
+    def apply_data_write_forwarding(self, st: OOOOpPipelineStage,
+                           st_load_en: RtlSignal,
+                           data_modifier=lambda dst_st, src_st: dst_st.data(src_st.data)):
+        """
+        :see: :meth:`~.OutOfOrderCummulativeOp.apply_data_write_forwarding`
+        """
+        st_prev = self.pipeline[st.index - 1][st.lane]
+
+        def is_not_0(sig):
+            return not (isinstance(sig, int) and sig == 0)
+
+        res = SwitchLogic([
+                (
+                    # the previous which is beeing loaded into this is colliding with src
+                    (st_load_en & st_prev.collision_detect[src_i][src_st.lane]) |
+                    (~st_load_en & st.collision_detect[src_i][src_st.lane]),
+                    # forward data instead of data from previous stage
+                    data_modifier(st, src_st)
+                )
+                for src_i, src_st in self.forwarding_sources(self.pipeline) if (
+                        # filter out stage combinations which do not have forwarding
+                        is_not_0(st.collision_detect[src_i][src_st.lane]) or
+                        is_not_0(st_prev.collision_detect[src_i][src_st.lane])
+                    )
+            ],
+            default=\
+            If(st_load_en,
+               data_modifier(st, st_prev)
+            )
+        )
+
+        return res
+
+    def write_back_data(self, row: List[OOOOpPipelineStage], row_prev: List[OOOOpPipelineStage]):
+        """
+        Resolve the source of the data for each lane of the WRITE_BACK stage and apply the main_op.
+        The colliding operations from the same stage are chained.
+        """
+        def is_not_0(sig):
+            return not (isinstance(sig, int) and sig == 0)
+
+        results = []
+        for st, st_prev in zip(row, row_prev):
+            src = copy(st_prev)
+            src.data = self._sig(f"{st.name:s}_data_src", self.MAIN_STATE_T)
+            res = copy(st)
+            res.data = self._sig(f"{st.name:s}_data_next", self.MAIN_STATE_T)
+            SwitchLogic(
+                [
+                    # the previous lane in the same stage has the newest version of the data
+                    (does_collinde(st_prev, row_prev[lane]), src.data(results[lane].data))
+                    for lane in reversed(range(st.lane))
+                ] + [
+                    (st_prev.collision_detect[src_i][src_st.lane], src.data(src_st.data))
+                    for src_i, src_st in self.forwarding_sources(self.pipeline)
+                    if is_not_0(st_prev.collision_detect[src_i][src_st.lane])
+                ],
+                default=src.data(st_prev.data)
+            )
+            self.main_op(res, src)
+            If(st.load_en,
+               st.data(res.data),
+            )
+            results.append(res)
+
+    def write_superseded(self, row: List[OOOOpPipelineStage], st: OOOOpPipelineStage):
+        """
+        :return: a signal which is 1 if the write of this stage is overwritten
+            by a write of the lane with a higher index in the same stage
+        """
+        newer = [
+            does_collinde(st, other) & ~self.write_cancel(other)
+            for other in row[st.lane + 1:]
+        ]
+        if newer:
+            return Or(*newer)
+        else:
+            return hBit(0)
+
+    def _state_to_bits(self, data):
+        if not isinstance(data, RtlSignal):
+            data = packIntf(data)
+        return data
+
+    def write_history_retention(self, row_valid: List[RtlSignal], row_out_ready: List[RtlSignal]):
+        """
+        Keep the write in the last stage of the write history until all reads which were issued before
+        the write request (in any lane) have returned. The bit mask of the outstanding reads is copied to the stage
+        when the write request is sent and the bits are cleared as the read data returns.
+
+        If the pipeline is full the read can not enter it and the write has to be retired anyway
+        (all outstanding reads are then executed again, :see: :meth:`~.read_replay`).
+
+        :param row_valid: valid flag for each row of the pipeline
+        :param row_out_ready: out_ready flag for each row of the pipeline
+        :return: tuple (retire enable, force retire, read pending, read finish) where read pending/finish are
+            bit vectors with a bit for each transaction id of each lane
+        """
+        WRITE_BACK = self.PIPELINE_CONFIG.WRITE_BACK
+        ID_CNT = 2 ** self.ID_WIDTH
+        read_mask_t = Bits(self.LANE_CNT * ID_CNT)
+        read_pending = self._reg("read_pending", read_mask_t, def_val=0)
+        read_pending_next = self._sig("read_pending_next", read_mask_t)
+        read_finish = self._sig("read_finish", read_mask_t)
+        for lane, m in enumerate(self.m):
+            ar_ack = m.ar.valid & m.ar.ready
+            r_ack = m.r.valid & m.r.ready
+            for i in range(ID_CNT):
+                b = lane * ID_CNT + i
+                read_finish[b](r_ack & m.r.id._eq(i))
+                read_pending_next[b]((read_pending[b] | (ar_ack & m.ar.id._eq(i))) & ~read_finish[b])
+        read_pending(read_pending_next)
+
+        # reads which were issued before the write of the stage
+        history = range(WRITE_BACK + 1, len(row_valid))
+        older_reads = [self._reg(f"st{i:d}_older_reads", read_mask_t, def_val=0)
+                       for i in history]
+        last_wait = rename_signal(self, row_valid[-1] & (older_reads[-1] != 0), "write_history_wait")
+        # the whole pipeline is stalled by the last write and the read data can not enter it
+        force = rename_signal(self, And(*row_valid[:-1]) & last_wait, "write_history_force_retire")
+        for i, older in zip(history, older_reads):
+            if i == WRITE_BACK + 1:
+                # the write request is sent when the WRITE_BACK stage moves
+                older_prev = read_pending_next
+            else:
+                older_prev = older_reads[i - WRITE_BACK - 2]
+            If(force,
+               older(0),
+            ).Elif(row_valid[i - 1] & row_out_ready[i - 1],
+               older(older_prev & ~read_finish),
+            ).Else(
+               older(older & ~read_finish),
+            )
+
+        retire_en = rename_signal(self, ~last_wait | force, "write_history_retire_en")
+        return retire_en, force, read_pending, read_finish
+
+    def read_replay(self, force: RtlSignal, read_pending: RtlSignal, read_finish: RtlSignal, r_ready: RtlSignal):
+        """
+        If the write is forced to leave the write history all outstanding reads may miss it.
+        The data of such a read is dropped and the read is executed again with the same transaction id
+        (the address is read from the state_array again).
+
+        :param force: the flag which tells that the write leaves the history while there are older outstanding reads
+        :param r_ready: the ready of the READ_DATA_RECEIVE stage
+        :return: list of flags which are 1 if the read data of the lane has to be dropped and the read executed again
+        """
+        ID_CNT = 2 ** self.ID_WIDTH
+        replay_req = self._reg("read_replay_req", read_pending._dtype, def_val=0)
+        If(force,
+           replay_req((replay_req | read_pending) & ~read_finish)
+        ).Else(
+           replay_req(replay_req & ~read_finish)
+        )
+
+        res = []
+        for lane, (m, sa, (replay_vld, replay_id)) in enumerate(zip(self.m, self.state_array, self.replay)):
+            r = m.r
+            lane_replay_req = replay_req[(lane + 1) * ID_CNT:lane * ID_CNT]
+            drop = rename_signal(self, r.valid & (lane_replay_req[r.id] | force), f"l{lane:d}_r_drop")
+            r.ready(drop._ternary(~replay_vld, r_ready))
+            replay_start = drop & ~replay_vld
+            addr_read = sa.port[2]
+            addr_read.en(replay_start)
+            addr_read.addr(r.id)
+            If(replay_start,
+               replay_vld(1),
+               replay_id(r.id),
+            ).Elif(m.ar.ready,
+               replay_vld(0),
+            )
+            res.append(drop)
+
+        return res
+
+    def main_pipeline(self):
+        PIPELINE_CONFIG = self.PIPELINE_CONFIG
+        LANE_CNT = self.LANE_CNT
+        self.pipeline = pipeline = [
+            [
+                OOOOpPipelineStage(i, f"st{i:d}_l{lane:d}", self, lane=lane)
+                for lane in range(LANE_CNT)
+            ]
+            for i in range(PIPELINE_CONFIG.WAIT_FOR_WRITE_ACK + 1)
+        ]
+        HAS_TRANS_ST = self.TRANSACTION_STATE_T is not None
+        # the address and transaction state of the first stage are read from the state_array
+        # :note: it has to be resolved before collision detector because the stage 1 is checked as well
+        for st, sa in zip(pipeline[PIPELINE_CONFIG.READ_DATA_RECEIVE], self.state_array):
+            state_read = sa.port[1]
+            st.addr = state_read.dout[self.MAIN_STATE_INDEX_WIDTH:]
+            if HAS_TRANS_ST:
+                low = self.MAIN_STATE_INDEX_WIDTH
+                st.transaction_state = state_read.dout[:low]._reinterpret_cast(self.TRANSACTION_STATE_T)
+
+        # all lanes in the stage are moving together
+        WRITE_BACK = PIPELINE_CONFIG.WRITE_BACK
+        row_can_leave = [self._sig(f"st{i:d}_can_leave") for i in range(len(pipeline))]
+        row_valid = []
+        row_in_ready = []
+        for i, row in enumerate(pipeline):
+            v = rename_signal(self, Or(*(st.valid for st in row)), f"st{i:d}_valid")
+            row_valid.append(v)
+            row_in_ready.append(rename_signal(self, ~v | row_can_leave[i], f"st{i:d}_in_ready"))
+
+        # The write history moves only together with the WRITE_BACK stage if there is something
+        # in the stages before, this is required because the stages before WRITE_BACK may contain
+        # the data which were read before the write in write history and if the history was moving
+        # while WRITE_BACK stage is stalled the write could leave the history before the data is updated.
+        front_empty = ~Or(*row_valid[:WRITE_BACK + 1], *(m.r.valid for m in self.m))
+        write_history_en = rename_signal(
+            self,
+            (row_valid[WRITE_BACK] & row_can_leave[WRITE_BACK]) | front_empty,
+            "write_history_en")
+        row_out_ready = [
+            rename_signal(self,
+                          row_can_leave[i] if i <= WRITE_BACK else row_can_leave[i] & write_history_en,
+                          f"st{i:d}_out_ready")
+            for i in range(len(pipeline))
+        ]
+        for i, row in enumerate(pipeline):
+            for st in row:
+                st.out_ready(row_out_ready[i])
+
+        retire_en, force, read_pending, read_finish = self.write_history_retention(row_valid, row_out_ready)
+        r_drop = self.read_replay(force, read_pending, read_finish,
+                                  row_in_ready[PIPELINE_CONFIG.READ_DATA_RECEIVE])
+
+        self.collision_detector(pipeline)
+
+        # writes which are leaving the write history
+        retire = []
+        for st in pipeline[-1]:
+            en = st.valid & row_out_ready[-1] & ~self.write_cancel(st) & ~self.write_superseded(pipeline[-1], st)
+            retire.append((
+                rename_signal(self, en, f"{st.name:s}_retire"),
+                st.addr,
+                self._state_to_bits(st.data),
+            ))
+
+        for i, row in enumerate(pipeline):
+            if i > 0:
+                row_prev = pipeline[i - 1]
+                for st, st_prev in zip(row, row_prev):
+                    st.in_valid(st_prev.valid & row_out_ready[i - 1])
+
+            if i < len(pipeline) - 1 and i != WRITE_BACK:
+                row_can_leave[i](row_in_ready[i + 1])
+
+            # :note: pipeline stages described in PIPELINE_CONFIG enum
+            if i == PIPELINE_CONFIG.READ_DATA_RECEIVE:
+                for st, m, sa, drop in zip(row, self.m, self.state_array, r_drop):
+                    # :note: we can not apply forward write data there because we do not know the original address yet
+                    r = m.r
+                    state_read = sa.port[1]
+                    state_read.addr(r.id)
+                    st.in_valid(r.valid & ~drop & row_in_ready[i])
+                    state_read.en(st.load_en)
+                    # the write which is leaving the history has to be applied also to this stage
+                    # because the next stage does not check this stage for collisions
+                    data = st.data
+                    data_patched = self._sig(f"{st.name:s}_data_patched", self.MAIN_STATE_T)
+                    SwitchLogic(
+                        [
+                            (en & st.valid & st.addr._eq(w_addr),
+                             data_patched(w_data._reinterpret_cast(self.MAIN_STATE_T)))
+                            for en, w_addr, w_data in reversed(retire)
+                        ],
+                        default=data_patched(data)
+                    )
+                    If(st.load_en,
+                        st.id(r.id),
+                        self.data_load(r, st),
+                    ).Else(
+                        data(data_patched)
+                    )
+                    st.data = data_patched
+
+            elif i <= PIPELINE_CONFIG.STATE_LOAD:
+                for st, st_prev in zip(row, row_prev):
+                    If(st.load_en,
+                        st.id(st_prev.id),
+                        st.addr(st_prev.addr),
+                        self.propagate_trans_st(st_prev, st),
+                    )
+                    self.apply_data_write_forwarding(st, st.load_en)
+
+            elif i == PIPELINE_CONFIG.WRITE_BACK:
+                for st, st_prev in zip(row, row_prev):
+                    If(st.load_en,
+                        st.id(st_prev.id),
+                        st.addr(st_prev.addr),
+                        self.propagate_trans_st(st_prev, st),
+                    )
+                self.write_back_data(row, row_prev)
+
+                extraConds = {}
+                skipWhen = {}
+                for st, m in zip(row, self.m):
+                    aw = m.aw
+                    w = m.w
+                    cancel = rename_signal(
+                        self,
+                        self.write_cancel(st) | self.write_superseded(row, st),
+                        f"{st.name:s}_write_back_cancel")
+                    for ch in (aw, w):
+                        extraConds[ch] = row_in_ready[i + 1]
+                        skipWhen[ch] = ~st.valid | cancel
+
+                    self._axi_addr_defaults(aw, 1)
+                    aw.id(st.id)
+                    aw.addr(Concat(st.addr, vec(0, self.ADDR_OFFSET_W)))
+
+                    st_data = self._state_to_bits(st.data)
+                    w.data(st_data._reinterpret_cast(w.data._dtype))
+                    w.strb(mask(self.DATA_WIDTH // 8))
+                    w.last(1)
+
+                aw_w = [ch for m in self.m for ch in (m.aw, m.w)]
+                wb_node = StreamNode([], aw_w, extraConds=extraConds, skipWhen=skipWhen)
+                wb_node.sync()
+                row_can_leave[i](And(row_in_ready[i + 1], *(wb_node.rd(ch) for ch in aw_w)))
+
+            elif i > PIPELINE_CONFIG.WRITE_BACK and i != PIPELINE_CONFIG.WAIT_FOR_WRITE_ACK:
+                for st, st_prev in zip(row, row_prev):
+                    If(st.load_en,
+                       st.id(st_prev.id),
+                       st.addr(st_prev.addr),
+                       st.data(st_prev.data),
+                       self.propagate_trans_st(st_prev, st),
+                    )
+
+            elif i == PIPELINE_CONFIG.WAIT_FOR_WRITE_ACK:
+                bs = []
+                douts = []
+                skipWhen = {}
+                for st, st_prev, m, dout, ooo_fifo in zip(row, row_prev, self.m, self.dataOut, self.ooo_fifo):
+                    If(st.load_en,
+                        st.id(st_prev.id),
+                        st.addr(st_prev.addr),
+                        self.propagate_trans_st(st_prev, st),
+                        st.data(st_prev.data),
+                    )
+                    b = m.b
+                    confirm = ooo_fifo.read_confirm
+                    # :note: the lanes of the stage are the same as in the WRITE_BACK stage
+                    cancel = self.write_cancel(st) | self.write_superseded(row, st)
+                    skipWhen[b] = ~st.valid | cancel
+                    skipWhen[dout] = ~st.valid
+                    skipWhen[confirm] = ~st.valid
+                    bs.append(b)
+                    douts.extend((dout, confirm))
+
+                    dout.addr(st.addr)
+                    dout.data(st.data)
+                    if HAS_TRANS_ST:
+                        dout.transaction_state(st.transaction_state)
+
+                    confirm.data(st.id)
+
+                # ommiting st_next.ready as there is no next
+                w_ack_node = StreamNode(bs, douts, skipWhen=skipWhen)
+                # the write has to stay in the history until all older reads have returned
+                w_ack_node.sync(write_history_en & retire_en)
+                row_can_leave[i](w_ack_node.ack() & retire_en)
+
@@ -14,6 +14,7 @@ from hwtSimApi.hdlSimulator import HdlSimulator
 class OOOOpPipelineStage():
     """
     :ivar index: index of the register in pipeline
+    :ivar lane: index of the lane in superscalar pipeline (0 if there is only a single lane)
     :ivar id: an id of an axi transaction (and index of item in state_array)
     :ivar addr: an address which is beeing processed in this stage
     :ivar state: state loaded from the state_array (current meta state)
@@ -27,11 +28,12 @@ class OOOOpPipelineStage():
         in this clock cycle
     """
 
-    def __init__(self, index, name: str, parent: "OutOfOrderCummulativeOp"):
+    def __init__(self, index, name: str, parent: "OutOfOrderCummulativeOp", lane: int=0):
         self.index = index
+        self.lane = lane
         self.name = name
         r = parent._reg
-        self.id = r(f"{name:s}_id", parent.m.ar.id._dtype)
+        self.id = r(f"{name:s}_id", Bits(parent.ID_WIDTH))
         self.addr = r(f"{name:s}_addr", Bits(parent.MAIN_STATE_INDEX_WIDTH))
 
         if parent.TRANSACTION_STATE_T is not None:
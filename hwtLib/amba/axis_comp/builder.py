@@ -18,6 +18,9 @@ from hwtLib.amba.axis_comp.splitSelect import AxiSSpliSelect
 class AxiSBuilder(AbstractStreamBuilder):
     """
     Helper class which simplifies building of large stream paths
+
+    :note: :meth:`~.buff_cdc` with items=1 uses :class:`~.AxiSCdc` with the synchronization by pulses
+        (throughput ~1/3 of the slower clock) unless full_throughput=True is specified
     """
     FifoCls = AxiSFifo
     FifoAsyncCls = AxiSFifoAsync
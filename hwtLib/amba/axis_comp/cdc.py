@@ -3,6 +3,7 @@
 
 from hwt.serializer.mode import serializeParamsUniq
 from hwtLib.amba.axis_comp.base import AxiSCompBase
+from hwtLib.amba.axis_comp.fifo_async import AxiSFifoAsync
 from hwtLib.handshaked.cdc import HandshakedCdc
 
 
@@ -15,6 +16,7 @@ class AxiSCdc(AxiSCompBase, HandshakedCdc):
 
     .. hwt-autodoc:: example_AxiSCdc
     """
+    FifoAsyncCls = AxiSFifoAsync
 
 
 def example_AxiSCdc():
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import List
+
+from hwt.code import If, Concat, Or
+from hwt.hdl.types.bits import Bits
+from hwt.interfaces.std import Handshaked
+from hwt.interfaces.utils import addClkRstn, propagateClkRstn
+from hwt.math import log2ceil, isPow2
+from hwt.serializer.mode import serializeParamsUniq
+from hwt.synthesizer.param import Param
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwt.synthesizer.unit import Unit
+from hwt.synthesizer.vectorUtils import fitTo_t
+from hwtLib.amba.axis import AxiStream
+from hwtLib.amba.axis_comp.fifo import AxiSFifo
+from hwtLib.handshaked.fifo import HandshakedFifo
+from hwtLib.logic.carrySaveAdder import carry_save_adder_tree
+from hwtLib.types.net.ip import IP_PROTOCOL
+
+
+class CHECKSUM_PROTOCOL():
+    """
+    The checksums supported by :class:`~.AxiS_checksum`
+    """
+    IPv4 = "IPv4"  # IPv4 header checksum
+    UDP = "UDP"  # UDP checksum (over IPv4)
+    TCP = "TCP"  # TCP checksum (over IPv4)
+
+
+def ones_complement_fold(s: RtlSignal) -> RtlSignal:
+    """
+    Fold 32b sum to a 16b ones' complement sum (add the carries back)
+    """
+    assert s._dtype.bit_length() == 32, s._dtype
+    t = fitTo_t(s[16:], Bits(17)) + fitTo_t(s[32:16], Bits(17))
+    return t[16:] + fitTo_t(t[16], Bits(16))
+
+
+@serializeParamsUniq
+class AxiS_checksum(Unit):
+    """
+    Streaming checksum offload for IPv4 header, UDP and TCP,
+    the frame on input is expected to contain the IPv4 packet on L3_OFFSET
+    (e.g. Ethernet II frame), the ranges of the checksum are resolved from the IPv4 header
+    (the ihl and totalLen fields) and the TCP/UDP checksum includes the IPv4 pseudo header.
+
+    The ones' complement sum of all 16b words of the bus word is computed using
+    a carry-save adder tree (:func:`hwtLib.logic.carrySaveAdder.carry_save_adder_tree`)
+    which is separated by a register from the final adder and the accumulator.
+
+    * INSERT=False (verify): the frames are passed to the output with a latency of 1 clk
+      and user bit of the last word of the frame is 1 if the checksum of the frame is correct
+      (for UDP the checksum 0 means that the checksum was not computed and it is correct).
+    * INSERT=True (fill): the checksum is computed and written in to the checksum field of the frame,
+      the original value of the field is ignored. The frames are stored in a buffer for MAX_FRAME_LEN bytes
+      because the checksum is known only after the end of the frame.
+
+    :note: The frames with an invalid IPv4 header or a different L4 protocol are not detected,
+        the protocol has to be checked before this component.
+
+    .. hwt-autodoc:: _example_AxiS_checksum
+    """
+
+    def _config(self):
+        self.DATA_WIDTH = Param(64)
+        self.PROTOCOL = Param(CHECKSUM_PROTOCOL.UDP)
+        self.INSERT = Param(False)
+        # byte offset of the IPv4 header in the frame (size of Ethernet II header)
+        self.L3_OFFSET = Param(14)
+        # the size of the buffer for INSERT=True
+        self.MAX_FRAME_LEN = Param(1522)
+
+    def _declr(self):
+        assert self.PROTOCOL in (CHECKSUM_PROTOCOL.IPv4,
+                                 CHECKSUM_PROTOCOL.UDP,
+                                 CHECKSUM_PROTOCOL.TCP), self.PROTOCOL
+        assert isPow2(self.DATA_WIDTH) and self.DATA_WIDTH >= 16, self.DATA_WIDTH
+        assert self.L3_OFFSET % 2 == 0, ("IPv4 header has to be aligned to 16b words", self.L3_OFFSET)
+        addClkRstn(self)
+        with self._paramsShared():
+            self.dataIn = AxiStream()
+            self.dataOut = AxiStream()._m()
+
+        for i in (self.dataIn, self.dataOut):
+            i.USE_KEEP = True
+
+        if self.INSERT:
+            db = self.dataBuff = AxiSFifo()
+            db.DATA_WIDTH = self.DATA_WIDTH
+            db.USE_KEEP = True
+            db.DEPTH = (self.MAX_FRAME_LEN + self.DATA_WIDTH // 8 - 1) // (self.DATA_WIDTH // 8)
+
+            # (checksum, byte offset of checksum field)
+            cb = self.csumBuff = HandshakedFifo(Handshaked)
+            cb.DEPTH = 4
+            cb.DATA_WIDTH = 16 + self._offset_t().bit_length()
+        else:
+            # checksum ok flag on last word
+            self.dataOut.USER_WIDTH = 1
+
+    def _offset_t(self):
+        """
+        Type of the byte offset in the frame
+        """
+        return Bits(17)
+
+    def _word_i_t(self):
+        return Bits(self._offset_t().bit_length() - log2ceil(self.DATA_WIDTH // 8))
+
+    def _lane_offsets(self, word_i: RtlSignal) -> List[RtlSignal]:
+        """
+        :return: byte offset in frame for each byte of the word
+        """
+        W = self.DATA_WIDTH // 8
+        if W == 1:
+            return [word_i]
+        lane_bits = log2ceil(W)
+        return [Concat(word_i, Bits(lane_bits).from_py(j)) for j in range(W)]
+
+    def _hdr_byte(self, word_i: RtlSignal, in_ack: RtlSignal, offset: int) -> RtlSignal:
+        """
+        Byte from the header of the frame, the value is valid on the word which contains the byte
+        and on all following words of the frame
+        """
+        k, j = divmod(offset, self.DATA_WIDTH // 8)
+        lane = self.dataIn.data[(j + 1) * 8:j * 8]
+        r = self._reg(f"hdr_byte{offset:d}", Bits(8), def_val=0)
+        in_word = word_i._eq(k)
+        If(in_ack & in_word,
+           r(lane)
+        )
+        return in_word._ternary(lane, r)
+
+    def _impl(self):
+        propagateClkRstn(self)
+        DW = self.DATA_WIDTH
+        W = DW // 8
+        IP = self.L3_OFFSET
+        PROTO = self.PROTOCOL
+        offset_t = self._offset_t()
+        din = self.dataIn
+
+        in_ack = self._sig("in_ack")
+        in_ack(din.valid & din.ready)
+        word_i = self._reg("word_i", self._word_i_t(), def_val=0)
+        If(in_ack,
+           If(din.last,
+              word_i(0)
+           ).Else(
+              word_i(word_i + 1)
+           )
+        )
+
+        # fields of IPv4 header
+        ihl = self._hdr_byte(word_i, in_ack, IP)[4:]
+        hdr_len = self._sig("hdr_len", offset_t)
+        hdr_len(fitTo_t(Concat(ihl, Bits(2).from_py(0)), offset_t))
+        total_len = self._sig("total_len", offset_t)
+        total_len(fitTo_t(Concat(self._hdr_byte(word_i, in_ack, IP + 2),
+                                 self._hdr_byte(word_i, in_ack, IP + 3)), offset_t))
+        l4 = self._sig("l4_offset", offset_t)
+        l4(hdr_len + IP)
+
+        field_off = self._sig("field_offset", offset_t)
+        if PROTO == CHECKSUM_PROTOCOL.IPv4:
+            field_off(IP + 10)
+        elif PROTO == CHECKSUM_PROTOCOL.UDP:
+            field_off(l4 + 6)
+        else:
+            field_off(l4 + 16)
+
+        # resolve which bytes are included in checksum
+        lane_offsets = self._lane_offsets(word_i)
+        byte_en = []
+        field_nonzero = []
+        for j, p in enumerate(lane_offsets):
+            if PROTO == CHECKSUM_PROTOCOL.IPv4:
+                en = (p >= IP) & (p < l4)
+            else:
+                # pseudo header src, dst address + L4 header + L4 payload
+                en = ((p >= IP + 12) & (p < IP + 20)) | ((p >= l4) & (p < total_len + IP))
+            en = din.keep[j] & en
+            is_field = p._eq(field_off) | p._eq(field_off + 1)
+            if self.INSERT:
+                en = en & ~is_field
+            elif PROTO == CHECKSUM_PROTOCOL.UDP:
+                field_nonzero.append(is_field & (din.data[(j + 1) * 8:j * 8] != 0))
+
+            byte_en.append(en)
+
+        # 16b words (big endian, the IPv4 header is aligned to 16b)
+        operands = []
+        for j in range(0, W, 2):
+            hi, lo = [byte_en[j + i]._ternary(din.data[(j + i + 1) * 8:(j + i) * 8], Bits(8).from_py(0))
+                      for i in range(2)]
+            operands.append(Concat(hi, lo))
+        csa_s, csa_c = carry_save_adder_tree(self, operands, "csa")
+
+        # pipeline register after the carry-save adder tree
+        st_vld = self._reg("st_vld", def_val=0)
+        st_ready = self._sig("st_ready")
+        st_data = self._reg("st_data", din.data._dtype)
+        st_keep = self._reg("st_keep", din.keep._dtype)
+        st_last = self._reg("st_last")
+        st_s = self._reg("st_s", csa_s._dtype)
+        st_c = self._reg("st_c", csa_c._dtype)
+        st_l4_len = self._reg("st_l4_len", offset_t)
+        st_field_off = self._reg("st_field_off", offset_t)
+        st_field_zero = self._reg("st_field_zero")
+        field_zero = self._sig("field_zero")
+        field_zero((word_i._eq(0) | st_field_zero) & ~Or(*field_nonzero, Bits(1).from_py(0)))
+
+        din.ready(~st_vld | st_ready)
+        If(din.ready,
+           st_vld(din.valid),
+        )
+        If(in_ack,
+           st_data(din.data),
+           st_keep(din.keep),
+           st_last(din.last),
+           st_s(csa_s),
+           st_c(csa_c),
+           st_l4_len(total_len - hdr_len),
+           st_field_off(field_off),
+           st_field_zero(field_zero),
+        )
+
+        # final adder and accumulator
+        st_ack = self._sig("st_ack")
+        st_ack(st_vld & st_ready)
+        sum_t = Bits(32)
+        acc = self._reg("acc", sum_t, def_val=0)
+        total = self._sig("total", sum_t)
+        if PROTO == CHECKSUM_PROTOCOL.IPv4:
+            pseudo = sum_t.from_py(0)
+        else:
+            proto = IP_PROTOCOL.UDP if PROTO == CHECKSUM_PROTOCOL.UDP else IP_PROTOCOL.TCP
+            pseudo = fitTo_t(st_l4_len, sum_t) + proto
+        total(acc + fitTo_t(st_s, sum_t) + fitTo_t(st_c, sum_t))
+        If(st_ack,
+           If(st_last,
+              acc(0)
+           ).Else(
+              acc(total)
+           )
+        )
+        folded = self._sig("folded", Bits(16))
+        folded(ones_complement_fold(total + pseudo))
+
+        if self.INSERT:
+            self._impl_insert(st_vld, st_ready, st_data, st_keep, st_last, st_field_off, folded)
+        else:
+            dout = self.dataOut
+            dout.data(st_data)
+            dout.keep(st_keep)
+            dout.last(st_last)
+            ok = folded._eq(0xffff)
+            if PROTO == CHECKSUM_PROTOCOL.UDP:
+                ok = ok | st_field_zero
+            dout.user(st_last & ok)
+            dout.valid(st_vld)
+            st_ready(dout.ready)
+
+    def _impl_insert(self, st_vld: RtlSignal, st_ready: RtlSignal,
+                     st_data: RtlSignal, st_keep: RtlSignal, st_last: RtlSignal,
+                     st_field_off: RtlSignal, folded: RtlSignal):
+        """
+        Store the frame in buffer until the checksum is resolved and then write the checksum to the frame
+        """
+        db = self.dataBuff
+        cb = self.csumBuff
+
+        csum = self._sig("csum", Bits(16))
+        if self.PROTOCOL == CHECKSUM_PROTOCOL.UDP:
+            # 0 means no checksum for UDP
+            If(folded._eq(0xffff),
+               csum(0xffff)
+            ).Else(
+               csum(~folded)
+            )
+        else:
+            csum(~folded)
+
+        db.dataIn.data(st_data)
+        db.dataIn.keep(st_keep)
+        db.dataIn.last(st_last)
+        cb.dataIn.data(Concat(st_field_off, csum))
+        db.dataIn.valid(st_vld & (~st_last | cb.dataIn.rd))
+        cb.dataIn.vld(st_vld & st_last & db.dataIn.ready)
+        st_ready(db.dataIn.ready & (~st_last | cb.dataIn.rd))
+
+        # output, the checksum of the frame has to be known before first word of the frame
+        # is send because it may be in any word of the frame
+        src = db.dataOut
+        dout = self.dataOut
+        out_word_i = self._reg("out_word_i", self._word_i_t(), def_val=0)
+        out_ack = src.valid & cb.dataOut.vld & dout.ready
+        If(out_ack,
+           If(src.last,
+              out_word_i(0)
+           ).Else(
+              out_word_i(out_word_i + 1)
+           )
+        )
+        offset_w = self._offset_t().bit_length()
+        out_field_off = cb.dataOut.data[16 + offset_w:16]
+        out_csum = cb.dataOut.data[16:]
+        out_data = []
+        for j, p in enumerate(self._lane_offsets(out_word_i)):
+            d = src.data[(j + 1) * 8:j * 8]
+            out_data.append(
+                p._eq(out_field_off)._ternary(
+                    out_csum[16:8],
+                    p._eq(out_field_off + 1)._ternary(out_csum[8:], d))
+            )
+        dout.data(Concat(*reversed(out_data)))
+        dout.keep(src.keep)
+        dout.last(src.last)
+        dout.valid(src.valid & cb.dataOut.vld)
+        src.ready(dout.ready & cb.dataOut.vld)
+        cb.dataOut.rd(src.valid & dout.ready & src.last)
+
+
+def _example_AxiS_checksum():
+    u = AxiS_checksum()
+    u.PROTOCOL = CHECKSUM_PROTOCOL.TCP
+    u.INSERT = True
+    return u
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = _example_AxiS_checksum()
+    print(to_rtl_str(u))
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from random import Random
+import unittest
+
+from hwt.simulator.simTestCase import SingleUnitSimTestCase
+from hwtLib.amba.axis import axis_send_bytes, axis_recieve_bytes, \
+    _axis_recieve_bytes
+from hwtLib.amba.axis_comp.checksum import AxiS_checksum, CHECKSUM_PROTOCOL
+from hwtLib.types.net.ip import IP_PROTOCOL
+from hwtSimApi.constants import CLK_PERIOD
+
+
+def ones_complement_sum(data):
+    s = 0
+    for i in range(0, len(data), 2):
+        w = data[i] << 8
+        if i + 1 < len(data):
+            w |= data[i + 1]
+        s += w
+    while s >> 16:
+        s = (s & 0xffff) + (s >> 16)
+    return s
+
+
+def ipv4_frame(rand: Random, proto: str, payload_len: int, ihl=5, pad=0, L3_OFFSET=14):
+    """
+    Generate Ethernet II frame with IPv4 packet with correct checksums
+
+    :return: tuple (frame bytes, offset of the checksum field)
+    """
+    ip_proto = IP_PROTOCOL.TCP if proto == CHECKSUM_PROTOCOL.TCP else IP_PROTOCOL.UDP
+    if ip_proto == IP_PROTOCOL.TCP:
+        l4 = [rand.getrandbits(8) for _ in range(20)]
+        l4_csum = 16
+    else:
+        l4 = [rand.getrandbits(8) for _ in range(4)] + [0, 0, 0, 0]
+        l4_csum = 6
+    l4 += [rand.getrandbits(8) for _ in range(payload_len)]
+    l4_len = len(l4)
+    if ip_proto == IP_PROTOCOL.UDP:
+        l4[4:6] = [l4_len >> 8, l4_len & 0xff]
+    l4[l4_csum:l4_csum + 2] = [0, 0]
+
+    total_len = ihl * 4 + l4_len
+    ip = [0x40 | ihl, 0, total_len >> 8, total_len & 0xff,
+          rand.getrandbits(8), rand.getrandbits(8), 0x40, 0,
+          64, ip_proto, 0, 0]
+    ip += [rand.getrandbits(8) for _ in range(8 + (ihl - 5) * 4)]
+    ip_csum = ~ones_complement_sum(ip) & 0xffff
+    ip[10:12] = [ip_csum >> 8, ip_csum & 0xff]
+
+    pseudo = ip[12:20] + [0, ip_proto, l4_len >> 8, l4_len & 0xff]
+    csum = ~ones_complement_sum(pseudo + l4) & 0xffff
+    if ip_proto == IP_PROTOCOL.UDP and csum == 0:
+        csum = 0xffff
+    l4[l4_csum:l4_csum + 2] = [csum >> 8, csum & 0xff]
+
+    eth = [rand.getrandbits(8) for _ in range(L3_OFFSET - 2)] + [0x08, 0x00]
+    frame = eth + ip + l4 + [rand.getrandbits(8) for _ in range(pad)]
+    if proto == CHECKSUM_PROTOCOL.IPv4:
+        field = L3_OFFSET + 10
+    else:
+        field = L3_OFFSET + ihl * 4 + l4_csum
+    return frame, field
+
+
+class AxiS_checksum_verifyTC(SingleUnitSimTestCase):
+    DATA_WIDTH = 64
+    PROTOCOL = CHECKSUM_PROTOCOL.UDP
+    INSERT = False
+
+    @classmethod
+    def getUnit(cls):
+        u = cls.u = AxiS_checksum()
+        u.DATA_WIDTH = cls.DATA_WIDTH
+        u.PROTOCOL = cls.PROTOCOL
+        u.INSERT = cls.INSERT
+        u.MAX_FRAME_LEN = 256
+        return u
+
+    def gen_frames(self, N=12):
+        """
+        :return: list of tuples (frame, field offset)
+        """
+        rand = Random(0)
+        frames = []
+        for i in range(N):
+            payload_len = rand.randint(0, 100)
+            ihl = 5 if i % 3 else rand.randint(5, 8)
+            pad = rand.choice([0, 0, 3, 10])
+            frames.append(ipv4_frame(rand, self.PROTOCOL, payload_len, ihl=ihl, pad=pad))
+        return frames
+
+    def recieve_frames(self):
+        """
+        :return: list of tuples (frame bytes, user flag from last word)
+        """
+        res = []
+        ag_data = self.u.dataOut._ag.data
+        while ag_data:
+            beats = deque()
+            while True:
+                data, keep, user, last = ag_data.popleft()
+                beats.append((data, keep, last))
+                if int(last):
+                    break
+            offset, f = _axis_recieve_bytes(beats, self.DATA_WIDTH // 8, True, False)
+            self.assertEqual(offset, 0)
+            res.append((f, int(user)))
+        return res
+
+    def run_frames(self, frames, randomized=False):
+        u = self.u
+        for f in frames:
+            axis_send_bytes(u.dataIn, f)
+        t = sum(len(f) // (self.DATA_WIDTH // 8) + 1 for f in frames) + 20
+        if randomized:
+            self.randomize(u.dataIn)
+            self.randomize(u.dataOut)
+            t *= 4
+        self.runSim(t * CLK_PERIOD)
+
+    def test_nop(self):
+        self.runSim(10 * CLK_PERIOD)
+        self.assertEmpty(self.u.dataOut._ag.data)
+
+    def test_correct(self, randomized=False):
+        frames = [f for f, _ in self.gen_frames()]
+        self.run_frames(frames, randomized=randomized)
+        self.assertSequenceEqual(self.recieve_frames(), [(f, 1) for f in frames])
+
+    def test_correct_randomized(self):
+        self.test_correct(randomized=True)
+
+    def test_corrupted(self):
+        rand = Random(1)
+        frames = []
+        ref = []
+        for i, (f, field) in enumerate(self.gen_frames()):
+            if i % 2:
+                if self.PROTOCOL == CHECKSUM_PROTOCOL.IPv4:
+                    # byte in IPv4 header
+                    b = rand.choice([14 + 1, 14 + 8, 14 + 13, field + 1])
+                else:
+                    # byte in pseudo header, L4 header or payload
+                    ip_end = 14 + (f[14] & 0xf) * 4
+                    b = rand.choice([14 + 12, 14 + 19, ip_end, field, ip_end + 8])
+                f[b] ^= 1 << rand.randint(0, 7)
+                ok = 0
+            else:
+                ok = 1
+            frames.append(f)
+            ref.append((f, ok))
+
+        self.run_frames(frames)
+        self.assertSequenceEqual(self.recieve_frames(), ref)
+
+    def test_padding_ignored(self):
+        rand = Random(2)
+        frames = []
+        for f, _ in self.gen_frames():
+            total_len = (f[14 + 2] << 8) | f[14 + 3]
+            if len(f) > 14 + total_len:
+                f[-1] ^= 0xff
+            f.extend(rand.getrandbits(8) for _ in range(3))
+            frames.append(f)
+        self.run_frames(frames)
+        self.assertSequenceEqual(self.recieve_frames(), [(f, 1) for f in frames])
+
+    def test_no_checksum(self):
+        frames = []
+        for f, field in self.gen_frames():
+            f[field:field + 2] = [0, 0]
+            frames.append(f)
+        self.run_frames(frames)
+        # 0 is allowed only for UDP
+        ok = int(self.PROTOCOL == CHECKSUM_PROTOCOL.UDP)
+        self.assertSequenceEqual(self.recieve_frames(), [(f, ok) for f in frames])
+
+
+class AxiS_checksum_verify_tcpTC(AxiS_checksum_verifyTC):
+    PROTOCOL = CHECKSUM_PROTOCOL.TCP
+
+
+class AxiS_checksum_verify_ipv4TC(AxiS_checksum_verifyTC):
+    PROTOCOL = CHECKSUM_PROTOCOL.IPv4
+
+
+class AxiS_checksum_verify_512bTC(AxiS_checksum_verifyTC):
+    DATA_WIDTH = 512
+    PROTOCOL = CHECKSUM_PROTOCOL.TCP
+
+
+class AxiS_checksum_insertTC(AxiS_checksum_verifyTC):
+    INSERT = True
+
+    def recieve_frames(self):
+        res = []
+        while self.u.dataOut._ag.data:
+            offset, f = axis_recieve_bytes(self.u.dataOut)
+            self.assertEqual(offset, 0)
+            res.append(f)
+        return res
+
+    def test_correct(self, randomized=False):
+        rand = Random(3)
+        frames = []
+        ref = []
+        for f, field in self.gen_frames():
+            ref.append(list(f))
+            # the original value of the field should be ignored
+            f[field:field + 2] = [rand.getrandbits(8), rand.getrandbits(8)]
+            frames.append(f)
+
+        self.run_frames(frames, randomized=randomized)
+        self.assertSequenceEqual(self.recieve_frames(), ref)
+
+    def test_corrupted(self):
+        pass
+
+    def test_padding_ignored(self):
+        pass
+
+    def test_no_checksum(self):
+        pass
+
+
+class AxiS_checksum_insert_tcpTC(AxiS_checksum_insertTC):
+    PROTOCOL = CHECKSUM_PROTOCOL.TCP
+
+
+class AxiS_checksum_insert_ipv4TC(AxiS_checksum_insertTC):
+    PROTOCOL = CHECKSUM_PROTOCOL.IPv4
+
+
+class AxiS_checksum_insert_512bTC(AxiS_checksum_insertTC):
+    DATA_WIDTH = 512
+    PROTOCOL = CHECKSUM_PROTOCOL.UDP
+
+
+AxiS_checksum_TCs = [
+    AxiS_checksum_verifyTC,
+    AxiS_checksum_verify_tcpTC,
+    AxiS_checksum_verify_ipv4TC,
+    AxiS_checksum_verify_512bTC,
+    AxiS_checksum_insertTC,
+    AxiS_checksum_insert_tcpTC,
+    AxiS_checksum_insert_ipv4TC,
+    AxiS_checksum_insert_512bTC,
+]
+
+if __name__ == "__main__":
+    suite = unittest.TestSuite()
+    # suite.addTest(AxiS_checksum_verifyTC('test_correct'))
+    for tc in AxiS_checksum_TCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
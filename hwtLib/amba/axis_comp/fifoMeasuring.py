@@ -22,6 +22,8 @@ class AxiS_fifoMeasuring(Unit):
     Fifo which are counting sizes of frames and sends it over
     dedicated handshaked interface "sizes"
 
+    :ivar ~.MEM_READ_LATENCY: read latency of the data buffer memory, see :class:`~.HandshakedFifo`
+
     .. hwt-autodoc:: _example_AxiS_fifoMeasuring
     """
 
@@ -30,6 +32,7 @@ class AxiS_fifoMeasuring(Unit):
         self.SIZES_BUFF_DEPTH = Param(16)
         self.MAX_LEN = Param((2048 // 8) - 1)
         self.EXPORT_ALIGNMENT_ERROR = Param(False)
+        self.MEM_READ_LATENCY = Param(1)
 
     def getAlignBitsCnt(self):
         return log2ceil(self.DATA_WIDTH // 8)
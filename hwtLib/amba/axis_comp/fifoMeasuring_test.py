@@ -10,7 +10,7 @@ from hwt.simulator.simTestCase import SingleUnitSimTestCase,\
 from hwtLib.amba.axis_comp.fifoMeasuring import AxiS_fifoMeasuring
 from pyMathBitPrecise.bit_utils import mask, mask_bytes
 from hwtSimApi.constants import CLK_PERIOD
-from hwtSimApi.triggers import Timer
+from hwtSimApi.triggers import Timer, WaitWriteOnly
 
 
 class AxiS_fifoMeasuringTC(SingleUnitSimTestCase):
@@ -265,9 +265,41 @@ class AxiS_fifoMeasuringTC(SingleUnitSimTestCase):
                           [MAX_LEN + 1, MAX_LEN + 2, MAX_LEN + 3]])
 
 
+class AxiS_fifoMeasuring_memReadLatency2TC(AxiS_fifoMeasuringTC):
+
+    @classmethod
+    def getUnit(cls):
+        u = super(AxiS_fifoMeasuring_memReadLatency2TC, cls).getUnit()
+        u.MEM_READ_LATENCY = 2
+        return u
+
+    def test_singleWordPacketWithDelay(self):
+        u = self.u
+
+        u.dataIn._ag.data.extend([(2, mask(8), 1),
+                                  ])
+
+        def init():
+            # the output register is reloaded if ready is 1, it has to be driven
+            yield WaitWriteOnly()
+            u.dataOut._ag.setEnable(False)
+
+        self.procs.append(init())
+        self.runSim(20 * CLK_PERIOD)
+        self.assertValSequenceEqual(u.sizes._ag.data, [8, ])
+        self.assertEmpty(u.dataOut._ag.data, 0)
+        self.assertValEqual(self.rtl_simulator.model.io.dataOut_last.read(), 1)
+
+
+AxiS_fifoMeasuringTCs = [
+    AxiS_fifoMeasuringTC,
+    AxiS_fifoMeasuring_memReadLatency2TC,
+]
+
 if __name__ == "__main__":
     suite = unittest.TestSuite()
     # suite.addTest(AxiS_fifoMeasuringTC('test_singleWordPacket'))
-    suite.addTest(unittest.makeSuite(AxiS_fifoMeasuringTC))
+    for tc in AxiS_fifoMeasuringTCs:
+        suite.addTest(unittest.makeSuite(tc))
     runner = unittest.TextTestRunner(verbosity=3)
     runner.run(suite)
@@ -1,9 +1,16 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from typing import List, Tuple
+
+from hwt.code import If, Concat, Or
+from hwt.hdl.types.bits import Bits
+from hwt.math import log2ceil
 from hwt.serializer.mode import serializeParamsUniq
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
 from hwtLib.amba.axis_comp.base import AxiSCompBase
 from hwtLib.handshaked.fifoAsync import HsFifoAsync
+from hwtLib.mem.fifoAsync import FifoAsync
 
 
 @serializeParamsUniq
@@ -13,9 +20,182 @@ class AxiSFifoAsync(AxiSCompBase, HsFifoAsync):
 
     :see: :class:`hwtLib.handshaked.fifo.HsFifoAsync`
 
+    If OUT_DATA_WIDTH is specified the fifo also resizes the stream (same as :class:`~.AxiS_resizer`),
+    the memory of the fifo is organised as words of the wider interface, each word is composed
+    of the items of the narrower interface (data, strb, keep, last, id, dest, user).
+
+    * upsize: the last word of the frame is padded with empty items (strb=0),
+      the padding takes 1 clock cycle of the input clock per item
+    * downsize: the empty items (strb=0) at the end of the frame are skipped,
+      the skipping takes 1 clock cycle of the output clock per item
+
+    :attention: same as for :class:`~.AxiS_resizer` the frame has to start at the begin of the word,
+        strb can be not fully set only in the last word and id, dest and user of the output word
+        are taken from the first input item in upsize mode
+
     .. hwt-autodoc:: _example_AxiSFifoAsync
     """
 
+    def _declr(self):
+        HsFifoAsync._declr(self)
+        if self.OUT_DATA_WIDTH is not None:
+            assert self.USE_STRB, "Strb is required to mark the padding in resized frames"
+
+    def _get_item_fields(self) -> List[Tuple[str, int, bool]]:
+        """
+        :return: list of tuples (name, width, is data width dependent) of the item
+            stored in a single memory bank (the item of the narrower interface),
+            the first field is in the lowest bits
+        """
+        DW = min(self.DATA_WIDTH, self.OUT_DATA_WIDTH)
+        fields = [("data", DW, True)]
+        if self.USE_STRB:
+            fields.append(("strb", DW // 8, True))
+        if self.USE_KEEP:
+            fields.append(("keep", DW // 8, True))
+        fields.append(("last", 1, False))
+        for name, w in [("id", self.ID_WIDTH),
+                        ("dest", self.DEST_WIDTH),
+                        ("user", self.USER_WIDTH)]:
+            if w:
+                fields.append((name, w, False))
+        return fields
+
+    def _declr_fifo_data_width(self, f: FifoAsync):
+        if self.OUT_DATA_WIDTH is None:
+            return HsFifoAsync._declr_fifo_data_width(self, f)
+
+        ITEM_W = sum(w for _, w, _ in self._get_item_fields())
+        if self.DATA_WIDTH < self.OUT_DATA_WIDTH:
+            f.DATA_WIDTH = ITEM_W
+            f.OUT_DATA_WIDTH = ITEM_W * (self.OUT_DATA_WIDTH // self.DATA_WIDTH)
+        else:
+            f.DATA_WIDTH = ITEM_W * (self.DATA_WIDTH // self.OUT_DATA_WIDTH)
+            f.OUT_DATA_WIDTH = ITEM_W
+
+    def _item_field_slices(self, item: RtlSignal) -> List[Tuple[str, RtlSignal, bool]]:
+        """
+        :return: list of tuples (name, signal, is data width dependent) for the fields of the item
+        """
+        res = []
+        offset = 0
+        for name, w, dw_dependent in self._get_item_fields():
+            res.append((name, item[offset + w:offset], dw_dependent))
+            offset += w
+        return res
+
+    def _items_of_word(self, word: RtlSignal, ITEMS: int) -> List[RtlSignal]:
+        ITEM_W = word._dtype.bit_length() // ITEMS
+        return [word[(i + 1) * ITEM_W:i * ITEM_W] for i in range(ITEMS)]
+
+    def _connect_fifo_in(self):
+        if self.OUT_DATA_WIDTH is None:
+            return HsFifoAsync._connect_fifo_in(self)
+
+        din = self.dataIn
+        fIn = self.fifo.dataIn
+        wr_en = ~fIn.wait
+        if self.DATA_WIDTH < self.OUT_DATA_WIDTH:
+            # upsize, every input item is stored in separate bank,
+            # the last word of the frame is padded with empty items
+            ITEMS = self.OUT_DATA_WIDTH // self.DATA_WIDTH
+            clk = {"clk": self.dataIn_clk, "rst": self.dataIn_rst_n}
+            in_sub = self._reg("in_sub", Bits(log2ceil(ITEMS)), def_val=0, **clk)
+            in_sub_last = in_sub._eq(ITEMS - 1)
+            padding = self._reg("padding", def_val=0, **clk)
+            w_en = self._sig("w_en")
+            w_en(fIn.en & wr_en)
+
+            din.ready(~padding & wr_en)
+            fIn.en(padding | din.valid)
+            If(padding,
+               fIn.data(0),
+            ).Else(
+               fIn.data(Concat(*reversed([getattr(din, name) for name, _, _ in self._get_item_fields()])))
+            )
+            If(w_en,
+               If(in_sub_last,
+                  in_sub(0),
+                  padding(0),
+               ).Else(
+                  in_sub(in_sub + 1),
+                  If(~padding & din.last,
+                     padding(1)
+                  )
+               )
+            )
+        else:
+            # downsize, the input word is split to items of output,
+            # last is set only for the last non empty item
+            ITEMS = self.DATA_WIDTH // self.OUT_DATA_WIDTH
+            STRB_W = self.OUT_DATA_WIDTH // 8
+            din.ready(wr_en)
+            fIn.en(din.valid & wr_en)
+            item_strb = [din.strb[(i + 1) * STRB_W:i * STRB_W] for i in range(ITEMS)]
+            item_not_empty = [s != 0 for s in item_strb]
+            items = []
+            for i in range(ITEMS):
+                item = []
+                for name, w, dw_dependent in self._get_item_fields():
+                    if dw_dependent:
+                        s = getattr(din, name)
+                        item.append(s[(i + 1) * w:i * w])
+                    elif name == "last":
+                        if i == ITEMS - 1:
+                            last = din.last & item_not_empty[i]
+                        else:
+                            last = din.last & item_not_empty[i] & ~Or(*item_not_empty[i + 1:])
+                        if i == 0:
+                            # frame with empty last word
+                            last = last | (din.last & ~Or(*item_not_empty))
+                        item.append(last)
+                    else:
+                        item.append(getattr(din, name))
+                items.append(Concat(*reversed(item)))
+            fIn.data(Concat(*reversed(items)))
+
+    def _connect_fifo_out(self, out_clk, out_rst):
+        if self.OUT_DATA_WIDTH is None:
+            return HsFifoAsync._connect_fifo_out(self, out_clk, out_rst)
+
+        fOut = self.fifo.dataOut
+        dout = self.dataOut
+        out_vld = self._reg("out_vld", def_val=0, clk=out_clk, rst=out_rst)
+        if self.DATA_WIDTH < self.OUT_DATA_WIDTH:
+            # upsize, the output word is composed of the items from all banks
+            ITEMS = self.OUT_DATA_WIDTH // self.DATA_WIDTH
+            items = [self._item_field_slices(item) for item in self._items_of_word(fOut.data, ITEMS)]
+            for f_i, (name, s, dw_dependent) in enumerate(items[0]):
+                if dw_dependent:
+                    v = Concat(*reversed([item[f_i][1] for item in items]))
+                elif name == "last":
+                    v = Or(*(item[f_i][1] for item in items))
+                else:
+                    v = s
+                getattr(dout, name)(v)
+            out_load = dout.ready | ~out_vld
+            dout.valid(out_vld)
+        else:
+            # downsize, the empty items at the end of frame are dropped
+            strb = None
+            last = None
+            for name, s, _ in self._item_field_slices(fOut.data):
+                getattr(dout, name)(s)
+                if name == "strb":
+                    strb = s
+                elif name == "last":
+                    last = s
+            out_empty = self._sig("out_empty")
+            out_empty(out_vld & strb._eq(0) & ~last)
+            out_load = dout.ready | out_empty | ~out_vld
+            dout.valid(out_vld & ~out_empty)
+
+        fOut.en(out_load & ~fOut.wait)
+        If(out_load,
+           out_vld(~fOut.wait)
+        )
+        return out_vld
+
 
 def _example_AxiSFifoAsync():
 
@@ -24,6 +204,15 @@ def _example_AxiSFifoAsync():
     return u
 
 
+def _example_AxiSFifoAsync_upsize():
+    u = AxiSFifoAsync()
+    u.USE_STRB = True
+    u.DEPTH = 5
+    u.DATA_WIDTH = 8
+    u.OUT_DATA_WIDTH = 32
+    return u
+
+
 if __name__ == "__main__":
     from hwt.synthesizer.utils import to_rtl_str
     u = _example_AxiSFifoAsync()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from random import Random
+import unittest
+
+from hwt.hdl.constants import Time
+from hwt.simulator.simTestCase import SingleUnitSimTestCase
+from hwtLib.amba.axis import axis_send_bytes, axis_recieve_bytes
+from hwtLib.amba.axis_comp.fifo_async import AxiSFifoAsync
+
+
+class AxiSFifoAsync_upsizeTC(SingleUnitSimTestCase):
+    """
+    Fast narrow stream to slow wide stream
+    """
+    IN_CLK = 10 * Time.ns
+    OUT_CLK = 40 * Time.ns
+    IN_W = 16
+    OUT_W = 64
+
+    @classmethod
+    def getUnit(cls):
+        u = cls.u = AxiSFifoAsync()
+        u.USE_STRB = True
+        u.DATA_WIDTH = cls.IN_W
+        u.OUT_DATA_WIDTH = cls.OUT_W
+        u.DEPTH = 5
+        return u
+
+    def setUp(self):
+        SingleUnitSimTestCase.setUp(self)
+        u = self.u
+        u.dataIn_clk._ag.period = self.IN_CLK
+        u.dataOut_clk._ag.period = self.OUT_CLK
+        RST_DELAY = int(max(self.IN_CLK, self.OUT_CLK) * 1.6)
+        u.dataIn_rst_n._ag.initDelay = \
+            u.dataOut_rst_n._ag.initDelay = RST_DELAY
+
+    def test_nop(self):
+        u = self.u
+        self.runSim(20 * self.OUT_CLK)
+        self.assertEmpty(u.dataOut._ag.data)
+
+    def test_frames(self, N=10, randomized=False):
+        u = self.u
+        rand = Random(0)
+        # strb can be not fully set only in the last word, the items of the narrow interface are always full
+        ITEM_B = min(self.IN_W, self.OUT_W) // 8
+        WORD_B = max(self.IN_W, self.OUT_W) // 8
+        frames = []
+        for i in range(N):
+            # frame lengths which are not aligned to the wider word
+            size = rand.randint(1, 3 * WORD_B // ITEM_B) * ITEM_B
+            frame = [rand.getrandbits(8) for _ in range(size)]
+            frames.append(frame)
+            axis_send_bytes(u.dataIn, frame)
+
+        input_words = len(u.dataIn._ag.data)
+        t = (input_words * max(self.OUT_W // self.IN_W, 1) + N * 4) * max(self.IN_CLK, self.OUT_CLK) \
+            + 20 * self.OUT_CLK
+        if randomized:
+            self.randomize(u.dataIn)
+            self.randomize(u.dataOut)
+            t *= 3
+
+        self.runSim(t)
+        for ref in frames:
+            offset, data = axis_recieve_bytes(u.dataOut)
+            self.assertEqual(offset, 0)
+            self.assertValSequenceEqual(data, ref)
+        self.assertEmpty(u.dataOut._ag.data)
+
+    def test_frames_randomized(self):
+        self.test_frames(randomized=True)
+
+
+class AxiSFifoAsync_downsizeTC(AxiSFifoAsync_upsizeTC):
+    """
+    Slow wide stream to fast narrow stream
+    """
+    IN_CLK = 40 * Time.ns
+    OUT_CLK = 10 * Time.ns
+    IN_W = 64
+    OUT_W = 16
+
+
+AxiSFifoAsyncTCs = [
+    AxiSFifoAsync_upsizeTC,
+    AxiSFifoAsync_downsizeTC,
+]
+
+if __name__ == "__main__":
+    suite = unittest.TestSuite()
+    # suite.addTest(AxiSFifoAsync_upsizeTC('test_frames'))
+    for tc in AxiSFifoAsyncTCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
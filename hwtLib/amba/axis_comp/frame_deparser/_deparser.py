@@ -3,7 +3,7 @@
 
 from typing import List, Optional, Union, Tuple
 
-from hwt.code import Switch, If, SwitchLogic, connect
+from hwt.code import Switch, If, SwitchLogic, connect, Concat
 from hwt.hdl.frameTmpl import FrameTmpl
 from hwt.hdl.frameTmplUtils import ChoicesOfFrameParts
 from hwt.hdl.transPart import TransPart
@@ -25,7 +25,9 @@ from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
 from hwtLib.abstract.template_configured import TemplateConfigured, \
     separate_streams, to_primitive_stream_t
 from hwtLib.amba.axis import AxiStream
+from hwtLib.amba.axis_segmented import AxiStreamSegmented
 from hwtLib.amba.axis_comp.base import AxiSCompBase
+from hwtLib.amba.axis_comp.segmented_lanes import AxiS_lanesToSegmented
 from hwtLib.amba.axis_comp.frame_deparser.strb_keep_stash import StrbKeepStash, \
     reduce_conditional_StrbKeepStashes
 from hwtLib.amba.axis_comp.frame_deparser.utils import _get_only_stream, \
@@ -35,6 +37,7 @@ from hwtLib.amba.axis_comp.frame_join import AxiS_FrameJoin
 from hwtLib.amba.axis_comp.frame_parser.field_connector import AxiS_frameParserFieldConnector, \
     get_byte_order_modifier
 from hwtLib.handshaked.builder import HsBuilder
+from hwtLib.handshaked.reg import HandshakedReg
 from hwtLib.handshaked.streamNode import StreamNode, ExclusiveStreamGroups
 from pyMathBitPrecise.bit_utils import mask
 
@@ -53,6 +56,14 @@ class AxiS_frameDeparser(AxiSCompBase, TemplateConfigured):
         (Input data structure can be splited into multiple frames as required)
 
     :note: names in the picture are just illustrative
+    :note: If SEGMENT_CNT > 1 the dataOut is :class:`~.AxiStreamSegmented`,
+        the dataIn is a list of inputs, one for each lane, each lane has own deparser of DATA_WIDTH
+        and the frames from lanes are packed to dataOut (:class:`~.AxiS_lanesToSegmented`,
+        the frame i is taken from lane i % SEGMENT_CNT). This allows to send up to SEGMENT_CNT frames per clock.
+    :note: If PIPELINE_STAGES > 0 the wide multiplexer which selects the output word
+        is split in to PIPELINE_STAGES levels and each level is followed by a register
+        with a ready chain break. The throughput remains 1 word per clock cycle,
+        the latency is increased by PIPELINE_STAGES.
 
     .. aafig::
         +---------+
@@ -91,6 +102,12 @@ class AxiS_frameDeparser(AxiSCompBase, TemplateConfigured):
         self.FRAME_TEMPLATES = Param(None
                                      if self._frames is None
                                      else tuple(self._frames))
+        # if > 1 the output is AxiStreamSegmented and the frames are assembled
+        # in SEGMENT_CNT lanes, each lane has own input
+        self.SEGMENT_CNT = Param(1)
+        # if > 0 the output word is selected by a pipeline of multiplexers and registers
+        # with this number of stages (latency of the component is increased by this number)
+        self.PIPELINE_STAGES = Param(0)
 
     def _mkFieldIntf(self, parent: StructIntf, structField: HStructField):
         """
@@ -116,6 +133,10 @@ class AxiS_frameDeparser(AxiSCompBase, TemplateConfigured):
         """"
         Parse template and decorate with interfaces
         """
+        if self.SEGMENT_CNT > 1:
+            self._declr_segmented()
+            return
+
         t = self._structT
         s_t = _get_only_stream(t)
         if s_t is None:
@@ -143,6 +164,46 @@ class AxiS_frameDeparser(AxiSCompBase, TemplateConfigured):
 
         self.dataIn = intfCls(self._structT, tuple(), self._mkFieldIntf)
 
+    def _declr_segmented(self):
+        """
+        Each lane is assembled by an independent instance of this component
+        and the frames from lanes are packed to :class:`~.AxiStreamSegmented` output
+        """
+        if self.ID_WIDTH or self.DEST_WIDTH or self.USER_WIDTH:
+            raise NotImplementedError()
+
+        addClkRstn(self)
+        with self._paramsShared():
+            self.dataOut = AxiStreamSegmented()._m()
+            self.to_segmented = AxiS_lanesToSegmented()
+
+        t = self._structT
+        if isinstance(t, HStruct):
+            intfCls = StructIntf
+        elif isinstance(t, HUnion):
+            intfCls = UnionSink
+        else:
+            raise TypeError(t)
+        self.dataIn = HObjList(
+            intfCls(t, tuple(), self._mkFieldIntf)
+            for _ in range(self.SEGMENT_CNT)
+        )
+
+        lanes = HObjList()
+        for _ in range(self.SEGMENT_CNT):
+            lane = self.__class__(t, self._tmpl, self._frames)
+            lane._updateParamsFrom(self)
+            lane.SEGMENT_CNT = 1
+            lanes.append(lane)
+        self.lanes = lanes
+
+    def _impl_segmented(self):
+        for din, lane, lane_out in zip(self.dataIn, self.lanes, self.to_segmented.dataIn):
+            lane.dataIn(din)
+            lane_out(lane.dataOut)
+        self.dataOut(self.to_segmented.dataOut)
+        propagateClkRstn(self)
+
     def connectPartsOfWord(self, wordData_out: RtlSignal,
                            tPart: Union[TransPart,
                                         ChoicesOfFrameParts],
@@ -358,6 +419,23 @@ class AxiS_frameDeparser(AxiSCompBase, TemplateConfigured):
         dout = self.dataOut
         maxWordIndex = words[-1][0]
         multipleWords = maxWordIndex > 0
+        PIPELINED = self.PIPELINE_STAGES > 0
+        if PIPELINED:
+            # the word is selected in output mux pipeline, the signals of the stage 0
+            # are used instead of dataOut
+            out_valid = self._sig("st0_valid")
+            out_ready = self._sig("st0_ready")
+            out_last = self._sig("st0_last")
+            out_strb = self._sig("st0_strb", dout.strb._dtype) if self.USE_STRB else None
+            out_keep = self._sig("st0_keep", dout.keep._dtype) if self.USE_KEEP else None
+            # data of the words indexed by inversed index of the word
+            words_data = [None for _ in range(maxWordIndex + 1)]
+        else:
+            out_valid = dout.valid
+            out_ready = dout.ready
+            out_last = dout.last
+            out_strb = dout.strb if self.USE_STRB else None
+            out_keep = dout.keep if self.USE_KEEP else None
         if multipleWords:
             # multiple word frame
             wordCntr_inversed = self._reg("wordCntr_inversed",
@@ -377,7 +455,7 @@ class AxiS_frameDeparser(AxiSCompBase, TemplateConfigured):
             inPorts = []
             # input ports which value should be consumed on this word
             lastInPorts = []
-            if multipleWords:
+            if multipleWords or PIPELINED:
                 wordData = self._sig(f"word{i:d}", dout.data._dtype)
             else:
                 wordData = self.dataOut.data
@@ -395,7 +473,7 @@ class AxiS_frameDeparser(AxiSCompBase, TemplateConfigured):
                 en = wordCntr_inversed._eq(inversedIndx)
             else:
                 en = True
-            en = self.dataOut.ready & en
+            en = out_ready & en
 
             ack = self.handshakeLogicForWord(inPorts, lastInPorts, en)
 
@@ -411,7 +489,7 @@ class AxiS_frameDeparser(AxiSCompBase, TemplateConfigured):
                 else:
                     nextWordIndex = wordCntr_inversed - 1
 
-                _ack = dout.ready & ack & inStreamLast
+                _ack = out_ready & ack & inStreamLast
 
                 a = [If(_ack,
                         wordCntr_inversed(nextWordIndex)
@@ -420,12 +498,16 @@ class AxiS_frameDeparser(AxiSCompBase, TemplateConfigured):
             else:
                 a = []
 
-            a.append(dout.valid(ack))
+            a.append(out_valid(ack))
 
-            # frame with multiple words (using wordCntr_inversed)
-            if multipleWords:
+            if PIPELINED:
+                words_data[inversedIndx] = wordData
+            elif multipleWords:
                 # data out logic
                 a.append(dout.data(wordData))
+
+            # frame with multiple words (using wordCntr_inversed)
+            if multipleWords:
                 wcntrSw.Case(inversedIndx, a)
 
             # is last word in frame
@@ -437,8 +519,9 @@ class AxiS_frameDeparser(AxiSCompBase, TemplateConfigured):
             pass
         elif not isPow2(maxWordIndex + 1):
             default = [wordCntr_inversed(maxWordIndex), ]
-            default.append(dout.valid(0))
-            default.append(dout.data(None))
+            default.append(out_valid(0))
+            if not PIPELINED:
+                default.append(dout.data(None))
 
             wcntrSw.Default(default)
 
@@ -450,25 +533,25 @@ class AxiS_frameDeparser(AxiSCompBase, TemplateConfigured):
                 last_last = wordCntr_inversed._eq(i) & en
                 last = (last_last) | last
 
-            selectRegLoad = last_last & dout.ready & ack
+            selectRegLoad = last_last & out_ready & ack
         else:
             last = endsOfFrames[0][1]
-            selectRegLoad = dout.ready & ack
+            selectRegLoad = out_ready & ack
 
         for r in self._tmpRegsForSelect.values():
             r.rd(selectRegLoad)
-        dout.last(last)
+        out_last(last)
 
         if multipleWords:
             if self.USE_STRB:
-                strb = dout.strb
+                strb = out_strb
                 Switch(wordCntr_inversed).add_cases([
                     (i, strb(v)) for i, v in extra_strbs
                 ]).Default(
                     strb(STRB_ALL)
                 )
             if self.USE_KEEP:
-                keep = dout.keep
+                keep = out_keep
                 Switch(wordCntr_inversed).add_cases([
                     (i, keep(v)) for i, v in extra_keeps
                 ]).Default(
@@ -480,7 +563,7 @@ class AxiS_frameDeparser(AxiSCompBase, TemplateConfigured):
             else:
                 m = STRB_ALL
             if self.USE_STRB:
-                dout.strb(m)
+                out_strb(m)
 
             if extra_keeps:
                 m = extra_keeps[0][1]
@@ -488,7 +571,108 @@ class AxiS_frameDeparser(AxiSCompBase, TemplateConfigured):
                 m = STRB_ALL
 
             if self.USE_KEEP:
-                dout.keep(m)
+                out_keep(m)
+
+        if PIPELINED:
+            meta = [out_last]
+            for m in (out_strb, out_keep):
+                if m is not None:
+                    meta.append(m)
+            self._create_output_mux_pipeline(
+                words_data,
+                wordCntr_inversed if multipleWords else None,
+                out_valid, out_ready, meta)
+
+    def _create_output_mux_pipeline(self, words_data: List[RtlSignal],
+                                    sel: Optional[RtlSignal],
+                                    valid: RtlSignal, ready: RtlSignal,
+                                    meta: List[RtlSignal]):
+        """
+        Select the word of the output frame by a tree of multiplexers with PIPELINE_STAGES levels,
+        the output of each level is stored in :class:`~.HandshakedReg` with a ready chain break
+        (LATENCY=(1, 2)) so the pipeline can pass a single word per clock cycle
+        and the ready of dataOut is not combinationally connected to inputs.
+
+        :param words_data: data signals for each word of the frame indexed by the value of sel
+        :param sel: the index of the actual word (None if there is only a single word)
+        :param valid: valid signal for the word selected by sel
+        :param ready: ready signal for the word selected by sel (driven by this function)
+        :param meta: [last, strb, keep] signals of the actual word which are only passed trough the pipeline
+        """
+        dout = self.dataOut
+        STAGES = self.PIPELINE_STAGES
+        SEL_W = 0 if sel is None else sel._dtype.bit_length()
+        # number of bits of the sel resolved in a single level of mux tree
+        SEL_W_PER_STAGE = (SEL_W + STAGES - 1) // STAGES
+        for st in range(STAGES):
+            # level of the mux tree
+            sel_w = SEL_W - st * SEL_W_PER_STAGE
+            if sel_w > 0:
+                used_w = min(SEL_W_PER_STAGE, sel_w)
+                if used_w == sel_w:
+                    _sel = sel
+                else:
+                    _sel = sel[used_w:0]
+                sel_rest = sel[sel_w:used_w] if sel_w > used_w else None
+                ARITY = 2 ** used_w
+                next_words_data = []
+                for g_i in range(0, len(words_data), ARITY):
+                    group = words_data[g_i:g_i + ARITY]
+                    if len(group) == 1:
+                        o = group[0]
+                    else:
+                        o = self._sig(f"st{st:d}_mux{g_i // ARITY:d}", group[0]._dtype)
+                        sw = Switch(_sel).add_cases(
+                            (i, o(d)) for i, d in enumerate(group)
+                        )
+                        if len(group) < ARITY:
+                            sw.Default(o(None))
+                    next_words_data.append(o)
+                words_data = next_words_data
+            else:
+                sel_rest = None
+
+            # register with a ready chain break
+            parts = [*words_data, *meta]
+            if sel_rest is not None:
+                parts.append(sel_rest)
+            r = HandshakedReg(Handshaked)
+            r.DATA_WIDTH = sum(p._dtype.bit_length() for p in parts)
+            r.LATENCY = (1, 2)
+            setattr(self, f"out_mux_st{st:d}_reg", r)
+            r.clk(self.clk)
+            r.rst_n(self.rst_n)
+            r.dataIn.data(Concat(*reversed(parts)))
+            r.dataIn.vld(valid)
+            ready(r.dataIn.rd)
+
+            # unpack the register data
+            offset = 0
+            parts_out = []
+            for p in parts:
+                w = p._dtype.bit_length()
+                if w == 1 and not p._dtype.force_vector:
+                    parts_out.append(r.dataOut.data[offset])
+                else:
+                    parts_out.append(r.dataOut.data[offset + w:offset])
+                offset += w
+            words_data = parts_out[:len(words_data)]
+            meta = parts_out[len(words_data):len(words_data) + len(meta)]
+            if sel_rest is not None:
+                sel = parts_out[-1]
+            valid = r.dataOut.vld
+            ready = r.dataOut.rd
+
+        assert len(words_data) == 1, words_data
+        dout.data(words_data[0])
+        dout.last(meta[0])
+        meta = meta[1:]
+        if self.USE_STRB:
+            dout.strb(meta.pop(0))
+        if self.USE_KEEP:
+            dout.keep(meta.pop(0))
+        dout.valid(valid)
+        ready(dout.ready)
 
     def _impl(self):
         """
@@ -497,7 +681,9 @@ class AxiS_frameDeparser(AxiSCompBase, TemplateConfigured):
         and other features which makes code below complex.
         Frame specifier can also describe multiple frames.
         """
-        if len(self.sub_t) > 1:
+        if self.SEGMENT_CNT > 1:
+            self._impl_segmented()
+        elif len(self.sub_t) > 1:
             self.delegate_to_children()
         else:
             s_t = _get_only_stream(self._structT)
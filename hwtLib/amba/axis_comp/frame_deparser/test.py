@@ -10,6 +10,7 @@ from hwt.hdl.transTmpl import TransTmpl
 from hwt.pyUtils.arrayQuery import iter_with_last
 from hwt.simulator.simTestCase import SimTestCase
 from hwtLib.amba.axis import axis_send_bytes, axis_recieve_bytes
+from hwtLib.amba.axis_segmented import axis_segmented_recieve_bytes
 from hwtLib.amba.axis_comp.frame_deparser import AxiS_frameDeparser
 from pyMathBitPrecise.bit_utils import mask
 from hwtSimApi.triggers import Timer
@@ -22,6 +23,8 @@ from hwtLib.amba.axis_comp.frame_deparser.test_types import s1field,\
 
 
 class AxiS_frameDeparser_TC(SimTestCase):
+    PIPELINE_STAGES = 0
+
     def instantiate(self, structT,
                     DATA_WIDTH=64,
                     maxFrameLen=inf,
@@ -51,6 +54,7 @@ class AxiS_frameDeparser_TC(SimTestCase):
         u.DATA_WIDTH = self.DATA_WIDTH = DATA_WIDTH
         u.USE_STRB = use_strb
         u.USE_KEEP = use_keep
+        u.PIPELINE_STAGES = self.PIPELINE_STAGES
         self.m = mask(self.DATA_WIDTH // 8)
 
         self.compileSimAndStart(self.u)
@@ -142,6 +146,22 @@ class AxiS_frameDeparser_TC(SimTestCase):
                                      (MAGIC + 2, m, 1),
                                      ])
 
+    def test_3Fields_throughput(self, N=5):
+        """
+        The frames should be send without any gaps between the words
+        """
+        self.instantiate(s3field, randomized=False)
+        u = self.u
+        ref = []
+        for i in range(N):
+            for f_i, f in enumerate([u.dataIn.item0, u.dataIn.item1, u.dataIn.item2]):
+                d = i * 3 + f_i
+                f._ag.data.append(d)
+                ref.append((d, self.m, int(f_i == 2)))
+
+        self.runSim((len(ref) + 2) * CLK_PERIOD)
+        self.assertValSequenceEqual(u.dataOut._ag.data, ref)
+
     def test_r_nop1Field(self):
         self.test_nop1Field(randomized=True)
 
@@ -157,6 +177,7 @@ class AxiS_frameDeparser_TC(SimTestCase):
     def test_3Fields_outOccupiedAtStart(self):
         u = self.u = AxiS_frameDeparser(s3field)
         u.USE_STRB = u.USE_KEEP = True
+        u.PIPELINE_STAGES = self.PIPELINE_STAGES
         u.DATA_WIDTH = self.DATA_WIDTH = 64
         m = mask(self.DATA_WIDTH // 8)
 
@@ -188,6 +209,7 @@ class AxiS_frameDeparser_TC(SimTestCase):
         self.DATA_WIDTH = 64
         u.USE_STRB = u.USE_KEEP = True
         u.DATA_WIDTH = self.DATA_WIDTH
+        u.PIPELINE_STAGES = self.PIPELINE_STAGES
         m = mask(self.DATA_WIDTH // 8)
         self.compileSimAndStart(self.u)
 
@@ -229,6 +251,7 @@ class AxiS_frameDeparser_TC(SimTestCase):
         u = self.u = AxiS_frameDeparser(structT,
                                      tmpl, frames)
         u.DATA_WIDTH = self.DATA_WIDTH
+        u.PIPELINE_STAGES = self.PIPELINE_STAGES
         m = mask(self.DATA_WIDTH // 8)
         self.compileSimAndStart(self.u)
 
@@ -539,10 +562,66 @@ class AxiS_frameDeparser_TC(SimTestCase):
     def test_unionDifferentMask_randomized(self, N=10):
         self.test_unionDifferentMask(N, randomized=True)
 
+    def test_segmented_3Fields(self, randomized=False):
+        u = self.u = AxiS_frameDeparser(s3field)
+        u.USE_STRB = False
+        u.USE_KEEP = True
+        u.PIPELINE_STAGES = self.PIPELINE_STAGES
+        SEGMENT_CNT = u.SEGMENT_CNT = 2
+        u.DATA_WIDTH = 64 * SEGMENT_CNT
+        self.compileSimAndStart(u)
+        if randomized:
+            self.randomize(u.dataOut)
+            for din in u.dataIn:
+                for intf in din._fieldsToInterfaces.values():
+                    self.randomize(intf)
+
+        # the frame i is taken from the lane i % SEGMENT_CNT
+        N = 3
+        frames = []
+        for i in range(N):
+            for lane_i, din in enumerate(u.dataIn):
+                f = [lane_i * 100 + i * 3 + f_i for f_i in range(3)]
+                din.item0._ag.data.append(f[0])
+                din.item1._ag.data.append(f[1])
+                din.item2._ag.data.append(f[2])
+                frames.append(f)
+
+        t = 3 * N + 10
+        if randomized:
+            t *= 6
+        self.runSim(t * CLK_PERIOD)
+
+        # each field is 8B and the segment is 8B wide, 2 frames per 3 beats
+        ref = [list(chain(*(int.to_bytes(v, 8, "little") for v in f)))
+               for f in frames]
+        if not randomized:
+            self.assertEqual(len(u.dataOut._ag.data), (3 * len(frames)) // SEGMENT_CNT)
+        self.assertSequenceEqual(axis_segmented_recieve_bytes(u.dataOut), ref)
+
+    def test_r_segmented_3Fields(self):
+        self.test_segmented_3Fields(randomized=True)
+
+
+class AxiS_frameDeparser_pipelined_TC(AxiS_frameDeparser_TC):
+    PIPELINE_STAGES = 2
+
+    def runSim(self, until: float, name=None):
+        # the output pipeline increases the latency
+        return super(AxiS_frameDeparser_pipelined_TC, self).runSim(
+            until + self.PIPELINE_STAGES * CLK_PERIOD, name=name)
+
+
+AxiS_frameDeparser_TCs = [
+    AxiS_frameDeparser_TC,
+    AxiS_frameDeparser_pipelined_TC,
+]
+
 
 if __name__ == "__main__":
     suite = unittest.TestSuite()
     # suite.addTest(AxiS_frameDeparser_TC('test_unionDifferentMask'))
-    suite.addTest(unittest.makeSuite(AxiS_frameDeparser_TC))
+    for tc in AxiS_frameDeparser_TCs:
+        suite.addTest(unittest.makeSuite(tc))
     runner = unittest.TextTestRunner(verbosity=3)
     runner.run(suite)
@@ -18,7 +18,11 @@ from hwtLib.abstract.frame_utils.alignment_utils import FrameAlignmentUtils
 from hwtLib.abstract.frame_utils.join.fsm import input_B_dst_to_fsm
 from hwtLib.abstract.frame_utils.join.state_trans_item import StateTransItem
 from hwtLib.amba.axis import AxiStream
+from hwtLib.amba.axis_segmented import AxiStreamSegmented
 from hwtLib.amba.axis_comp.frame_join.input_reg import FrameJoinInputReg
+from hwtLib.amba.axis_comp.reg import AxiSReg
+from hwtLib.amba.axis_comp.segmented_lanes import AxiS_segmentedToLanes, \
+    AxiS_lanesToSegmented
 from pyMathBitPrecise.bit_utils import bit_list_to_int
 
 
@@ -28,12 +32,27 @@ class AxiS_FrameJoin(Unit):
     to remove invalid bytes from body of the final packet.
     Can be also used to translate alignment of data.
 
-    :note: delay=0
+    :note: delay=0 (if the tree mode is not used)
+    :note: id/dest/user is supported only for a single input
+        (e.g. when used to change the alignment of the frame)
+    :note: If SEGMENT_CNT > 1 the interfaces are of :class:`~.AxiStreamSegmented` type,
+        the frames are distributed to SEGMENT_CNT lanes (:class:`~.AxiS_segmentedToLanes`,
+        the i-th frame of each input to the lane i % SEGMENT_CNT), each lane has own join
+        of DATA_WIDTH and the results are packed back (:class:`~.AxiS_lanesToSegmented`).
+        The frames on the segmented bus always start at the begin of the segment,
+        which means that the start_offsets of the inputs and OUT_OFFSET have to be 0.
     :note: This component generates different frame joining logic
         for each specific case of data alignment, cunk size, frame lens, etc.
         which can happen based on configuration. This means that the implementation
         can be just straight wire or very complicated pipelined shift logic.
 
+    :note: The number of frame formats which has to be resolved grows exponentially
+        with the number of inputs. If the estimated number of formats is larger than
+        MAX_FLAT_FRAME_FORMATS (or USE_TREE=True) the inputs are joined
+        by a balanced tree of smaller joins (the halves of inputs are joined separately
+        and then the results are joined together) with :class:`~.AxiSReg` between the levels
+        of the tree. (USE_TREE=None means automatic selection, delay>0 in tree mode)
+
     :note: The figure is ilustrative
 
     .. aafig::
@@ -57,15 +76,35 @@ class AxiS_FrameJoin(Unit):
         self.DATA_WIDTH = 16
         self.USE_KEEP = True
         self.OUT_OFFSET = Param(0)
+        self.SEGMENT_CNT = Param(1)
+        self.USE_TREE = Param(None)
+        self.MAX_FLAT_FRAME_FORMATS = Param(1024)
 
     def _declr(self):
         assert self.USE_KEEP
         t = self.T
         assert isinstance(t, HStruct)
+        if self.SEGMENT_CNT > 1:
+            self._declr_segmented()
+            return
+
         word_bytes = self.word_bytes = self.DATA_WIDTH // 8
         input_cnt = self.input_cnt = len(t.fields)
+        if input_cnt > 1 and (self.ID_WIDTH or self.DEST_WIDTH or self.USER_WIDTH):
+            raise NotImplementedError(
+                "It is not clear how id/dest/user should be managed between the joined frames")
         streams = [f.dtype for f in t.fields]
         fju = FrameAlignmentUtils(word_bytes, self.OUT_OFFSET)
+        use_tree = self.USE_TREE
+        if use_tree is None:
+            use_tree = input_cnt > 2 and\
+                fju.estimate_frame_format_cnt(streams, self.OUT_OFFSET) > self.MAX_FLAT_FRAME_FORMATS
+        # 2 inputs can not be split
+        self.use_tree = use_tree and input_cnt > 2
+        if self.use_tree:
+            self._declr_tree()
+            return
+
         input_B_dst = fju.resolve_input_bytes_destinations(
             streams)
         self.state_trans_table = input_B_dst_to_fsm(
@@ -75,6 +114,124 @@ class AxiS_FrameJoin(Unit):
             self.dataOut = AxiStream()._m()
             self.dataIn = HObjList(AxiStream() for _ in range(self.input_cnt))
 
+    @staticmethod
+    def _joined_stream_t(streams: List[HStream], out_offset: int):
+        """
+        :return: type of the output stream of the join of specified streams
+        """
+        len_min = 0
+        len_max = 0
+        for t in streams:
+            B = t.element_t.bit_length() // 8
+            len_min += t.len_min * B
+            len_max += t.len_max * B
+        return HStream(Bits(8), frame_len=(len_min, len_max),
+                       start_offsets=[out_offset])
+
+    def _declr_tree(self):
+        """
+        Split the inputs in to halves, each half with more than one input is joined
+        by a child join and the results are joined by the root join
+        """
+        addClkRstn(self)
+        with self._paramsShared():
+            self.dataOut = AxiStream()._m()
+            self.dataIn = HObjList(AxiStream() for _ in range(self.input_cnt))
+
+        fields = self.T.fields
+        half = (len(fields) + 1) // 2
+        parts = HObjList()
+        part_regs = HObjList()
+        root_fields = []
+        for part_i, part_fields in enumerate((fields[:half], fields[half:])):
+            if len(part_fields) == 1:
+                root_fields.append((part_fields[0].dtype, f"part{part_i:d}"))
+                continue
+
+            p = self.__class__()
+            p._updateParamsFrom(self)
+            p.T = HStruct(*((f.dtype, f.name) for f in part_fields))
+            p.OUT_OFFSET = 0
+            parts.append(p)
+
+            r = AxiSReg()
+            r._updateParamsFrom(self)
+            part_regs.append(r)
+
+            root_fields.append((
+                self._joined_stream_t([f.dtype for f in part_fields], p.OUT_OFFSET),
+                f"part{part_i:d}"))
+
+        self.parts = parts
+        self.part_regs = part_regs
+
+        root = self.root = self.__class__()
+        root._updateParamsFrom(self)
+        root.T = HStruct(*root_fields)
+        root.USE_TREE = False
+
+    def _impl_tree(self):
+        fields = self.T.fields
+        half = (len(fields) + 1) // 2
+        parts = iter(self.parts)
+        part_regs = iter(self.part_regs)
+        for root_in, (in_offset, in_end) in zip(
+                self.root.dataIn,
+                ((0, half), (half, len(fields)))):
+            if in_end - in_offset == 1:
+                root_in(self.dataIn[in_offset])
+            else:
+                p = next(parts)
+                r = next(part_regs)
+                for p_in, din in zip(p.dataIn, self.dataIn[in_offset:in_end]):
+                    p_in(din)
+                r.dataIn(p.dataOut)
+                root_in(r.dataOut)
+
+        self.dataOut(self.root.dataOut)
+        propagateClkRstn(self)
+
+    def _declr_segmented(self):
+        """
+        The frames of each input are distributed to lanes, each lane is joined
+        by an independent instance of this component
+        and the lanes are packed back to :class:`~.AxiStreamSegmented` output
+        """
+        if self.OUT_OFFSET != 0:
+            raise NotImplementedError(
+                "The frame on segmented bus starts at the begin of the segment", self.OUT_OFFSET)
+        for f in self.T.fields:
+            if tuple(f.dtype.start_offsets) != (0,):
+                raise NotImplementedError(
+                    "The frame on segmented bus starts at the begin of the segment",
+                    f.name, f.dtype.start_offsets)
+
+        addClkRstn(self)
+        with self._paramsShared():
+            self.dataOut = AxiStreamSegmented()._m()
+            self.dataIn = HObjList(AxiStreamSegmented() for _ in self.T.fields)
+            self.to_lanes = HObjList(AxiS_segmentedToLanes() for _ in self.T.fields)
+            self.to_segmented = AxiS_lanesToSegmented()
+
+        lanes = HObjList()
+        for _ in range(self.SEGMENT_CNT):
+            lane = self.__class__()
+            lane._updateParamsFrom(self)
+            lane.SEGMENT_CNT = 1
+            lanes.append(lane)
+        self.lanes = lanes
+
+    def _impl_segmented(self):
+        for in_i, (din, to_lanes) in enumerate(zip(self.dataIn, self.to_lanes)):
+            to_lanes.dataIn(din)
+            for lane, lane_in in zip(self.lanes, to_lanes.dataOut):
+                lane.dataIn[in_i](lane_in)
+
+        for lane, lane_out in zip(self.lanes, self.to_segmented.dataIn):
+            lane_out(lane.dataOut)
+        self.dataOut(self.to_segmented.dataOut)
+        propagateClkRstn(self)
+
     def generate_input_register(self, input_i, reg_cnt):
         in_reg = FrameJoinInputReg()
         in_reg._updateParamsFrom(self)
@@ -289,6 +446,13 @@ class AxiS_FrameJoin(Unit):
                 )
 
     def _impl(self):
+        if self.SEGMENT_CNT > 1:
+            self._impl_segmented()
+            return
+        elif self.use_tree:
+            self._impl_tree()
+            return
+
         regs = []
         keep_masks = []
         ready = []
@@ -304,6 +468,10 @@ class AxiS_FrameJoin(Unit):
 
         out_sel, out_mux_values = self.generate_output_byte_mux(regs)
         self.generate_fsm(regs, out_sel, out_mux_values, keep_masks, ready)
+        # (only a single input) the output word always starts in the first input register
+        for name in ("id", "dest", "user"):
+            if getattr(self, f"{name.upper():s}_WIDTH"):
+                getattr(self.dataOut, name)(getattr(regs[0][0], name))
         propagateClkRstn(self)
 
 
@@ -28,6 +28,10 @@ class UnalignedJoinRegIntf(Interface):
         self.keep = VectSignal(self.DATA_WIDTH // 8)
         if self.USE_STRB:
             self.strb = VectSignal(self.DATA_WIDTH // 8)
+        for name in ("id", "dest", "user"):
+            w = getattr(self, f"{name.upper():s}_WIDTH")
+            if w:
+                setattr(self, name, VectSignal(w))
         self.relict = Signal()
         self.last = Signal()
 
@@ -60,9 +64,6 @@ class FrameJoinInputReg(Unit):
 
         # used to shift whole register pipeline using input keep_mask
         self.ready = Signal()
-        if self.ID_WIDTH or self.USER_WIDTH or self.DEST_WIDTH:
-            raise NotImplementedError("It is not clear how id/user/dest"
-                                      " should be managed between the frames")
 
     def _impl(self):
         mask_t = Bits(self.DATA_WIDTH // 8, force_vector=True)
@@ -75,6 +76,13 @@ class FrameJoinInputReg(Unit):
         if self.USE_STRB:
             data_fieds.append((mask_t, "strb"),
 )
+        # id/dest/user are just moved together with the data
+        side_channels = []
+        for name in ("id", "dest", "user"):
+            w = getattr(self, f"{name.upper():s}_WIDTH")
+            if w:
+                data_fieds.append((Bits(w), name))
+                side_channels.append(name)
         data_t = HStruct(*data_fieds)
         # regs[0] connected to output as first, regs[-1] connected to input
         regs = [
@@ -129,6 +137,8 @@ class FrameJoinInputReg(Unit):
             data_drive = [r.data(r_prev.data), ]
             if self.USE_STRB:
                 data_drive.append(r.strb(r_prev.strb))
+            for name in side_channels:
+                data_drive.append(getattr(r, name)(getattr(r_prev, name)))
 
             is_empty = r.keep._eq(0)
             fully_consumed = fully_consumed_flags[i]
@@ -168,6 +178,8 @@ class FrameJoinInputReg(Unit):
             rout.data(rin.data)
             if self.USE_STRB:
                 rout.strb(rin.strb)
+            for name in side_channels:
+                getattr(rout, name)(getattr(rin, name))
             rout.keep(rin.keep)
             rout.relict(rin.relict)
             rout.last(rin.last)
@@ -8,7 +8,10 @@ from hwt.hdl.types.bits import Bits
 from hwt.hdl.types.stream import HStream
 from hwt.hdl.types.struct import HStruct
 from hwt.simulator.simTestCase import SingleUnitSimTestCase
-from hwtLib.amba.axis import axis_recieve_bytes, axis_send_bytes
+from hwtLib.amba.axis import axis_recieve_bytes, axis_send_bytes, \
+    _axis_send_bytes, _axis_recieve_bytes
+from hwtLib.amba.axis_segmented import axis_segmented_send_bytes, \
+    axis_segmented_recieve_bytes
 from hwtLib.amba.axis_comp.frame_join import AxiS_FrameJoin
 from hwtSimApi.constants import CLK_PERIOD
 
@@ -19,12 +22,14 @@ class AxiS_FrameJoin_1x_2B_TC(SingleUnitSimTestCase):
     T = HStruct(
         (HStream(Bits(8 * D_B), (1, inf), [0]), "frame0"),
     )
+    USE_TREE = None
 
     @classmethod
     def getUnit(cls):
         u = cls.u = AxiS_FrameJoin()
         u.T = cls.T
         u.DATA_WIDTH = cls.D_W = cls.D_B * 8
+        u.USE_TREE = cls.USE_TREE
         return u
 
     def send(self, input_i, data_B, offset):
@@ -60,8 +65,9 @@ class AxiS_FrameJoin_1x_2B_TC(SingleUnitSimTestCase):
             for f_offset, frame in frames:
                 self.send(i, frame, offset=f_offset)
 
+        out_words = sum(len(data) // self.D_B + 1 for _, data in OUT_FRAMES)
         self.runSim(CLK_PERIOD * (
-            len(IN_FRAMES) * len(OUT_FRAMES[0]) * 20 + 100))
+            max(len(IN_FRAMES) * len(OUT_FRAMES[0]), out_words) * 20 + 100))
         for (ref_offset, ref_frame) in OUT_FRAMES:
             offset, frame = axis_recieve_bytes(self.u.dataOut)
 
@@ -143,6 +149,24 @@ class AxiS_FrameJoin_1x_2B_TC(SingleUnitSimTestCase):
 
         self._test_pass_data(IN_FRAMES)
 
+    def test_pass_data_random_len(self, repeat=10):
+        self.randomize_all()
+        # [offset, [data]]
+        IN_FRAMES = [[] for _ in self.u.dataIn]
+        data_cntr = 0
+        for _ in range(repeat):
+            for f, frames in zip(self.T.fields, IN_FRAMES):
+                data_B = f.dtype.element_t.bit_length() // 8
+                lmin = f.dtype.len_min
+                lmax = min(f.dtype.len_max, lmin + 4 * self.D_B)
+                offset = self._rand.choice(f.dtype.start_offsets)
+                size = data_B * self._rand.randint(lmin, lmax)
+                data = self.gen_data(data_cntr, size)
+                frames.append((offset, data))
+                data_cntr += size
+
+        self._test_pass_data(IN_FRAMES)
+
 
 class AxiS_FrameJoin_1x_2B_len1_TC(AxiS_FrameJoin_1x_2B_TC):
     D_B = 2
@@ -292,6 +316,138 @@ class AxiS_FrameJoin_3x_in_1B_on_5B_TC(AxiS_FrameJoin_1x_2B_TC):
     )
 
 
+class AxiS_FrameJoin_3x_in_1B_on_2B_tree_TC(AxiS_FrameJoin_3x_in_1B_on_2B_TC):
+    USE_TREE = True
+
+    def test_use_tree(self):
+        self.assertTrue(self.u.use_tree)
+
+
+class AxiS_FrameJoin_4x_in_1B_on_4B_TC(AxiS_FrameJoin_3x_in_1B_on_2B_tree_TC):
+    """
+    The tree should be selected automatically
+    """
+    D_B = 4
+    USE_TREE = None
+    T = HStruct(
+        *((HStream(Bits(8 * 1), (1, inf), [0]), f"frame{i:d}") for i in range(4))
+    )
+
+
+class AxiS_FrameJoin_8x_in_2B_on_2B_TC(AxiS_FrameJoin_4x_in_1B_on_4B_TC):
+    """
+    Multi level tree
+    """
+    D_B = 2
+    USE_TREE = True
+    T = HStruct(
+        *((HStream(Bits(8 * 2), (1, inf), [0]), f"frame{i:d}") for i in range(8))
+    )
+
+
+class AxiS_FrameJoin_1x_4B_dest_TC(SingleUnitSimTestCase):
+    """
+    A single input with dest signal (realignment of the frames with a different dest)
+    """
+    D_B = 4
+    T = HStruct(
+        (HStream(Bits(8), (1, inf), [0, 1, 2, 3]), "frame0"),
+    )
+
+    @classmethod
+    def getUnit(cls):
+        u = cls.u = AxiS_FrameJoin()
+        u.T = cls.T
+        u.DATA_WIDTH = cls.D_B * 8
+        u.DEST_WIDTH = 4
+        return u
+
+    def test_pass_data(self, N=30):
+        u = self.u
+        din = u.dataIn[0]
+        ref = []
+        for _ in range(N):
+            data = [self._rand.getrandbits(8) for _ in range(self._rand.randint(1, 3 * self.D_B))]
+            offset = self._rand.choice(self.T.fields[0].dtype.start_offsets)
+            dest = self._rand.getrandbits(u.DEST_WIDTH)
+            for w in _axis_send_bytes(din, data, True, offset):
+                din._ag.data.append((dest, *w))
+            ref.append((u.OUT_OFFSET, dest, data))
+
+        self.randomize(din)
+        self.randomize(u.dataOut)
+        self.runSim(CLK_PERIOD * (len(din._ag.data) * 8 + 40))
+        for ref_frame in ref:
+            offset, dest, data = _axis_recieve_bytes(u.dataOut._ag.data, self.D_B, True, True)
+            self.assertEqual((offset, int(dest), data), ref_frame)
+        self.assertEmpty(u.dataOut._ag.data)
+
+
+class AxiS_FrameJoin_segmented_2x2B_TC(SingleUnitSimTestCase):
+    """
+    2 segments of 2B, a single input
+    """
+    SEG_B = 2
+    SEGMENT_CNT = 2
+    T = HStruct(
+        (HStream(Bits(8), (1, inf), [0]), "frame0"),
+    )
+
+    @classmethod
+    def getUnit(cls):
+        u = cls.u = AxiS_FrameJoin()
+        u.T = cls.T
+        u.DATA_WIDTH = cls.SEG_B * 8 * cls.SEGMENT_CNT
+        u.SEGMENT_CNT = cls.SEGMENT_CNT
+        return u
+
+    def test_nop(self):
+        self.runSim(CLK_PERIOD * 20)
+        self.assertEmpty(self.u.dataOut._ag.data)
+
+    def test_pass_data(self, N=20, randomized=False):
+        u = self.u
+        max_len = 3 * self.SEG_B * self.SEGMENT_CNT
+        in_frames = []
+        for din in u.dataIn:
+            frames = [[self._rand.getrandbits(8) for _ in range(self._rand.randint(1, max_len))]
+                      for _ in range(N)]
+            in_frames.append(frames)
+            axis_segmented_send_bytes(din, frames, self._rand)
+
+        t = sum(len(din._ag.data) for din in u.dataIn) * 4 + 40
+        if randomized:
+            for din in u.dataIn:
+                self.randomize(din)
+            self.randomize(u.dataOut)
+            t *= 4
+
+        self.runSim(CLK_PERIOD * t)
+        res = axis_segmented_recieve_bytes(u.dataOut)
+        ref = [[B for frames in in_frames for B in frames[f_i]] for f_i in range(N)]
+        self.assertSequenceEqual(res, ref)
+
+    def test_pass_data_randomized(self):
+        self.test_pass_data(randomized=True)
+
+
+class AxiS_FrameJoin_segmented_2x2B_3x_in_TC(AxiS_FrameJoin_segmented_2x2B_TC):
+    """
+    Multiple inputs with frames of different length
+    """
+    T = HStruct(
+        *((HStream(Bits(8), (1, inf), [0]), f"frame{i:d}") for i in range(3))
+    )
+
+
+class AxiS_FrameJoin_segmented_4x1B_2x_in_TC(AxiS_FrameJoin_segmented_2x2B_TC):
+    SEG_B = 1
+    SEGMENT_CNT = 4
+    T = HStruct(
+        *((HStream(Bits(8), (1, inf), [0]), f"frame{i:d}") for i in range(2))
+    )
+
+
 AxiS_FrameJoin_TCs = [
    AxiS_FrameJoin_2x_1B_TC,
    AxiS_FrameJoin_1x_2B_len1_TC,
@@ -313,6 +469,13 @@ AxiS_FrameJoin_TCs = [
    AxiS_FrameJoin_3x_in_2B_TC,
    AxiS_FrameJoin_3x_in_1B_on_2B_TC,
    AxiS_FrameJoin_3x_in_1B_on_5B_TC,
+   AxiS_FrameJoin_3x_in_1B_on_2B_tree_TC,
+   AxiS_FrameJoin_4x_in_1B_on_4B_TC,
+   AxiS_FrameJoin_8x_in_2B_on_2B_TC,
+   AxiS_FrameJoin_1x_4B_dest_TC,
+   AxiS_FrameJoin_segmented_2x2B_TC,
+   AxiS_FrameJoin_segmented_2x2B_3x_in_TC,
+   AxiS_FrameJoin_segmented_4x1B_2x_in_TC,
 ]
 
 if __name__ == "__main__":
@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from typing import Optional, List, Union
+from math import ceil, inf
+from typing import Optional, List, Union, Tuple
 
-from hwt.code import If, connect
-from hwt.code_utils import connect_optional
+from hwt.code import If, connect, Concat, And, Or
+from hwt.code_utils import connect_optional, rename_signal
 from hwt.hdl.frameTmpl import FrameTmpl
 from hwt.hdl.transTmpl import TransTmpl
 from hwt.hdl.typeShortcuts import hBit
@@ -22,17 +23,22 @@ from hwt.math import log2ceil
 from hwt.serializer.mode import serializeParamsUniq
 from hwt.synthesizer.hObjList import HObjList
 from hwt.synthesizer.param import Param
-from hwtLib.abstract.frame_utils.alignment_utils import next_frame_offsets
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwt.synthesizer.typePath import TypePath
+from hwt.synthesizer.vectorUtils import fitTo_t
 from hwtLib.abstract.template_configured import TemplateConfigured, \
-    HdlType_separate
+    HdlType_separate, HStruct_join_separated
 from hwtLib.amba.axis import AxiStream
+from hwtLib.amba.axis_segmented import AxiStreamSegmented
 from hwtLib.amba.axis_comp.base import AxiSCompBase
 from hwtLib.amba.axis_comp.frame_deparser.utils import drill_down_in_HStruct_fields
 from hwtLib.amba.axis_comp.frame_join._join import AxiS_FrameJoin
+from hwtLib.amba.axis_comp.segmented_lanes import AxiS_segmentedToLanes
 from hwtLib.amba.axis_comp.frame_parser.field_connector import AxiS_frameParserFieldConnector
 from hwtLib.amba.axis_comp.frame_parser.footer_split import AxiS_footerSplit
 from hwtLib.amba.axis_comp.frame_parser.word_factory import WordFactory
 from hwtLib.handshaked.streamNode import StreamNode
+from pyMathBitPrecise.bit_utils import mask
 
 
 def is_non_const_stream(t: HdlType):
@@ -45,6 +51,44 @@ def is_non_const_stream(t: HdlType):
     return False
 
 
+def contains_stream(t: HdlType):
+    if isinstance(t, HStream):
+        return True
+    elif isinstance(t, (HStruct, HUnion)):
+        return any(contains_stream(f.dtype) for f in t.fields)
+    else:
+        return False
+
+
+def is_single_non_const_stream(t: HdlType):
+    """
+    :return: True if the type is a variable size HStream
+        (potentially wrapped in HStructs with a single field)
+    """
+    while isinstance(t, HStruct) and len(t.fields) == 1:
+        t = t.fields[0].dtype
+    return is_non_const_stream(t)
+
+
+def single_field_path(t: HdlType) -> TypePath:
+    """
+    :return: path of the field in HStructs with a single field
+    """
+    path = []
+    while isinstance(t, HStruct) and len(t.fields) == 1:
+        f = t.fields[0]
+        path.append(f.name)
+        t = f.dtype
+    return TypePath(*path)
+
+
+def to_field_path(path: Union[str, Tuple[str, ...]]) -> TypePath:
+    if isinstance(path, str):
+        return TypePath(path)
+    else:
+        return TypePath(*path)
+
+
 @serializeParamsUniq
 class AxiS_frameParser(AxiSCompBase, TemplateConfigured):
     """
@@ -69,6 +113,40 @@ class AxiS_frameParser(AxiSCompBase, TemplateConfigured):
                                       +---------+
 
     :note: names in the figure are just illustrative
+    :note: The frame may contain a single variable size segment (HStream)
+        surrounded by const size prefix and suffix (e.g. header, payload, footer).
+        The prefix and suffix are parsed in child parsers and the segments which
+        do not start on word boundary are shifted using :class:`~.AxiS_FrameJoin`.
+    :note: The boundary between multiple variable size segments can not be resolved
+        from the frame itself. If the length of the segment is stored in the const size prefix
+        (e.g. IHL in IPv4 header) it can be specified in STREAM_LENGTHS.
+        The segment ends are then resolved from the prefix fields in runtime
+        and the frame may contain any number of variable size segments (and const size segments
+        between them), the last variable size segment does not need to have the length
+        specified (it ends before const size suffix at the end of the frame).
+        The variable size segment of zero length does not generate any frame on its output.
+
+        .. code-block:: python
+
+            t = HStruct(
+                (Bits(4), "ihl"), (Bits(4), "version"), (uint8_t, None), (uint16_t, "totalLen"),
+                (Bits(16 * 8), "rest_of_header"),
+                (HStream(uint8_t), "options"),
+                (HStream(uint8_t), "payload"),
+            )
+            u = AxiS_frameParser(t)
+            u.STREAM_LENGTHS = (
+                # stream, header fields, fn(*header fields) -> length in bytes
+                ("options", ("ihl", ), lambda ihl: Concat(ihl - 5, Bits(2).from_py(0))),
+            )
+    :note: If SEGMENT_CNT > 1 the dataIn is :class:`~.AxiStreamSegmented`
+        and the frames are distributed to SEGMENT_CNT lanes (:class:`~.AxiS_segmentedToLanes`),
+        each lane has own parser of DATA_WIDTH and the dataOut is a list of outputs, one for each lane
+        (the frame i is parsed by lane i % SEGMENT_CNT). This allows to parse up to SEGMENT_CNT frames per clock.
+    :note: id/dest is passed to stream outputs only.
+        If INTERLEAVED the frames with a different id/dest may be interleaved on the input,
+        each combination of id/dest has own parser and the dataOut is a list of outputs,
+        one for each context (index of the context is Concat(id, dest)).
 
     :ivar ~.dataIn: the AxiStream interface for input frame
     :ivar ~.dataOut: output field interface generated from input type description
@@ -88,7 +166,7 @@ class AxiS_frameParser(AxiSCompBase, TemplateConfigured):
             from structT parseTemplate
         :note: this unit can parse sequence of frames,
             if they are specified by "frames"
-        :attention: structT can not contain fields with variable size
+        :attention: structT can contain only a single field with variable size
             like HStream
         """
         TemplateConfigured.__init__(self, structT, tmpl, frames)
@@ -106,6 +184,15 @@ class AxiS_frameParser(AxiSCompBase, TemplateConfigured):
         self.SHARED_READY = Param(False)
         # if true, a new state for overflow will be created in FSM
         self.OVERFLOW_SUPPORT = Param(False)
+        # if > 1 the input is AxiStreamSegmented and the frames are parsed
+        # in SEGMENT_CNT lanes, each lane has own output
+        self.SEGMENT_CNT = Param(1)
+        # tuple of tuples (stream field path, tuple of prefix field paths,
+        # fn(*prefix field signals) -> length of the stream in bytes)
+        self.STREAM_LENGTHS = Param(())
+        # if True, the frames with a different id/dest may be interleaved
+        # on the input, each id/dest combination has own parser and own output
+        self.INTERLEAVED = Param(False)
 
     def _mkFieldIntf(self, parent: Union[StructIntf, UnionSource],
                      structField: HStructField):
@@ -135,11 +222,6 @@ class AxiS_frameParser(AxiSCompBase, TemplateConfigured):
             return i
 
     def _declr(self):
-        if self.ID_WIDTH:
-            raise NotImplementedError(self.ID_WIDTH)
-        if self.DEST_WIDTH:
-            raise NotImplementedError(self.DEST_WIDTH)
-
         addClkRstn(self)
 
         t = self._structT
@@ -150,6 +232,13 @@ class AxiS_frameParser(AxiSCompBase, TemplateConfigured):
         else:
             raise TypeError(t)
 
+        if self.SEGMENT_CNT > 1:
+            self._declr_segmented(intfCls)
+            return
+        elif self.INTERLEAVED:
+            self._declr_interleaved(intfCls)
+            return
+
         # input stream
         with self._paramsShared():
             self.dataIn = self.intfCls()
@@ -170,6 +259,97 @@ class AxiS_frameParser(AxiSCompBase, TemplateConfigured):
             #        as well
             self.parsing_overflow = Signal()._m()
 
+    def _declr_segmented(self, intfCls):
+        """
+        The frames from :class:`~.AxiStreamSegmented` input are distributed
+        to lanes and each lane is parsed by an independent instance of this component
+        """
+        if self.SHARED_READY or self.OVERFLOW_SUPPORT:
+            raise NotImplementedError()
+        if self.ID_WIDTH or self.DEST_WIDTH or self.USER_WIDTH:
+            raise NotImplementedError()
+
+        with self._paramsShared():
+            self.dataIn = AxiStreamSegmented()
+            self.to_lanes = AxiS_segmentedToLanes()
+
+        t = self._structT
+        if is_only_padding(t):
+            self.dataOut = None
+        else:
+            self.dataOut = HObjList(
+                intfCls(t, tuple(), self._mkFieldIntf)._m()
+                for _ in range(self.SEGMENT_CNT)
+            )
+
+        lanes = HObjList()
+        for _ in range(self.SEGMENT_CNT):
+            lane = self.__class__(t, self._tmpl, self._frames)
+            lane._updateParamsFrom(self)
+            lane.SEGMENT_CNT = 1
+            lanes.append(lane)
+        self.lanes = lanes
+
+    def _impl_segmented(self):
+        self.to_lanes.dataIn(self.dataIn)
+        for lane_in, lane in zip(self.to_lanes.dataOut, self.lanes):
+            lane.dataIn(lane_in)
+        if self.dataOut is not None:
+            for dout, lane in zip(self.dataOut, self.lanes):
+                dout(lane.dataOut)
+        propagateClkRstn(self)
+
+    def _declr_interleaved(self, intfCls):
+        """
+        The frames with a different id/dest are parsed by an independent
+        instance of this component (context), the input is demultiplexed
+        by id/dest
+        """
+        if self.SHARED_READY or self.OVERFLOW_SUPPORT:
+            raise NotImplementedError()
+        CTX_W = self.ID_WIDTH + self.DEST_WIDTH
+        if not CTX_W:
+            raise ValueError("INTERLEAVED requires id/dest to resolve the frame")
+
+        with self._paramsShared():
+            self.dataIn = self.intfCls()
+
+        t = self._structT
+        if is_only_padding(t):
+            self.dataOut = None
+        else:
+            self.dataOut = HObjList(
+                intfCls(t, tuple(), self._mkFieldIntf)._m()
+                for _ in range(2 ** CTX_W)
+            )
+
+        contexts = HObjList()
+        for _ in range(2 ** CTX_W):
+            c = self.__class__(t, self._tmpl, self._frames)
+            c._updateParamsFrom(self)
+            c.INTERLEAVED = False
+            contexts.append(c)
+        self.contexts = contexts
+
+    def _impl_interleaved(self):
+        din = self.dataIn
+        ctx = [s for s in (getattr(din, "id", None), getattr(din, "dest", None))
+               if s is not None]
+        ctx = ctx[0] if len(ctx) == 1 else Concat(*ctx)
+        ready = []
+        for ctx_i, c in enumerate(self.contexts):
+            connect(din, c.dataIn, exclude=[din.valid, din.ready])
+            # :note: id/dest is valid only if valid=1
+            is_ctx = din.valid & ctx._eq(ctx_i)
+            c.dataIn.valid(is_ctx)
+            ready.append(is_ctx & c.dataIn.ready)
+        din.ready(Or(*ready))
+
+        if self.dataOut is not None:
+            for dout, c in zip(self.dataOut, self.contexts):
+                dout(c.dataOut)
+        propagateClkRstn(self)
+
     def parseTemplate(self):
         t = self._structT
         try:
@@ -185,35 +365,100 @@ class AxiS_frameParser(AxiSCompBase, TemplateConfigured):
             if self._tmpl or self._frames:
                 raise NotImplementedError()
 
+            separated = list(HdlType_separate(t, is_non_const_stream))
+            if self.STREAM_LENGTHS:
+                separated = self._parseTemplate_stream_lengths(separated)
+            elif sum(1 for is_non_const_sized, _ in separated
+                     if is_non_const_sized) > 1:
+                raise NotImplementedError(
+                    "Multiple variable size segments in a single frame,"
+                    " the boundary between them can not be resolved"
+                    " (specify the STREAM_LENGTHS)", t)
+            elif len(separated) > 2:
+                # const size prefix, variable size segment and const size suffix,
+                # the prefix is parsed in first child and the rest is parsed
+                # in second child which splits the suffix
+                rest_t = HStruct_join_separated([s_t for _, s_t in separated[1:]])
+                separated = [separated[0], (True, rest_t)]
+
             children = HObjList()
             self.sub_t = sub_t = []
             is_const_sized = self.sub_t_is_const_sized = []
             is_padding = self.sub_t_is_padding = []
-            separated = list(HdlType_separate(t, is_non_const_stream))
-            if len(separated) > 1 or separated[0][0]:
-                # it may be required to delegate this on children
-                first = True
-                for is_non_const_sized, s_t in separated:
-                    _is_padding = is_only_padding(s_t)
-                    if is_non_const_sized or (not first and _is_padding):
-                        c = None
-                    else:
-                        c = self.__class__(s_t)
-                    sub_t.append(s_t)
-                    children.append(c)
-                    first = False
-                    is_padding.append(_is_padding)
-                    is_const_sized.append(not is_non_const_sized)
-
-                if len(is_const_sized) >= 2 and \
-                        is_const_sized[0] and\
-                        not is_const_sized[1]:
-                    # we will parse const-size prefix and
-                    # then there will be a variable size suffix
-                    children[0].OVERFLOW_SUPPORT = True
-
-                with self._paramsShared(exclude=({"OVERFLOW_SUPPORT", "T"}, {})):
-                    self.children = children
+            for is_non_const_sized, s_t in separated:
+                _is_padding = is_only_padding(s_t)
+                if _is_padding or is_single_non_const_stream(s_t):
+                    # connected directly to the output stream
+                    # or ignored entirely
+                    c = None
+                else:
+                    c = self.__class__(s_t)
+                sub_t.append(s_t)
+                children.append(c)
+                is_padding.append(_is_padding)
+                is_const_sized.append(not is_non_const_sized)
+
+            with self._paramsShared(exclude=({"OVERFLOW_SUPPORT", "T",
+                                               "STREAM_LENGTHS", "INTERLEAVED"}, {})):
+                self.children = children
+
+            for c in children:
+                if c is not None and not contains_stream(c._structT):
+                    # only the streams have id/dest
+                    c.ID_WIDTH = 0
+                    c.DEST_WIDTH = 0
+
+    def _parseTemplate_stream_lengths(self, separated: List[Tuple[bool, HdlType]])\
+            -> List[Tuple[bool, HdlType]]:
+        """
+        Resolve the length of each variable size segment from STREAM_LENGTHS
+
+        :return: the separated segments where the last variable size segment
+            without length specified is merged with the const size suffix
+        """
+        lengths = {to_field_path(s_path): (tuple(to_field_path(p) for p in f_paths), fn)
+                   for s_path, f_paths, fn in self.STREAM_LENGTHS}
+        if separated[0][0]:
+            raise NotImplementedError(
+                "STREAM_LENGTHS requires a const size prefix with the length fields", self._structT)
+        prefix_t = separated[0][1]
+
+        seg_lengths = []
+        for i, (is_non_const_sized, s_t) in enumerate(separated):
+            length = None
+            if is_non_const_sized:
+                length = lengths.pop(single_field_path(s_t), None)
+                if length is None:
+                    if any(_is_non_const_sized for _is_non_const_sized, _ in separated[i + 1:]):
+                        raise NotImplementedError(
+                            "Only the last variable size segment may have unspecified length",
+                            s_t)
+                    if len(separated) > i + 1:
+                        # variable size segment and const size suffix parsed in a child
+                        rest_t = HStruct_join_separated([_s_t for _, _s_t in separated[i:]])
+                        separated = separated[:i] + [(True, rest_t)]
+                    seg_lengths.append(None)
+                    break
+                else:
+                    f_paths, fn = length
+                    length = (tuple(self._find_prefix_field(prefix_t, p) for p in f_paths), fn)
+            seg_lengths.append(length)
+
+        if lengths:
+            raise ValueError("STREAM_LENGTHS specified for an unknown stream", lengths.keys())
+
+        self.sub_t_length = seg_lengths
+        return separated
+
+    @staticmethod
+    def _find_prefix_field(prefix_t: HdlType, path: TypePath) -> Tuple[int, int]:
+        """
+        :return: tuple (start bit, end bit) of the field in prefix
+        """
+        for (start, end), tmpl in TransTmpl(prefix_t).walkFlatten():
+            if tmpl.getFieldPath() == path:
+                return (start, end)
+        raise ValueError("The length field has to be in a const size prefix of the frame", path)
 
     def parser_fsm(self, words):
         din = self.dataIn
@@ -267,6 +512,51 @@ class AxiS_frameParser(AxiSCompBase, TemplateConfigured):
                 )
             )
 
+    def _declr_aligner(self, name: str, frame_t: HStream, dst: AxiStream) -> AxiS_FrameJoin:
+        """
+        Instantiate a component which shifts the data of the frame
+        so the frame starts at the beginning of the word
+        """
+        align = AxiS_FrameJoin()
+        align._updateParamsFrom(
+            self,
+            exclude=({"T", "ID_WIDTH", "DEST_WIDTH"}, {}))
+        align.ID_WIDTH = dst.ID_WIDTH
+        align.DEST_WIDTH = dst.DEST_WIDTH
+        align.USE_KEEP = True
+        align.USE_STRB = False
+        align.OUT_OFFSET = 0
+        align.T = HStruct((frame_t, "f0"))
+        setattr(self, name, align)
+        return align
+
+    def _connect_masked(self, src: AxiStream, dst: AxiStream, mask_val: RtlSignal, exclude=()):
+        """
+        Connect the AxiStream interfaces and drive keep/strb of the dst from mask_val
+        (the aligner uses keep while this component may use strb)
+        """
+        _exclude = list(exclude)
+        for i in (src, dst):
+            if i.USE_KEEP:
+                _exclude.append(i.keep)
+            if i.USE_STRB:
+                _exclude.append(i.strb)
+
+        connect(src, dst, exclude=_exclude)
+        if dst.USE_KEEP:
+            dst.keep(mask_val)
+        if dst.USE_STRB:
+            dst.strb(mask_val)
+
+    def _stream_mask(self, i: AxiStream) -> RtlSignal:
+        if i.USE_KEEP:
+            return i.keep
+        elif i.USE_STRB:
+            return i.strb
+        else:
+            raise NotImplementedError(
+                "keep/strb is required to resolve the boundary of unaligned segment")
+
     def delegate_to_children(self):
         if self.SHARED_READY:
             raise NotImplementedError()
@@ -275,7 +565,15 @@ class AxiS_frameParser(AxiSCompBase, TemplateConfigured):
         if self.OVERFLOW_SUPPORT:
             raise NotImplementedError()
         din = self.dataIn
-        if len(self.children) == 2:
+        if len(self.children) == 1:
+            # only a variable size stream
+            if self.sub_t_is_padding[0]:
+                din.ready(1)
+            else:
+                _, dout = drill_down_in_HStruct_fields(self.sub_t[0], self.dataOut)
+                dout(din)
+
+        elif len(self.children) == 2:
             c0, c1 = self.children
             t0, t1 = self.sub_t
             t0_is_padding, t1_is_padding = self.sub_t_is_padding
@@ -286,6 +584,8 @@ class AxiS_frameParser(AxiSCompBase, TemplateConfigured):
                 fs = AxiS_footerSplit()
                 fs._updateParamsFrom(self)
                 fs.FOOTER_WIDTH = t1.bit_length()
+                # the suffix starts at the beginning of the word
+                fs.ALIGN_FOOTER = True
                 self.footer_split = fs
                 fs.dataIn(din)
 
@@ -303,75 +603,240 @@ class AxiS_frameParser(AxiSCompBase, TemplateConfigured):
                     suffix.ready(1)
                 else:
                     # parse suffix in child component
-                    suffix_offsets = next_frame_offsets(prefix_t, self.DATA_WIDTH)
-                    if suffix_offsets != [0, ]:
-                        # add aligment logic
-                        align = AxiS_FrameJoin()
-                        align._updateParamsFrom(
-                            self,
-                            exclude=({"T"}, {}))
-                        align.USE_KEEP = True
-                        align.USE_STRB = False
-                        align.OUT_OFFSET = 0
-                        align.T = HStruct(
-                            (HStream(t1, frame_len=1,
-                                     start_offsets=[x // 8 for x in suffix_offsets]),
-                             "f0"))
-                        self.suffix_align = align
-                        connect(suffix, align.dataIn[0], exclude=[suffix.strb, align.dataIn[0].keep])
-                        align.dataIn[0].keep(suffix.strb)
-                        suffix = align.dataOut
-                        connect(suffix, c1.dataIn, exclude=[suffix.keep,
-                                                            c1.dataIn.strb])
-                        c1.dataIn.strb(suffix.keep)
-                    else:
-                        c1.dataIn(suffix)
+                    c1.dataIn(suffix)
 
                 if not t1_is_padding:
                     connect_optional(c1.dataOut, self.dataOut)
+
             elif t0_const_sized and not t1_const_sized:
-                # prefix parser, parser prefix in subcomponent
-                # and let rest to a suffix
+                # prefix parser, parse prefix in c0 sub component
+                # and pass the rest to c1 sub component or directly to the output stream
+                DW = self.DATA_WIDTH
+                PREFIX_W = t0.bit_length()
+                PREFIX_WORDS = ceil(PREFIX_W / DW)
+                # index of the first word which contains the rest
+                REST_START = PREFIX_W // DW
+                REST_OFFSET = PREFIX_W % DW
+                # index of the word in the input frame, saturated at the end of the prefix
+                word_i = self._reg("word_i", Bits(log2ceil(PREFIX_WORDS + 1)), def_val=0)
+                is_prefix = rename_signal(self, word_i < PREFIX_WORDS, "is_prefix")
+                is_rest = rename_signal(self, word_i >= REST_START, "is_rest")
+
+                slaves = []
+                extraConds = {}
+                skipWhen = {}
                 if not t0_is_padding:
+                    connect(din, c0.dataIn, exclude=[din.valid, din.ready])
                     connect_optional(c0.dataOut, self.dataOut)
-                masters = [din]
-                if t1_is_padding:
-                    slaves = [c0.dataIn, ]
-                    extraConds = {
-                       c0.dataIn: ~c0.parsing_overflow,
-                    }
-                    skipWhen = {
-                       c0.dataIn: ~c0.parsing_overflow,
-                    }
-                else:
-                    suffix_t, suffix = drill_down_in_HStruct_fields(t1, self.dataOut)
-                    assert isinstance(suffix_t, HStream), suffix_t
-                    t1_offset = c0._structT.bit_length() % self.DATA_WIDTH
-                    if t1_offset == 0:
-                        # t1 is aligned on word boundary
-                        # and does not require any first word mask modification
-                        slaves = [c0.dataIn, suffix]
-                        extraConds = {
-                           c0.dataIn: ~c0.parsing_overflow,
-                           suffix: c0.parsing_overflow,
-                        }
-                        skipWhen = {
-                           c0.dataIn: ~c0.parsing_overflow,
-                           suffix: c0.parsing_overflow,
-                        }
+                    slaves.append(c0.dataIn)
+                    extraConds[c0.dataIn] = is_prefix
+                    skipWhen[c0.dataIn] = ~is_prefix
+
+                if not t1_is_padding:
+                    if c1 is None:
+                        rest_t, rest = drill_down_in_HStruct_fields(t1, self.dataOut)
+                        assert isinstance(rest_t, HStream), rest_t
                     else:
-                        raise NotImplementedError("prefix parser- modify mask for suffix")
+                        rest = c1.dataIn
 
-                StreamNode(masters, slaves,
+                    if REST_OFFSET == 0:
+                        # the rest is aligned on word boundary
+                        # and does not require any first word mask modification
+                        connect(din, rest, exclude=[din.valid, din.ready])
+                    else:
+                        # the first word of the rest contains also the end of the prefix
+                        # which has to be masked out and the data has to be shifted
+                        # at the begin of the word
+                        assert REST_OFFSET % 8 == 0, REST_OFFSET
+                        align = self._declr_aligner(
+                            "rest_align",
+                            HStream(Bits(8), frame_len=(1, inf),
+                                    start_offsets=[REST_OFFSET // 8]),
+                            rest)
+                        din_mask = self._stream_mask(din)
+                        is_first_rest_word = word_i._eq(REST_START)
+                        self._connect_masked(
+                            din, align.dataIn[0],
+                            is_first_rest_word._ternary(
+                                din_mask & (mask(DW // 8) & ~mask(REST_OFFSET // 8)),
+                                din_mask),
+                            exclude=[din.valid, din.ready])
+                        self._connect_masked(align.dataOut, rest, align.dataOut.keep)
+                        rest = align.dataIn[0]
+
+                    slaves.append(rest)
+                    extraConds[rest] = is_rest
+                    skipWhen[rest] = ~is_rest
+
+                StreamNode([din], slaves,
                            extraConds=extraConds,
                            skipWhen=skipWhen).sync()
-                connect(din, c0.dataIn, exclude=[din.valid, din.ready])
+                If(din.valid & din.ready,
+                    If(din.last,
+                       word_i(0)
+                    ).Elif(is_prefix,
+                       word_i(word_i + 1)
+                    )
+                )
+                if c1 is not None:
+                    connect_optional(c1.dataOut, self.dataOut)
             else:
                 raise NotImplementedError("multiple con-constant size segments")
         else:
             raise NotImplementedError("multiple con-constant size segments")
         propagateClkRstn(self)
 
+    def _capture_prefix_field(self, name: str, start: int, end: int,
+                              word_i: RtlSignal, din_ack: RtlSignal) -> RtlSignal:
+        """
+        Store the parts of the field of the prefix in registers
+        (the last part is used directly from the input data in the word where it is)
+        """
+        din = self.dataIn
+        DW = self.DATA_WIDTH
+        parts = []
+        last_w = (end - 1) // DW
+        for w in range(start // DW, last_w + 1):
+            d = din.data[min(end, (w + 1) * DW) - w * DW:max(start, w * DW) - w * DW]
+            r = self._reg(f"{name:s}_w{w:d}", d._dtype, def_val=0)
+            is_w = word_i._eq(w)
+            If(din_ack & is_w,
+               r(d)
+            )
+            if w == last_w:
+                r = is_w._ternary(d, r)
+            parts.append(r)
+
+        if len(parts) == 1:
+            return parts[0]
+        else:
+            return Concat(*reversed(parts))
+
+    def delegate_to_children_stream_lengths(self):
+        """
+        Each segment is cut from the input stream using the byte position in the frame
+        (the ends of the variable size segments are resolved from the prefix fields),
+        the segments which do not start on word boundary are shifted using :class:`~.AxiS_FrameJoin`
+        """
+        if self.SHARED_READY or self.OVERFLOW_SUPPORT:
+            raise NotImplementedError()
+        din = self.dataIn
+        DW = self.DATA_WIDTH
+        W = DW // 8
+        din_ack = din.valid & din.ready
+
+        # capture the length fields of the prefix
+        CAPTURE_WORDS = max(ceil(end / DW)
+                            for length in self.sub_t_length if length is not None
+                            for _, end in length[0])
+        hdr_word_i = self._reg("hdr_word_i", Bits(log2ceil(CAPTURE_WORDS + 1)), def_val=0)
+        If(din_ack,
+            If(din.last,
+               hdr_word_i(0)
+            ).Elif(hdr_word_i != CAPTURE_WORDS,
+               hdr_word_i(hdr_word_i + 1)
+            )
+        )
+        seg_lens = []
+        for seg_i, (s_t, length) in enumerate(zip(self.sub_t, self.sub_t_length)):
+            if length is None:
+                if self.sub_t_is_const_sized[seg_i]:
+                    assert s_t.bit_length() % 8 == 0, s_t
+                    seg_lens.append(s_t.bit_length() // 8)
+                else:
+                    # till the end of the frame
+                    seg_lens.append(None)
+            else:
+                fields, fn = length
+                fields = [self._capture_prefix_field(f"seg{seg_i:d}_len_f{f_i:d}", start, end,
+                                                     hdr_word_i, din_ack)
+                          for f_i, (start, end) in enumerate(fields)]
+                seg_lens.append(fn(*fields))
+
+        # byte position of the current word in the frame (saturated behind the last end)
+        MAX_END = sum(l if isinstance(l, int) else mask(l._dtype.bit_length())
+                      for l in seg_lens if l is not None)
+        pos_t = Bits(log2ceil(MAX_END + 2 * W))
+        word_B = self._reg("word_B", pos_t, def_val=0)
+        If(din_ack,
+            If(din.last,
+               word_B(0)
+            ).Elif(word_B < MAX_END,
+               word_B(word_B + W)
+            )
+        )
+
+        din_mask = self._stream_mask(din)
+        slaves = []
+        extraConds = {}
+        skipWhen = {}
+        seg_start = 0
+        for seg_i, (c, s_t, seg_len, is_padding) in enumerate(zip(
+                self.children, self.sub_t, seg_lens, self.sub_t_is_padding)):
+            if seg_len is None:
+                seg_end = None
+            elif isinstance(seg_start, int) and isinstance(seg_len, int):
+                seg_end = seg_start + seg_len
+            else:
+                if isinstance(seg_start, int):
+                    seg_start = pos_t.from_py(seg_start)
+                if not isinstance(seg_len, int):
+                    seg_len = fitTo_t(seg_len, pos_t)
+                seg_end = rename_signal(self, seg_start + seg_len, f"seg{seg_i:d}_end")
+
+            if not is_padding:
+                in_seg = []
+                for B_i in range(W):
+                    B_pos = word_B + B_i
+                    B_in_seg = []
+                    if not isinstance(seg_start, int) or seg_start > 0:
+                        B_in_seg.append(B_pos >= seg_start)
+                    if seg_end is not None:
+                        B_in_seg.append(B_pos < seg_end)
+                    in_seg.append(And(*B_in_seg) if B_in_seg else hBit(1))
+                seg_mask = rename_signal(self, din_mask & Concat(*reversed(in_seg)), f"seg{seg_i:d}_mask")
+                if seg_end is None:
+                    seg_last = din.last
+                else:
+                    seg_last = din.last | (seg_end <= word_B + W)
+
+                if c is None:
+                    seg_t, dst = drill_down_in_HStruct_fields(s_t, self.dataOut)
+                    assert isinstance(seg_t, HStream), seg_t
+                else:
+                    dst = c.dataIn
+                    connect_optional(c.dataOut, self.dataOut)
+
+                if isinstance(seg_start, int) and seg_start % W == 0:
+                    # aligned on word boundary
+                    seg_in = dst
+                else:
+                    align = self._declr_aligner(
+                        f"seg{seg_i:d}_align",
+                        HStream(Bits(8), frame_len=(1, inf),
+                                start_offsets=[seg_start % W, ]
+                                if isinstance(seg_start, int) else
+                                list(range(W))),
+                        dst)
+                    self._connect_masked(align.dataOut, dst, align.dataOut.keep)
+                    seg_in = align.dataIn[0]
+
+                self._connect_masked(din, seg_in, seg_mask,
+                                     exclude=[din.valid, din.ready, din.last])
+                seg_in.last(seg_last)
+                slaves.append(seg_in)
+                # :note: the data is valid only if valid=1
+                has_data = din.valid & (seg_mask != 0)
+                extraConds[seg_in] = has_data
+                skipWhen[seg_in] = ~has_data
+
+            seg_start = seg_end
+
+        StreamNode([din], slaves,
+                   extraConds=extraConds,
+                   skipWhen=skipWhen).sync()
+        propagateClkRstn(self)
+
     def _impl(self):
         """
         Output data signals are directly connected to input in most of the cases,
@@ -382,7 +847,13 @@ class AxiS_frameParser(AxiSCompBase, TemplateConfigured):
         * Streams may have alignment logic if required
         """
 
-        if self.sub_t:
+        if self.SEGMENT_CNT > 1:
+            self._impl_segmented()
+        elif self.INTERLEAVED:
+            self._impl_interleaved()
+        elif self.sub_t and self.STREAM_LENGTHS:
+            self.delegate_to_children_stream_lengths()
+        elif self.sub_t:
             self.delegate_to_children()
         else:
             words = list(self.chainFrameWords())
@@ -4,12 +4,13 @@
 from math import ceil
 from typing import Tuple, List
 
-from hwt.code import If, SwitchLogic
+from hwt.code import If, SwitchLogic, Concat
 from hwt.hdl.typeShortcuts import hBit, vec
 from hwt.hdl.types.bits import Bits
 from hwt.hdl.types.defs import BIT
 from hwt.hdl.types.struct import HStruct
 from hwt.interfaces.utils import addClkRstn
+from hwt.math import log2ceil
 from hwt.pyUtils.arrayQuery import iter_with_last
 from hwt.synthesizer.hObjList import HObjList
 from hwt.synthesizer.param import Param
@@ -93,8 +94,6 @@ class AxiS_footerSplit(AxiSCompBase):
     """
     Split a constant size footer and prefix data from a input frame.
 
-    :attention: this component does not solve an alignment of output streams
-
     .. code-block:: python
 
         HStruct(
@@ -109,10 +108,15 @@ class AxiS_footerSplit(AxiSCompBase):
         Once last word is fond the mask of boundary word is resolved
         and data is send to dataOut[0] and [1].
         Then the rest of data in registers is send on dataOut[1].
+        If ALIGN_FOOTER is set the footer is shifted by a barrel shifter
+        so it starts at the beginning of the first word of dataOut[1]
+        (the footer may start at any byte of any word).
 
     :note: The design is pipelined and the data can loaded
         in to internal registers imediadetely as soon as there is some space.
         There is no inter-frame delay.
+    :note: keep/strb may be disabled only if FOOTER_WIDTH is a multiple of DATA_WIDTH
+        (the input frames are then expected to be made of complete words)
 
     .. hwt-autodoc:: _example_AxiS_footerSplit
     """
@@ -120,6 +124,9 @@ class AxiS_footerSplit(AxiSCompBase):
     def _config(self):
         AxiSCompBase._config(self)
         self.FOOTER_WIDTH = Param(32)
+        # if True the footer on dataOut[1] starts at the beginning of the word,
+        # else it has the offset as it had in the input frame
+        self.ALIGN_FOOTER = Param(True)
 
     def _declr(self):
         addClkRstn(self)
@@ -130,9 +137,18 @@ class AxiS_footerSplit(AxiSCompBase):
                 self.intfCls()._m()
             ])
 
-    def generate_regs(self, LOOK_AHEAD) -> List[Tuple[RtlSignal, RtlSignal,
-                                                      RtlSignal, RtlSignal,
-                                                      RtlSignal]]:
+    def _meta_signal_names(self) -> List[str]:
+        """
+        :return: names of signals which are just passed together with the data
+        """
+        return [name for name, w in [("id", self.ID_WIDTH),
+                                     ("dest", self.DEST_WIDTH),
+                                     ("user", self.USER_WIDTH)] if w]
+
+    def _data_fields(self) -> List[Tuple[Bits, str]]:
+        """
+        :return: fields of the struct for the data word and its flags
+        """
         din = self.dataIn
         mask_t = Bits(self.DATA_WIDTH // 8, force_vector=True)
         data_fieds = [
@@ -145,8 +161,16 @@ class AxiS_footerSplit(AxiSCompBase):
             data_fieds.append((mask_t, "keep"))
         if self.USE_STRB:
             data_fieds.append((mask_t, "strb"))
+        for name in self._meta_signal_names():
+            data_fieds.append((getattr(din, name)._dtype, name))
+        return data_fieds
 
-        reg_t = HStruct(*data_fieds)
+    def generate_regs(self, LOOK_AHEAD) -> List[Tuple[RtlSignal, RtlSignal,
+                                                      RtlSignal, RtlSignal,
+                                                      RtlSignal]]:
+        din = self.dataIn
+        mask_t = Bits(self.DATA_WIDTH // 8, force_vector=True)
+        reg_t = HStruct(*self._data_fields())
         regs = []
         # 0 is dataIn, 1 is connected to dataIn, ..., n connected to dataOut
         for last, i in iter_with_last(range(LOOK_AHEAD + 1 + 1)):
@@ -195,17 +219,20 @@ class AxiS_footerSplit(AxiSCompBase):
             in_mask = din.keep
         elif self.USE_STRB:
             in_mask = din.strb
-        elif self.DATA_WIDTH == 8:
-            in_mask = vec(1, 1)
         else:
-            raise NotImplementedError(
-                "keep/strb can be ignored only for DATA_WIDTH=8")
+            # all words are complete
+            in_mask = vec(mask(BYTE_CNT), BYTE_CNT)
 
         set_is_footer = self._sig("set_is_footer")
         set_is_footer(din.valid & din.last)
         mask_cases = []
+        if self.USE_KEEP or self.USE_STRB:
+            bytes_in_last_input_word_variants = range(1, BYTE_CNT + 1)
+        else:
+            bytes_in_last_input_word_variants = [BYTE_CNT, ]
+
         for last_B_valid, bytes_in_last_input_word in iter_with_last(
-                range(1, BYTE_CNT + 1)):
+                bytes_in_last_input_word_variants):
             footer_end = (LOOK_AHEAD * BYTE_CNT
                           + bytes_in_last_input_word) * 8
             footer_start = footer_end - FOOTER_WIDTH
@@ -254,6 +281,107 @@ class AxiS_footerSplit(AxiSCompBase):
         SwitchLogic(mask_cases, mask_default)
         return set_is_footer
 
+    def _barrel_shift_right(self, name: str, v: RtlSignal, sh: RtlSignal, item_width: int):
+        """
+        Shift the value right by sh items (logarithmic shifter, one 2:1 mux per bit of sh)
+        """
+        t = v._dtype
+        w = t.bit_length()
+        for i in range(sh._dtype.bit_length()):
+            amount = (1 << i) * item_width
+            if amount >= w:
+                v_shifted = t.from_py(0)
+            else:
+                v_shifted = Concat(Bits(amount).from_py(0), v[w:amount])
+            s = self._sig(f"{name:s}_sh{i:d}", t)
+            If(sh[i],
+               s(v_shifted)
+            ).Else(
+               s(v)
+            )
+            v = s
+        return v
+
+    def _footer_align(self, src, dst):
+        """
+        Shift the footer so it starts at the beginning of the word.
+        The offset is resolved from the mask of the first word of the footer.
+        Each input word is split in to a lower part which completes the output word
+        stored in the buffer and the upper part which is stored in the buffer for the next output word.
+        The output word is released once the next input word arrives, or once the end of the frame
+        is detected. The flush of the last word is overlapped with the first word of the next frame.
+
+        :param src: the struct signal with the unaligned footer
+        :param dst: the output interface for the aligned footer
+        """
+        BYTE_CNT = self.DATA_WIDTH // 8
+        USE_KEEP = self.USE_KEEP
+        USE_STRB = self.USE_STRB
+        in_mask = src.keep if USE_KEEP else src.strb
+        buff = self._reg("footer_buff", HStruct(*self._data_fields()),
+                         def_val={"valid": 0, "last": 0})
+        sh_t = Bits(log2ceil(BYTE_CNT), force_vector=True)
+        sh = self._reg("footer_sh", sh_t)
+
+        # buffer is empty or it contains the last word of previous frame
+        is_first = rename_signal(self, ~buff.valid | buff.last, "footer_is_first")
+        first_sh = self._sig("footer_first_sh", sh_t)
+        # offset of the footer = index of first valid byte
+        SwitchLogic(
+            [(in_mask[i], first_sh(i)) for i in range(BYTE_CNT - 1)],
+            default=first_sh(BYTE_CNT - 1)
+        )
+        cur_sh = self._sig("footer_cur_sh", sh_t)
+        If(is_first,
+           cur_sh(first_sh)
+        ).Else(
+           cur_sh(sh)
+        )
+
+        def split(name, v, item_width):
+            # :return: tuple (part which completes the previous output word, part for the next output word)
+            W = BYTE_CNT * item_width
+            v = self._barrel_shift_right(
+                name, Concat(v, Bits(W).from_py(0)), cur_sh, item_width)
+            return v[W:], v[:W]
+
+        to_prev = {}
+        to_next = {}
+        to_prev["data"], to_next["data"] = split("footer_data", src.data, 8)
+        if USE_KEEP:
+            to_prev["keep"], to_next["keep"] = split("footer_keep", src.keep, 1)
+        if USE_STRB:
+            to_prev["strb"], to_next["strb"] = split("footer_strb", src.strb, 1)
+        next_mask = to_next["keep"] if USE_KEEP else to_next["strb"]
+        # last word of the input footer has data also for the next output word
+        has_next = rename_signal(self, next_mask != 0, "footer_has_next")
+
+        # output the word from buffer
+        dst.valid(buff.valid & (buff.last | src.valid))
+        dst.last(buff.last | (src.last & ~has_next))
+        for name, v in to_prev.items():
+            If(buff.last,
+               getattr(dst, name)(getattr(buff, name))
+            ).Else(
+               getattr(dst, name)(getattr(buff, name) | v)
+            )
+        for name in self._meta_signal_names():
+            getattr(dst, name)(getattr(buff, name))
+        src.ready(~buff.valid | dst.ready)
+
+        If(src.valid & (~buff.valid | dst.ready),
+            *(getattr(buff, name)(v) for name, v in to_next.items()),
+            *(getattr(buff, name)(getattr(src, name)) for name in self._meta_signal_names()),
+            buff.last(src.last),
+            buff.valid(is_first | ~src.last | has_next),
+            If(is_first,
+               sh(first_sh),
+            ),
+        ).Elif(buff.valid & buff.last & dst.ready,
+            # flush of the last word without the next frame
+            buff.valid(0),
+        )
+
     def _impl(self):
         USE_KEEP = self.USE_KEEP
         USE_STRB = self.USE_STRB
@@ -261,11 +389,25 @@ class AxiS_footerSplit(AxiSCompBase):
         D_W = self.DATA_WIDTH
         LOOK_AHEAD = ceil(FOOTER_WIDTH / D_W)
         if FOOTER_WIDTH % 8 != 0:
-            raise NotImplementedError()
-        if not (self.USE_KEEP or self.USE_STRB):
-            assert D_W == 8, ("AxiStream is configured not to use KEEP/STRB"
-                              " but is required to resolve frame end", D_W)
+            raise NotImplementedError(
+                "keep/strb is byte granular, the boundary of footer would not be representable",
+                FOOTER_WIDTH)
+        if not (USE_KEEP or USE_STRB) and FOOTER_WIDTH % D_W != 0:
+            raise NotImplementedError(
+                "AxiStream is configured not to use KEEP/STRB"
+                " but it is required to mark the boundary of the footer",
+                D_W, FOOTER_WIDTH)
+
         dout = self.dataOut
+        if self.ALIGN_FOOTER and D_W > 8 and (USE_KEEP or USE_STRB):
+            # the footer may start at any byte, the output is realigned in _footer_align()
+            footer = self._sig("footer", HStruct(
+                *self._data_fields(),
+                (BIT, "ready"),
+            ))
+        else:
+            # the footer is always aligned or the alignment is not required
+            footer = dout[1]
         regs = self.generate_regs(LOOK_AHEAD)
         self.flush_en_logic(regs)
         # resolve footer flags
@@ -289,26 +431,30 @@ class AxiS_footerSplit(AxiSCompBase):
                 # last if this word contains footer, or next word does not contains data
                 d0_last_word_in_last_r = prev_r.valid & prev_is_footer[0]
                 dout[0].last((is_footer != 0) | d0_last_word_in_last_r)
-                dout[0].valid(r.valid & d0_en & en & (~d1_en | dout[1].ready))
+                dout[0].valid(r.valid & d0_en & en & (~d1_en | footer.ready))
 
                 # connect footer
-                dout[1].data(r.data)
-                dout[1].last(r.last)
-                dout[1].valid(r.valid & d1_en & en & (~d0_en | dout[0].ready))
+                footer.data(r.data)
+                footer.last(r.last)
+                footer.valid(r.valid & d1_en & en & (~d0_en | dout[0].ready))
 
                 mask0 = ~is_footer
                 mask1 = is_footer
                 if USE_KEEP:
                     dout[0].keep(r.keep & mask0)
-                    dout[1].keep(r.keep & mask1)
+                    footer.keep(r.keep & mask1)
                 if USE_STRB:
                     dout[0].strb(r.strb & mask0)
-                    dout[1].strb(r.strb & mask1)
+                    footer.strb(r.strb & mask1)
+                for name in self._meta_signal_names():
+                    v = getattr(r, name)
+                    for o in (dout[0], footer):
+                        getattr(o, name)(v)
 
                 ready(
                     ~r.valid | (
                         (dout[0].ready | ~d0_en) &
-                        (dout[1].ready | ~d1_en)
+                        (footer.ready | ~d1_en)
                     )
                 )
             else:
@@ -331,6 +477,8 @@ class AxiS_footerSplit(AxiSCompBase):
                     data_feed.append(r.keep(prev_r.keep))
                 if USE_STRB:
                     data_feed.append(r.strb(prev_r.strb))
+                for name in self._meta_signal_names():
+                    data_feed.append(getattr(r, name)(getattr(prev_r, name)))
 
                 prev_r_vld = prev_r.valid & (din.valid | prev_can_flush)
                 If(ready,
@@ -351,6 +499,9 @@ class AxiS_footerSplit(AxiSCompBase):
                     )
                )
 
+        if footer is not dout[1]:
+            self._footer_align(footer, dout[1])
+
 def _example_AxiS_footerSplit():
     u = AxiS_footerSplit()
     u.DATA_WIDTH = 8
@@ -19,6 +19,7 @@ TEST_FRAME_SIZES = [v * 8 for v in [
 
 
 class AxiS_footerSplitTC(SimTestCase):
+    ALIGN_FOOTER = True
 
     def setUp(self):
         pass
@@ -29,6 +30,7 @@ class AxiS_footerSplitTC(SimTestCase):
         u.FOOTER_WIDTH = footer_width
         u.DATA_WIDTH = data_width
         u.USE_STRB = use_strb
+        u.ALIGN_FOOTER = self.ALIGN_FOOTER
         self.compileSim(u)
         SimTestCase.setUp(self)
         if randomize:
@@ -62,9 +64,9 @@ class AxiS_footerSplitTC(SimTestCase):
     def _test_frames(self, data_width, footer_width,
                      frame_len0, frame_len1,
                      randomize,
-                     N=3):
+                     N=3, use_strb=True):
         u = self.custom_setUp(data_width, footer_width,
-                              randomize, use_strb=True)
+                              randomize, use_strb=use_strb)
         expected0 = []
         expected1 = []
         offset = 1
@@ -78,7 +80,10 @@ class AxiS_footerSplitTC(SimTestCase):
                 expected0.append((0,
                                   gen_data(frame_len)))
                 offset += frame_len // 8
-                off1 = (frame_len % data_width) // 8
+                if self.ALIGN_FOOTER:
+                    off1 = 0
+                else:
+                    off1 = (frame_len % data_width) // 8
                 expected1.append((off1,
                                   gen_data(footer_width)))
                 offset += footer_width // 8
@@ -141,6 +146,41 @@ class AxiS_footerSplitTC(SimTestCase):
                                   frame_len0, frame_len1):
         self._test_frames(24, footer_width, frame_len0, frame_len1, True)
 
+    @TestMatrix([256, 512],
+                [4 * 8, 5 * 8, 70 * 8],
+                [False, True])
+    def test_frames_wide(self, data_width, footer_width, randomize):
+        # footer crossing the word boundary, footer in a single word
+        self._test_frames(data_width, footer_width, 61 * 8, 3 * 8, randomize)
+
+    @TestMatrix([8, 16, 32],
+                [1, 3],
+                [False, True])
+    def test_frames_no_strb(self, data_width, footer_words, randomize):
+        # frames made of complete words
+        self._test_frames(data_width, footer_words * data_width,
+                          data_width, 3 * data_width, randomize,
+                          use_strb=False)
+
+
+class AxiS_footerSplit_unaligned_TC(AxiS_footerSplitTC):
+    """
+    The footer keeps the offset from the input frame
+    """
+    ALIGN_FOOTER = False
+
+    def test_frames_wide(self):
+        self._test_frames(256, 5 * 8, 61 * 8, 3 * 8, True)
+
+    def test_frames_no_strb(self):
+        pass
+
+    def test_frames_8_randomized(self):
+        pass
+
+    def test_frames_24_randomized(self):
+        pass
+
 
 if __name__ == '__main__':
     import unittest
@@ -159,6 +199,7 @@ if __name__ == '__main__':
     # suite.addTest(AxiS_footerSplitTC('test_frames_24'))
     # suite.addTest(AxiS_footerSplitTC('test_frames_8_randomized'))
     suite.addTest(unittest.makeSuite(AxiS_footerSplitTC))
+    suite.addTest(unittest.makeSuite(AxiS_footerSplit_unaligned_TC))
     runner = unittest.TextTestRunner(verbosity=3)
     if useParallerlTest:
         # Run same tests across 4 processes
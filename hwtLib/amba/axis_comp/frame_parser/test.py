@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from collections import deque
+from math import ceil
 import os
 
+from hwt.code import Concat
 from hwt.hdl.constants import Time
 from hwt.hdl.types.bits import Bits
 from hwt.hdl.types.stream import HStream
@@ -10,15 +13,18 @@ from hwt.hdl.types.struct import HStruct
 from hwt.interfaces.structIntf import StructIntf
 from hwt.pyUtils.testUtils import TestMatrix
 from hwt.simulator.simTestCase import SimTestCase
+from hwt.synthesizer.hObjList import HObjList
 from hwtLib.amba.axis import packAxiSFrame, \
     unpackAxiSFrame, axis_recieve_bytes
+from hwtLib.amba.axis_segmented import axis_segmented_send_bytes
 from hwtLib.amba.axis_comp.frame_deparser.test_types import unionOfStructs, unionSimple
 from hwtLib.amba.axis_comp.frame_parser import AxiS_frameParser
 from hwtLib.amba.axis_comp.frame_parser.test_types import structManyInts,\
     ref0_structManyInts, ref1_structManyInts, ref_unionOfStructs0,\
     ref_unionOfStructs2, ref_unionOfStructs1, ref_unionOfStructs3,\
     ref_unionSimple0, ref_unionSimple1, ref_unionSimple2, ref_unionSimple3
-from hwtLib.types.ctypes import uint16_t
+from hwt.synthesizer.vectorUtils import fitTo_t
+from hwtLib.types.ctypes import uint8_t, uint16_t, uint32_t, uint64_t
 from hwtSimApi.constants import CLK_PERIOD
 from hwt.hdl.types.structUtils import HdlType_select
 
@@ -46,14 +52,22 @@ class AxiS_frameParserTC(SimTestCase):
         if isinstance(intf, StructIntf):
             for _intf in intf._interfaces:
                 self.randomizeIntf(_intf)
+        elif isinstance(intf, HObjList):
+            for _intf in intf:
+                self.randomizeIntf(_intf)
         else:
             self.randomize(intf)
 
     def mySetUp(self, dataWidth, structTemplate, randomize=False,
-                use_strb=False, use_keep=False):
+                use_strb=False, use_keep=False, dest_width=0, segment_cnt=1,
+                stream_lengths=(), interleaved=False):
         u = AxiS_frameParser(structTemplate)
         u.USE_STRB = use_strb
         u.USE_KEEP = use_keep
+        u.DEST_WIDTH = dest_width
+        u.SEGMENT_CNT = segment_cnt
+        u.STREAM_LENGTHS = stream_lengths
+        u.INTERLEAVED = interleaved
         u.DATA_WIDTH = dataWidth
         if self.DEFAULT_BUILD_DIR is not None:
             # because otherwise files gets mixed in parralel test execution
@@ -298,6 +312,311 @@ class AxiS_frameParserTC(SimTestCase):
         if not suffix_padding:
             self.assertValSequenceEqual(u.dataOut.footer._ag.data, [frame_len + 1])
 
+    @TestMatrix([32], [1, 2, 5], [uint16_t, uint32_t, uint64_t], [True, False])
+    def test_header_and_stream(self, dataWidth, frame_len, header_t, randomize):
+        T = HStruct(
+            (header_t, "header"),
+            (HStream(Bits(8)), "frame0"),
+        )
+        u = self.mySetUp(dataWidth, T, randomize, use_strb=True)
+        frames = [[(i + f_i) & 0xff for i in range(frame_len + f_i)]
+                  for f_i in range(3)]
+        for f_i, f in enumerate(frames):
+            v = T.from_py({
+                "header": f_i + 10,
+                "frame0": f,
+            })
+            u.dataIn._ag.data.extend(
+                packAxiSFrame(dataWidth, v, withStrb=True)
+            )
+        t = 40
+        if randomize:
+            t *= 3
+
+        self.runMatrixSim2(t, dataWidth, frame_len, randomize)
+
+        for f in frames:
+            off, _f = axis_recieve_bytes(u.dataOut.frame0)
+            self.assertEqual(off, 0)
+            self.assertValSequenceEqual(_f, f)
+        self.assertEmpty(u.dataOut.frame0._ag.data)
+        self.assertValSequenceEqual(u.dataOut.header._ag.data,
+                                    [f_i + 10 for f_i in range(len(frames))])
+
+    @TestMatrix([32], [1, 2, 5], [uint16_t, uint32_t], [True, False])
+    def test_header_stream_and_footer(self, dataWidth, frame_len, header_t, randomize):
+        T = HStruct(
+            (header_t, "header"),
+            (HStream(Bits(8)), "frame0"),
+            (uint16_t, "footer"),
+        )
+        u = self.mySetUp(dataWidth, T, randomize, use_strb=True)
+        frames = [[(i + f_i) & 0xff for i in range(frame_len + f_i)]
+                  for f_i in range(3)]
+        for f_i, f in enumerate(frames):
+            v = T.from_py({
+                "header": f_i + 10,
+                "frame0": f,
+                "footer": f_i + 20,
+            })
+            u.dataIn._ag.data.extend(
+                packAxiSFrame(dataWidth, v, withStrb=True)
+            )
+        t = 40
+        if randomize:
+            t *= 3
+
+        self.runMatrixSim2(t, dataWidth, frame_len, randomize)
+
+        for f in frames:
+            off, _f = axis_recieve_bytes(u.dataOut.frame0)
+            self.assertEqual(off, 0)
+            self.assertValSequenceEqual(_f, f)
+        self.assertEmpty(u.dataOut.frame0._ag.data)
+        self.assertValSequenceEqual(u.dataOut.header._ag.data,
+                                    [f_i + 10 for f_i in range(len(frames))])
+        self.assertValSequenceEqual(u.dataOut.footer._ag.data,
+                                    [f_i + 20 for f_i in range(len(frames))])
+
+    @TestMatrix([32], [1, 2, 5], [uint16_t, uint32_t], [True, False])
+    def test_header_stream_and_footer_dest(self, dataWidth, frame_len, header_t, randomize):
+        T = HStruct(
+            (header_t, "header"),
+            (HStream(Bits(8)), "frame0"),
+            (uint16_t, "footer"),
+        )
+        u = self.mySetUp(dataWidth, T, randomize, use_strb=True, dest_width=2)
+        frames = [[(i + f_i) & 0xff for i in range(frame_len + f_i)]
+                  for f_i in range(3)]
+        for f_i, f in enumerate(frames):
+            v = T.from_py({
+                "header": f_i + 10,
+                "frame0": f,
+                "footer": f_i + 20,
+            })
+            u.dataIn._ag.data.extend(
+                (f_i, *w)
+                for w in packAxiSFrame(dataWidth, v, withStrb=True)
+            )
+        t = 40
+        if randomize:
+            t *= 3
+
+        self.runMatrixSim2(t, dataWidth, frame_len, randomize)
+
+        out = u.dataOut.frame0._ag.data
+        dest = [int(w[0]) for w in out]
+        ref_dest = []
+        for f_i, f in enumerate(frames):
+            ref_dest.extend(f_i for _ in range(ceil(len(f) / (dataWidth // 8))))
+        self.assertSequenceEqual(dest, ref_dest)
+        # strip the dest so the frames can be checked in same way as in other tests
+        u.dataOut.frame0._ag.data = deque(w[1:] for w in out)
+        for f in frames:
+            off, _f = axis_recieve_bytes(u.dataOut.frame0)
+            self.assertEqual(off, 0)
+            self.assertValSequenceEqual(_f, f)
+        self.assertValSequenceEqual(u.dataOut.header._ag.data,
+                                    [f_i + 10 for f_i in range(len(frames))])
+        self.assertValSequenceEqual(u.dataOut.footer._ag.data,
+                                    [f_i + 20 for f_i in range(len(frames))])
+
+    def _send_bytes(self, u, dataWidth, frame, dest=None):
+        words = packAxiSFrame(dataWidth, uint8_t[len(frame)].from_py(frame), withStrb=True)
+        if dest is None:
+            u.dataIn._ag.data.extend(words)
+        else:
+            u.dataIn._ag.data.extend((dest, *w) for w in words)
+
+    def _recieve_frames(self, intf, ref_frames):
+        for f in ref_frames:
+            if f:
+                off, _f = axis_recieve_bytes(intf)
+                self.assertEqual(off, 0)
+                self.assertValSequenceEqual(_f, f)
+        self.assertEmpty(intf._ag.data)
+
+    # IPv4 like header, the length of the options is specified by ihl
+    # and the payload is the rest of the frame
+    IP_LIKE_T = HStruct(
+        (Bits(4), "ihl"), (Bits(4), "version"),
+        (uint8_t, "tos"),
+        (uint16_t, "totalLen"),
+        (HStream(Bits(8)), "options"),
+        (HStream(Bits(8)), "payload"),
+    )
+    IP_LIKE_STREAM_LENGTHS = (
+        ("options", ("ihl", ), lambda ihl: Concat(ihl - 1, Bits(2).from_py(0))),
+    )
+
+    def _ip_like_frame(self, ihl, tos, options, payload, footer=()):
+        totalLen = 4 * ihl + len(payload)
+        return [ihl | (4 << 4), tos, totalLen & 0xff, totalLen >> 8,
+                *options, *payload, *footer]
+
+    @TestMatrix([16, 24, 32, 64], [True, False])
+    def test_stream_lengths_options_and_payload(self, dataWidth, randomize):
+        u = self.mySetUp(dataWidth, self.IP_LIKE_T, randomize, use_strb=True,
+                         stream_lengths=self.IP_LIKE_STREAM_LENGTHS)
+        N = 20
+        ref = []
+        for f_i in range(N):
+            ihl = self._rand.randint(1, 5)
+            options = [self._rand.getrandbits(8) for _ in range((ihl - 1) * 4)]
+            payload = [self._rand.getrandbits(8)
+                       for _ in range(self._rand.randint(0 if options else 1, 3 * dataWidth // 8))]
+            ref.append((ihl, f_i, options, payload))
+            self._send_bytes(u, dataWidth, self._ip_like_frame(ihl, f_i, options, payload))
+
+        t = len(u.dataIn._ag.data) * 2 + 40
+        if randomize:
+            t *= 4
+        self.runMatrixSim2(t, dataWidth, N, randomize)
+
+        self.assertValSequenceEqual(u.dataOut.ihl._ag.data, [f[0] for f in ref])
+        self.assertValSequenceEqual(u.dataOut.version._ag.data, [4 for _ in ref])
+        self.assertValSequenceEqual(u.dataOut.tos._ag.data, [f[1] for f in ref])
+        self.assertValSequenceEqual(u.dataOut.totalLen._ag.data,
+                                    [4 * f[0] + len(f[3]) for f in ref])
+        self._recieve_frames(u.dataOut.options, [f[2] for f in ref])
+        self._recieve_frames(u.dataOut.payload, [f[3] for f in ref])
+
+    @TestMatrix([16, 24, 32, 64], [True, False])
+    def test_stream_lengths_two_streams_and_footer(self, dataWidth, randomize):
+        T = HStruct(
+            *self.IP_LIKE_T.fields,
+            (uint16_t, "footer"),
+            (HStream(Bits(8)), "trailer"),
+        )
+        # both streams have the length specified, the footer is behind the payload
+        # and the trailer is the rest of the frame
+        stream_lengths = (
+            *self.IP_LIKE_STREAM_LENGTHS,
+            ("payload", ("totalLen", "ihl"),
+             lambda totalLen, ihl: totalLen - fitTo_t(Concat(ihl, Bits(2).from_py(0)), totalLen._dtype)),
+        )
+        u = self.mySetUp(dataWidth, T, randomize, use_strb=True,
+                         stream_lengths=stream_lengths)
+        N = 20
+        ref = []
+        for f_i in range(N):
+            ihl = self._rand.randint(1, 5)
+            options = [self._rand.getrandbits(8) for _ in range((ihl - 1) * 4)]
+            payload = [self._rand.getrandbits(8)
+                       for _ in range(self._rand.randint(0, 3 * dataWidth // 8))]
+            footer = f_i + 100
+            trailer = [self._rand.getrandbits(8) for _ in range(self._rand.randint(0, 2))]
+            ref.append((options, payload, footer, trailer))
+            self._send_bytes(u, dataWidth, self._ip_like_frame(
+                ihl, f_i, options, payload, [footer & 0xff, footer >> 8, *trailer]))
+
+        t = len(u.dataIn._ag.data) * 2 + 40
+        if randomize:
+            t *= 4
+        self.runMatrixSim2(t, dataWidth, N, randomize)
+
+        self.assertValSequenceEqual(u.dataOut.tos._ag.data, list(range(N)))
+        self.assertValSequenceEqual(u.dataOut.footer._ag.data, [f[2] for f in ref])
+        self._recieve_frames(u.dataOut.options, [f[0] for f in ref])
+        self._recieve_frames(u.dataOut.payload, [f[1] for f in ref])
+        self._recieve_frames(u.dataOut.trailer, [f[3] for f in ref])
+
+    @TestMatrix([16, 32], [True, False])
+    def test_interleaved(self, dataWidth, randomize):
+        T = HStruct(
+            (uint8_t, "header"),
+            (HStream(Bits(8)), "frame0"),
+        )
+        DEST_WIDTH = 2
+        u = self.mySetUp(dataWidth, T, randomize, use_strb=True,
+                         dest_width=DEST_WIDTH, interleaved=True)
+        N = 8
+        # per context list of frames
+        ref = [[] for _ in range(2 ** DEST_WIDTH)]
+        words = [[] for _ in range(2 ** DEST_WIDTH)]
+        for dest, frames in enumerate(ref):
+            for f_i in range(N):
+                f = [self._rand.getrandbits(8) for _ in range(self._rand.randint(1, 3 * dataWidth // 8))]
+                frames.append((dest * N + f_i, f))
+                v = T.from_py({"header": dest * N + f_i, "frame0": f})
+                words[dest].extend((dest, *w) for w in packAxiSFrame(dataWidth, v, withStrb=True))
+
+        # interleave the beats of the frames with a different dest
+        while any(words):
+            dest = self._rand.choice([i for i, w in enumerate(words) if w])
+            u.dataIn._ag.data.append(words[dest].pop(0))
+
+        t = len(u.dataIn._ag.data) * 2 + 40
+        if randomize:
+            t *= 4
+        self.runMatrixSim2(t, dataWidth, N, randomize)
+
+        for dest, (dout, frames) in enumerate(zip(u.dataOut, ref)):
+            self.assertValSequenceEqual(dout.header._ag.data, [h for h, _ in frames])
+            # strip the dest so the frames can be checked in same way as in other tests
+            out = dout.frame0._ag.data
+            self.assertSequenceEqual([int(w[0]) for w in out], [dest for _ in out])
+            dout.frame0._ag.data = deque(w[1:] for w in out)
+            self._recieve_frames(dout.frame0, [f for _, f in frames])
+
+    def _segmented_send(self, u, T, values):
+        frames = []
+        for v in values:
+            frames.append([int(d) for d, _ in packAxiSFrame(8, T.from_py(v))])
+        axis_segmented_send_bytes(u.dataIn, frames, self._rand)
+
+    @TestMatrix([64, 128], [True, False])
+    def test_segmented(self, dataWidth, randomize):
+        T = HStruct(
+            (uint16_t, "a"),
+            (uint32_t, "b"),
+            (uint16_t, "c"),
+        )
+        SEGMENT_CNT = 2
+        u = self.mySetUp(dataWidth, T, randomize, use_strb=True,
+                         segment_cnt=SEGMENT_CNT)
+        N = 9
+        frames = [(i, i + 100, i + 200) for i in range(N)]
+        self._segmented_send(u, T, [{"a": a, "b": b, "c": c} for a, b, c in frames])
+
+        t = N + 10
+        if randomize:
+            t *= 6
+        self.runMatrixSim2(t, dataWidth, SEGMENT_CNT, randomize)
+
+        for lane_i, dout in enumerate(u.dataOut):
+            lane_frames = frames[lane_i::SEGMENT_CNT]
+            for i, name in enumerate(["a", "b", "c"]):
+                self.assertValSequenceEqual(getattr(dout, name)._ag.data,
+                                            [f[i] for f in lane_frames], name)
+
+    @TestMatrix([32, 64], [2, 4], [True, False])
+    def test_segmented_header_and_stream(self, dataWidth, segment_cnt, randomize):
+        T = HStruct(
+            (uint16_t, "header"),
+            (HStream(Bits(8)), "frame0"),
+        )
+        u = self.mySetUp(dataWidth, T, randomize, use_strb=True,
+                         segment_cnt=segment_cnt)
+        N = 16
+        frames = [[self._rand.getrandbits(8) for _ in range(self._rand.randint(1, 3 * dataWidth // 8))]
+                  for _ in range(N)]
+        self._segmented_send(u, T, [{"header": f_i, "frame0": f} for f_i, f in enumerate(frames)])
+
+        t = len(u.dataIn._ag.data) * 2 + 40
+        if randomize:
+            t *= 4
+        self.runMatrixSim2(t, dataWidth, segment_cnt, randomize)
+
+        for lane_i, dout in enumerate(u.dataOut):
+            for f in frames[lane_i::segment_cnt]:
+                off, _f = axis_recieve_bytes(dout.frame0)
+                self.assertEqual(off, 0)
+                self.assertValSequenceEqual(_f, f)
+            self.assertEmpty(dout.frame0._ag.data)
+            self.assertValSequenceEqual(dout.header._ag.data,
+                                        list(range(N))[lane_i::segment_cnt])
+
 
 if __name__ == "__main__":
     import unittest
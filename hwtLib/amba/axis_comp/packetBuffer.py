@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.code import If, Or, Concat
+from hwt.code_utils import rename_signal
+from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.defs import BIT
+from hwt.interfaces.std import Handshaked, VectSignal
+from hwt.interfaces.utils import addClkRstn, propagateClkRstn
+from hwt.math import log2ceil
+from hwt.serializer.mode import serializeParamsUniq
+from hwt.synthesizer.hObjList import HObjList
+from hwt.synthesizer.interfaceLevel.interfaceUtils.utils import packIntf, \
+    connectPacked
+from hwt.synthesizer.param import Param
+from hwt.synthesizer.unit import Unit
+from hwtLib.amba.axis import AxiStream
+from hwtLib.mem.fifoArrayWithRam import FifoArrayWithRam
+
+
+@serializeParamsUniq
+class AxiSPacketBuffer(Unit):
+    """
+    Multi-queue packet buffer for AXI-Stream (e.g. virtual output queues).
+    The frames are stored in a shared memory of cells (1 cell = 1 word of the stream)
+    and the cells of each queue are linked in a list (:class:`~.FifoArrayWithRam`),
+    because of this the memory is used only by the queues which actually contain the data.
+
+    * dataIn: the input frames, the dest signal specifies the queue
+    * dequeue: scheduler port, the index of the queue from which a single frame should be sent to dataOut,
+      the request is blocked until there is a complete frame in the queue (see frame_available)
+    * dataOut: the output frames, the dest signal contains the index of the queue
+    * occupancy: number of cells used by each queue
+    * frame_available: bit mask of queues with at least one complete frame
+
+    The length of each frame is stored in a separate :class:`~.FifoArrayWithRam`
+    so the frame can be read from the memory without any gaps between the words.
+
+    :ivar QUEUE_CNT: number of queues
+    :ivar CELLS: number of cells (words) in shared memory
+    :ivar MAX_FRAME_LEN: maximum number of words in a single frame
+    :ivar MAX_FRAMES: maximum number of frames in the buffer, None means CELLS
+    :ivar DROP_THRESHOLD: tail-drop, if the occupancy of the queue is >= this threshold
+        on the begin of the frame the frame is dropped, None to disable the tail-drop
+    :ivar BACKPRESSURE_THRESHOLD: if the total number of used cells is >= this threshold
+        on the begin of the frame the frame is stalled, None means CELLS - MAX_FRAME_LEN
+        (which also ensures that each started frame fits in to the memory)
+
+    :attention: The frames longer than MAX_FRAME_LEN are not supported and may cause deadlock.
+
+    .. hwt-autodoc:: _example_AxiSPacketBuffer
+    """
+
+    def _config(self):
+        AxiStream._config(self)
+        self.QUEUE_CNT = Param(4)
+        self.CELLS = Param(256)
+        self.MAX_FRAME_LEN = Param(16)
+        self.MAX_FRAMES = Param(None)
+        self.DROP_THRESHOLD = Param(None)
+        self.BACKPRESSURE_THRESHOLD = Param(None)
+
+    def _get_backpressure_threshold(self) -> int:
+        if self.BACKPRESSURE_THRESHOLD is None:
+            return self.CELLS - self.MAX_FRAME_LEN
+        else:
+            return self.BACKPRESSURE_THRESHOLD
+
+    def _declr(self):
+        assert self._get_backpressure_threshold() + self.MAX_FRAME_LEN <= self.CELLS, (
+            "Each started frame has to fit in to memory, otherwise it may deadlock",
+            self.BACKPRESSURE_THRESHOLD, self.MAX_FRAME_LEN, self.CELLS)
+        self.QUEUE_W = log2ceil(self.QUEUE_CNT)
+        self.OCCUPANCY_W = log2ceil(self.CELLS + 1)
+
+        addClkRstn(self)
+        with self._paramsShared(exclude=({"DEST_WIDTH"}, set())):
+            self.dataIn = AxiStream()
+            self.dataOut = AxiStream()._m()
+        for i in (self.dataIn, self.dataOut):
+            i.DEST_WIDTH = self.QUEUE_W
+
+        dq = self.dequeue = Handshaked()
+        dq.DATA_WIDTH = self.QUEUE_W
+
+        self.occupancy = HObjList(VectSignal(self.OCCUPANCY_W)._m()
+                                  for _ in range(self.QUEUE_CNT))
+        self.frame_available = VectSignal(self.QUEUE_CNT)._m()
+
+        # dest, valid, ready are not stored
+        WORD_W = self.dataIn._bit_length() - self.QUEUE_W - 2
+        c = self.cells = FifoArrayWithRam()
+        c.QUEUE_CNT = self.QUEUE_CNT
+        c.ITEMS = self.CELLS + self.QUEUE_CNT
+        c.DATA_WIDTH = WORD_W
+
+        MAX_FRAMES = self.CELLS if self.MAX_FRAMES is None else self.MAX_FRAMES
+        f = self.frames = FifoArrayWithRam()
+        f.QUEUE_CNT = self.QUEUE_CNT
+        f.ITEMS = MAX_FRAMES + self.QUEUE_CNT
+        f.DATA_WIDTH = log2ceil(self.MAX_FRAME_LEN + 1)
+
+    def _impl_occupancy_counters(self, push_en, push_queue, pop_en, pop_queue):
+        total = self._reg("occupancy_total", Bits(self.OCCUPANCY_W), def_val=0)
+        If(push_en & ~pop_en,
+           total(total + 1)
+        ).Elif(~push_en & pop_en,
+           total(total - 1)
+        )
+        occupancy = []
+        for q, o in enumerate(self.occupancy):
+            occ = self._reg(f"occupancy_{q:d}", o._dtype, def_val=0)
+            inc = push_en & push_queue._eq(q)
+            dec = pop_en & pop_queue._eq(q)
+            If(inc & ~dec,
+               occ(occ + 1)
+            ).Elif(~inc & dec,
+               occ(occ - 1)
+            )
+            o(occ)
+            occupancy.append(occ)
+        return total, occupancy
+
+    def _impl_input(self, occupancy_total, occupancy, cell_push_en, frame_push_en):
+        din = self.dataIn
+        cells_push = self.cells.push
+        frames_push = self.frames.push
+
+        in_first = self._reg("in_first", def_val=1)
+        in_drop = self._reg("in_drop", def_val=0)
+        in_len = self._reg("in_len", frames_push.data._dtype, def_val=0)
+
+        # drop/stall decision is made on the first word of the frame
+        if self.DROP_THRESHOLD is None:
+            drop_now = BIT.from_py(0)
+        else:
+            drop_now = Or(*(din.dest._eq(q) & (occ >= self.DROP_THRESHOLD)
+                            for q, occ in enumerate(occupancy)))
+        drop = self._sig("in_drop_now")
+        If(in_first,
+           drop(drop_now)
+        ).Else(
+           drop(in_drop)
+        )
+        stall = self._sig("in_stall")
+        stall(in_first & (occupancy_total >= self._get_backpressure_threshold()))
+        store_en = rename_signal(self, ~drop & ~stall, "in_store_en")
+
+        cells_push.addr(din.dest)
+        cells_push.data(packIntf(din, exclude=[din.valid, din.ready, din.dest]))
+        frames_push.addr(din.dest)
+        frames_push.data(in_len + 1)
+
+        cells_push.vld(din.valid & store_en & (~din.last | frames_push.rd))
+        frames_push.vld(din.valid & store_en & din.last & cells_push.rd)
+        din.ready(~stall & (drop | (cells_push.rd & (~din.last | frames_push.rd))))
+
+        din_ack = din.valid & din.ready
+        If(din_ack,
+           in_first(din.last),
+           If(in_first,
+              in_drop(drop_now),
+           ),
+           If(din.last,
+              in_len(0),
+           ).Elif(store_en,
+              in_len(in_len + 1),
+           )
+        )
+        cell_push_en(din_ack & ~drop)
+        frame_push_en(din_ack & ~drop & din.last)
+
+    def _impl_output(self, frame_push_en):
+        dq = self.dequeue
+        dout = self.dataOut
+        frames_pop_req = self.frames.pop_req
+        frames_pop = self.frames.pop
+        cells_pop_req = self.cells.pop_req
+        cells_pop = self.cells.pop
+
+        # number of complete frames in each queue
+        frame_cnts = []
+        frame_cnt_t = Bits(log2ceil(self.frames.ITEMS + 1))
+        dq_en = rename_signal(self, dq.vld & dq.rd, "dequeue_en")
+        for q in range(self.QUEUE_CNT):
+            cnt = self._reg(f"frame_cnt_{q:d}", frame_cnt_t, def_val=0)
+            inc = frame_push_en & self.dataIn.dest._eq(q)
+            dec = dq_en & dq.data._eq(q)
+            If(inc & ~dec,
+               cnt(cnt + 1)
+            ).Elif(~inc & dec,
+               cnt(cnt - 1)
+            )
+            frame_cnts.append(cnt != 0)
+        self.frame_available(Concat(*reversed(frame_cnts)))
+
+        # get length of the frame
+        dq_queue_has_frame = Or(*(dq.data._eq(q) & a for q, a in enumerate(frame_cnts)))
+        frames_pop_req.addr(dq.data)
+        frames_pop_req.vld(dq.vld & dq_queue_has_frame)
+        dq.rd(frames_pop_req.rd & (~dq.vld | dq_queue_has_frame))
+
+        # read the words of the frame
+        remaining = self._reg("out_remaining", frames_pop.data._dtype, def_val=0)
+        out_queue = self._reg("out_queue", dq.data._dtype)
+        load_next = rename_signal(self, remaining._eq(0) | (remaining._eq(1) & cells_pop_req.rd), "out_load_next")
+        frames_pop.rd(load_next)
+        If(frames_pop.vld & load_next,
+           remaining(frames_pop.data),
+           out_queue(frames_pop.addr),
+        ).Elif(cells_pop_req.rd & (remaining != 0),
+           remaining(remaining - 1),
+        )
+        cells_pop_req.addr(out_queue)
+        cells_pop_req.vld(remaining != 0)
+
+        connectPacked(cells_pop.data, dout, exclude=[dout.valid, dout.ready, dout.dest])
+        dout.dest(cells_pop.addr)
+        dout.valid(cells_pop.vld)
+        cells_pop.rd(dout.ready)
+        return rename_signal(self, cells_pop.vld & dout.ready, "cell_pop_en"), cells_pop.addr
+
+    def _impl(self):
+        propagateClkRstn(self)
+        cell_push_en = self._sig("cell_push_en")
+        frame_push_en = self._sig("frame_push_en")
+        cell_pop_en, cell_pop_queue = self._impl_output(frame_push_en)
+        occupancy_total, occupancy = self._impl_occupancy_counters(
+            cell_push_en, self.dataIn.dest, cell_pop_en, cell_pop_queue)
+        self._impl_input(occupancy_total, occupancy, cell_push_en, frame_push_en)
+
+
+def _example_AxiSPacketBuffer():
+    u = AxiSPacketBuffer()
+    u.DATA_WIDTH = 32
+    u.USE_STRB = True
+    u.QUEUE_CNT = 4
+    u.CELLS = 64
+    u.MAX_FRAME_LEN = 8
+    u.DROP_THRESHOLD = 32
+    return u
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = _example_AxiSPacketBuffer()
+    print(to_rtl_str(u))
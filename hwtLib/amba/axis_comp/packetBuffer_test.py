@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from random import Random
+import unittest
+
+from hwt.simulator.simTestCase import SingleUnitSimTestCase
+from hwtLib.amba.axis_comp.packetBuffer import AxiSPacketBuffer
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer, WaitWriteOnly, WaitCombRead
+
+
+class AxiSPacketBufferTC(SingleUnitSimTestCase):
+
+    @classmethod
+    def getUnit(cls):
+        u = cls.u = AxiSPacketBuffer()
+        u.DATA_WIDTH = 8
+        u.QUEUE_CNT = 3
+        u.CELLS = 32
+        u.MAX_FRAME_LEN = 8
+        return u
+
+    def send_frame(self, queue, frame):
+        ag_data = self.u.dataIn._ag.data
+        for i, d in enumerate(frame):
+            ag_data.append((queue, d, int(i == len(frame) - 1)))
+
+    def recieve_frames(self):
+        """
+        :return: list of tuples (queue, frame data)
+        """
+        frames = []
+        cur = []
+        for q, d, last in self.u.dataOut._ag.data:
+            cur.append(int(d))
+            if int(last):
+                frames.append((int(q), cur))
+                cur = []
+        self.assertEmpty(cur)
+        return frames
+
+    def dequeue_after(self, t, queues):
+        def proc():
+            yield Timer(t)
+            yield WaitWriteOnly()
+            self.u.dequeue._ag.data.extend(queues)
+
+        self.procs.append(proc())
+
+    def assert_occupancy(self, ref):
+        io = self.rtl_simulator.model.io
+        occupancy = [getattr(io, f"occupancy_{q:d}").read()
+                     for q in range(self.u.QUEUE_CNT)]
+        self.assertValSequenceEqual(occupancy, ref)
+
+    def test_nop(self):
+        u = self.u
+        self.runSim(10 * CLK_PERIOD)
+        self.assertEmpty(u.dataOut._ag.data)
+        self.assert_occupancy([0 for _ in range(u.QUEUE_CNT)])
+
+    def test_store_without_dequeue(self):
+        u = self.u
+        self.send_frame(0, [1, 2, 3])
+        self.send_frame(2, [4])
+        self.send_frame(0, [5, 6])
+        self.runSim(15 * CLK_PERIOD)
+        self.assertEmpty(u.dataIn._ag.data)
+        self.assertEmpty(u.dataOut._ag.data)
+        self.assert_occupancy([5, 0, 1])
+        self.assertValEqual(self.rtl_simulator.model.io.frame_available.read(), 0b101)
+
+    def test_single_frame(self):
+        u = self.u
+        self.send_frame(1, [1, 2, 3])
+        self.dequeue_after(6 * CLK_PERIOD, [1])
+        self.runSim(20 * CLK_PERIOD)
+        self.assertSequenceEqual(self.recieve_frames(), [(1, [1, 2, 3])])
+        self.assert_occupancy([0, 0, 0])
+
+    def test_dequeue_before_frame_is_complete(self):
+        u = self.u
+        # the dequeue is blocked until the frame is complete
+        u.dequeue._ag.data.append(2)
+        self.send_frame(2, [1, 2, 3, 4])
+        self.runSim(20 * CLK_PERIOD)
+        self.assertSequenceEqual(self.recieve_frames(), [(2, [1, 2, 3, 4])])
+
+    def test_random_frames(self, N=20, randomized=False, shuffle_dequeue=False):
+        """
+        :param shuffle_dequeue: if True the frames are dequeued in random queue order
+            and only the frames which fit under the backpressure threshold are generated
+            (otherwise the dequeue may wait for a frame which is stalled on input)
+        """
+        u = self.u
+        rand = Random(0)
+        frames = [[] for _ in range(u.QUEUE_CNT)]
+        dequeue = []
+        total_words = 0
+        for i in range(N):
+            q = rand.randint(0, u.QUEUE_CNT - 1)
+            f = [rand.getrandbits(8) for _ in range(rand.randint(1, u.MAX_FRAME_LEN))]
+            if shuffle_dequeue and total_words + len(f) > u._get_backpressure_threshold():
+                N = i
+                break
+            total_words += len(f)
+            frames[q].append(f)
+            dequeue.append(q)
+            self.send_frame(q, f)
+
+        if shuffle_dequeue:
+            rand.shuffle(dequeue)
+        u.dequeue._ag.data.extend(dequeue)
+        ref = []
+        frame_i = [0 for _ in frames]
+        for q in dequeue:
+            ref.append((q, frames[q][frame_i[q]]))
+            frame_i[q] += 1
+
+        # the words should be transfered without gaps
+        t = total_words + N + 20
+        if randomized:
+            self.randomize(u.dataIn)
+            self.randomize(u.dequeue)
+            self.randomize(u.dataOut)
+            t *= 4
+
+        self.runSim(t * CLK_PERIOD)
+        self.assertSequenceEqual(self.recieve_frames(), ref)
+        self.assert_occupancy([0 for _ in range(u.QUEUE_CNT)])
+
+    def test_random_frames_randomized(self):
+        self.test_random_frames(randomized=True)
+
+    def test_random_frames_shuffled_dequeue(self):
+        self.test_random_frames(shuffle_dequeue=True)
+
+    def test_random_frames_shuffled_dequeue_randomized(self):
+        self.test_random_frames(randomized=True, shuffle_dequeue=True)
+
+
+class AxiSPacketBuffer_tailDropTC(AxiSPacketBufferTC):
+
+    @classmethod
+    def getUnit(cls):
+        u = AxiSPacketBufferTC.getUnit()
+        u.DROP_THRESHOLD = 4
+        return u
+
+    def test_random_frames(self):
+        # the frames would be dropped depending on timing
+        pass
+
+    def test_random_frames_randomized(self):
+        pass
+
+    def test_random_frames_shuffled_dequeue(self):
+        pass
+
+    def test_random_frames_shuffled_dequeue_randomized(self):
+        pass
+
+    def test_store_without_dequeue(self):
+        pass
+
+    def test_tail_drop(self):
+        u = self.u
+        self.send_frame(0, [1, 2, 3])
+        self.send_frame(0, [4, 5, 6])
+        # dropped because queue 0 has occupancy 6
+        self.send_frame(0, [7, 8])
+        self.send_frame(1, [9])
+        self.dequeue_after(20 * CLK_PERIOD, [0, 0, 1])
+        self.runSim(40 * CLK_PERIOD)
+        self.assertEmpty(u.dataIn._ag.data)
+        self.assertSequenceEqual(self.recieve_frames(), [
+            (0, [1, 2, 3]),
+            (0, [4, 5, 6]),
+            (1, [9]),
+        ])
+        self.assertValEqual(self.rtl_simulator.model.io.frame_available.read(), 0)
+        self.assert_occupancy([0, 0, 0])
+
+
+class AxiSPacketBuffer_backpressureTC(AxiSPacketBufferTC):
+
+    @classmethod
+    def getUnit(cls):
+        u = AxiSPacketBufferTC.getUnit()
+        u.BACKPRESSURE_THRESHOLD = 8
+        return u
+
+    def test_store_without_dequeue(self):
+        pass
+
+    def test_backpressure(self):
+        u = self.u
+        frames = [(q % u.QUEUE_CNT, [q * 4 + i for i in range(4)]) for q in range(4)]
+        for q, f in frames:
+            self.send_frame(q, f)
+
+        def check_stalled():
+            yield Timer(20 * CLK_PERIOD)
+            yield WaitCombRead()
+            # 2 frames (8 words) are stored, the third one is stalled
+            # (the first word of it is already on the interface)
+            self.assertEqual(len(u.dataIn._ag.data), 7)
+            self.assert_occupancy([4, 4, 0])
+            yield WaitWriteOnly()
+            u.dequeue._ag.data.extend(q for q, _ in frames)
+
+        self.procs.append(check_stalled())
+        self.runSim(50 * CLK_PERIOD)
+        self.assertEmpty(u.dataIn._ag.data)
+        self.assertSequenceEqual(self.recieve_frames(), frames)
+
+
+AxiSPacketBufferTCs = [
+    AxiSPacketBufferTC,
+    AxiSPacketBuffer_tailDropTC,
+    AxiSPacketBuffer_backpressureTC,
+]
+
+if __name__ == "__main__":
+    suite = unittest.TestSuite()
+    # suite.addTest(AxiSPacketBufferTC('test_random_frames'))
+    for tc in AxiSPacketBufferTCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
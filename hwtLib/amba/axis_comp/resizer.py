@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from hwt.code import If, Concat, Switch
+from math import gcd
+
+from hwt.code import If, Concat, Switch, SwitchLogic
 from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.defs import BIT
 from hwt.interfaces.utils import addClkRstn
 from hwt.math import log2ceil
 from hwt.synthesizer.param import Param
@@ -16,6 +19,9 @@ class AxiS_resizer(AxiSCompBase):
     """
     Change data with of AxiStream interface
 
+    If one data width is not a multiple of the other (e.g. 40b to 64b)
+    the component works as a gearbox (see :meth:`~.gearbox`).
+
     :attention: start of frame is expected to be aligned on first word
     :attention: strb can be not fully set only in last word
     :attention: in upscale mode id and other signals which are not dependent on data width
@@ -50,6 +56,7 @@ class AxiS_resizer(AxiSCompBase):
     .. hwt-interfaces: _example_AxiS_resizer_upscale
     .. hwt-schematic:: _example_AxiS_resizer_upscale
     .. hwt-schematic:: _example_AxiS_resizer_downscale
+    .. hwt-schematic:: _example_AxiS_resizer_gearbox
     """
 
     def _config(self):
@@ -57,8 +64,19 @@ class AxiS_resizer(AxiSCompBase):
         self.OUT_DATA_WIDTH = Param(64)
         self.USE_STRB = True
 
+    def _is_integer_ratio(self) -> bool:
+        IN_DW = int(self.DATA_WIDTH)
+        OUT_DW = int(self.OUT_DATA_WIDTH)
+        return IN_DW % OUT_DW == 0 or OUT_DW % IN_DW == 0
+
     def _declr(self):
-        assert self.USE_STRB
+        if self._is_integer_ratio():
+            assert self.USE_STRB
+        elif self.USE_STRB or self.USE_KEEP:
+            # gearbox items are bytes, a mask bit has to cover a whole byte of data
+            assert self.DATA_WIDTH % 8 == 0 and self.OUT_DATA_WIDTH % 8 == 0, (
+                "Non byte aligned data width can not be used with strb/keep",
+                self.DATA_WIDTH, self.OUT_DATA_WIDTH)
         addClkRstn(self)
 
         with self._paramsShared():
@@ -211,11 +229,147 @@ class AxiS_resizer(AxiSCompBase):
            )
         )
 
+    def gearbox(self, IN_DW, OUT_DW):
+        """
+        Resize for data widths where one is not a multiple of the other.
+
+        The input words are split to items (bytes if strb/keep is used, otherwise
+        gcd(IN_DW, OUT_DW) bits) which are stored in a shift buffer of IN_ITEMS + OUT_ITEMS items.
+        The output word is taken from the begin of the buffer and it never contains
+        the items from multiple frames (the last word of the frame is flushed immediately).
+        The input is accepted in every clock cycle if there is a space for a whole input word
+        after the output word is taken, the output is driven directly from registers.
+
+        :attention: strb/keep can be not fully set only in last word and the set bytes
+            have to be contiguous and start at the begin of the word
+        :attention: if strb/keep is not used the last word of the frame has to be fully
+            used because there is no way how to mark the invalid part of the word
+        :attention: id and other signals which are not dependent on data width
+            are stored for each item and they are taken from first item of the output word
+        """
+        din = self.dataIn
+        dout = self.dataOut
+        if self.USE_STRB or self.USE_KEEP:
+            ITEM_W = 8
+        else:
+            ITEM_W = gcd(IN_DW, OUT_DW)
+        IN_ITEMS = IN_DW // ITEM_W
+        OUT_ITEMS = OUT_DW // ITEM_W
+        BUFF_ITEMS = IN_ITEMS + OUT_ITEMS
+        cnt_t = Bits(log2ceil(BUFF_ITEMS + 1))
+        item_data_t = Bits(ITEM_W)
+
+        dIn = self.getDataWidthDependent(din)
+        others_in = [s for s in self.get_data(din)
+                     if s not in dIn and s is not din.last]
+        others_out = [s for s in self.get_data(dout)
+                      if s not in self.getDataWidthDependent(dout) and s is not dout.last]
+
+        # buffer of items, item is tuple (data, last, *others)
+        buff = []
+        for i in range(BUFF_ITEMS):
+            item = [
+                self._reg(f"buff{i:d}_data", item_data_t),
+                self._reg(f"buff{i:d}_last"),
+            ]
+            for o in others_in:
+                item.append(self._reg(f"buff{i:d}_{o._name:s}", o._dtype))
+            buff.append(item)
+        item_cnt = self._reg("item_cnt", cnt_t, def_val=0)
+
+        # output word, ends on first last item in first OUT_ITEMS of buffer
+        out_n = self._sig("out_item_cnt", cnt_t)
+        out_last = self._sig("out_last")
+        SwitchLogic(
+            [(buff[i][1] & (item_cnt > i),
+              [out_n(i + 1), out_last(1)])
+             for i in range(OUT_ITEMS)],
+            default=[out_n(OUT_ITEMS), out_last(0)]
+        )
+        out_vld = out_last | (item_cnt >= OUT_ITEMS)
+        out_items_vld = [out_n > i for i in range(OUT_ITEMS)]
+        dout.data(Concat(*reversed([
+            vld._ternary(item[0], item_data_t.from_py(0))
+            for vld, item in zip(out_items_vld, buff)
+        ])))
+        out_mask = Concat(*reversed(out_items_vld))\
+            if (self.USE_STRB or self.USE_KEEP) else None
+        if self.USE_STRB:
+            dout.strb(out_mask)
+        if self.USE_KEEP:
+            dout.keep(out_mask)
+        dout.last(out_last)
+        for o, b in zip(others_out, buff[0][2:]):
+            o(b)
+        self.get_valid_signal(dout)(out_vld)
+
+        out_ack = out_vld & self.get_ready_signal(dout)
+        # number of items which remains in buffer after output word is taken
+        rem = self._sig("rem_item_cnt", cnt_t)
+        If(out_ack,
+           rem(item_cnt - out_n)
+        ).Else(
+           rem(item_cnt)
+        )
+
+        # number of valid items in input word
+        if self.USE_STRB or self.USE_KEEP:
+            in_mask = din.keep if self.USE_KEEP else din.strb
+            in_n = self._sig("in_item_cnt", cnt_t)
+            SwitchLogic(
+                [(in_mask[i], in_n(i + 1))
+                 for i in reversed(range(IN_ITEMS))],
+                default=in_n(0)
+            )
+            in_last = [din.last & in_n._eq(i + 1) for i in range(IN_ITEMS)]
+        else:
+            in_n = cnt_t.from_py(IN_ITEMS)
+            in_last = [din.last if i == IN_ITEMS - 1 else BIT.from_py(0)
+                       for i in range(IN_ITEMS)]
+        in_items = [
+            [din.data[(i + 1) * ITEM_W:i * ITEM_W], in_last[i], *others_in]
+            for i in range(IN_ITEMS)
+        ]
+        self.get_ready_signal(din)(rem <= OUT_ITEMS)
+        in_ack = self.get_valid_signal(din) & self.get_ready_signal(din)
+
+        # shift the buffer by the number of items of the output word and append the input items
+        out_n_ack = out_ack._ternary(out_n, cnt_t.from_py(0))
+        for i, item in enumerate(buff):
+            for f_i, r in enumerate(item):
+                shifted = self._sig(f"{r.name:s}_shifted", r._dtype)
+                Switch(out_n_ack).add_cases(
+                    (sh, shifted(buff[i + sh][f_i] if i + sh < BUFF_ITEMS else None))
+                    for sh in range(OUT_ITEMS + 1)
+                ).Default(
+                    shifted(None)
+                )
+                from_in = self._sig(f"{r.name:s}_from_in", r._dtype)
+                Switch(rem).add_cases(
+                    (pos, from_in(in_items[i - pos][f_i]))
+                    for pos in range(max(0, i - IN_ITEMS + 1), i + 1)
+                ).Default(
+                    from_in(None)
+                )
+                If(rem > i,
+                   r(shifted)
+                ).Else(
+                   r(from_in)
+                )
+
+        If(in_ack,
+           item_cnt(rem + in_n)
+        ).Else(
+           item_cnt(rem)
+        )
+
     def _impl(self):
         IN_DW = int(self.DATA_WIDTH)
         OUT_DW = int(self.OUT_DATA_WIDTH)
 
-        if IN_DW < OUT_DW:  # UPSCALE
+        if not self._is_integer_ratio():
+            self.gearbox(IN_DW, OUT_DW)
+        elif IN_DW < OUT_DW:  # UPSCALE
             self.upscale(IN_DW, OUT_DW)
         elif IN_DW > OUT_DW:  # DOWNSCALE
             self.downscale(IN_DW, OUT_DW)
@@ -246,6 +400,16 @@ def _example_AxiS_resizer_downscale():
     return u
 
 
+def _example_AxiS_resizer_gearbox():
+    from hwtLib.amba.axis import AxiStream
+
+    u = AxiS_resizer(AxiStream)
+    u.DATA_WIDTH = 40
+    u.OUT_DATA_WIDTH = 64
+
+    return u
+
+
 if __name__ == "__main__":
     from hwt.synthesizer.utils import to_rtl_str
     u = _example_AxiS_resizer_downscale()
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from math import gcd
+from random import Random
 import unittest
 
 from hwt.doc_markers import internal
@@ -8,9 +10,11 @@ from hwt.hdl.constants import Time
 from hwt.interfaces.utils import addClkRstn
 from hwt.simulator.simTestCase import SingleUnitSimTestCase
 from hwt.synthesizer.param import Param
+from hwt.synthesizer.utils import to_rtl_str
 from hwtLib.amba.axis import AxiStream
 from hwtLib.amba.axis_comp.builder import AxiSBuilder
 from hwtLib.amba.axis_comp.resizer import AxiS_resizer
+from hwtSimApi.constants import CLK_PERIOD
 from pyMathBitPrecise.bit_utils import mask
 
 
@@ -221,11 +225,128 @@ class AxiS_resizer_upAndDown_TC(SingleUnitSimTestCase):
         self.assertValSequenceEqual(u.dataOut._ag.data, data)
 
 
+class AxiS_resizer_gearbox_TC(SingleUnitSimTestCase):
+    DW_IN = 40
+    DW_OUT = 64
+
+    @classmethod
+    def getUnit(cls):
+        u = cls.u = AxiS_resizer()
+        u.DATA_WIDTH = cls.DW_IN
+        u.OUT_DATA_WIDTH = cls.DW_OUT
+        return u
+
+    def frame_to_words(self, frame, DW):
+        """
+        :param frame: list of bytes
+        :return: list of tuples (data, strb, last)
+        """
+        B = DW // 8
+        words = []
+        for i in range(0, len(frame), B):
+            w = frame[i:i + B]
+            words.append((it(8, *w), mask(len(w)), int(i + B >= len(frame))))
+        return words
+
+    def test_nop(self):
+        u = self.u
+        self.runSim(20 * CLK_PERIOD)
+        self.assertEmpty(u.dataOut._ag.data)
+
+    def test_frames(self, N=20, randomized=False):
+        u = self.u
+        rand = Random(0)
+        ref = []
+        for _ in range(N):
+            frame = [rand.getrandbits(8) for _ in range(rand.randint(1, 3 * (self.DW_IN + self.DW_OUT) // 8))]
+            u.dataIn._ag.data.extend(self.frame_to_words(frame, self.DW_IN))
+            ref.extend(self.frame_to_words(frame, self.DW_OUT))
+
+        t = len(u.dataIn._ag.data) + len(ref) + 10
+        if randomized:
+            self.randomize(u.dataIn)
+            self.randomize(u.dataOut)
+            t *= 3
+        self.runSim(t * CLK_PERIOD)
+        self.assertValSequenceEqual(u.dataOut._ag.data, ref)
+
+    def test_frames_randomized(self):
+        self.test_frames(randomized=True)
+
+    def test_throughput(self, N=40):
+        u = self.u
+        # a single long frame, the data should be transfered without any stall
+        # on the side with smaller throughput
+        frame = [i % 256 for i in range(N * self.DW_IN * self.DW_OUT // 8 // gcd(self.DW_IN, self.DW_OUT))]
+        in_words = self.frame_to_words(frame, self.DW_IN)
+        ref = self.frame_to_words(frame, self.DW_OUT)
+        u.dataIn._ag.data.extend(in_words)
+        self.runSim((max(len(in_words), len(ref)) + 3) * CLK_PERIOD)
+        self.assertValSequenceEqual(u.dataOut._ag.data, ref)
+
+
+class AxiS_resizer_gearbox_down_TC(AxiS_resizer_gearbox_TC):
+    DW_IN = 64
+    DW_OUT = 40
+
+
+class AxiS_resizer_gearbox_noStrb_TC(SingleUnitSimTestCase):
+    """
+    Without strb the items are of gcd(DW_IN, DW_OUT) bits
+    """
+    DW_IN = 10
+    DW_OUT = 16
+
+    @classmethod
+    def getUnit(cls):
+        u = cls.u = AxiS_resizer()
+        u.USE_STRB = False
+        u.DATA_WIDTH = cls.DW_IN
+        u.OUT_DATA_WIDTH = cls.DW_OUT
+        return u
+
+    def test_frames(self, N=10):
+        u = self.u
+        rand = Random(0)
+        self.randomize(u.dataIn)
+        self.randomize(u.dataOut)
+        ref = []
+        # the frame length has to be a multiple of both widths
+        FRAME_LEN_GRANULARITY = self.DW_IN * self.DW_OUT // gcd(self.DW_IN, self.DW_OUT)
+        for _ in range(N):
+            frame_w = FRAME_LEN_GRANULARITY * rand.randint(1, 3)
+            frame = rand.getrandbits(frame_w)
+            in_cnt = frame_w // self.DW_IN
+            u.dataIn._ag.data.extend(
+                ((frame >> (i * self.DW_IN)) & mask(self.DW_IN), int(i == in_cnt - 1))
+                for i in range(in_cnt))
+            out_cnt = frame_w // self.DW_OUT
+            ref.extend(
+                ((frame >> (i * self.DW_OUT)) & mask(self.DW_OUT), int(i == out_cnt - 1))
+                for i in range(out_cnt))
+
+        self.runSim((len(u.dataIn._ag.data) + len(ref) + 10) * 3 * CLK_PERIOD)
+        self.assertValSequenceEqual(u.dataOut._ag.data, ref)
+
+    def test_keep_not_byte_aligned(self):
+        # a keep bit can not mark a part of the byte
+        u = AxiS_resizer()
+        u.USE_STRB = False
+        u.USE_KEEP = True
+        u.DATA_WIDTH = self.DW_IN
+        u.OUT_DATA_WIDTH = self.DW_OUT
+        with self.assertRaises(AssertionError):
+            to_rtl_str(u)
+
+
 AxiS_resizer_TCs = [
     AxiS_resizer_upscale_TC,
     AxiS_resizer_downscale_TC,
     AxiS_resizer_downAndUp_TC,
-    AxiS_resizer_upAndDown_TC
+    AxiS_resizer_upAndDown_TC,
+    AxiS_resizer_gearbox_TC,
+    AxiS_resizer_gearbox_down_TC,
+    AxiS_resizer_gearbox_noStrb_TC,
 ]
 
 if __name__ == "__main__":
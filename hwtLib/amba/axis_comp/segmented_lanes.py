@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import List, Tuple
+
+from hwt.code import If, Or, And, SwitchLogic, Concat
+from hwt.code_utils import rename_signal
+from hwt.hdl.types.bits import Bits
+from hwt.interfaces.utils import addClkRstn
+from hwt.math import log2ceil
+from hwt.synthesizer.hObjList import HObjList
+from hwt.synthesizer.param import Param
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwt.synthesizer.unit import Unit
+from hwtLib.amba.axis import AxiStream
+from hwtLib.amba.axis_segmented import AxiStreamSegmented
+from pyMathBitPrecise.bit_utils import mask
+
+
+def _split_segments(sig: RtlSignal, SEGMENT_CNT: int) -> List[RtlSignal]:
+    W = sig._dtype.bit_length() // SEGMENT_CNT
+    return [sig[(i + 1) * W:i * W] for i in range(SEGMENT_CNT)]
+
+
+def _lane_masks(lane: AxiStream) -> List[RtlSignal]:
+    res = []
+    if lane.USE_KEEP:
+        res.append(lane.keep)
+    if lane.USE_STRB:
+        res.append(lane.strb)
+    return res
+
+
+class _Segment():
+    """
+    Container of signals of a single segment
+
+    :ivar ~.data: data of the segment
+    :ivar ~.keep: byte mask of the segment
+    :ivar ~.occ: 1 if the segment contains a data of the frame
+    """
+
+    def __init__(self, data, keep, occ):
+        self.data = data
+        self.keep = keep
+        self.occ = occ
+
+    @classmethod
+    def new_sig(cls, parent: Unit, name: str, SEG_W: int):
+        return cls(parent._sig(f"{name:s}_data", Bits(SEG_W)),
+                   parent._sig(f"{name:s}_keep", Bits(SEG_W // 8)),
+                   parent._sig(f"{name:s}_occ"))
+
+    @classmethod
+    def empty(cls, SEG_W: int):
+        return cls(Bits(SEG_W).from_py(None), Bits(SEG_W // 8).from_py(0), 0)
+
+    def __call__(self, other: "_Segment"):
+        return [
+            self.data(other.data),
+            self.keep(other.keep),
+            self.occ(other.occ),
+        ]
+
+
+class AxiS_segmentedBase(Unit):
+    """
+    Base class of the converters between :class:`~.AxiStreamSegmented` and lanes
+    of :class:`~.AxiStream` (each lane with a whole frames, the frames are assigned to the lanes
+    in round-robin fashion)
+    """
+
+    def _config(self):
+        AxiStream._config(self)
+        self.USE_KEEP = True
+        self.SEGMENT_CNT = Param(2)
+
+    def _declr(self):
+        if self.ID_WIDTH or self.DEST_WIDTH or self.USER_WIDTH:
+            raise NotImplementedError()
+        assert self.SEGMENT_CNT > 1, self.SEGMENT_CNT
+        addClkRstn(self)
+        self.SEG_W = self.DATA_WIDTH // self.SEGMENT_CNT
+
+    def _mk_segmented(self):
+        i = AxiStreamSegmented()
+        i.DATA_WIDTH = self.DATA_WIDTH
+        i.SEGMENT_CNT = self.SEGMENT_CNT
+        return i
+
+    def _mk_lanes(self):
+        lanes = HObjList()
+        for _ in range(self.SEGMENT_CNT):
+            lane = AxiStream()
+            lane._updateParamsFrom(self)
+            lanes.append(lane)
+        return lanes
+
+    def _lane_index_add(self, i: RtlSignal, n: int):
+        """
+        :return: (i + n) % SEGMENT_CNT
+        """
+        K = self.SEGMENT_CNT
+        assert n >= 0 and n <= K, n
+        if n == 0:
+            return i
+        w = log2ceil(2 * K)
+        _i = Concat(Bits(w - i._dtype.bit_length()).from_py(0), i)
+        r = _i + n
+        return (r >= K)._ternary(r - K, r)[i._dtype.bit_length():]
+
+
+class AxiS_segmentedToLanes(AxiS_segmentedBase):
+    """
+    Distribute the frames from :class:`~.AxiStreamSegmented` to SEGMENT_CNT lanes
+    (the frame i goes to the lane i % SEGMENT_CNT) and realign the frames so they start at the beginning
+    of the lane word.
+
+    Each lane takes its part of the input beat independently. The input beat is consumed
+    once all lanes have taken their part. (There is at most one part of the beat for each lane.)
+    The frame which does not start at the segment 0 is rotated using a buffer of SEGMENT_CNT - 1 segments.
+    Because of this the last word of the frame may have to be send in an extra clock cycle
+    (the lane does not accept a next frame in this clock cycle).
+
+    .. hwt-autodoc::
+    """
+
+    def _declr(self):
+        super(AxiS_segmentedToLanes, self)._declr()
+        self.dataIn = self._mk_segmented()
+        self.dataOut = self._mk_lanes()._m()
+
+    def _impl(self):
+        K = self.SEGMENT_CNT
+        SEG_W = self.SEG_W
+        SEG_B = SEG_W // 8
+        din = self.dataIn
+        segs = [
+            _Segment(d, k, en)
+            for d, k, en in zip(
+                _split_segments(din.data, K),
+                _split_segments(din.keep, K),
+                [din.en[i] for i in range(K)])
+        ]
+        start = [din.start[i] for i in range(K)]
+        end = [din.end[i] for i in range(K)]
+
+        # resolve the lane for each segment
+        idx_t = Bits(log2ceil(K))
+        # the lane of the last frame which started on input
+        cur = self._reg("cur", idx_t, def_val=K - 1)
+        seg_lane = []
+        lane_i = cur
+        for i, s in enumerate(segs):
+            lane_next = self._sig(f"seg{i:d}_lane", idx_t)
+            If(s.occ & start[i],
+               lane_next(self._lane_index_add(lane_i, 1))
+            ).Else(
+               lane_next(lane_i)
+            )
+            seg_lane.append(lane_next)
+            lane_i = lane_next
+
+        din_ack = rename_signal(self, din.valid & din.ready, "din_ack")
+        If(din_ack,
+           cur(lane_i)
+        )
+
+        lane_fin = []
+        for L, dout in enumerate(self.dataOut):
+            sel = [rename_signal(self, s.occ & l._eq(L), f"lane{L:d}_seg{i:d}_sel")
+                   for i, (s, l) in enumerate(zip(segs, seg_lane))]
+            piece_vld = Or(*sel)
+            piece_end = rename_signal(self, Or(*(s & e for s, e in zip(sel, end))), f"lane{L:d}_piece_end")
+
+            # the segments of this lane shifted to the index 0
+            piece = [_Segment.new_sig(self, f"lane{L:d}_piece{j:d}", SEG_W) for j in range(K)]
+            SwitchLogic(
+                [
+                    # the first segment of this lane is on index ps
+                    (sel[ps], [
+                        p(_Segment(segs[ps + j].data,
+                                   sel[ps + j]._ternary(segs[ps + j].keep, Bits(SEG_B).from_py(0)),
+                                   sel[ps + j])
+                          if ps + j < K else _Segment.empty(SEG_W))
+                        for j, p in enumerate(piece)
+                    ])
+                    for ps in range(K)
+                ],
+                default=[p(_Segment.empty(SEG_W)) for p in piece]
+            )
+
+            # the segments of the frame which do not fit to the last output word
+            buf_data = self._reg(f"lane{L:d}_buf_data", Bits(SEG_W * (K - 1)))
+            buf_keep = self._reg(f"lane{L:d}_buf_keep", Bits(SEG_B * (K - 1)))
+            buf_occ = [self._reg(f"lane{L:d}_buf_occ{i:d}", def_val=0) for i in range(K - 1)]
+            # the buffer contains the last segments of the frame
+            buf_last = self._reg(f"lane{L:d}_buf_last", def_val=0)
+            buf = [_Segment(d, k, o)
+                   for d, k, o in zip(_split_segments(buf_data, K - 1),
+                                      _split_segments(buf_keep, K - 1),
+                                      buf_occ)]
+
+            # buffer + piece
+            comb = [_Segment.new_sig(self, f"lane{L:d}_comb{i:d}", SEG_W) for i in range(2 * K - 1)]
+            for i, c in enumerate(comb):
+                cases = []
+                for b in range(K):
+                    # the buffer contains b segments
+                    if b == 0:
+                        b_cond = ~buf_occ[0]
+                    elif b == K - 1:
+                        b_cond = buf_occ[-1]
+                    else:
+                        b_cond = buf_occ[b - 1] & ~buf_occ[b]
+
+                    if i < b:
+                        src = buf[i]
+                    elif i - b < K:
+                        src = piece[i - b]
+                    else:
+                        src = _Segment.empty(SEG_W)
+                    cases.append((b_cond, c(src)))
+                SwitchLogic(cases, default=c(_Segment.empty(SEG_W)))
+
+            done = self._reg(f"lane{L:d}_done", def_val=0)
+            has_piece = rename_signal(self, din.valid & piece_vld & ~done, f"lane{L:d}_has_piece")
+            emit = comb[K - 1].occ | piece_end
+            dout.valid(buf_last | (has_piece & emit))
+            dout_masks = _lane_masks(dout)
+            If(buf_last,
+               dout.data(Concat(Bits(SEG_W).from_py(None), buf_data)),
+               [m(Concat(Bits(SEG_B).from_py(0), buf_keep)) for m in dout_masks],
+               dout.last(1),
+            ).Else(
+               dout.data(Concat(*reversed([c.data for c in comb[:K]]))),
+               [m(Concat(*reversed([c.keep for c in comb[:K]]))) for m in dout_masks],
+               dout.last(piece_end & ~comb[K].occ),
+            )
+
+            take = rename_signal(self, has_piece & ~buf_last & (~emit | dout.ready), f"lane{L:d}_take")
+
+            def buf_load(src: List[_Segment]):
+                return [
+                    buf_data(Concat(*reversed([s.data for s in src]))),
+                    buf_keep(Concat(*reversed([s.keep for s in src]))),
+                    [o(s.occ) for o, s in zip(buf_occ, src)],
+                ]
+
+            If(buf_last,
+                If(dout.ready,
+                   [o(0) for o in buf_occ],
+                   buf_last(0),
+                )
+            ).Elif(take,
+                If(emit,
+                   buf_load(comb[K:]),
+                   buf_last(piece_end & comb[K].occ),
+                ).Else(
+                   buf_load(comb[:K - 1]),
+                )
+            )
+
+            If(din_ack,
+               done(0)
+            ).Elif(take,
+               done(1)
+            )
+            lane_fin.append(~has_piece | take)
+
+        din.ready(And(*lane_fin))
+
+
+class AxiS_lanesToSegmented(AxiS_segmentedBase):
+    """
+    Pack the frames from SEGMENT_CNT lanes to :class:`~.AxiStreamSegmented`,
+    the frames are taken from lanes in round-robin fashion (the frame i is taken from lane i % SEGMENT_CNT).
+    (Inverse of :class:`~.AxiS_segmentedToLanes`)
+
+    The frame starts in the first free segment after previous frame, the segments
+    which do not fit to the output beat are stored in a carry register and they are send
+    in the next beat. The output beat is send if there is not a next frame available
+    (the rest of the segments is disabled).
+
+    :note: the last word of the frame has to contain at least a single valid byte
+
+    .. hwt-autodoc::
+    """
+
+    def _declr(self):
+        super(AxiS_lanesToSegmented, self)._declr()
+        self.dataIn = self._mk_lanes()
+        self.dataOut = self._mk_segmented()._m()
+
+    def _lane_word(self, lane: AxiStream) -> Tuple[List[_Segment], RtlSignal]:
+        """
+        :return: tuple (segments, number of used segments)
+        """
+        K = self.SEGMENT_CNT
+        SEG_B = self.SEG_W // 8
+        masks = _lane_masks(lane)
+        if masks:
+            keep = _split_segments(masks[0], K)
+        else:
+            keep = [Bits(SEG_B).from_py(mask(SEG_B)) for _ in range(K)]
+        # the words which are not last are always full
+        segs = [_Segment(d, k, ~lane.last | ~k._eq(0))
+                for d, k in zip(_split_segments(lane.data, K), keep)]
+
+        pos_t = Bits(log2ceil(2 * K))
+        n = self._sig(f"{lane._name:s}_seg_cnt", pos_t)
+        SwitchLogic([
+                (segs[i].occ, n(i + 1))
+                for i in reversed(range(K))
+            ],
+            default=n(0)
+        )
+        return segs, n
+
+    def _impl(self):
+        K = self.SEGMENT_CNT
+        SEG_W = self.SEG_W
+        SEG_B = SEG_W // 8
+        dout = self.dataOut
+        idx_t = Bits(log2ceil(K))
+        pos_t = Bits(log2ceil(2 * K))
+
+        # the lane of next word
+        cur = self._reg("cur", idx_t, def_val=0)
+        # the segments of the last word which did not fit in to previous beat
+        carry_data = self._reg("carry_data", Bits(SEG_W * (K - 1)))
+        carry_keep = self._reg("carry_keep", Bits(SEG_B * (K - 1)))
+        carry_len = self._reg("carry_len", pos_t, def_val=0)
+        carry_last = self._reg("carry_last", def_val=0)
+        carry = [
+            _Segment(d, k, None)
+            for d, k in zip(_split_segments(carry_data, K - 1), _split_segments(carry_keep, K - 1))
+        ]
+
+        lane_words = [self._lane_word(lane) for lane in self.dataIn]
+        is_first = []
+        for L, lane in enumerate(self.dataIn):
+            f = self._reg(f"lane{L:d}_is_first", def_val=1)
+            If(lane.valid & lane.ready,
+               f(lane.last)
+            )
+            is_first.append(f)
+
+        # resolve the words which are placed in to this output beat,
+        # the element j is a word from the lane cur + j
+        elements = []
+        p = carry_len
+        prev_en = None
+        for j in range(K):
+            name = f"el{j:d}"
+            lane_i = rename_signal(self, self._lane_index_add(cur, j), f"{name:s}_lane")
+            vld = self._sig(f"{name:s}_vld")
+            last = self._sig(f"{name:s}_last")
+            first = self._sig(f"{name:s}_first")
+            n = self._sig(f"{name:s}_seg_cnt", pos_t)
+            segs = [_Segment.new_sig(self, f"{name:s}_seg{i:d}", SEG_W) for i in range(K)]
+            SwitchLogic(
+                [
+                    (lane_i._eq(L), [
+                        vld(lane.valid),
+                        last(lane.last),
+                        first(is_first[L]),
+                        n(lane_n),
+                        [s(lane_s) for s, lane_s in zip(segs, lane_segs)],
+                    ])
+                    for L, (lane, (lane_segs, lane_n)) in enumerate(zip(self.dataIn, lane_words))
+                ],
+                default=[
+                    vld(0),
+                    last(None),
+                    first(None),
+                    n(None),
+                    [s(_Segment.empty(SEG_W)) for s in segs]
+                ]
+            )
+            pos = rename_signal(self, p, f"{name:s}_pos")
+            if prev_en is None:
+                en = vld
+            else:
+                prev_last = elements[-1][3]
+                # previous frame ended and there is a space for next frame
+                en = prev_en & prev_last & (pos < K) & vld
+            en = rename_signal(self, en, f"{name:s}_en")
+            elements.append((en, pos, lane_i, last, first, n, segs))
+            p = pos + n
+            prev_en = en
+
+        carry_vld = ~carry_len._eq(0)
+        dout.valid(elements[0][0] | (carry_vld & carry_last))
+
+        data = []
+        keep = []
+        en = []
+        start = []
+        end = []
+        for k in range(K):
+            s = _Segment.new_sig(self, f"dout_seg{k:d}", SEG_W)
+            s_start = self._sig(f"dout_seg{k:d}_start")
+            s_end = self._sig(f"dout_seg{k:d}_end")
+            cases = []
+            if k < K - 1:
+                cases.append(
+                    (carry_len > k, [
+                        s(_Segment(carry[k].data, carry[k].keep, 1)),
+                        s_start(0),
+                        s_end(carry_last & carry_len._eq(k + 1)),
+                    ])
+                )
+            for el_en, el_pos, _, el_last, el_first, el_n, el_segs in reversed(elements):
+                for pos in range(k + 1):
+                    rel = k - pos
+                    occ = el_segs[rel].occ
+                    cases.append(
+                        (el_en & el_pos._eq(pos), [
+                            s(_Segment(el_segs[rel].data, occ._ternary(el_segs[rel].keep, Bits(SEG_B).from_py(0)), occ)),
+                            s_start(occ & el_first if rel == 0 else 0),
+                            s_end(occ & el_last & el_n._eq(rel + 1)),
+                        ])
+                    )
+            SwitchLogic(cases, default=[s(_Segment.empty(SEG_W)), s_start(0), s_end(0)])
+            data.append(s.data)
+            keep.append(s.keep)
+            en.append(s.occ)
+            start.append(s_start)
+            end.append(s_end)
+
+        dout.data(Concat(*reversed(data)))
+        dout.keep(Concat(*reversed(keep)))
+        dout.en(Concat(*reversed(en)))
+        dout.start(Concat(*reversed(start)))
+        dout.end(Concat(*reversed(end)))
+
+        for L, lane in enumerate(self.dataIn):
+            lane.ready(dout.ready & Or(*(el_en & el_lane._eq(L)
+                                         for el_en, _, el_lane, *_ in elements)))
+
+        # the last element in this beat may not fit and the rest of it has to be stored in carry
+        carry_cases = []
+        for el_en, el_pos, _, el_last, _, el_n, el_segs in reversed(elements):
+            end_pos = el_pos + el_n
+            carry_cases.append((el_en, [
+                If(end_pos > K,
+                   carry_len(end_pos - K),
+                   SwitchLogic([
+                       (el_pos._eq(pos), [
+                           carry_data(Concat(*reversed([
+                               el_segs[K - pos + i].data if i < pos else Bits(SEG_W).from_py(None)
+                               for i in range(K - 1)
+                           ]))),
+                           carry_keep(Concat(*reversed([
+                               el_segs[K - pos + i].keep if i < pos else Bits(SEG_B).from_py(0)
+                               for i in range(K - 1)
+                           ]))),
+                       ])
+                       for pos in range(1, K)
+                   ]),
+                ).Else(
+                   carry_len(0),
+                ),
+                carry_last(el_last),
+            ]))
+
+        # number of frames which were finished in this beat
+        cur_cases = [
+            (el_en & el_last, cur(self._lane_index_add(cur, j + 1)))
+            for j, (el_en, _, _, el_last, *_) in reversed(list(enumerate(elements)))
+        ]
+        If(dout.valid & dout.ready,
+           SwitchLogic(carry_cases, default=[carry_len(0), carry_last(0)]),
+           SwitchLogic(cur_cases),
+        )
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = AxiS_segmentedToLanes()
+    u.DATA_WIDTH = 64
+    print(to_rtl_str(u))
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.simulator.simTestCase import SimTestCase
+from hwtLib.amba.axis import axis_send_bytes, axis_recieve_bytes
+from hwtLib.amba.axis_comp.segmented_lanes import AxiS_segmentedToLanes, \
+    AxiS_lanesToSegmented
+from hwtLib.amba.axis_segmented import axis_segmented_send_bytes, \
+    axis_segmented_recieve_bytes
+from hwtSimApi.constants import CLK_PERIOD
+
+
+class AxiS_segmentedToLanes_2x2B_TC(SimTestCase):
+    SEGMENT_CNT = 2
+    SEG_B = 2
+
+    def _rand_frames(self, N, max_len=None):
+        if max_len is None:
+            max_len = 3 * self.SEGMENT_CNT * self.SEG_B
+        return [[self._rand.getrandbits(8) for _ in range(self._rand.randint(1, max_len))]
+                for _ in range(N)]
+
+    def _test_to_lanes(self, N, randomized):
+        u = AxiS_segmentedToLanes()
+        u.SEGMENT_CNT = self.SEGMENT_CNT
+        u.DATA_WIDTH = self.SEG_B * 8 * self.SEGMENT_CNT
+        self.compileSimAndStart(u)
+
+        frames = self._rand_frames(N)
+        axis_segmented_send_bytes(u.dataIn, frames, self._rand)
+        t = len(u.dataIn._ag.data) * 2 + 20
+        if randomized:
+            self.randomize(u.dataIn)
+            for dout in u.dataOut:
+                self.randomize(dout)
+            t *= 4
+        self.runSim(t * CLK_PERIOD)
+
+        for L, dout in enumerate(u.dataOut):
+            for f in frames[L::self.SEGMENT_CNT]:
+                offset, data = axis_recieve_bytes(dout)
+                self.assertEqual(offset, 0)
+                self.assertValSequenceEqual(data, f)
+            self.assertEmpty(dout._ag.data)
+
+    def _test_to_segmented(self, N, randomized):
+        u = AxiS_lanesToSegmented()
+        u.SEGMENT_CNT = self.SEGMENT_CNT
+        u.DATA_WIDTH = self.SEG_B * 8 * self.SEGMENT_CNT
+        self.compileSimAndStart(u)
+
+        frames = self._rand_frames(N)
+        for L, din in enumerate(u.dataIn):
+            for f in frames[L::self.SEGMENT_CNT]:
+                axis_send_bytes(din, f)
+        t = sum(len(din._ag.data) for din in u.dataIn) + 20
+        if randomized:
+            self.randomize(u.dataOut)
+            for din in u.dataIn:
+                self.randomize(din)
+            t *= 4
+        self.runSim(t * CLK_PERIOD)
+
+        self.assertSequenceEqual(axis_segmented_recieve_bytes(u.dataOut), frames)
+
+    def test_to_lanes_nop(self):
+        self._test_to_lanes(0, False)
+
+    def test_to_lanes(self):
+        self._test_to_lanes(30, False)
+
+    def test_to_lanes_small_frames(self):
+        u = AxiS_segmentedToLanes()
+        u.SEGMENT_CNT = self.SEGMENT_CNT
+        u.DATA_WIDTH = self.SEG_B * 8 * self.SEGMENT_CNT
+        self.compileSimAndStart(u)
+
+        # a frame in each segment of each beat
+        frames = self._rand_frames(8 * self.SEGMENT_CNT, max_len=self.SEG_B)
+        axis_segmented_send_bytes(u.dataIn, frames)
+        # all frames have to be transfered in 8 clock cycles (+ reset and latency)
+        self.runSim((8 + 3) * CLK_PERIOD)
+
+        for L, dout in enumerate(u.dataOut):
+            for f in frames[L::self.SEGMENT_CNT]:
+                offset, data = axis_recieve_bytes(dout)
+                self.assertEqual(offset, 0)
+                self.assertValSequenceEqual(data, f)
+
+    def test_r_to_lanes(self):
+        self._test_to_lanes(30, True)
+
+    def test_to_segmented_nop(self):
+        self._test_to_segmented(0, False)
+
+    def test_to_segmented(self):
+        self._test_to_segmented(30, False)
+
+    def test_r_to_segmented(self):
+        self._test_to_segmented(30, True)
+
+    def test_to_segmented_small_frames(self):
+        u = AxiS_lanesToSegmented()
+        u.SEGMENT_CNT = self.SEGMENT_CNT
+        u.DATA_WIDTH = self.SEG_B * 8 * self.SEGMENT_CNT
+        self.compileSimAndStart(u)
+
+        frames = self._rand_frames(8 * self.SEGMENT_CNT, max_len=self.SEG_B)
+        for L, din in enumerate(u.dataIn):
+            for f in frames[L::self.SEGMENT_CNT]:
+                axis_send_bytes(din, f)
+        self.runSim((8 + 10) * CLK_PERIOD)
+
+        # a frame in each segment of each beat
+        self.assertEqual(len(u.dataOut._ag.data), 8)
+        self.assertSequenceEqual(axis_segmented_recieve_bytes(u.dataOut), frames)
+
+
+class AxiS_segmentedToLanes_3x1B_TC(AxiS_segmentedToLanes_2x2B_TC):
+    SEGMENT_CNT = 3
+    SEG_B = 1
+
+
+class AxiS_segmentedToLanes_4x2B_TC(AxiS_segmentedToLanes_2x2B_TC):
+    SEGMENT_CNT = 4
+    SEG_B = 2
+
+
+AxiS_segmentedToLanes_TCs = [
+    AxiS_segmentedToLanes_2x2B_TC,
+    AxiS_segmentedToLanes_3x1B_TC,
+    AxiS_segmentedToLanes_4x2B_TC,
+]
+
+if __name__ == "__main__":
+    import unittest
+    suite = unittest.TestSuite()
+    # suite.addTest(AxiS_segmentedToLanes_2x2B_TC('test_to_lanes'))
+    for tc in AxiS_segmentedToLanes_TCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
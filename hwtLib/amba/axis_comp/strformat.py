@@ -1,7 +1,8 @@
 from typing import Dict, Tuple, List, Union, Optional
 
 from hdlConvertorAst.to.hdlUtils import iter_with_last
-from hwt.code import If, Switch, SwitchLogic, Or
+from hwt.code import If, Switch, SwitchLogic, Or, Concat
+from hwt.code_utils import rename_signal
 from hwt.hdl.statement import HdlStatement
 from hwt.hdl.typeShortcuts import hBit
 from hwt.hdl.types.bits import Bits
@@ -21,6 +22,7 @@ from hwt.synthesizer.vectorUtils import fitTo
 from hwtLib.amba.axis import AxiStream
 from hwtLib.logic.binToBcd import BinToBcd
 from hwtLib.types.ctypes import uint32_t
+from pyMathBitPrecise.bit_utils import mask
 
 
 class AxiS_strFormatItem():
@@ -67,6 +69,14 @@ class AxiS_strFormatItem():
 
 
 class HdlType_to_Interface_with_AxiStream(HdlType_to_Interface):
+    """
+    :ivar DATA_WIDTH: data width of AxiStream interfaces for HStream types,
+        if > 8 the stream has a keep signal (the bytes have to be aligned to the start of the word)
+    """
+
+    def __init__(self, DATA_WIDTH=8):
+        super(HdlType_to_Interface_with_AxiStream, self).__init__()
+        self.DATA_WIDTH = DATA_WIDTH
 
     def apply(self, dtype: HdlType, field_path: Optional[TypePath]=None) -> Interface:
         """
@@ -77,7 +87,8 @@ class HdlType_to_Interface_with_AxiStream(HdlType_to_Interface):
             assert dtype.start_offsets == (0,), dtype.start_offsets
             assert dtype.len_min >= 1, dtype
             i = AxiStream()
-            i.DATA_WIDTH = 8
+            i.DATA_WIDTH = self.DATA_WIDTH
+            i.USE_KEEP = self.DATA_WIDTH > 8
         else:
             i = super(HdlType_to_Interface_with_AxiStream, self).apply(dtype, field_path)
         return i
@@ -92,8 +103,20 @@ class AxiS_strFormat(Unit):
 
     :note: use :func:`hwtLib.amba.axis_comp.strformat_fn.axiS_strFormat` to generate instance
         of this component from normal string format string and argument
+    :note: If DATA_WIDTH > 8 the component produces multiple characters per clock cycle
+        and the data_out has a keep signal, see :meth:`~._impl_wide`.
+        The input strings then also have DATA_WIDTH and keep signal.
     """
 
+    # names for tables for translation of digits to a chars (names of signals can not depend on a char case)
+    DIGIT_TABLE_NAMES = {
+        'b': "bin",
+        'o': "oct",
+        'd': "dec",
+        'x': "hex",
+        'X': "hex_upper",
+    }
+
     def _config(self):
         self.DATA_WIDTH = Param(8)
         self.FORMAT = Param((
@@ -111,17 +134,22 @@ class AxiS_strFormat(Unit):
         addClkRstn(self)
         if self.INPUT_T is not None:
             # if INPUT_T is none it menas that the component is configured to print a costant string.
-            self.data_in = HdlType_to_Interface_with_AxiStream().apply(self.INPUT_T)
+            self.data_in = HdlType_to_Interface_with_AxiStream(self.DATA_WIDTH).apply(self.INPUT_T)
         # filter out emplty strings
         self.FORMAT = tuple(f for f in self.FORMAT if not isinstance(f, str) or f)
         assert self.FORMAT, "Need to have something to print"
 
+        assert self.DATA_WIDTH % 8 == 0, self.DATA_WIDTH
         with self._paramsShared():
             self.data_out = AxiStream()._m()
+        self.data_out.USE_KEEP = self.DATA_WIDTH > 8
 
-    def build_string_rom(self):
+    def build_string_rom(self, align: int=1):
         """
         Collect all const strings and char translation tables and pack them in to a content of string rom
+
+        :param align: the alignment of the start of the strings in the rom (in bytes),
+            the strings are padded with 0 to a multiple of this value
         """
 
         # offset of tables for translation to a char
@@ -169,6 +197,8 @@ class AxiS_strFormat(Unit):
         last_end = 0
         for i, s in sorted(strings.items(), key=lambda x: x[0]):
             strings_offset_and_size[i] = (last_end, len(s))
+            padding = (align - len(s) % align) % align
+            s = s + bytes(padding)
             _string_rom.append(s)
             last_end += len(s)
         for f_char, table in sorted(digit_translation_tables.items(), key=lambda x: x[0]):
@@ -180,16 +210,24 @@ class AxiS_strFormat(Unit):
 
         return _string_rom, strings_offset_and_size, max_chars_per_format, max_bcd_digits
 
-    def create_char_mux(self, in_, out_, char_i, digits, bits_per_digit):
+    def create_char_mux(self, in_, out_, char_i, digits, bits_per_digit,
+                        chars_per_word=1, char_offset=0):
         """
         Create a MUX which select the degit from input vector.
         Also perform necessary type casting for corner cases.
+
+        :param chars_per_word: number of characters in a single output word,
+            if > 1 the char_i is an index of the word
+        :param char_offset: index of the character in the output word
         """
         in_w = in_._dtype.bit_length()
-        Switch(char_i)\
-        .add_cases([
-            (digits - i - 1,
-             out_(
+        cases = []
+        for word_i in range((digits - char_offset + chars_per_word - 1) // chars_per_word):
+            # index of the digit from the least significant one
+            i = digits - (word_i * chars_per_word + char_offset) - 1
+            cases.append((
+                word_i,
+                out_(
                     fitTo(
                         in_[min((i + 1) * bits_per_digit, in_w): i * bits_per_digit],
                         out_,
@@ -200,8 +238,9 @@ class AxiS_strFormat(Unit):
                 if i * bits_per_digit < in_w else
                 # case where there are more digits than in the input domain
                 out_(0)
-            )
-            for i in range(digits)])\
+            ))
+        Switch(char_i)\
+        .add_cases(cases)\
         .Default(out_(None))
         # default branch should not be used as counter should not get to such a value
 
@@ -282,12 +321,294 @@ class AxiS_strFormat(Unit):
 
         return res, in_vld, in_last,
 
+    def connect_single_format_group_wide(self,
+                                         f_i: int,
+                                         f: Union[str, AxiS_strFormatItem],
+                                         strings_offset_and_size: Dict[Union[int, str], Tuple[int, int]],
+                                         string_rom: RtlSignal,
+                                         digit_tables: Dict[str, RtlSignal],
+                                         chunk_i: RtlSignal,
+                                         to_bcd_inputs: List[Tuple[RtlSignal, HdlStatement]],
+                                         en: RtlSignal,
+                                         chunk_rd: RtlSignal,
+                                         chunk_data: List[RtlSignal],
+                                         chunk_cnt: RtlSignal):
+        """
+        Same as :meth:`~.connect_single_format_group` just produces a chunk of up to DATA_WIDTH // 8
+        characters per clock cycle. (:see: :meth:`~._impl_wide`)
+        """
+        W = len(chunk_data)
+        in_vld = hBit(1)
+        res = []
+        in_last = None
+        if isinstance(f, str):
+            str_offset, str_size = strings_offset_and_size[f_i]
+            # the strings in string_rom are aligned to a word
+            string_rom_index_t = Bits(log2ceil(string_rom._dtype.size), signed=False)
+            str_offset = string_rom_index_t.from_py(str_offset // W)
+            w = string_rom[str_offset + fitTo(chunk_i, str_offset, shrink=False)]
+            for i, d in enumerate(chunk_data):
+                res.append(d(w[(i + 1) * 8:i * 8]))
+        else:
+            assert isinstance(f, AxiS_strFormatItem), f
+            in_ = self.data_in._fieldsToInterfaces[f.member_path]
+
+            if f.format_type in ('d', 'b', 'o', 'x', 'X'):
+                str_size = f.digits
+                if  f.format_type == 'd':
+                    # first use BCD convertor to convert to BCD
+                    to_bcd_inputs.append((en, in_))
+                    bcd = self.bin_to_bcd.dout
+                    in_vld = bcd.vld
+                    bcd.rd(chunk_rd & en & chunk_i._eq((str_size + W - 1) // W - 1))
+                    in_ = bcd.data
+
+                bits_per_char = AxiS_strFormatItem.BITS_PER_CHAR[f.format_type]
+                table = digit_tables[f.format_type]
+                for i, d in enumerate(chunk_data):
+                    if i >= str_size:
+                        res.append(d(None))
+                        continue
+                    actual_digit = self._sig(f"f_{f_i}_actual_digit_{i:d}", Bits(bits_per_char))
+                    # iterate output digits using chunk_i
+                    self.create_char_mux(in_, actual_digit, chunk_i, f.digits, bits_per_char, W, i)
+                    res.append(
+                        # use char translation table to translate digit in to a char
+                        d(table[actual_digit])
+                    )
+            else:
+                # connect a string from an input AxiStream
+                assert f.format_type == 's', f.format_type
+                assert in_.DATA_WIDTH == W * 8, (in_.DATA_WIDTH, W)
+                assert in_.USE_STRB == False, in_.USE_STRB
+                assert in_.USE_KEEP == True, in_.USE_KEEP
+
+                in_vld = in_.valid
+                in_.ready(chunk_rd & en)
+                for i, d in enumerate(chunk_data):
+                    res.append(d(in_.data[(i + 1) * 8:i * 8]))
+                # the bytes are aligned to the start of the word
+                res.append(
+                    Switch(in_.keep)\
+                    .add_cases((mask(i + 1), chunk_cnt(i + 1)) for i in range(W))\
+                    .Default(chunk_cnt(None))
+                )
+                in_last = in_.last
+
+        if in_last is None:
+            # if signal to detect last character is not overriden use conter to resolve it
+            chunk_cnt_last = str_size - ((str_size + W - 1) // W - 1) * W
+            last_chunk_i = (str_size + W - 1) // W - 1
+            in_last = chunk_i._eq(last_chunk_i)
+            if last_chunk_i == 0:
+                res.append(chunk_cnt(chunk_cnt_last))
+            else:
+                res.append(
+                    If(in_last,
+                       chunk_cnt(chunk_cnt_last)
+                    ).Else(
+                       chunk_cnt(W)
+                    )
+                )
+
+        return res, in_vld, in_last,
+
+    def _impl_chunk_packer(self, chunk_vld: RtlSignal, chunk_rd: RtlSignal,
+                           chunk_data: List[RtlSignal], chunk_cnt: RtlSignal,
+                           chunk_last: RtlSignal):
+        """
+        Pack the chunks of characters in to output words.
+        The bytes which do not fill the whole word are stored in buffer and joined with next chunk.
+
+        :param chunk_data: list of bytes of the chunk, the chunk_cnt bytes from the start are valid
+        :param chunk_cnt: number of valid bytes in chunk (>= 1)
+        :param chunk_last: the chunk is the last chunk of the output string
+        """
+        dout = self.data_out
+        W = len(chunk_data)
+        byte_t = Bits(8)
+        cnt_t = chunk_cnt._dtype
+        total_t = Bits(cnt_t.bit_length() + 1, signed=False)
+
+        buf = [self._reg(f"pack_buf_{i:d}", byte_t) for i in range(W - 1)]
+        buf_cnt = self._reg("pack_buf_cnt", cnt_t, def_val=0)
+        # the buffer contains the rest of the last chunk and the output word with it has to be send
+        buf_flush = self._reg("pack_buf_flush", def_val=0)
+
+        total = self._sig("pack_total", total_t)
+        total(fitTo(buf_cnt, total, shrink=False) + fitTo(chunk_cnt, total, shrink=False))
+        full = rename_signal(self, total >= W, "pack_full")
+
+        # the bytes from buffer followed by the bytes of the chunk
+        joined = []
+        for k in range(2 * W - 1):
+            j = self._sig(f"pack_joined_{k:d}", byte_t)
+            cases = []
+            for b in range(W):
+                if k < b:
+                    v = buf[k]
+                elif k - b < W:
+                    v = chunk_data[k - b]
+                else:
+                    v = None
+                cases.append((b, j(v)))
+            Switch(buf_cnt).add_cases(cases).Default(j(None))
+            joined.append(j)
+
+        keep_cnt = self._sig("pack_keep_cnt", total_t)
+        absorb = chunk_vld & ~full & ~chunk_last
+        If(buf_flush,
+            chunk_rd(0),
+            dout.valid(1),
+            dout.last(1),
+            dout.data(Concat(byte_t.from_py(None), *reversed(buf))),
+            keep_cnt(fitTo(buf_cnt, keep_cnt, shrink=False)),
+            If(dout.ready,
+               buf_flush(0),
+               buf_cnt(0),
+            )
+        ).Else(
+            chunk_rd(dout.ready | absorb),
+            dout.valid(chunk_vld & (full | chunk_last)),
+            dout.last(chunk_last & (total <= W)),
+            dout.data(Concat(*reversed(joined[:W]))),
+            If(full,
+               keep_cnt(W)
+            ).Else(
+               keep_cnt(total)
+            ),
+            If(chunk_vld & (dout.ready | absorb),
+                If(full,
+                   *(b(j) for b, j in zip(buf, joined[W:])),
+                   buf_cnt((total - W)[cnt_t.bit_length():]),
+                   buf_flush(chunk_last & (total != W)),
+                ).Elif(chunk_last,
+                   buf_cnt(0),
+                ).Else(
+                   *(b(j) for b, j in zip(buf, joined)),
+                   buf_cnt(total[cnt_t.bit_length():]),
+                )
+            )
+        )
+        Switch(keep_cnt)\
+            .add_cases((i, dout.keep(mask(i))) for i in range(W))\
+            .Default(dout.keep(mask(W)))
+
+    def _impl_wide(self) -> None:
+        """
+        The implementation for DATA_WIDTH > 8 which produces multiple characters per clock cycle.
+
+        Each format group produces a chunk of up to DATA_WIDTH // 8 characters per clock cycle.
+        The constant strings are aligned to a word in string_rom so the chunk is a single word of the rom.
+        The digits of the numbers are translated in parallel and the BCD is read as a whole.
+        The chunks are then packed in to the output words (:meth:`~._impl_chunk_packer`),
+        the keep signal masks out the unused bytes of the last word.
+        """
+        W = self.DATA_WIDTH // 8
+        _string_rom, strings_offset_and_size, max_chars_per_format, max_bcd_digits = self.build_string_rom(W)
+        # instanciate bin_to_bcd if required
+        if max_bcd_digits > 0:
+            bin_to_bcd = BinToBcd()
+            bin_to_bcd.INPUT_WIDTH = log2ceil(10 ** max_bcd_digits - 1)
+            self.bin_to_bcd = bin_to_bcd
+        # tuples (cond, input)
+        to_bcd_inputs = []
+
+        # the tables for translation of digits to a chars are separated as they need a read port for each char
+        digit_tables = {}
+        strings_end = 0
+        for k, (offset, size) in strings_offset_and_size.items():
+            if isinstance(k, str):
+                name = self.DIGIT_TABLE_NAMES[k]
+                digit_tables[k] = self._sig(f"digit_table_{name:s}", Bits(8)[size],
+                                            def_val=[int(c) for c in _string_rom[offset:offset + size]])
+            else:
+                strings_end = max(strings_end, offset + size)
+        strings_end = (strings_end + W - 1) // W
+        if strings_end > 0:
+            word_t = Bits(self.DATA_WIDTH)
+            string_rom = self._sig("string_rom", word_t[strings_end],
+                                   def_val=[int.from_bytes(_string_rom[i * W:(i + 1) * W], "little")
+                                            for i in range(strings_end)])
+        else:
+            string_rom = None
+
+        max_chunks_per_format = (max_chars_per_format + W - 1) // W
+        chunk_i = self._reg("chunk_i", Bits(log2ceil(max_chunks_per_format), signed=False), def_val=0)
+        chunk_rd = self._sig("chunk_rd")
+        chunk_data = [self._sig(f"chunk_data_{i:d}", Bits(8)) for i in range(W)]
+        chunk_cnt = self._sig("chunk_cnt", Bits(log2ceil(W + 1), signed=False))
+
+        # create an iterator over all characters
+        element_cnt = len(self.FORMAT)
+        if element_cnt == 1:
+            en = 1
+            f_i = 0
+            f = self.FORMAT[f_i]
+            _, chunk_vld, chunk_last = self.connect_single_format_group_wide(
+                f_i, f, strings_offset_and_size, string_rom, digit_tables, chunk_i,
+                to_bcd_inputs, en, chunk_rd, chunk_data, chunk_cnt)
+            chunk_i_rst = chunk_last
+        else:
+            main_st = self._reg("main_st", Bits(log2ceil(element_cnt), signed=False), def_val=0)
+            chunk_vld = hBit(0)
+            chunk_last = hBit(0)
+            chunk_i_rst = hBit(0)
+            main_st_fsm = Switch(main_st)
+            for is_last_f, (f_i, f) in iter_with_last(enumerate(self.FORMAT)):
+                en = main_st._eq(f_i)
+                data_drive, in_vld, in_last = self.connect_single_format_group_wide(
+                    f_i, f, strings_offset_and_size, string_rom, digit_tables, chunk_i,
+                    to_bcd_inputs, en, chunk_rd, chunk_data, chunk_cnt)
+                # build out vld from all input valids
+                chunk_vld = chunk_vld | (en & in_vld)
+                # keep only last of the last part
+                chunk_last = en & in_last
+                chunk_i_rst = chunk_i_rst | (en & in_last)
+                main_st_fsm.Case(
+                    f_i,
+                    If(chunk_rd & in_vld & in_last,
+                       main_st(0)
+                       if is_last_f else
+                       main_st(main_st + 1)
+                    ),
+                    *data_drive
+                )
+            main_st_fsm.Default(
+                main_st(None),
+                *(d(None) for d in chunk_data),
+                chunk_cnt(None),
+            )
+        chunk_vld = rename_signal(self, chunk_vld, "chunk_vld")
+        chunk_last = rename_signal(self, chunk_last, "chunk_last")
+
+        If(chunk_rd & chunk_vld,
+            If(chunk_i_rst,
+               chunk_i(0)
+            ).Else(
+               chunk_i(chunk_i + 1)
+            )
+        )
+        self._impl_chunk_packer(chunk_vld, chunk_rd, chunk_data, chunk_cnt, chunk_last)
+
+        if to_bcd_inputs:
+            in_ = bin_to_bcd.din
+            SwitchLogic(
+                # actual value may be smaller, because bcd is shared among
+                # multiple input formats
+                [(c, in_.data(fitTo(v, in_.data, shrink=False)))
+                 for c, v in to_bcd_inputs],
+                default=in_.data(None)
+            )
+            in_.vld(chunk_i._eq(0) & Or(*(c for c, _ in to_bcd_inputs)))
+            propagateClkRstn(self)
+
     def _impl(self) -> None:
-        _string_rom, strings_offset_and_size, max_chars_per_format, max_bcd_digits = self.build_string_rom()
         if self.DATA_WIDTH != 8:
-            # it self.DATA_WIDTH != 1B we need to handle all possible alignments and shifts, precompute some strings
-            # because number of string memory ports is limited etc.
-            raise NotImplementedError()
+            self._impl_wide()
+            return
+
+        _string_rom, strings_offset_and_size, max_chars_per_format, max_bcd_digits = self.build_string_rom()
         # instanciate bin_to_bcd if required
         if max_bcd_digits > 0:
             bin_to_bcd = BinToBcd()
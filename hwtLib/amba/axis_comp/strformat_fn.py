@@ -110,6 +110,9 @@ def axiS_strFormat(parent: Unit, name: str, data_width: int, format_str: str,
     * If nuber_of_digits starts with 0 the leading zeros will be used instead of default space char (' ')
     * The sign char is included in nuber_of_digits ('{0:04X}'.format(-1) == '-001')
     * The type is described in :class:`hwtLib.amba.axis_comp.strformat.AxiS_strFormatItem`
+
+    :note: If data_width > 8 the output and the string arguments have keep signal
+        and the string arguments have to have same data width.
     """
 
     f = AxiS_strFormat()
@@ -19,6 +19,7 @@ class _example_AxiS_strFormat_no_args(Unit):
         addClkRstn(self)
         with self._paramsShared():
             self.out = AxiStream()._m()
+        self.out.USE_KEEP = self.DATA_WIDTH > 8
 
     def _impl(self):
         o = axiS_strFormat(self, "f0", self.DATA_WIDTH, "test 1234")
@@ -70,6 +71,8 @@ class _example_AxiS_strFormat_1x_str(Unit):
         with self._paramsShared():
             self.out = AxiStream()._m()
             self.str0 = AxiStream()
+        for i in (self.out, self.str0):
+            i.USE_KEEP = self.DATA_WIDTH > 8
 
     def _impl(self):
         o = axiS_strFormat(self, "f0", self.DATA_WIDTH, "str0:{0:s}", self.str0)
@@ -84,6 +87,8 @@ class _example_AxiS_strFormat_3x_str(_example_AxiS_strFormat_1x_str):
         with self._paramsShared():
             self.str1 = AxiStream()
             self.str2 = AxiStream()
+        for i in (self.str1, self.str2):
+            i.USE_KEEP = self.DATA_WIDTH > 8
 
     def _impl(self):
         o = axiS_strFormat(self, "f0", self.DATA_WIDTH, "{0:s}{1:s}xyz{str2:s}",
@@ -93,6 +98,11 @@ class _example_AxiS_strFormat_3x_str(_example_AxiS_strFormat_1x_str):
 
 
 class AxiS_strFormat_TC(SimTestCase):
+    DATA_WIDTH = 8
+
+    def compileSimAndStart(self, u):
+        u.DATA_WIDTH = self.DATA_WIDTH
+        return super(AxiS_strFormat_TC, self).compileSimAndStart(u)
 
     def test_args_numbers(self):
         u = self.compileSimAndStart(_example_AxiS_strFormat_args_numbers())
@@ -157,10 +167,36 @@ class AxiS_strFormat_TC(SimTestCase):
             self.assertEqual(s, "{0:s}{1:s}xyz{2:s}".format(*s_ref))
 
 
+class AxiS_strFormat_32b_TC(AxiS_strFormat_TC):
+    DATA_WIDTH = 32
+
+    def test_no_args_throughput(self):
+        u = self.compileSimAndStart(_example_AxiS_strFormat_no_args())
+        self.runSim(30 * CLK_PERIOD)
+        # 3 words per frame
+        self.assertGreaterEqual(len(u.out._ag.data), 27)
+        while len(u.out._ag.data) >= 3:
+            frame = axis_recieve_bytes(u.out)
+            s = bytes(frame[1]).decode("utf-8")
+            self.assertEqual(s, 'test 1234')
+
+
+class AxiS_strFormat_64b_TC(AxiS_strFormat_TC):
+    DATA_WIDTH = 64
+
+
+AxiS_strFormat_TCs = [
+    AxiS_strFormat_TC,
+    AxiS_strFormat_32b_TC,
+    AxiS_strFormat_64b_TC,
+]
+
+
 if __name__ == "__main__":
     suite = unittest.TestSuite()
     # suite.addTest(AxiS_strFormat_TC('test_args_numbers'))
-    suite.addTest(unittest.makeSuite(AxiS_strFormat_TC))
+    for tc in AxiS_strFormat_TCs:
+        suite.addTest(unittest.makeSuite(tc))
     runner = unittest.TextTestRunner(verbosity=3)
     runner.run(suite)
     # from hwt.synthesizer.utils import to_rtl_str
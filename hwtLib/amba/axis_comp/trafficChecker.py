@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.code import If, Concat, Or
+from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.struct import HStruct
+from hwt.interfaces.utils import addClkRstn, propagateClkRstn
+from hwt.math import log2ceil
+from hwt.serializer.mode import serializeParamsUniq
+from hwt.synthesizer.param import Param
+from hwt.synthesizer.unit import Unit
+from hwt.synthesizer.vectorUtils import fitTo
+from hwtLib.amba.axi4Lite import Axi4Lite
+from hwtLib.amba.axiLite_comp.endpoint import AxiLiteEndpoint
+from hwtLib.amba.axis import AxiStream
+from hwtLib.amba.axis_comp.trafficGen import _cfg_reg, _status_reg, \
+    _traffic_payload, LFSR_POLY, LFSR_POLY_WIDTH, PAYLOAD_SEQ
+from hwtLib.logic.lfsr import lfsr_unroll_masks, lfsr_apply_masks
+
+
+@serializeParamsUniq
+class AxiSTrafficChecker(Unit):
+    """
+    Checker of the frames generated by :class:`hwtLib.amba.axis_comp.trafficGen.AxiSTrafficGen`
+    (the payload_mode and seed registers have to be set to same value as in generator).
+    The input is always ready, so the checker measures the line rate of the source.
+
+    * frames, bytes: the number of received frames and bytes (bytes with keep=1)
+    * seq_errors: the number of frames with unexpected sequence number (lost, duplicated
+      or reordered frames), the expected sequence number is then resynchronized
+      to the received one
+    * payload_errors: the number of frames with at least one corrupted byte
+    * cycles: the number of clock cycles while the checker is enabled
+
+    The rising edge of enable clears the counters and the expected sequence number.
+
+    .. hwt-autodoc::
+    """
+
+    def _config(self):
+        self.DATA_WIDTH = Param(64)
+        self.MAX_LEN = Param(2048)
+        self.CNTRL_ADDR_WIDTH = Param(8)
+        self.CNTRL_DATA_WIDTH = Param(32)
+
+    def _registers_t(self):
+        reg_t = Bits(self.CNTRL_DATA_WIDTH)
+        return HStruct(
+            (reg_t, "enable"),
+            (reg_t, "payload_mode"),
+            (reg_t, "seed"),
+            (reg_t, "frames"),
+            (reg_t, "bytes"),
+            (reg_t, "seq_errors"),
+            (reg_t, "payload_errors"),
+            (reg_t, "cycles"),
+        )
+
+    def _declr(self):
+        assert self.DATA_WIDTH >= LFSR_POLY_WIDTH, ("The sequence number has to fit in to a first word", self.DATA_WIDTH)
+        assert self.CNTRL_DATA_WIDTH == 32, self.CNTRL_DATA_WIDTH
+        addClkRstn(self)
+        with self._paramsShared():
+            self.axis_in = AxiStream()
+        self.axis_in.USE_KEEP = True
+
+        with self._paramsShared(prefix="CNTRL_"):
+            self.cntrl = Axi4Lite()
+            self.conv = AxiLiteEndpoint(self._registers_t())
+
+    def _impl(self):
+        propagateClkRstn(self)
+        self.conv.bus(self.cntrl)
+        regs = self.conv.decoded
+
+        DW = self.DATA_WIDTH
+        W = DW // 8
+        cntr_t = Bits(self.CNTRL_DATA_WIDTH)
+        din = self.axis_in
+
+        en = _cfg_reg(self, regs, "enable", 1)
+        payload_mode = _cfg_reg(self, regs, "payload_mode", 1, def_val=PAYLOAD_SEQ)
+        seed = _cfg_reg(self, regs, "seed", LFSR_POLY_WIDTH, def_val=1)
+
+        en_prev = self._reg("en_prev", def_val=0)
+        en_prev(en)
+        start = self._sig("start")
+        start(en & ~en_prev)
+
+        din.ready(1)
+        ack = self._sig("ack")
+        ack(din.valid)
+
+        is_first = self._reg("is_first", def_val=1)
+        word_i = self._reg("word_i", Bits(log2ceil(self.MAX_LEN // W + 1)))
+        lfsr = self._reg("lfsr", Bits(LFSR_POLY_WIDTH))
+        expected_seq = self._reg("expected_seq", cntr_t, def_val=0)
+        frame_err = self._reg("frame_err", def_val=0)
+
+        rx_seq = self._sig("rx_seq", cntr_t)
+        rx_seq(din.data[32:])
+
+        # on the first word the state of LFSR is resolved from the received sequence number
+        lfsr_cur = self._sig("lfsr_cur", lfsr._dtype)
+        If(is_first,
+           lfsr_cur(seed ^ rx_seq),
+        ).Else(
+           lfsr_cur(lfsr),
+        )
+        out_masks, next_masks = lfsr_unroll_masks(LFSR_POLY, LFSR_POLY_WIDTH, DW)
+        word_i_cur = is_first._ternary(word_i._dtype.from_py(0), word_i)
+        expected = self._sig("expected", Bits(DW))
+        expected(_traffic_payload(payload_mode, word_i_cur, lfsr_cur, out_masks, DW))
+
+        byte_err = []
+        for i in range(W):
+            err = din.keep[i] & (din.data[(i + 1) * 8:i * 8] != expected[(i + 1) * 8:i * 8])
+            if i < 4:
+                # the sequence number is checked separately
+                err = err & ~is_first
+            byte_err.append(err)
+        word_err = self._sig("word_err")
+        word_err(Or(*byte_err))
+
+        seq_err = self._sig("seq_err")
+        seq_err(ack & is_first & (rx_seq != expected_seq))
+
+        # the frame boundaries are tracked even if the checker is disabled
+        If(ack,
+           is_first(din.last),
+           word_i(word_i_cur + 1),
+           lfsr(Concat(*reversed(lfsr_apply_masks(lfsr_cur, next_masks)))),
+           frame_err(~din.last & (frame_err | word_err)),
+        )
+        If(start,
+           expected_seq(0),
+        ).Elif(ack & is_first,
+           expected_seq(rx_seq + 1),
+        )
+
+        # counters
+        frames = self._reg("frames", cntr_t, def_val=0)
+        _bytes = self._reg("bytes", cntr_t, def_val=0)
+        seq_errors = self._reg("seq_errors", cntr_t, def_val=0)
+        payload_errors = self._reg("payload_errors", cntr_t, def_val=0)
+        cycles = self._reg("cycles", cntr_t, def_val=0)
+        byte_cnt = fitTo(din.keep[0], _bytes)
+        for i in range(1, W):
+            byte_cnt = byte_cnt + fitTo(din.keep[i], _bytes)
+
+        If(start,
+           frames(0),
+           _bytes(0),
+           seq_errors(0),
+           payload_errors(0),
+           cycles(0),
+        ).Else(
+           If(en,
+              cycles(cycles + 1),
+           ),
+           If(en & ack,
+              _bytes(_bytes + byte_cnt),
+              If(din.last,
+                 frames(frames + 1),
+                 If(frame_err | word_err,
+                    payload_errors(payload_errors + 1),
+                 ),
+              ),
+              If(seq_err,
+                 seq_errors(seq_errors + 1),
+              ),
+           )
+        )
+        _status_reg(regs, "frames", frames)
+        _status_reg(regs, "bytes", _bytes)
+        _status_reg(regs, "seq_errors", seq_errors)
+        _status_reg(regs, "payload_errors", payload_errors)
+        _status_reg(regs, "cycles", cycles)
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = AxiSTrafficChecker()
+    print(to_rtl_str(u))
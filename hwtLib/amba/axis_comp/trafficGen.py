@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import List
+
+from hwt.code import If, Switch, Concat, connect
+from hwt.hdl.constants import READ_WRITE, READ
+from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.struct import HStruct
+from hwt.interfaces.structIntf import StructIntf
+from hwt.interfaces.utils import addClkRstn, propagateClkRstn
+from hwt.math import log2ceil
+from hwt.serializer.mode import serializeParamsUniq
+from hwt.synthesizer.param import Param
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwt.synthesizer.unit import Unit
+from hwt.synthesizer.vectorUtils import fitTo
+from hwtLib.amba.axi4Lite import Axi4Lite
+from hwtLib.amba.axiLite_comp.endpoint import AxiLiteEndpoint
+from hwtLib.amba.axis import AxiStream
+from hwtLib.logic.lfsr import lfsr_unroll_masks, lfsr_apply_masks
+from hwtLib.mem.ram import RamSingleClock
+from pyMathBitPrecise.bit_utils import mask
+
+# values of len_mode register
+LEN_MODE_FIXED = 0
+LEN_MODE_UNIFORM = 1
+LEN_MODE_TABLE = 2
+
+# values of payload_mode register
+PAYLOAD_SEQ = 0
+PAYLOAD_LFSR = 1
+
+# LFSR used for the payload (x^32 + x^22 + x^2 + x + 1)
+LFSR_POLY_WIDTH = 32
+LFSR_POLY = 0x80200003
+
+
+def _cfg_reg(parent: Unit, regs: StructIntf, name: str, width: int, def_val=0) -> RtlSignal:
+    """
+    Create a register which is writable and readable from the AXI-lite endpoint
+    """
+    r = parent._reg(name, Bits(width), def_val=def_val)
+    intf = getattr(regs, name)
+    If(intf.dout.vld,
+       connect(intf.dout.data, r, fit=True)
+    )
+    connect(r, intf.din, fit=True)
+    return r
+
+
+def _status_reg(regs: StructIntf, name: str, val: RtlSignal):
+    """
+    Connect the value to a read-only register of the AXI-lite endpoint
+    """
+    connect(val, getattr(regs, name).din, fit=True)
+
+
+def _traffic_payload(payload_mode: RtlSignal, word_i: RtlSignal,
+                     lfsr: RtlSignal, lfsr_out_masks: List[int], DATA_WIDTH: int) -> RtlSignal:
+    """
+    :return: the expected data of the word of the frame (without the sequence number)
+    """
+    lfsr_data = Concat(*reversed(lfsr_apply_masks(lfsr, lfsr_out_masks)))
+    seq_data = fitTo(word_i, lfsr_data, shrink=False)
+    return payload_mode._eq(PAYLOAD_LFSR)._ternary(lfsr_data, seq_data)
+
+
+def _bits_to_int(bits: List[int]) -> int:
+    v = 0
+    for i, b in enumerate(bits):
+        v |= b << i
+    return v
+
+
+def traffic_frame_py(DATA_WIDTH: int, seq: int, length: int,
+                     payload_mode: int, seed: int) -> List[int]:
+    """
+    Python model of the frame generated by :class:`~.AxiSTrafficGen` (for the simulation)
+
+    :return: list of bytes of the frame
+    """
+    W = DATA_WIDTH // 8
+    out_masks, next_masks = lfsr_unroll_masks(LFSR_POLY, LFSR_POLY_WIDTH, DATA_WIDTH)
+    lfsr = seed ^ seq
+    data = []
+    for word_i in range((length + W - 1) // W):
+        if payload_mode == PAYLOAD_LFSR:
+            w = _bits_to_int(lfsr_apply_masks(lfsr, out_masks))
+        else:
+            w = word_i
+        if word_i == 0:
+            w = (w & ~mask(32)) | seq
+        lfsr = _bits_to_int(lfsr_apply_masks(lfsr, next_masks))
+        data.extend((w >> (8 * i)) & 0xff for i in range(W))
+
+    return data[:length]
+
+
+@serializeParamsUniq
+class AxiSTrafficGen(Unit):
+    """
+    Line-rate generator of AXI-stream frames for testing of the datapaths and throughput measurement,
+    (an extended version of :class:`hwtLib.amba.axis_comp.frameGen.AxisFrameGen`)
+    the frames can be checked by :class:`hwtLib.amba.axis_comp.trafficChecker.AxiSTrafficChecker`.
+
+    The first 4B of the frame are the sequence number of the frame (little endian),
+    the rest of the frame is the payload, the word i of the frame is:
+
+    * PAYLOAD_SEQ: i
+    * PAYLOAD_LFSR: DATA_WIDTH bits of :class:`hwtLib.logic.lfsr.Lfsr` sequence,
+      the state of LFSR is set to seed ^ sequence number on the start of the frame
+
+    The length of the frame (in bytes, >= 4) is selected by len_mode register:
+
+    * LEN_MODE_FIXED: len_min
+    * LEN_MODE_UNIFORM: pseudo random from the range <len_min, len_max>
+    * LEN_MODE_TABLE: the lengths from imix table (in BRAM) in round robin order,
+      imix_size is the number of used items of the table
+
+    The length of the next frame is resolved during the actual frame
+    so the frames can be sent without any gaps.
+
+    * gap: the number of idle clock cycles after each frame
+    * rate: limits the number of words per clock cycle to rate/2**16 (0 = no limit)
+    * frame_limit: the number of frames to send (0 = no limit)
+    * sent_frames, sent_bytes, cycles: counters, the cycles counts clock cycles while the generator is enabled,
+      (sent_bytes/cycles is the throughput in bytes per clock cycle)
+
+    The rising edge of enable clears the counters and the sequence number.
+
+    .. hwt-autodoc::
+    """
+
+    def _config(self):
+        self.DATA_WIDTH = Param(64)
+        self.MAX_LEN = Param(2048)
+        self.IMIX_TABLE_SIZE = Param(16)
+        self.CNTRL_ADDR_WIDTH = Param(8)
+        self.CNTRL_DATA_WIDTH = Param(32)
+
+    def _registers_t(self):
+        reg_t = Bits(self.CNTRL_DATA_WIDTH)
+        return HStruct(
+            (reg_t, "enable"),
+            (reg_t, "len_mode"),
+            (reg_t, "len_min"),
+            (reg_t, "len_max"),
+            (reg_t, "imix_size"),
+            (reg_t, "gap"),
+            (reg_t, "rate"),
+            (reg_t, "payload_mode"),
+            (reg_t, "seed"),
+            (reg_t, "frame_limit"),
+            (reg_t, "sent_frames"),
+            (reg_t, "sent_bytes"),
+            (reg_t, "cycles"),
+            (reg_t[self.IMIX_TABLE_SIZE], "imix"),
+        )
+
+    def _declr(self):
+        assert self.DATA_WIDTH >= LFSR_POLY_WIDTH, ("The sequence number has to fit in to a first word", self.DATA_WIDTH)
+        assert self.CNTRL_DATA_WIDTH == 32, self.CNTRL_DATA_WIDTH
+        addClkRstn(self)
+        with self._paramsShared():
+            self.axis_out = AxiStream()._m()
+        self.axis_out.USE_KEEP = True
+
+        with self._paramsShared(prefix="CNTRL_"):
+            self.cntrl = Axi4Lite()
+            self.conv = AxiLiteEndpoint(self._registers_t())
+
+        ram = self.imix_ram = RamSingleClock()
+        ram.PORT_CNT = (READ_WRITE, READ)
+        ram.DATA_WIDTH = self.CNTRL_DATA_WIDTH
+        ram.ADDR_WIDTH = log2ceil(self.IMIX_TABLE_SIZE - 1)
+
+    def _impl_next_len(self, regs: StructIntf, start: RtlSignal, load: RtlSignal):
+        """
+        Resolve the length of the next frame
+
+        :param start: clear the state
+        :param load: the next length is being used
+        :return: tuple (next_len, next_len_vld)
+        """
+        len_t = Bits(log2ceil(self.MAX_LEN + 1))
+        LEN_W = len_t.bit_length()
+        len_mode = _cfg_reg(self, regs, "len_mode", 2, def_val=LEN_MODE_FIXED)
+        len_min = _cfg_reg(self, regs, "len_min", LEN_W, def_val=self.DATA_WIDTH // 8)
+        len_max = _cfg_reg(self, regs, "len_max", LEN_W, def_val=self.DATA_WIDTH // 8)
+        imix_size = _cfg_reg(self, regs, "imix_size", log2ceil(self.IMIX_TABLE_SIZE + 1), def_val=0)
+
+        next_len = self._reg("next_len", len_t)
+        next_len_vld = self._reg("next_len_vld", def_val=0)
+
+        # pseudo random value for uniform distribution
+        rnd = self._reg("rnd", Bits(LFSR_POLY_WIDTH), def_val=1)
+        _, rnd_next_masks = lfsr_unroll_masks(LFSR_POLY, LFSR_POLY_WIDTH, LEN_W)
+        rnd(Concat(*reversed(lfsr_apply_masks(rnd, rnd_next_masks))))
+        # the smallest mask which covers the range, the values out of range are skipped
+        rng = self._sig("len_range", len_t)
+        rng(len_max - len_min)
+        rng_mask = rng
+        sh = 1
+        while sh < LEN_W:
+            rng_mask = rng_mask | Concat(Bits(sh).from_py(0), rng_mask[:sh])
+            sh *= 2
+        rnd_len = self._sig("rnd_len", len_t)
+        rnd_len(rnd[LEN_W:] & rng_mask)
+
+        # read of the imix table
+        imix = self.imix_ram.port[1]
+        imix_i = self._reg("imix_i", imix.addr._dtype, def_val=0)
+        imix_rd_pending = self._reg("imix_rd_pending", def_val=0)
+        imix_rd = ~next_len_vld & ~imix_rd_pending & len_mode._eq(LEN_MODE_TABLE)
+        imix.en(imix_rd)
+        imix.addr(imix_i)
+        imix_rd_pending(~start & ~load & imix_rd)
+
+        If(start,
+            imix_i(0),
+        ).Elif(imix_rd,
+            If(fitTo(imix_i, imix_size, shrink=False) >= imix_size - 1,
+               imix_i(0),
+            ).Else(
+               imix_i(imix_i + 1),
+            )
+        )
+
+        If(start | load,
+            next_len_vld(0),
+        ).Elif(~next_len_vld,
+            Switch(len_mode)\
+            .Case(LEN_MODE_UNIFORM,
+                next_len(len_min + rnd_len),
+                next_len_vld(rnd_len <= rng),
+            ).Case(LEN_MODE_TABLE,
+                next_len(imix.dout[LEN_W:]),
+                next_len_vld(imix_rd_pending),
+            ).Default(
+                next_len(len_min),
+                next_len_vld(1),
+            )
+        )
+        return next_len, next_len_vld
+
+    def _impl(self):
+        propagateClkRstn(self)
+        self.conv.bus(self.cntrl)
+        regs = self.conv.decoded
+        self.imix_ram.port[0](regs.imix)
+
+        DW = self.DATA_WIDTH
+        W = DW // 8
+        cntr_t = Bits(self.CNTRL_DATA_WIDTH)
+        dout = self.axis_out
+
+        en = _cfg_reg(self, regs, "enable", 1)
+        gap = _cfg_reg(self, regs, "gap", 16)
+        rate = _cfg_reg(self, regs, "rate", 16)
+        payload_mode = _cfg_reg(self, regs, "payload_mode", 1, def_val=PAYLOAD_SEQ)
+        seed = _cfg_reg(self, regs, "seed", LFSR_POLY_WIDTH, def_val=1)
+        frame_limit = _cfg_reg(self, regs, "frame_limit", self.CNTRL_DATA_WIDTH)
+
+        en_prev = self._reg("en_prev", def_val=0)
+        en_prev(en)
+        start = self._sig("start")
+        start(en & ~en_prev)
+
+        load = self._sig("load")
+        next_len, next_len_vld = self._impl_next_len(regs, start, load)
+
+        active = self._reg("active", def_val=0)
+        rem = self._reg("rem", next_len._dtype)
+        word_i = self._reg("word_i", Bits(log2ceil(self.MAX_LEN // W + 1)))
+        lfsr = self._reg("lfsr", Bits(LFSR_POLY_WIDTH))
+        seq = self._reg("seq", cntr_t, def_val=0)
+        frame_seq = self._reg("frame_seq", cntr_t)
+        gap_cntr = self._reg("gap_cntr", gap._dtype, def_val=0)
+
+        # rate limiter, 1 word can be send if credit >= 1.0
+        credit = self._reg("credit", Bits(17), def_val=0)
+        rate_ok = rate._eq(0) | credit[16]
+
+        is_last = self._sig("is_last")
+        is_last(rem <= W)
+        dout.valid(active & rate_ok)
+        ack = self._sig("ack")
+        ack(active & rate_ok & dout.ready)
+
+        limit_reached = (frame_limit != 0) & (seq >= frame_limit)
+        load(en & ~start & next_len_vld & ~limit_reached & (
+            (~active & gap_cntr._eq(0)) |
+            (ack & is_last & gap._eq(0))
+        ))
+
+        out_masks, next_masks = lfsr_unroll_masks(LFSR_POLY, LFSR_POLY_WIDTH, DW)
+        If(load,
+            active(1),
+            rem(next_len),
+            word_i(0),
+            lfsr(seed ^ seq),
+            frame_seq(seq),
+        ).Elif(ack,
+            If(is_last,
+               active(0),
+            ),
+            rem(rem - W),
+            word_i(word_i + 1),
+            lfsr(Concat(*reversed(lfsr_apply_masks(lfsr, next_masks)))),
+        )
+        If(start,
+           seq(0),
+        ).Elif(load,
+           seq(seq + 1),
+        )
+        If(ack & is_last & (gap != 0),
+           # -1 because the load of the next frame takes 1 clk
+           gap_cntr(gap - 1),
+        ).Elif(gap_cntr != 0,
+           gap_cntr(gap_cntr - 1),
+        )
+        If(rate._eq(0) | start,
+           credit(0),
+        ).Elif(ack,
+           credit(credit - 0x10000 + fitTo(rate, credit)),
+        ).Elif(~credit[16],
+           credit(credit + fitTo(rate, credit)),
+        )
+
+        payload = _traffic_payload(payload_mode, word_i, lfsr, out_masks, DW)
+        If(word_i._eq(0),
+           dout.data(Concat(payload[DW:32], frame_seq)),
+        ).Else(
+           dout.data(payload),
+        )
+        If(is_last,
+           Switch(rem[log2ceil(W + 1):])\
+           .add_cases((i, dout.keep(mask(i))) for i in range(1, W))\
+           .Default(dout.keep(mask(W)))
+        ).Else(
+           dout.keep(mask(W))
+        )
+        dout.last(is_last)
+
+        # counters
+        sent_frames = self._reg("sent_frames", cntr_t, def_val=0)
+        sent_bytes = self._reg("sent_bytes", cntr_t, def_val=0)
+        cycles = self._reg("cycles", cntr_t, def_val=0)
+        If(start,
+           sent_frames(0),
+           sent_bytes(0),
+           cycles(0),
+        ).Else(
+           If(en,
+              cycles(cycles + 1),
+           ),
+           If(ack,
+              sent_bytes(sent_bytes + fitTo(is_last._ternary(rem, next_len._dtype.from_py(W)), sent_bytes)),
+              If(is_last,
+                 sent_frames(sent_frames + 1),
+              )
+           )
+        )
+        _status_reg(regs, "sent_frames", sent_frames)
+        _status_reg(regs, "sent_bytes", sent_bytes)
+        _status_reg(regs, "cycles", cycles)
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = AxiSTrafficGen()
+    print(to_rtl_str(u))
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from hwt.simulator.simTestCase import SingleUnitSimTestCase
+from hwtLib.abstract.discoverAddressSpace import AddressSpaceProbe
+from hwtLib.amba.axiLite_comp.endpoint_test import addrGetter
+from hwtLib.amba.axiLite_comp.sim.mem_space_master import AxiLiteMemSpaceMaster
+from hwtLib.amba.axis import axis_recieve_bytes, axis_send_bytes
+from hwtLib.amba.axis_comp.trafficChecker import AxiSTrafficChecker
+from hwtLib.amba.axis_comp.trafficGen import AxiSTrafficGen, traffic_frame_py, \
+    LEN_MODE_UNIFORM, LEN_MODE_TABLE, PAYLOAD_LFSR, PAYLOAD_SEQ
+from hwtLib.amba.constants import RESP_OKAY
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer, WaitWriteOnly
+
+
+class _RegsMixin():
+
+    @classmethod
+    def mkRegisterMap(cls, u):
+        cls.addrProbe = AddressSpaceProbe(u.cntrl, addrGetter)
+        cls.regs = AxiLiteMemSpaceMaster(u.cntrl, cls.addrProbe.discovered)
+
+    def read_regs_after(self, t, names):
+        def proc():
+            yield Timer(t)
+            yield WaitWriteOnly()
+            for n in names:
+                getattr(self.regs, n).read()
+
+        self.procs.append(proc())
+
+    def assertRegsRead(self, ref):
+        self.assertValSequenceEqual(self.u.cntrl._ag.r.data,
+                                    [(v, RESP_OKAY) for v in ref])
+
+
+class AxiSTrafficGenTC(_RegsMixin, SingleUnitSimTestCase):
+
+    @classmethod
+    def getUnit(cls):
+        cls.u = u = AxiSTrafficGen()
+        u.DATA_WIDTH = 64
+        u.MAX_LEN = 128
+        u.IMIX_TABLE_SIZE = 4
+        return u
+
+    @classmethod
+    def setUpClass(cls):
+        cls.compileSim(cls.getUnit(), onAfterToRtl=cls.mkRegisterMap)
+
+    def recieve_frames(self):
+        frames = []
+        while self.u.axis_out._ag.data:
+            offset, f = axis_recieve_bytes(self.u.axis_out)
+            self.assertEqual(offset, 0)
+            frames.append(f)
+        return frames
+
+    def assert_frames(self, frames, lens, payload_mode, seed):
+        ref = [traffic_frame_py(self.u.DATA_WIDTH, seq, l, payload_mode, seed)
+               for seq, l in enumerate(lens)]
+        self.assertSequenceEqual(frames, ref)
+
+    def test_nop(self):
+        self.runSim(20 * CLK_PERIOD)
+        self.assertEmpty(self.u.axis_out._ag.data)
+
+    def test_fixed_len(self, payload_mode=PAYLOAD_SEQ):
+        regs = self.regs
+        regs.len_min.write(21)
+        regs.payload_mode.write(payload_mode)
+        regs.seed.write(0x1234)
+        regs.frame_limit.write(3)
+        regs.enable.write(1)
+        self.read_regs_after(40 * CLK_PERIOD, ["sent_frames", "sent_bytes"])
+        self.runSim(60 * CLK_PERIOD)
+
+        self.assert_frames(self.recieve_frames(), [21, 21, 21], payload_mode, 0x1234)
+        self.assertRegsRead([3, 3 * 21])
+
+    def test_fixed_len_lfsr(self):
+        self.test_fixed_len(payload_mode=PAYLOAD_LFSR)
+
+    def test_uniform_len(self, N=16):
+        regs = self.regs
+        regs.len_mode.write(LEN_MODE_UNIFORM)
+        regs.len_min.write(4)
+        regs.len_max.write(40)
+        regs.payload_mode.write(PAYLOAD_LFSR)
+        regs.frame_limit.write(N)
+        regs.enable.write(1)
+        self.runSim((N * 6 + 40) * CLK_PERIOD)
+
+        frames = self.recieve_frames()
+        lens = [len(f) for f in frames]
+        self.assertEqual(len(frames), N)
+        for l in lens:
+            self.assertGreaterEqual(l, 4)
+            self.assertLessEqual(l, 40)
+        self.assertGreater(len(set(lens)), 1, lens)
+        self.assert_frames(frames, lens, PAYLOAD_LFSR, 1)
+
+    def test_imix_table(self):
+        regs = self.regs
+        lens = [4, 17, 64]
+        for i, l in enumerate(lens):
+            regs.imix[i].write(l)
+        regs.imix_size.write(len(lens))
+        regs.len_mode.write(LEN_MODE_TABLE)
+        regs.frame_limit.write(5)
+        regs.enable.write(1)
+        self.runSim(80 * CLK_PERIOD)
+
+        self.assert_frames(self.recieve_frames(), [4, 17, 64, 4, 17], PAYLOAD_SEQ, 1)
+
+    def test_line_rate(self, gap=0, rate=0, N=60):
+        """
+        Check the number of clock cycles required for N frames of 2 words
+        """
+        regs = self.regs
+        regs.len_min.write(16)
+        regs.gap.write(gap)
+        regs.rate.write(rate)
+        regs.frame_limit.write(N)
+        regs.enable.write(1)
+        # the time spent by the register writes
+        t_cfg = 20
+        if rate:
+            t = int(2 * N * 0x10000 / rate)
+        else:
+            t = N * (2 + gap)
+        self.runSim((t_cfg + t) * CLK_PERIOD)
+
+        self.assertEqual(len(self.recieve_frames()), N)
+
+    def test_line_rate_gap(self):
+        self.test_line_rate(gap=3, N=20)
+
+    def test_line_rate_rate_limit(self):
+        self.test_line_rate(rate=0x8000, N=20)
+
+    def test_line_rate_too_short_sim(self, N=60):
+        """
+        The back-to-back frames do not fit in to shorter time
+        """
+        regs = self.regs
+        regs.len_min.write(16)
+        regs.frame_limit.write(N)
+        regs.enable.write(1)
+        self.runSim((20 + 2 * N - 10) * CLK_PERIOD)
+        self.assertLess(len(self.recieve_frames()), N)
+
+    def test_randomized(self, N=10):
+        u = self.u
+        regs = self.regs
+        regs.len_mode.write(LEN_MODE_UNIFORM)
+        regs.len_min.write(5)
+        regs.len_max.write(64)
+        regs.payload_mode.write(PAYLOAD_LFSR)
+        regs.seed.write(0xdead)
+        regs.frame_limit.write(N)
+        regs.enable.write(1)
+        self.randomize(u.axis_out)
+        self.runSim((N * 8 * 3 + 60) * CLK_PERIOD)
+
+        frames = self.recieve_frames()
+        self.assertEqual(len(frames), N)
+        self.assert_frames(frames, [len(f) for f in frames], PAYLOAD_LFSR, 0xdead)
+
+
+class AxiSTrafficCheckerTC(_RegsMixin, SingleUnitSimTestCase):
+
+    @classmethod
+    def getUnit(cls):
+        cls.u = u = AxiSTrafficChecker()
+        u.DATA_WIDTH = 64
+        u.MAX_LEN = 128
+        return u
+
+    @classmethod
+    def setUpClass(cls):
+        cls.compileSim(cls.getUnit(), onAfterToRtl=cls.mkRegisterMap)
+
+    def send_frames_after(self, t, frames):
+        def proc():
+            yield Timer(t)
+            yield WaitWriteOnly()
+            for f in frames:
+                axis_send_bytes(self.u.axis_in, f)
+
+        self.procs.append(proc())
+
+    def check(self, frames, ref_counters, payload_mode=PAYLOAD_LFSR, seed=0x55):
+        regs = self.regs
+        regs.payload_mode.write(payload_mode)
+        regs.seed.write(seed)
+        regs.enable.write(1)
+        self.send_frames_after(10 * CLK_PERIOD, frames)
+        t = 20 + sum((len(f) + 7) // 8 for f in frames)
+        self.read_regs_after(t * CLK_PERIOD, ["frames", "bytes", "seq_errors", "payload_errors"])
+        self.runSim((t + 20) * CLK_PERIOD)
+        self.assertRegsRead(ref_counters)
+
+    def test_nop(self):
+        self.check([], [0, 0, 0, 0])
+
+    def test_correct_frames(self):
+        lens = [4, 8, 9, 31, 64]
+        frames = [traffic_frame_py(64, seq, l, PAYLOAD_LFSR, 0x55)
+                  for seq, l in enumerate(lens)]
+        self.check(frames, [len(lens), sum(lens), 0, 0])
+
+    def test_correct_frames_seq(self):
+        lens = [12, 7, 40]
+        frames = [traffic_frame_py(64, seq, l, PAYLOAD_SEQ, 0)
+                  for seq, l in enumerate(lens)]
+        self.check(frames, [len(lens), sum(lens), 0, 0], payload_mode=PAYLOAD_SEQ, seed=0)
+
+    def test_seq_gap(self):
+        # frame 2 lost, frame 4 duplicated
+        seqs = [0, 1, 3, 4, 4, 5]
+        frames = [traffic_frame_py(64, seq, 20, PAYLOAD_LFSR, 0x55)
+                  for seq in seqs]
+        self.check(frames, [len(seqs), 20 * len(seqs), 2, 0])
+
+    def test_payload_error(self):
+        frames = [traffic_frame_py(64, seq, 30, PAYLOAD_LFSR, 0x55)
+                  for seq in range(4)]
+        frames[1][10] ^= 0x10
+        frames[2][29] ^= 0x1
+        frames[2][28] ^= 0x1
+        self.check(frames, [4, 4 * 30, 0, 2])
+
+    def test_wrong_seed(self):
+        frames = [traffic_frame_py(64, seq, 9, PAYLOAD_LFSR, 0x56)
+                  for seq in range(3)]
+        self.check(frames, [3, 3 * 9, 0, 3])
+
+
+AxiSTrafficGenTCs = [
+    AxiSTrafficGenTC,
+    AxiSTrafficCheckerTC,
+]
+
+if __name__ == "__main__":
+    suite = unittest.TestSuite()
+    # suite.addTest(AxiSTrafficGenTC('test_uniform_len'))
+    for tc in AxiSTrafficGenTCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
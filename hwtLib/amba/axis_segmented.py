@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from random import Random
+from typing import List, Tuple, Optional, Union
+
+from hwt.hdl.types.bits import Bits
+from hwt.interfaces.std import VectSignal
+from hwt.synthesizer.param import Param
+from hwtLib.amba.axi_intf_common import Axi_hs
+from hwtLib.amba.axis import AxiStreamAgent
+from hwtSimApi.hdlSimulator import HdlSimulator
+from pyMathBitPrecise.bit_utils import mask, get_bit, get_bit_range
+
+
+class AxiStreamSegmented(Axi_hs):
+    """
+    AXI-stream like interface where each beat is divided in to SEGMENT_CNT segments
+    and each segment can carry a part of a different frame.
+    This allows to transfer up to SEGMENT_CNT frames in a single beat.
+
+    The frame occupies a continuous sequence of segments, it may start in any segment
+    and it continues in next segment and in the segment 0 of the next beat.
+    All segments of the frame except the last one have to be full. The segments which do not carry
+    any data (en=0) may be only between the frames.
+
+    :ivar ~.data: main data signal, segment i is data[(i + 1) * SEGMENT_WIDTH:i * SEGMENT_WIDTH]
+    :ivar ~.keep: byte mask for each segment (same layout as data)
+    :ivar ~.en: flag for each segment, 1 if segment contains a valid data
+    :ivar ~.start: flag for each segment, 1 if segment contains the first word of the frame
+    :ivar ~.end: flag for each segment, 1 if segment contains the last word of the frame
+        (same meaning as last in :class:`~.AxiStream`)
+
+    .. hwt-autodoc::
+    """
+
+    def _config(self):
+        self.DATA_WIDTH = Param(64)
+        self.SEGMENT_CNT = Param(2)
+
+    def _declr(self):
+        assert self.DATA_WIDTH % (self.SEGMENT_CNT * 8) == 0, (
+            "Segment has to be composed of bytes", self.DATA_WIDTH, self.SEGMENT_CNT)
+        self.data = VectSignal(self.DATA_WIDTH)
+        self.keep = VectSignal(self.DATA_WIDTH // 8)
+        self.en = VectSignal(self.SEGMENT_CNT)
+        self.start = VectSignal(self.SEGMENT_CNT)
+        self.end = VectSignal(self.SEGMENT_CNT)
+        super(AxiStreamSegmented, self)._declr()
+
+    def _initSimAgent(self, sim: HdlSimulator):
+        # (data, keep, en, start, end)
+        self._ag = AxiStreamAgent(sim, self)
+
+
+def axis_segmented_pack_frames(DATA_WIDTH: int, SEGMENT_CNT: int,
+                               frames: List[List[Optional[int]]],
+                               gaps: Optional[List[int]]=None)\
+        -> List[Tuple["Bits3val", int, int, int, int]]:
+    """
+    Pack the bytes of the frames in to beats of :class:`~.AxiStreamSegmented` interface
+
+    :param frames: list of frames, frame is a list of bytes
+    :param gaps: optional number of empty segments before each frame
+    :return: list of beats, beat format is (data, keep, en, start, end)
+    """
+    SEG_W = DATA_WIDTH // SEGMENT_CNT
+    SEG_B = SEG_W // 8
+    # list of segments (data, vld_mask, keep, start, end) or None for an empty segment
+    segs = []
+    for f_i, f in enumerate(frames):
+        assert f, "Frame has to have at least a single byte"
+        if gaps is not None:
+            segs.extend(None for _ in range(gaps[f_i]))
+        seg_cnt = (len(f) + SEG_B - 1) // SEG_B
+        for seg_i in range(seg_cnt):
+            data = 0
+            vld = 0
+            keep = 0
+            for B_i, B in enumerate(f[seg_i * SEG_B:(seg_i + 1) * SEG_B]):
+                if B is not None:
+                    data |= B << (B_i * 8)
+                    vld |= 0xff << (B_i * 8)
+                keep |= 1 << B_i
+            segs.append((data, vld, keep, seg_i == 0, seg_i == seg_cnt - 1))
+
+    data_t = Bits(DATA_WIDTH)
+    beats = []
+    for beat_i in range(0, len(segs), SEGMENT_CNT):
+        data = 0
+        vld = 0
+        keep = 0
+        en = 0
+        start = 0
+        end = 0
+        for seg_i, s in enumerate(segs[beat_i:beat_i + SEGMENT_CNT]):
+            if s is None:
+                continue
+            s_data, s_vld, s_keep, s_start, s_end = s
+            data |= s_data << (seg_i * SEG_W)
+            vld |= s_vld << (seg_i * SEG_W)
+            keep |= s_keep << (seg_i * SEG_B)
+            en |= 1 << seg_i
+            start |= int(s_start) << seg_i
+            end |= int(s_end) << seg_i
+        beats.append((data_t.from_py(data, vld), keep, en, start, end))
+
+    return beats
+
+
+def axis_segmented_send_bytes(intf: AxiStreamSegmented,
+                              frames: List[List[Optional[int]]],
+                              rand: Union[Random, None, List[int]]=None):
+    """
+    Pack the frames in to beats of :class:`~.AxiStreamSegmented` interface
+    and add them to the agent of the interface (in simulation)
+
+    :param frames: list of frames, frame is a list of bytes
+    :param rand: optional Random instance used to generate the empty segments
+        between the frames (or explicit list of number of empty segments before each frame)
+    """
+    if isinstance(rand, Random):
+        gaps = [rand.choice((0, 0, 0, 1, intf.SEGMENT_CNT - 1)) for _ in frames]
+    else:
+        gaps = rand
+    intf._ag.data.extend(axis_segmented_pack_frames(
+        intf.DATA_WIDTH, intf.SEGMENT_CNT, frames, gaps))
+
+
+def axis_segmented_recieve_bytes(intf: AxiStreamSegmented) -> List[List[int]]:
+    """
+    Read all frames from :class:`~.AxiStreamSegmented` agent in simulation
+
+    :return: list of frames, frame is a list of bytes
+    """
+    SEGMENT_CNT = intf.SEGMENT_CNT
+    SEG_W = intf.DATA_WIDTH // SEGMENT_CNT
+    SEG_B = SEG_W // 8
+    frames = []
+    frame = None
+    for data, keep, en, start, end in intf._ag.data:
+        keep = int(keep)
+        en = int(en)
+        start = int(start)
+        end = int(end)
+        for seg_i in range(SEGMENT_CNT):
+            if not get_bit(en, seg_i):
+                assert frame is None, ("Empty segment inside of the frame", frame)
+                continue
+            if get_bit(start, seg_i):
+                assert frame is None, ("Unfinished frame", frame)
+                frame = []
+            else:
+                assert frame is not None, "Segment without start of the frame"
+            seg_keep = get_bit_range(keep, seg_i * SEG_B, SEG_B)
+            is_end = get_bit(end, seg_i)
+            if not is_end:
+                assert seg_keep == mask(SEG_B), ("All segments except the last one have to be full", seg_keep)
+            for B_i in range(SEG_B):
+                if get_bit(seg_keep, B_i):
+                    offset = seg_i * SEG_W + B_i * 8
+                    if get_bit_range(data.vld_mask, offset, 8) != 0xff:
+                        raise AssertionError(
+                            "Data not valid but it should be based on keep",
+                            seg_i, B_i, seg_keep)
+                    frame.append(get_bit_range(data.val, offset, 8))
+            if is_end:
+                frames.append(frame)
+                frame = None
+
+    if frame is not None:
+        raise ValueError("Unfinished frame", frame)
+
+    intf._ag.data.clear()
+    return frames
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 from hwtLib.abstract.streamBuilder import AbstractStreamBuilder
+from hwtLib.handshaked.cdc import HandshakedCdc
 from hwtLib.handshaked.fifo import HandshakedFifo
 from hwtLib.handshaked.fifoAsync import HsFifoAsync
 from hwtLib.handshaked.joinFair import HsJoinFairShare
@@ -17,12 +18,16 @@ from hwtLib.handshaked.splitSelect import HsSplitSelect
 class HsBuilder(AbstractStreamBuilder):
     """
     Helper class which simplifies building of large stream paths
+
+    :note: :meth:`~.buff_cdc` with items=1 uses :class:`~.HandshakedCdc` with the synchronization by pulses
+        (throughput ~1/3 of the slower clock) unless full_throughput=True is specified
     """
     FifoCls = HandshakedFifo
     FifoAsyncCls = HsFifoAsync
     JoinExplicitCls = NotImplemented
     JoinPrioritizedCls = HsJoinPrioritized
     JoinFairCls = HsJoinFairShare
+    RegCdcCls = HandshakedCdc
     ResizerCls = HsResizer
     RegCls = HandshakedReg
     SplitCopyCls = HsSplitCopy
@@ -12,6 +12,7 @@ from hwt.synthesizer.unit import Unit
 from hwtLib.clocking.cdc import CdcPulseGen
 from hwtLib.handshaked.compBase import HandshakedCompBase
 from hwtLib.clocking.vldSynced_cdc import VldSyncedCdc
+from hwtLib.handshaked.fifoAsync import HsFifoAsync
 
 
 @serializeParamsUniq
@@ -44,16 +45,33 @@ class HandshakedCdc(HandshakedCompBase):
     :note: This component uses syncrhorization by pulse CDCs which means it's throughput is significantly limited
         (eta slowest clk / 3)
 
+    :ivar ~.ASYNC_FIFO_DEPTH: None to use the synchronization by pulse CDCs,
+        otherwise the depth of the asynchronous FIFO (:class:`~.HsFifoAsync`, 2**n + 1) which is used instead,
+        the FIFO with a depth >= FULL_THROUGHPUT_ASYNC_FIFO_DEPTH passes 1 item per clock cycle of the slower clock,
+        (the constraints for the CDC are then generated by :class:`hwtLib.mem.fifoAsync.FifoAsync`)
+    :cvar ~.FifoAsyncCls: the class of the asynchronous FIFO used if ASYNC_FIFO_DEPTH is not None
+    :cvar ~.FULL_THROUGHPUT_ASYNC_FIFO_DEPTH: the minimal ASYNC_FIFO_DEPTH for the throughput of 1 item
+        per clock cycle of the slower clock (the FIFO has to cover the latency of the pointer synchronization)
+
     .. hwt-autodoc:: example_HandshakedCdc
     """
+    FifoAsyncCls = HsFifoAsync
+    FULL_THROUGHPUT_ASYNC_FIFO_DEPTH = 9
+
     def _config(self):
         HandshakedCompBase._config(self)
         self.DATA_RESET_VAL = Param(None)
         self.IN_FREQ = Param(int(100e6))
         self.OUT_FREQ = Param(int(100e6))
+        self.ASYNC_FIFO_DEPTH = Param(None)
 
     def _declr(self):
         VldSyncedCdc._declr(self)
+        if self.ASYNC_FIFO_DEPTH is not None:
+            f = self.fifo = self.FifoAsyncCls(self.intfCls)
+            f._updateParamsFrom(self)
+            f.DEPTH = self.ASYNC_FIFO_DEPTH
+            return
 
         ipg = self.in_ack_pulse_gen = CdcPulseGen()
         ipg.IN_FREQ = self.OUT_FREQ
@@ -107,7 +125,20 @@ class HandshakedCdc(HandshakedCompBase):
 
         return regs
 
+    def _impl_async_fifo(self):
+        f = self.fifo
+        f.dataIn_clk(self.dataIn_clk)
+        f.dataIn_rst_n(self.dataIn_rst_n)
+        f.dataOut_clk(self.dataOut_clk)
+        f.dataOut_rst_n(self.dataOut_rst_n)
+        f.dataIn(self.dataIn)
+        self.dataOut(f.dataOut)
+
     def _impl(self):
+        if self.ASYNC_FIFO_DEPTH is not None:
+            self._impl_async_fifo()
+            return
+
         vld, rd = self.get_valid_signal, self.get_ready_signal
         din = self.dataIn
         dout = self.dataOut
@@ -177,6 +208,14 @@ def example_HandshakedCdc():
     return u
 
 
+def example_HandshakedCdc_asyncFifo():
+    u = HandshakedCdc(Handshaked)
+    u.IN_FREQ = int(100e6)
+    u.OUT_FREQ = int(200e6)
+    u.ASYNC_FIFO_DEPTH = HandshakedCdc.FULL_THROUGHPUT_ASYNC_FIFO_DEPTH
+    return u
+
+
 if __name__ == "__main__":
     from hwt.synthesizer.utils import to_rtl_str
     u = example_HandshakedCdc()
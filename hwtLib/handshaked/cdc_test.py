@@ -3,8 +3,11 @@
 
 import unittest
 
-from hwt.interfaces.std import Handshaked
+from hwt.interfaces.std import Handshaked, Clk, Rst_n
 from hwt.simulator.simTestCase import SingleUnitSimTestCase
+from hwt.synthesizer.unit import Unit
+from hwt.synthesizer.utils import to_rtl_str
+from hwtLib.handshaked.builder import HsBuilder
 from hwtLib.handshaked.cdc import HandshakedCdc
 from hwtSimApi.constants import CLK_PERIOD, Time
 
@@ -59,10 +62,92 @@ class HandshakedCdc_fast_to_slow_TC(HandshakedCdc_slow_to_fast_TC):
     OUT_CLK = HandshakedCdc_slow_to_fast_TC.IN_CLK
 
 
+class HandshakedCdc_asyncFifo_slow_to_fast_TC(HandshakedCdc_slow_to_fast_TC):
+
+    @classmethod
+    def getUnit(cls):
+        u = HandshakedCdc_slow_to_fast_TC.getUnit()
+        u.ASYNC_FIFO_DEPTH = u.FULL_THROUGHPUT_ASYNC_FIFO_DEPTH
+        return u
+
+    def test_throughput(self, N=40):
+        u = self.u
+        REF = list(range(N))
+        u.dataIn._ag.data.extend(REF)
+        # 1 item per clock cycle of the slower clock + latency of the CDC
+        self.runSim(self.slowest_clk() * (N + 10))
+        self.assertValSequenceEqual(u.dataOut._ag.data, REF)
+
+
+class HandshakedCdc_asyncFifo_fast_to_slow_TC(HandshakedCdc_asyncFifo_slow_to_fast_TC):
+    IN_CLK = HandshakedCdc_slow_to_fast_TC.OUT_CLK
+    OUT_CLK = HandshakedCdc_slow_to_fast_TC.IN_CLK
+
+
+class HandshakedCdc_asyncFifo_same_freq_TC(HandshakedCdc_asyncFifo_slow_to_fast_TC):
+    IN_CLK = CLK_PERIOD
+    OUT_CLK = CLK_PERIOD
+
+
+class HsBuilderCdc(Unit):
+    """
+    Unit with a CDC instantiated by :meth:`~.HsBuilder.buff_cdc`
+    """
+
+    def __init__(self, full_throughput):
+        self.full_throughput = full_throughput
+        super(HsBuilderCdc, self).__init__()
+
+    def _declr(self):
+        self.clk = Clk()
+        self.clk.FREQ = int(100e6)
+        self.rst_n = Rst_n()
+        self.dataIn = Handshaked()
+
+        self.out_clk = Clk()
+        self.out_clk.FREQ = int(150e6)
+        self.out_rst_n = Rst_n()
+        self.dataOut = Handshaked()._m()
+
+    def _impl(self):
+        self.dataOut(
+            HsBuilder(self, self.dataIn)
+            .buff_cdc(self.out_clk, self.out_rst_n, full_throughput=self.full_throughput)
+            .end
+        )
+
+
+class HsBuilder_buff_cdc_TC(unittest.TestCase):
+
+    def _get_cdc(self, full_throughput):
+        u = HsBuilderCdc(full_throughput)
+        to_rtl_str(u)
+        cdcs = [c for c in u._units if isinstance(c, HandshakedCdc)]
+        self.assertEqual(len(cdcs), 1)
+        return cdcs[0]
+
+    def test_pulse_sync(self):
+        self.assertIsNone(self._get_cdc(False).ASYNC_FIFO_DEPTH)
+
+    def test_full_throughput(self):
+        self.assertEqual(self._get_cdc(True).ASYNC_FIFO_DEPTH,
+                         HandshakedCdc.FULL_THROUGHPUT_ASYNC_FIFO_DEPTH)
+
+
+HandshakedCdcTCs = [
+    HandshakedCdc_slow_to_fast_TC,
+    HandshakedCdc_fast_to_slow_TC,
+    HandshakedCdc_asyncFifo_slow_to_fast_TC,
+    HandshakedCdc_asyncFifo_fast_to_slow_TC,
+    HandshakedCdc_asyncFifo_same_freq_TC,
+    HsBuilder_buff_cdc_TC,
+]
+
+
 if __name__ == "__main__":
     suite = unittest.TestSuite()
     # suite.addTest(HandshakedCdcTC('test_normalOp'))
-    suite.addTest(unittest.makeSuite(HandshakedCdc_slow_to_fast_TC))
-    suite.addTest(unittest.makeSuite(HandshakedCdc_fast_to_slow_TC))
+    for tc in HandshakedCdcTCs:
+        suite.addTest(unittest.makeSuite(tc))
     runner = unittest.TextTestRunner(verbosity=3)
     runner.run(suite)
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from typing import Optional, Tuple, Union
+from typing import List, Optional, Tuple, Union
 
 from hwt.code import If, connect
+from hwt.hdl.types.bits import Bits
 from hwt.interfaces.std import VectSignal, Clk, Rst_n, Rst
 from hwt.interfaces.utils import addClkRstn, propagateClkRstn
 from hwt.math import log2ceil
@@ -11,6 +12,7 @@ from hwt.serializer.mode import serializeParamsUniq
 from hwt.synthesizer.interfaceLevel.interfaceUtils.utils import packIntf, \
     connectPacked
 from hwt.synthesizer.param import Param
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
 from hwtLib.handshaked.compBase import HandshakedCompBase
 from hwtLib.mem.fifo import Fifo
 
@@ -27,6 +29,14 @@ class HandshakedFifo(HandshakedCompBase):
                  | | | | | |
                  +-+-+-+-+-+
 
+    :ivar ~.MEM_READ_LATENCY: number of clock cycles from the read of the memory to the data,
+        1 means that the memory read register is directly used as an output register,
+        if > 1 the memory read data are delayed by MEM_READ_LATENCY - 1 registers
+        (e.g. the BRAM output register) and the output is a small skid buffer which prefetches
+        the data from the memory. The dataOut is driven from a register, the FIFO is still
+        first-word-fall-through and the throughput is 1 item per clock even if the FIFO is
+        almost empty. The MEM_READ_LATENCY + 2 items of DEPTH are stored outside of the memory.
+
     .. hwt-autodoc:: _example_HandshakedFifo
     """
     FIFO_CLS = Fifo
@@ -36,6 +46,7 @@ class HandshakedFifo(HandshakedCompBase):
         self.DEPTH = Param(0)
         self.EXPORT_SIZE = Param(False)
         self.EXPORT_SPACE = Param(False)
+        self.MEM_READ_LATENCY = Param(1)
         super()._config()
 
     def _declr_io(self):
@@ -57,15 +68,27 @@ class HandshakedFifo(HandshakedCompBase):
         assert self.DEPTH > 1 ,\
             "Fifo is too small, fifo pointers would not work correctly, use register(s) instead"
 
+        assert self.MEM_READ_LATENCY >= 1, self.MEM_READ_LATENCY
         self._declr_io()
 
         f = self.fifo = self.FIFO_CLS()
         DW = self.dataIn._bit_length() - self.NON_DATA_BITS_CNT
         f.DATA_WIDTH = DW
-        f.DEPTH = self.DEPTH - 1  # because there is an extra register
+        # because there are extra registers on output
+        f.DEPTH = self.DEPTH - self._out_buff_capacity()
+        assert f.DEPTH > 0, ("DEPTH has to be > MEM_READ_LATENCY + 2 because of the prefetch buffer",
+                             self.DEPTH, self.MEM_READ_LATENCY)
         f.EXPORT_SIZE = self.EXPORT_SIZE
         f.EXPORT_SPACE = self.EXPORT_SPACE
 
+    def _out_buff_capacity(self) -> int:
+        """
+        :return: number of items which are stored outside of the memory
+        """
+        if self.MEM_READ_LATENCY == 1:
+            return 1
+        else:
+            return self.MEM_READ_LATENCY + 2
 
     def _connect_size_and_space(self, out_vld, fifo):
         if self.EXPORT_SIZE:
@@ -88,6 +111,25 @@ class HandshakedFifo(HandshakedCompBase):
                self.space(space_tmp + 1)
             )
 
+    def _connect_size_and_space_prefetch(self, out_cnt, fifo):
+        """
+        Same as :meth:`~._connect_size_and_space` but for the case where there are
+        more items outside of the memory (:meth:`~._connect_fifo_out_prefetch`)
+        """
+        if self.EXPORT_SIZE:
+            size_tmp = self._sig("size_tmp", self.size._dtype)
+            connect(fifo.size, size_tmp, fit=True)
+            out_cnt_tmp = self._sig("out_cnt_tmp", self.size._dtype)
+            connect(out_cnt, out_cnt_tmp, fit=True)
+            self.size(size_tmp + out_cnt_tmp)
+
+        if self.EXPORT_SPACE:
+            space_tmp = self._sig("space_tmp", self.space._dtype)
+            connect(fifo.space, space_tmp, fit=True)
+            out_space_tmp = self._sig("out_space_tmp", self.space._dtype)
+            connect(out_cnt._dtype.from_py(self._out_buff_capacity()) - out_cnt, out_space_tmp, fit=True)
+            self.space(space_tmp + out_space_tmp)
+
     def _connect_fifo_in(self):
         rd = self.get_ready_signal
         vld = self.get_valid_signal
@@ -119,6 +161,118 @@ class HandshakedFifo(HandshakedCompBase):
         )
         return out_vld
 
+    def _connect_fifo_out_prefetch(self, out_clk, out_rst) -> RtlSignal:
+        """
+        Connect the output of the FIFO memory trough the read pipeline and the skid buffer
+        to the output, the data is read from the memory if there is a space in the skid buffer
+        for all items in the read pipeline (the read does not depend on the output ready)
+
+        :return: number of items read from the memory and not consumed on the output yet
+        """
+        rd = self.get_ready_signal
+        vld = self.get_valid_signal
+
+        def reg(name, t=Bits(1), def_val=None):
+            return self._reg(name, t, def_val=def_val, clk=out_clk, rst=out_rst)
+
+        L = self.MEM_READ_LATENCY
+        CAPACITY = self._out_buff_capacity()
+        # the items in read pipeline + the items in skid buffer + the output register
+        out_cnt = reg("out_cnt", Bits(log2ceil(CAPACITY + 1)), def_val=0)
+
+        fOut = self.fifo.dataOut
+        fOut.en(out_cnt != CAPACITY)
+        mem_read = self._sig("mem_read")
+        mem_read(fOut.en & ~fOut.wait)
+
+        # the read pipeline, the first stage is the read register of the fifo
+        p_vld = reg("mem_read_vld0", def_val=0)
+        p_vld(mem_read)
+        HAS_DATA = fOut.DATA_WIDTH > 0
+        if HAS_DATA:
+            p_data = fOut.data
+        for i in range(1, L):
+            _p_vld = reg(f"mem_read_vld{i:d}", def_val=0)
+            _p_vld(p_vld)
+            p_vld = _p_vld
+            if HAS_DATA:
+                _p_data = reg(f"mem_read_data{i:d}", p_data._dtype)
+                _p_data(p_data)
+                p_data = _p_data
+
+        # skid buffer, the item 0 is the oldest, the items are shifted on read
+        SKID_ITEMS = CAPACITY - 1
+        skid_cnt = reg("skid_cnt", Bits(log2ceil(SKID_ITEMS + 1)), def_val=0)
+        skid_empty = skid_cnt._eq(0)
+
+        dout = self.dataOut
+        out_vld = reg("out_vld", def_val=0)
+        vld(dout)(out_vld)
+
+        out_ack = out_vld & rd(dout)
+        out_load = ~out_vld | rd(dout)
+        If(out_load,
+            out_vld(~skid_empty | p_vld),
+        )
+
+        skid_pop = self._sig("skid_pop")
+        skid_pop(out_load & ~skid_empty)
+        skid_push = self._sig("skid_push")
+        skid_push(p_vld & ~(out_load & skid_empty))
+
+        If(skid_push & ~skid_pop,
+           skid_cnt(skid_cnt + 1)
+        ).Elif(~skid_push & skid_pop,
+           skid_cnt(skid_cnt - 1)
+        )
+
+        If(mem_read & ~out_ack,
+           out_cnt(out_cnt + 1)
+        ).Elif(~mem_read & out_ack,
+           out_cnt(out_cnt - 1)
+        )
+
+        if HAS_DATA:
+            skid = [reg(f"skid{i:d}", p_data._dtype) for i in range(SKID_ITEMS)]
+            out_data = reg("out_data", p_data._dtype)
+            connectPacked(out_data, dout, exclude=[vld(dout), rd(dout)])
+            If(out_load,
+                If(~skid_empty,
+                   out_data(skid[0]),
+                ).Else(
+                   out_data(p_data),
+                ),
+            )
+            self._connect_skid_buff_data(skid, skid_cnt, skid_push, skid_pop, p_data)
+
+        return out_cnt
+
+    def _connect_skid_buff_data(self, skid: List[RtlSignal], skid_cnt: RtlSignal,
+                                skid_push: RtlSignal, skid_pop: RtlSignal, din: RtlSignal):
+        """
+        Collapsing shift register, the item 0 is the oldest, the din is written
+        to first empty item (after shift if skid_pop)
+        """
+        SKID_ITEMS = len(skid)
+        for i, s in enumerate(skid):
+            push_here = skid_push & skid_cnt._eq(i + 1)
+            if i + 1 < SKID_ITEMS:
+                If(skid_pop,
+                   If(push_here,
+                      s(din)
+                   ).Else(
+                      s(skid[i + 1])
+                   )
+                ).Elif(skid_push & skid_cnt._eq(i),
+                   s(din)
+                )
+            else:
+                If(skid_pop & push_here,
+                   s(din)
+                ).Elif(~skid_pop & skid_push & skid_cnt._eq(i),
+                   s(din)
+                )
+
     def _impl(self,
               clk_rst: Optional[Tuple[
                   Tuple[Clk, Union[Rst, Rst_n]],
@@ -140,8 +294,12 @@ class HandshakedFifo(HandshakedCompBase):
             f.dataOut_rst_n(out_rst)
 
         self._connect_fifo_in()
-        out_vld = self._connect_fifo_out(out_clk, out_rst)
-        self._connect_size_and_space(out_vld, self.fifo)
+        if self.MEM_READ_LATENCY == 1:
+            out_vld = self._connect_fifo_out(out_clk, out_rst)
+            self._connect_size_and_space(out_vld, self.fifo)
+        else:
+            out_cnt = self._connect_fifo_out_prefetch(out_clk, out_rst)
+            self._connect_size_and_space_prefetch(out_cnt, self.fifo)
 
 
 def _example_HandshakedFifo():
@@ -17,14 +17,24 @@ class HsFifoAsync(HandshakedFifo):
     :note: same functionality as :class:`hwtLib.handshaked.fifo.HandshakedFifo`
         except it has separated clock for input/output
 
+    :ivar ~.OUT_DATA_WIDTH: DATA_WIDTH of dataOut, None means same as DATA_WIDTH,
+        if specified the data of dataIn are packed to/unpacked from the data of dataOut,
+        (the ratio of widths has to be an integer, the first item is in the lowest bits,
+        see :class:`hwtLib.mem.fifoAsync.FifoAsync`),
+        DEPTH is then in items of the wider interface (in downsize mode the output register
+        does not add an extra word because it holds a part of the word which is still in the memory)
+
     .. hwt-autodoc:: _example_HsFifoAsync
     """
     def _config(self):
         HandshakedFifo._config(self)
         self.IN_FREQ = Param(int(100e6))
         self.OUT_FREQ = Param(int(100e6))
+        self.OUT_DATA_WIDTH = Param(None)
 
     def _declr(self):
+        if self.MEM_READ_LATENCY != 1:
+            raise NotImplementedError(self.MEM_READ_LATENCY)
         assert isPow2(self.DEPTH - 1), (
             "DEPTH has to be 2**n + 1"
             " because fifo has have DEPTH 2**n"
@@ -37,16 +47,21 @@ class HsFifoAsync(HandshakedFifo):
                 with self._associated(rst=self.dataIn_rst_n):
                     self.dataIn = self.intfCls()
 
-            with self._associated(clk=self.dataOut_clk):
-                self.dataOut_rst_n = Rst_n()
-                with self._associated(rst=self.dataOut_rst_n):
-                    self.dataOut = self.intfCls()._m()
+        with self._associated(clk=self.dataOut_clk):
+            self.dataOut_rst_n = Rst_n()
+            with self._associated(rst=self.dataOut_rst_n):
+                if self.OUT_DATA_WIDTH is None:
+                    with self._paramsShared():
+                        self.dataOut = self.intfCls()._m()
+                else:
+                    with self._paramsShared(exclude=({"DATA_WIDTH"}, set())):
+                        self.dataOut = self.intfCls()._m()
+                    self.dataOut.DATA_WIDTH = self.OUT_DATA_WIDTH
 
         f = self.fifo = FifoAsync()
         f.IN_FREQ = self.IN_FREQ
         f.OUT_FREQ = self.OUT_FREQ
-        DW = self.dataIn._bit_length() - 2  # 2 for control (valid, ready)
-        f.DATA_WIDTH = DW
+        self._declr_fifo_data_width(f)
         # because the output register is used as another item storage
         f.DEPTH = self.DEPTH - 1
         f.EXPORT_SIZE = self.EXPORT_SIZE
@@ -58,6 +73,11 @@ class HsFifoAsync(HandshakedFifo):
         if self.EXPORT_SPACE:
             self.space = VectSignal(SIZE_W, signed=False)
 
+    def _declr_fifo_data_width(self, f: FifoAsync):
+        f.DATA_WIDTH = self.dataIn._bit_length() - self.NON_DATA_BITS_CNT
+        if self.OUT_DATA_WIDTH is not None:
+            f.OUT_DATA_WIDTH = self.dataOut._bit_length() - self.NON_DATA_BITS_CNT
+
     def _impl(self):
         HandshakedFifo._impl(
             self,
@@ -75,6 +95,15 @@ def _example_HsFifoAsync():
     return u
 
 
+def _example_HsFifoAsync_upsize():
+    from hwt.interfaces.std import Handshaked
+    u = HsFifoAsync(Handshaked)
+    u.DEPTH = 5
+    u.DATA_WIDTH = 8
+    u.OUT_DATA_WIDTH = 32
+    return u
+
+
 if __name__ == "__main__":
     from hwt.synthesizer.utils import to_rtl_str
     u = _example_HsFifoAsync()
@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from copy import copy
 import unittest
 
-from hwt.hdl.constants import Time
+from hwt.hdl.constants import Time, NOP
 from hwt.interfaces.std import Handshaked
 from hwtLib.handshaked.fifoAsync import HsFifoAsync
 from hwtLib.handshaked.fifo_test import HsFifoTC
+# imported as a module so the base test cases are not collected again from this file
+from hwtLib.mem import fifoAsync_test
+from hwtSimApi.triggers import WaitWriteOnly
 
 
 class HsFifoAsyncTC(HsFifoTC):
@@ -33,9 +37,56 @@ class HsFifoAsyncTC(HsFifoTC):
         super(HsFifoTC, self).test_tryMore2(capturedOffset=capturedOffset)
 
 
+class HsFifoAsync_upsizeTC(fifoAsync_test.FifoAsync_upsizeTC):
+
+    @classmethod
+    def getUnit(cls):
+        u = cls.u = HsFifoAsync(Handshaked)
+        u.DATA_WIDTH = cls.IN_W
+        u.OUT_DATA_WIDTH = cls.OUT_W
+        u.DEPTH = 5
+        return u
+
+    def test_tryMore(self):
+        u = self.u
+        RATIO = max(self.IN_W, self.OUT_W) // min(self.IN_W, self.OUT_W)
+        if self.IN_W < self.OUT_W:
+            # the memory and the output register
+            ITEMS_IN = u.DEPTH * RATIO
+        else:
+            # the item in output register is a part of the word which is still in the memory
+            ITEMS_IN = u.DEPTH - 1
+        u.dataIn._ag.data.extend(range(ITEMS_IN + 2))
+
+        def init():
+            yield WaitWriteOnly()
+            u.dataOut._ag.setEnable(False)
+
+        self.procs.append(init())
+        self.runSim(ITEMS_IN * 4 * max(self.IN_CLK, self.OUT_CLK))
+        d = copy(u.dataIn._ag.data)
+        if u.dataIn._ag.actualData != NOP:
+            d.appendleft(u.dataIn._ag.actualData)
+        self.assertEqual(len(d), 2)
+
+
+class HsFifoAsync_downsizeTC(HsFifoAsync_upsizeTC):
+    IN_CLK = 40 * Time.ns
+    OUT_CLK = 10 * Time.ns
+    IN_W = 32
+    OUT_W = 8
+
+
+HsFifoAsyncTCs = [
+    HsFifoAsyncTC,
+    HsFifoAsync_upsizeTC,
+    HsFifoAsync_downsizeTC,
+]
+
 if __name__ == "__main__":
     suite = unittest.TestSuite()
     # suite.addTest(HsFifoAsyncTC('test_stuckedData'))
-    suite.addTest(unittest.makeSuite(HsFifoAsyncTC))
+    for tc in HsFifoAsyncTCs:
+        suite.addTest(unittest.makeSuite(tc))
     runner = unittest.TextTestRunner(verbosity=3)
     runner.run(suite)
@@ -6,9 +6,15 @@ import unittest
 
 from hwt.hdl.constants import NOP
 from hwt.interfaces.std import Handshaked
-
+from hwt.interfaces.utils import addClkRstn
+from hwt.simulator.simTestCase import SingleUnitSimTestCase
+from hwt.synthesizer.unit import Unit
+from hwt.synthesizer.utils import to_rtl_str
+from hwtLib.handshaked.builder import HsBuilder
 from hwtLib.handshaked.fifo import HandshakedFifo
 from hwtLib.mem.fifo_test import FifoTC
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer, WaitWriteOnly
 
 
 class HsFifoTC(FifoTC):
@@ -44,9 +50,152 @@ class HsFifoTC(FifoTC):
         super(HsFifoTC, self).test_tryMore2(capturedOffset=capturedOffset)
 
 
+class HsFifo_prefetchTC(SingleUnitSimTestCase):
+    """
+    :class:`~.HandshakedFifo` with MEM_READ_LATENCY > 1
+    """
+    ITEMS = 8
+    MEM_READ_LATENCY = 2
+
+    @classmethod
+    def getUnit(cls):
+        u = cls.u = HandshakedFifo(Handshaked)
+        u.DEPTH = cls.ITEMS
+        u.DATA_WIDTH = 8
+        u.EXPORT_SIZE = True
+        u.EXPORT_SPACE = True
+        u.MEM_READ_LATENCY = cls.MEM_READ_LATENCY
+        return u
+
+    getUnconsumedInput = HsFifoTC.getUnconsumedInput
+
+    def first_word_latency(self):
+        # fifo write + memory read pipeline + output register
+        return 1 + self.MEM_READ_LATENCY + 1
+
+    def test_passdata(self, N=20):
+        u = self.u
+        ref = [i + 1 for i in range(N)]
+        u.dataIn._ag.data.extend(ref)
+
+        self.runSim((N + 10) * CLK_PERIOD)
+        self.assertValSequenceEqual(u.dataOut._ag.data, ref)
+
+    def test_throughput(self, N=40):
+        """
+        One item per clock even if the fifo is emptied and filled again
+        """
+        u = self.u
+        ref = [i + 1 for i in range(N)]
+        u.dataIn._ag.data.extend(ref)
+        # the fifo becomes empty during the pause
+        PAUSE = self.first_word_latency() + 3
+        t_pause = N // 2 * CLK_PERIOD
+
+        def pauseInput():
+            yield Timer(t_pause)
+            u.dataIn._ag.setEnable(False)
+            yield Timer(PAUSE * CLK_PERIOD)
+            u.dataIn._ag.setEnable(True)
+
+        self.procs.append(pauseInput())
+        self.runSim((N + PAUSE + self.first_word_latency() + 1) * CLK_PERIOD)
+        self.assertValSequenceEqual(u.dataOut._ag.data, ref)
+
+    def test_capacity(self):
+        u = self.u
+        ref = [i + 1 for i in range(self.ITEMS * 2)]
+        u.dataIn._ag.data.extend(ref)
+
+        def init():
+            yield WaitWriteOnly()
+            u.dataOut._ag.setEnable(False)
+
+        self.procs.append(init())
+        self.runSim(self.ITEMS * 4 * CLK_PERIOD)
+        self.assertEmpty(u.dataOut._ag.data)
+        self.assertValSequenceEqual(self.getUnconsumedInput(), ref[self.ITEMS:])
+        self.assertValEqual(u.size._ag.data[-1], self.ITEMS)
+        self.assertValEqual(u.space._ag.data[-1], 0)
+
+    def test_size_space(self, N=40):
+        u = self.u
+        ref = [i + 1 for i in range(N)]
+        u.dataIn._ag.data.extend(ref)
+        self.randomize(u.dataIn)
+        self.randomize(u.dataOut)
+
+        self.runSim(N * 6 * CLK_PERIOD)
+        self.assertValSequenceEqual(u.dataOut._ag.data, ref)
+        for size, space in zip(u.size._ag.data, u.space._ag.data):
+            self.assertEqual(int(size) + int(space), self.ITEMS)
+
+    def test_randomized(self, N=40):
+        u = self.u
+        ref = [i + 1 for i in range(N)]
+        u.dataIn._ag.data.extend(ref)
+        self.randomize(u.dataIn)
+        self.randomize(u.dataOut)
+
+        self.runSim(N * 6 * CLK_PERIOD)
+        self.assertValSequenceEqual(u.dataOut._ag.data, ref)
+
+
+class HsFifo_prefetch3TC(HsFifo_prefetchTC):
+    ITEMS = 16
+    MEM_READ_LATENCY = 3
+
+
+class HsBuilderBuffLatency(Unit):
+    """
+    Unit with a FIFO instantiated by :meth:`~.HsBuilder.buff` with specified latency
+    """
+
+    def __init__(self, items, latency):
+        self.items = items
+        self.latency = latency
+        super(HsBuilderBuffLatency, self).__init__()
+
+    def _declr(self):
+        addClkRstn(self)
+        self.dataIn = Handshaked()
+        self.dataOut = Handshaked()._m()
+
+    def _impl(self):
+        self.dataOut(HsBuilder(self, self.dataIn).buff(self.items, latency=self.latency).end)
+
+
+class HsFifo_builderLatencyTC(unittest.TestCase):
+
+    def _get_fifo(self, latency):
+        u = HsBuilderBuffLatency(8, latency)
+        to_rtl_str(u)
+        fifos = [c for c in u._units if isinstance(c, HandshakedFifo)]
+        self.assertEqual(len(fifos), 1)
+        return fifos[0]
+
+    def test_latency2(self):
+        self.assertEqual(self._get_fifo(2).MEM_READ_LATENCY, 1)
+
+    def test_latency3(self):
+        with self.assertRaises(ValueError):
+            self._get_fifo(3)
+
+    def test_latency4(self):
+        self.assertEqual(self._get_fifo(4).MEM_READ_LATENCY, 2)
+
+
+HsFifoTCs = [
+    HsFifoTC,
+    HsFifo_prefetchTC,
+    HsFifo_prefetch3TC,
+    HsFifo_builderLatencyTC,
+]
+
 if __name__ == "__main__":
     suite = unittest.TestSuite()
     # suite.addTest(HsFifoTC('test_passdata'))
-    suite.addTest(unittest.makeSuite(HsFifoTC))
+    for tc in HsFifoTCs:
+        suite.addTest(unittest.makeSuite(tc))
     runner = unittest.TextTestRunner(verbosity=3)
     runner.run(suite)
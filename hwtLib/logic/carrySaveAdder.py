@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import List, Tuple
+
+from hwt.code import Concat
+from hwt.hdl.types.bits import Bits
+from hwt.math import log2ceil
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwt.synthesizer.unit import Unit
+from hwt.synthesizer.vectorUtils import fitTo_t
+
+
+def carry_save_add(a: RtlSignal, b: RtlSignal, c: RtlSignal) -> Tuple[RtlSignal, RtlSignal]:
+    """
+    3:2 compressor (full adder for each bit), a + b + c == sum + carry
+
+    :note: all operands have to be of same width, the carry out of MSB is discarded
+    :return: tuple (sum, carry)
+    """
+    w = a._dtype.bit_length()
+    s = a ^ b ^ c
+    carry = (a & b) | (a & c) | (b & c)
+    if w == 1:
+        carry = Bits(1).from_py(0)
+    else:
+        carry = Concat(carry[w - 1:], Bits(1).from_py(0))
+    return s, carry
+
+
+def carry_save_adder_tree(parent: Unit, operands: List[RtlSignal], name: str) -> Tuple[RtlSignal, RtlSignal]:
+    """
+    Reduce the list of operands to a two operands using a tree of 3:2 compressors
+    (Wallace tree), the final addition of the two operands is left on the user
+    so it can be placed in a different pipeline stage.
+
+    :param parent: the unit where the signals for levels of the tree should be created
+    :param name: name prefix for the signals of the tree
+
+    :note: the width of the result is extended so the sum does not overflow
+    :return: tuple (sum, carry), sum + carry == sum of all operands
+    """
+    assert operands
+    w = max(o._dtype.bit_length() for o in operands) + log2ceil(len(operands))
+    t = Bits(w)
+    ops = [fitTo_t(o, t, shrink=False) for o in operands]
+    level = 0
+    while len(ops) > 2:
+        next_ops = []
+        for i in range(0, len(ops) - 2, 3):
+            for o_name, o in zip(("s", "c"), carry_save_add(*ops[i:i + 3])):
+                # each level in a separate signal to avoid the duplication of the expressions
+                o_sig = parent._sig(f"{name:s}_l{level:d}_{o_name:s}{i // 3:d}", t)
+                o_sig(o)
+                next_ops.append(o_sig)
+        next_ops.extend(ops[len(ops) - len(ops) % 3:])
+        ops = next_ops
+        level += 1
+
+    if len(ops) == 1:
+        ops.append(t.from_py(0))
+
+    return tuple(ops)
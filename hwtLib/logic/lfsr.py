@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from typing import List, Tuple, Union
 
 from hwt.code import Xor, Concat
 from hwt.hdl.constants import Time
@@ -9,6 +10,7 @@ from hwt.interfaces.std import Signal
 from hwt.interfaces.utils import addClkRstn
 from hwt.simulator.simTestCase import SingleUnitSimTestCase
 from hwt.synthesizer.param import Param
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
 from hwt.synthesizer.unit import Unit
 from hwt.synthesizer.vectorUtils import iterBits
 from pyMathBitPrecise.bit_utils import get_bit
@@ -47,6 +49,40 @@ class Lfsr(Unit):
         self.dataOut(accumulator[0])
 
 
+def lfsr_unroll_masks(POLY: int, POLY_WIDTH: int, steps: int) -> Tuple[List[int], List[int]]:
+    """
+    Resolve the output bits and the state of :class:`~.Lfsr` after specified number of steps
+    as a linear combination (xor) of the bits of the actual state.
+    This allows to generate multiple bits per clock cycle.
+
+    :return: tuple (masks for output bits, masks for bits of the next state)
+        where the mask specifies which bits of the actual state are xored together
+    """
+    state = [1 << i for i in range(POLY_WIDTH)]
+    out = []
+    for _ in range(steps):
+        out.append(state[0])
+        next_bit = 0
+        for i, b in enumerate(state):
+            if get_bit(POLY, i):
+                next_bit ^= b
+        state = [next_bit, *state[:-1]]
+    return out, state
+
+
+def lfsr_apply_masks(state: Union[int, RtlSignal], masks: List[int]) -> List[Union[int, RtlSignal]]:
+    """
+    Compute the bits from the state of the LFSR and masks from :func:`~.lfsr_unroll_masks`
+    (works for the signals and for the int values for the simulation)
+    """
+    if isinstance(state, int):
+        return [bin(state & m).count("1") & 1 for m in masks]
+    else:
+        w = state._dtype.bit_length()
+        return [Xor(*(state[i] for i in range(w) if get_bit(m, i)))
+                for m in masks]
+
+
 class LfsrTC(SingleUnitSimTestCase):
 
     @classmethod
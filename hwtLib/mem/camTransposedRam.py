@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import List, Tuple, Union
+
+from hwt.code import If, Concat, And, Or, Switch
+from hwt.hdl.types.bits import Bits
+from hwt.interfaces.agents.handshaked import HandshakedAgent
+from hwt.interfaces.std import HandshakeSync, Signal, VectSignal, Handshaked
+from hwt.math import log2ceil, isPow2
+from hwt.serializer.mode import serializeParamsUniq
+from hwt.synthesizer.param import Param
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwtLib.logic.oneHotToBin import oneHotToBin
+from hwtLib.mem.cam import Cam
+from hwtSimApi.hdlSimulator import HdlSimulator
+from pyMathBitPrecise.bit_utils import mask
+
+
+class CamMatchResHs(HandshakeSync):
+    """
+    The result of the CAM match, the index is the lowest index of the matching item
+
+    .. hwt-autodoc::
+    """
+
+    def _config(self):
+        self.INDEX_WIDTH = Param(4)
+
+    def _declr(self):
+        HandshakeSync._declr(self)
+        self.found = Signal()
+        self.index = VectSignal(self.INDEX_WIDTH)
+
+    def _initSimAgent(self, sim: HdlSimulator):
+        self._ag = CamMatchResHsAgent(sim, self)
+
+
+class CamMatchResHsAgent(HandshakedAgent):
+    """
+    Simulation agent for :class:`.CamMatchResHs` interface
+
+    data format: tuple (found, index)
+    """
+
+    def get_data(self):
+        i = self.intf
+        return (i.found.read(), i.index.read())
+
+    def set_data(self, data):
+        i = self.intf
+        if data is None:
+            found, index = None, None
+        else:
+            found, index = data
+        i.found.write(found)
+        i.index.write(index)
+
+
+@serializeParamsUniq
+class CamTransposedRam(Cam):
+    """
+    Content addressable memory with the keys stored in transposed RAMs
+
+    The key is split to chunks of CHUNK_WIDTH bits. For each chunk there is a memory with 2**CHUNK_WIDTH rows
+    and ITEMS bits in each row. The bit i in the row v is 1 if the chunk of the key of the item i is equal to v.
+    The match reads the row selected by the chunk of the key from each chunk memory (one read per chunk),
+    the rows are and-ed together and the result is converted to the index of the lowest matching item.
+    The comparators of :class:`~.Cam` are replaced by memory reads.
+
+    Each chunk memory is composed of ITEMS columns of 2**CHUNK_WIDTH x 1 bit, each with a single write port
+    (the write does not need to read the rest of the row) and a synchronous read.
+    This maps to single bit LUTRAMs (e.g. RAM32X1S/RAM64X1S/RAM256X1S on Xilinx FPGAs),
+    ITEMS * ceil(KEY_WIDTH / CHUNK_WIDTH) memories of 2**CHUNK_WIDTH bits are used in total.
+    The memories are too narrow for BRAM.
+
+    * match latency: 1 + MATCH_PIPELINE_DEPTH + log(ITEMS, PRIORITY_ENCODER_FANIN) clock cycles,
+      the throughput is one match per clock
+    * write latency: 2**CHUNK_WIDTH + 1 clock cycles, the write updates one row of each chunk memory per clock,
+      the item which is being written does not match
+
+    :ivar CHUNK_WIDTH: width of the key chunk (address width of the chunk memories)
+    :ivar MATCH_PIPELINE_DEPTH: number of register stages used for and of the rows from the chunk memories
+    :ivar PRIORITY_ENCODER_FANIN: number of inputs of the priority encoder in a single pipeline stage
+        (the priority encoder is a tree of :func:`~.oneHotToBin` with a register after each level)
+
+    :note: ITEMS and PRIORITY_ENCODER_FANIN has to be a power of 2
+
+    .. hwt-autodoc:: _example_CamTransposedRam
+    """
+
+    def _config(self):
+        Cam._config(self)
+        self.CHUNK_WIDTH = Param(5)
+        self.MATCH_PIPELINE_DEPTH = Param(1)
+        self.PRIORITY_ENCODER_FANIN = Param(16)
+
+    def _declr_match_io(self):
+        assert self.ITEMS >= 2 and isPow2(self.ITEMS), self.ITEMS
+        assert self.PRIORITY_ENCODER_FANIN >= 2 and isPow2(self.PRIORITY_ENCODER_FANIN), self.PRIORITY_ENCODER_FANIN
+        assert self.MATCH_PIPELINE_DEPTH >= 1, self.MATCH_PIPELINE_DEPTH
+        assert self.CHUNK_WIDTH >= 1, self.CHUNK_WIDTH
+        self.match = m = Handshaked()
+        m.DATA_WIDTH = self.KEY_WIDTH
+        self.out = o = CamMatchResHs()._m()
+        o.INDEX_WIDTH = log2ceil(self.ITEMS)
+
+    def key_chunks(self) -> List[Tuple[int, int]]:
+        """
+        :return: list of tuples (high, low) of the chunks of the key
+        """
+        KW = self.KEY_WIDTH
+        CW = self.CHUNK_WIDTH
+        return [(min(low + CW, KW), low) for low in range(0, KW, CW)]
+
+    def _pipeline_reg(self, en: RtlSignal, name: str, v: RtlSignal, def_val=None):
+        r = self._reg(name, v._dtype, def_val=def_val)
+        If(en,
+           r(v)
+        )
+        return r
+
+    def writeHandler(self, chunk_mems: List[List[RtlSignal]], item_vld: RtlSignal):
+        """
+        Multi-cycle write, in each clock one row of each chunk memory is updated
+        (only the column of the written item is written)
+        """
+        w = self.write
+        ITEMS = self.ITEMS
+        ROW_W = min(self.CHUNK_WIDTH, self.KEY_WIDTH)
+
+        w_busy = self._reg("w_busy", def_val=0)
+        # one hot encoded index of the item which is being written
+        w_mask = self._reg("w_mask", Bits(ITEMS))
+        w_mask_next = self._sig("w_mask_next", Bits(ITEMS))
+        w_key = self._reg("w_key", Bits(self.KEY_WIDTH))
+        w_row = self._reg("w_row", Bits(ROW_W), def_val=0)
+        w_last = w_row._eq(mask(ROW_W))
+        w_start = w.vld & ~w_busy
+        w.rd(~w_busy)
+        If(w_start,
+            w_busy(1),
+            w_mask(w_mask_next),
+            w_key(w.data),
+            w_row(0),
+        ).Elif(w_busy,
+            If(w_last,
+               w_busy(0),
+            ),
+            w_row(w_row + 1),
+        )
+        if self.USE_VLD_BIT:
+            w_vld_flag = self._reg("w_vld_flag")
+            If(w_start,
+               w_vld_flag(w.vld_flag)
+            )
+        else:
+            w_vld_flag = 1
+
+        # the item is not valid while it is being written
+        item_vld_next = self._sig("item_vld_next", Bits(ITEMS))
+        for i in range(ITEMS):
+            w_mask_next[i](w.addr._eq(i))
+            start = w_start & w_mask_next[i]
+            end = w_busy & w_last & w_mask[i]
+            item_vld_next[i]((~start & ~end & item_vld[i]) | (end & w_vld_flag))
+        item_vld(item_vld_next)
+
+        for (high, low), columns in zip(self.key_chunks(), chunk_mems):
+            cw = high - low
+            row = w_row[cw:]
+            en = w_busy
+            if cw < ROW_W:
+                # this chunk memory has less rows
+                en = en & w_row[:cw]._eq(0)
+            bit = w_key[high:low]._eq(row)
+            for i, col in enumerate(columns):
+                If(self.clk._onRisingEdge(),
+                    If(en & w_mask[i],
+                       col[row](bit)
+                    )
+                )
+
+    def match_and(self, en: RtlSignal, vld: RtlSignal, rows: List[RtlSignal]) -> Tuple[RtlSignal, RtlSignal]:
+        """
+        And the rows from the chunk memories in MATCH_PIPELINE_DEPTH stages
+
+        :return: tuple (valid, one hot encoded match)
+        """
+        D = self.MATCH_PIPELINE_DEPTH
+        for stage in range(D):
+            # number of rows and-ed together in this stage
+            fanin = 1
+            while fanin ** (D - stage) < len(rows):
+                fanin += 1
+            rows = [
+                self._pipeline_reg(en, f"match_and{stage:d}_{g_i:d}", And(*rows[g:g + fanin]))
+                for g_i, g in enumerate(range(0, len(rows), fanin))
+            ]
+            vld = self._pipeline_reg(en, f"match_and{stage:d}_vld", vld, def_val=0)
+
+        assert len(rows) == 1, rows
+        return vld, rows[0]
+
+    def priority_encoder(self, en: RtlSignal, vld: RtlSignal,
+                         match_one_hot: RtlSignal) -> Tuple[RtlSignal, RtlSignal, RtlSignal]:
+        """
+        Pipelined priority encoder, tree of :func:`~.oneHotToBin`, the lowest index has the priority
+
+        :return: tuple (valid, found, index)
+        """
+        F = self.PRIORITY_ENCODER_FANIN
+        found: List[RtlSignal] = [match_one_hot[i] for i in range(self.ITEMS)]
+        index: List[Union[RtlSignal, None]] = [None for _ in found]
+        level = 0
+        while len(found) > 1:
+            _found = []
+            _index = []
+            for g_i, g in enumerate(range(0, len(found), F)):
+                g_found = found[g:g + F]
+                g_index = index[g:g + F]
+                name = f"prio_enc{level:d}_{g_i:d}"
+                sel = oneHotToBin(self, g_found, f"{name:s}_sel")
+                if g_index[0] is None:
+                    i = sel
+                else:
+                    # index from the previous level selected by this level
+                    index_sel = self._sig(f"{name:s}_index_sel", g_index[0]._dtype)
+                    Switch(sel).add_cases(
+                        (i, index_sel(ix))
+                        for i, ix in enumerate(g_index)
+                    )
+                    i = Concat(sel, index_sel)
+                _found.append(self._pipeline_reg(en, f"{name:s}_found", Or(*g_found)))
+                _index.append(self._pipeline_reg(en, f"{name:s}_index", i))
+
+            vld = self._pipeline_reg(en, f"prio_enc{level:d}_vld", vld, def_val=0)
+            found = _found
+            index = _index
+            level += 1
+
+        return vld, found[0], index[0]
+
+    def matchHandler(self, chunk_mems: List[List[RtlSignal]], item_vld: RtlSignal,
+                     key: Handshaked, match_res: CamMatchResHs):
+        # the whole pipeline is stalled if the output is not read
+        en = self._sig("match_pipeline_en")
+
+        # read rows from the chunk memories (the memory read is a first stage of the pipeline)
+        rows = [
+            self._pipeline_reg(en, "match_item_vld", item_vld),
+        ]
+        for c, ((high, low), columns) in enumerate(zip(self.key_chunks(), chunk_mems)):
+            addr = key.data[high:low]
+            row = []
+            for i, col in enumerate(columns):
+                # synchronous read of the column
+                dout = self._sig(f"chunk{c:d}_col{i:d}_dout")
+                If(self.clk._onRisingEdge(),
+                    If(en,
+                       dout(col[addr])
+                    )
+                )
+                row.append(dout)
+            rows.append(Concat(*reversed(row)))
+        vld = self._pipeline_reg(en, "match_vld", key.vld, def_val=0)
+        key.rd(en)
+
+        vld, match_one_hot = self.match_and(en, vld, rows)
+        vld, found, index = self.priority_encoder(en, vld, match_one_hot)
+
+        en(~vld | match_res.rd)
+        match_res.vld(vld)
+        match_res.found(found)
+        match_res.index(index)
+
+    def _impl(self):
+        ITEMS = self.ITEMS
+        chunk_mems = []
+        for c, (high, low) in enumerate(self.key_chunks()):
+            ROWS = 2 ** (high - low)
+            if self.USE_VLD_BIT:
+                init = [0 for _ in range(ROWS)]
+            else:
+                # all items have key 0 after reset
+                init = [int(r == 0) for r in range(ROWS)]
+            columns = [
+                self._sig(f"chunk{c:d}_col{i:d}_mem", Bits(1)[ROWS], init)
+                for i in range(ITEMS)
+            ]
+            chunk_mems.append(columns)
+
+        item_vld = self._reg("item_vld", Bits(ITEMS),
+                             def_val=0 if self.USE_VLD_BIT else mask(ITEMS))
+        self.writeHandler(chunk_mems, item_vld)
+        self.matchHandler(chunk_mems, item_vld, self.match, self.out)
+
+
+def _example_CamTransposedRam():
+    u = CamTransposedRam()
+    u.ITEMS = 4096
+    u.KEY_WIDTH = 16
+    u.CHUNK_WIDTH = 8
+    u.MATCH_PIPELINE_DEPTH = 1
+    u.PRIORITY_ENCODER_FANIN = 16
+    return u
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = _example_CamTransposedRam()
+    print(to_rtl_str(u))
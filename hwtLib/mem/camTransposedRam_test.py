@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from random import Random
+
+from hwt.hdl.constants import NOP
+from hwt.simulator.simTestCase import SingleUnitSimTestCase
+from hwtLib.mem.camTransposedRam import CamTransposedRam
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer
+
+
+class CamTransposedRamTC(SingleUnitSimTestCase):
+
+    @classmethod
+    def getUnit(cls):
+        cls.u = u = CamTransposedRam()
+        u.ITEMS = 32
+        u.KEY_WIDTH = 12
+        u.CHUNK_WIDTH = 5
+        u.PRIORITY_ENCODER_FANIN = 4
+        return u
+
+    def match_latency(self):
+        u = self.u
+        PRIO_ENC_LEVELS = 0
+        i = u.ITEMS
+        while i > 1:
+            i = (i + u.PRIORITY_ENCODER_FANIN - 1) // u.PRIORITY_ENCODER_FANIN
+            PRIO_ENC_LEVELS += 1
+        return 1 + u.MATCH_PIPELINE_DEPTH + PRIO_ENC_LEVELS
+
+    def write_latency(self):
+        return 2 ** self.u.CHUNK_WIDTH + 1
+
+    def outData(self):
+        """
+        :return: the match results with index as None if the item was not found
+            (the index is not specified in this case)
+        """
+        return [(int(found), int(index) if found else None)
+                for found, index in self.u.out._ag.data]
+
+    def test_writeAndMatchTest(self):
+        u = self.u
+        u.write._ag.data.extend([(0, 1, 1),
+                                 (1, 3, 1),
+                                 (7, 11, 1),
+                                 ])
+        u.match._ag.data.extend([NOP for _ in range(3 * self.write_latency())])
+        u.match._ag.data.extend([1, 2, 3, 5, 11, 12])
+
+        self.runSim((4 * self.write_latency() + self.match_latency() + 10) * CLK_PERIOD)
+        self.assertValSequenceEqual(self.outData(),
+                                    [(1, 0), (0, None), (1, 1), (0, None), (1, 7), (0, None)])
+
+    def test_overwrite_and_invalidate(self):
+        u = self.u
+        u.write._ag.data.extend([
+            (3, 10, 1),
+            (4, 20, 1),
+            # overwrite item 3
+            (3, 30, 1),
+            # invalidate item 4
+            (4, 20, 0),
+        ])
+        u.match._ag.data.extend([NOP for _ in range(4 * self.write_latency())])
+        u.match._ag.data.extend([10, 20, 30])
+
+        self.runSim((5 * self.write_latency() + self.match_latency() + 10) * CLK_PERIOD)
+        self.assertValSequenceEqual(self.outData(),
+                                    [(0, None), (0, None), (1, 3)])
+
+    def test_priority(self):
+        u = self.u
+        u.write._ag.data.extend([
+            (u.ITEMS - 1, 5, 1),
+            (9, 5, 1),
+            (17, 5, 1),
+        ])
+        u.match._ag.data.extend([NOP for _ in range(3 * self.write_latency())])
+        u.match._ag.data.append(5)
+
+        self.runSim((4 * self.write_latency() + self.match_latency() + 10) * CLK_PERIOD)
+        self.assertValSequenceEqual(self.outData(), [(1, 9)])
+
+    def test_match_throughput(self):
+        u = self.u
+        u.write._ag.data.extend((i, i + 100, 1) for i in range(4))
+        N = 40
+        MATCHES = [(i % 8) + 100 for i in range(N)]
+        t0 = (4 * self.write_latency() + 5) * CLK_PERIOD
+
+        def planMatch():
+            yield Timer(t0)
+            u.match._ag.data.extend(MATCHES)
+            # one match per clock
+            yield Timer((N + self.match_latency() + 1) * CLK_PERIOD)
+            self.assertEqual(len(u.out._ag.data), N)
+
+        self.procs.append(planMatch())
+        self.runSim(t0 + (N + self.match_latency() + 10) * CLK_PERIOD)
+        self.assertValSequenceEqual(self.outData(), [
+            (1, m - 100) if m - 100 < 4 else (0, None)
+            for m in MATCHES
+        ])
+
+    def test_random(self, N=40, randomized=True):
+        u = self.u
+        rand = Random(0)
+        KEYS = 16
+        ITEMS = 8
+        mem = {}
+        writes = []
+        for _ in range(N):
+            i = rand.randint(0, ITEMS - 1)
+            k = rand.randint(0, KEYS - 1)
+            vld = rand.random() < 0.8
+            writes.append((i, k, int(vld)))
+            if vld:
+                mem[i] = k
+            else:
+                mem.pop(i, None)
+        u.write._ag.data.extend(writes)
+
+        t0 = (N * self.write_latency() * 2) * CLK_PERIOD
+        MATCHES = [rand.randint(0, KEYS - 1) for _ in range(N)]
+
+        def planMatch():
+            yield Timer(t0)
+            u.match._ag.data.extend(MATCHES)
+
+        if randomized:
+            self.randomize(u.write)
+            self.randomize(u.match)
+            self.randomize(u.out)
+
+        self.procs.append(planMatch())
+        self.runSim(t0 + (N * 4 + self.match_latency() + 10) * CLK_PERIOD)
+
+        expected = []
+        for k in MATCHES:
+            index = None
+            for i, _k in sorted(mem.items()):
+                if _k == k:
+                    index = i
+                    break
+            expected.append((0, None) if index is None else (1, index))
+
+        self.assertValSequenceEqual(self.outData(), expected)
+
+
+class CamTransposedRam_deepPipelineTC(CamTransposedRamTC):
+
+    @classmethod
+    def getUnit(cls):
+        cls.u = u = CamTransposedRam()
+        u.ITEMS = 64
+        u.KEY_WIDTH = 13
+        u.CHUNK_WIDTH = 3
+        u.MATCH_PIPELINE_DEPTH = 3
+        u.PRIORITY_ENCODER_FANIN = 2
+        return u
+
+
+class CamTransposedRam_noVldTC(SingleUnitSimTestCase):
+    outData = CamTransposedRamTC.outData
+
+    @classmethod
+    def getUnit(cls):
+        cls.u = u = CamTransposedRam()
+        u.ITEMS = 8
+        u.KEY_WIDTH = 8
+        u.CHUNK_WIDTH = 4
+        u.USE_VLD_BIT = False
+        return u
+
+    def test_writeAndMatchTest(self):
+        u = self.u
+        u.write._ag.data.extend([(0, 1), (5, 3)])
+        u.match._ag.data.extend([NOP for _ in range(40)])
+        # all other items have key 0 after reset
+        u.match._ag.data.extend([0, 1, 3, 4])
+
+        self.runSim(60 * CLK_PERIOD)
+        self.assertValSequenceEqual(self.outData(),
+                                    [(1, 1), (1, 0), (1, 5), (0, None)])
+
+
+CamTransposedRamTCs = [
+    CamTransposedRamTC,
+    CamTransposedRam_deepPipelineTC,
+    CamTransposedRam_noVldTC,
+]
+
+if __name__ == "__main__":
+    import unittest
+    suite = unittest.TestSuite()
+    # suite.addTest(CamTransposedRamTC('test_writeAndMatchTest'))
+    for tc in CamTransposedRamTCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
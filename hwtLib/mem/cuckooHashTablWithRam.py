@@ -20,7 +20,7 @@ class CuckooHashTableWithRam(CuckooHashTable):
         CuckooHashTable.__init__(self)
 
     def _config(self):
-        CuckooHashTable._config(self)
+        super(CuckooHashTableWithRam, self)._config()
         self.TABLE_CNT = len(self.polynomials)
         self.POLYNOMIALS = Param(tuple(self.polynomials))
 
@@ -38,7 +38,7 @@ class CuckooHashTableWithRam(CuckooHashTable):
             t_io.lookupRes(HsBuilder(self, t.io.lookupRes).buff(latency=(1, 2)).end)
 
         self.tables = list(self.tables_tmp) 
-        CuckooHashTable._impl(self)
+        super(CuckooHashTableWithRam, self)._impl()
 
 
 def _example_CuckooHashTableWithRam():
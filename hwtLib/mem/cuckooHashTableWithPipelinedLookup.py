@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import List, Tuple
+
+from hwt.code import FsmBuilder, And, If, SwitchLogic, Concat, In
+from hwt.code_utils import rename_signal
+from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.defs import BIT
+from hwt.hdl.types.enum import HEnum
+from hwt.hdl.types.struct import HStruct
+from hwt.interfaces.std import Handshaked
+from hwt.interfaces.utils import propagateClkRstn
+from hwt.math import log2ceil
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwtLib.handshaked.fifo import HandshakedFifo
+from hwtLib.handshaked.streamNode import StreamNode
+from hwtLib.logic.crcPoly import CRC_32, CRC_32C
+from hwtLib.mem.cuckooHashTablWithRam import CuckooHashTableWithRam
+from hwtLib.mem.cuckooHashTable import CuckooHashTable, ORIGIN_TYPE
+from hwtLib.mem.hashTableCore import HashTableCore
+
+
+class CuckooHashTableWithPipelinedLookup(CuckooHashTable):
+    """
+    :class:`~.CuckooHashTable` with a lookup path which is decoupled from the main FSM
+
+    The lookups from the lookup interface are passed directly to the tables and they are not
+    waiting for the main FSM (one lookup per clock). The lookups of the main FSM share the lookup ports
+    of the tables and they have the priority, they are marked by lookupId=1.
+    At most MAX_LOOKUP_OVERLAP lookups can be in progress.
+
+    During insert there is always one item which is not stored in any table (the item in the stash register).
+    The stash is searched together with the tables and if the item is found in the stash
+    the result from the stash is used (forwarding from in-flight insert).
+    Reads from the table have priority over the writes, the lookups from the lookup interface
+    are stalled while the main FSM writes to tables so the writes can not be starved.
+    Because the read and write does not happen in the same clock cycle
+    and the stash is updated together with the write to the table, the lookup sees
+    a consistent snapshot of the tables and stash (all inserts and deletes are atomic from the lookup perspective).
+
+    .. hwt-autodoc:: _example_CuckooHashTableWithPipelinedLookupAndRam
+    """
+
+    def _declr_outer_io(self):
+        CuckooHashTable._declr_outer_io(self)
+        # the result of the stash lookup waiting for the result from tables
+        f = self.lookup_stash_res = HandshakedFifo(Handshaked)
+        f.DEPTH = self.MAX_LOOKUP_OVERLAP
+        f.DATA_WIDTH = 1 + self.KEY_WIDTH + self.DATA_WIDTH
+
+    def configure_tables(self, tables: List[HashTableCore]):
+        """
+        :note: lookupId=1 marks the lookup of the main FSM
+        """
+        CuckooHashTable.configure_tables(self, tables)
+        for t in tables:
+            t.LOOKUP_ID_WIDTH = 1
+
+    def stash_match(self, name: str, stash_vld: RtlSignal, stash_key: List[RtlSignal], key: RtlSignal):
+        """
+        :return: one-hot encoded index of the stash item with the key
+        """
+        m = self._sig(name, Bits(len(stash_key), force_vector=True))
+        m(Concat(*reversed([
+            stash_vld[i] & k._eq(key)
+            for i, k in enumerate(stash_key)
+        ])))
+        return m
+
+    def lookup_path(self, fsm_lookup: RtlSignal, fsm_lookup_key: RtlSignal, fsm_lookup_res_en: RtlSignal,
+                    lookup_en: RtlSignal, stash_vld: RtlSignal,
+                    stash_key: List[RtlSignal], stash_data: List[RtlSignal]) -> Tuple[RtlSignal, RtlSignal]:
+        """
+        Lookup in tables and in the stash, the results from the tables for the lookups
+        of the main FSM are marked by lookupId=1
+
+        :param fsm_lookup: the main FSM requests a lookup
+        :param fsm_lookup_key: the key for the lookup of the main FSM
+        :param fsm_lookup_res_en: the main FSM consumes the result of its lookup
+        :param lookup_en: if 0 the lookups from the lookup interface are stalled
+        :param stash_vld: the vector of valid flags of the items in the stash
+
+        :return: tuple (tables lookup ack, the result of the lookup of the main FSM is valid on tables lookupRes)
+        """
+        tables = self.tables
+        lookup = self.lookup
+        lookupRes = self.lookupRes
+        f = self.lookup_stash_res
+        DW = self.DATA_WIDTH
+        KW = self.KEY_WIDTH
+
+        # lookup in the stash together with the lookup in the tables
+        ext_lookup_en = ~fsm_lookup & lookup_en
+        table_lookup = StreamNode(slaves=[t.lookup for t in tables])
+        table_lookup.sync(fsm_lookup | (ext_lookup_en & lookup.vld & f.dataIn.rd))
+        tables_lookup_rd = And(*(t.lookup.rd for t in tables))
+        for t in tables:
+            t.lookup.key(fsm_lookup._ternary(fsm_lookup_key, lookup.key))
+            t.lookup.lookupId(fsm_lookup)
+        lookup.rd(ext_lookup_en & tables_lookup_rd & f.dataIn.rd)
+        f.dataIn.vld(ext_lookup_en & tables_lookup_rd & lookup.vld)
+
+        s_match = self.stash_match("lookup_stash_match", stash_vld, stash_key, lookup.key)
+        s_data = self._sig("lookup_stash_data", Bits(DW))
+        SwitchLogic([(s_match[i], s_data(d)) for i, d in enumerate(stash_data)],
+                    default=s_data(None))
+        f.dataIn.data(Concat(s_match != 0, lookup.key, s_data))
+
+        # the results for the lookup interface are merged with the result of the stash lookup
+        res = [t.lookupRes for t in tables]
+        res_is_fsm = res[0].lookupId[0]
+        tables_res_vld = And(*(r.vld for r in res))
+        table_lookupRes = StreamNode(masters=res)
+        table_lookupRes.sync((res_is_fsm & fsm_lookup_res_en) |
+                             (~res_is_fsm & lookupRes.rd & f.dataOut.vld))
+        lookupRes.vld(tables_res_vld & ~res_is_fsm & f.dataOut.vld)
+        f.dataOut.rd(tables_res_vld & ~res_is_fsm & lookupRes.rd)
+
+        s_res = f.dataOut.data
+        s_found = s_res[DW + KW]
+        s_key = s_res[DW + KW:DW]
+        s_data = s_res[DW:]
+
+        def connect_res(key, data, found, occupied):
+            return [
+                lookupRes.key(key) if self.LOOKUP_KEY else (),
+                lookupRes.data(data),
+                lookupRes.found(found),
+                lookupRes.occupied(occupied),
+            ]
+
+        SwitchLogic([
+                (s_found, connect_res(s_key, s_data, 1, 1)),
+                *((r.found, connect_res(r.key, r.data, r.found, r.occupied)) for r in res)
+            ],
+            default=connect_res(res[0].key, res[0].data, res[0].found, res[0].occupied)
+        )
+
+        return table_lookup.ack(), rename_signal(self, tables_res_vld & res_is_fsm, "fsm_lookupRes_vld")
+
+    def stash_load(self, isIdle: RtlSignal, lookupResNext: RtlSignal, insertTargetOH: RtlSignal, stash: RtlSignal):
+        """
+        load a stash register from insert/delete interface
+        """
+        insert = self.insert
+        delete = self.delete
+        assert self.MAX_REINSERT > 0, self.MAX_REINSERT
+        If(isIdle,
+            If(self.clean.vld,
+                stash.origin_op(ORIGIN_TYPE.DELETE),
+                stash.item_vld(0)
+            ).Elif(delete.vld,
+                stash.origin_op(ORIGIN_TYPE.DELETE),
+                stash.key(delete.key),
+                stash.item_vld(0),
+            ).Elif(insert.vld,
+                stash.origin_op(ORIGIN_TYPE.INSERT),
+                stash.key(insert.key),
+                stash.data(insert.data),
+                stash.reinsert_cntr(self.MAX_REINSERT),
+                stash.item_vld(1),
+            )
+        ).Elif(lookupResNext,
+            SwitchLogic([
+                (insertTargetOH[i],
+                    [
+                        # load stash from item found previously
+                        # :note: happens in same time as write to table
+                        #     so the stash and item in table is swapped
+                        stash.key(t.lookupRes.key),
+                        stash.data(t.lookupRes.data),
+                        stash.reinsert_cntr(stash.reinsert_cntr - 1),
+                        stash.item_vld(t.lookupRes.occupied),
+                    ]
+                  )
+                  for i, t in enumerate(self.tables)
+                ],
+                default=[
+                    stash.origin_op(ORIGIN_TYPE.DELETE),
+                    stash.key(None),
+                    stash.data(None),
+                    stash.reinsert_cntr(None),
+                    stash.item_vld(None),
+                ])
+        )
+        cmd_priority = [self.clean, self.delete, self.insert]
+        for i, intf in enumerate(cmd_priority):
+            withLowerPrio = cmd_priority[:i]
+            intf.rd(And(isIdle, *[~x.vld for x in withLowerPrio]))
+
+    def _impl(self):
+        propagateClkRstn(self)
+
+        # stash is storage for item which is going to be swapped with actual
+        stash_t = HStruct(
+            (Bits(self.KEY_WIDTH), "key"),
+            (Bits(self.DATA_WIDTH), "data"),
+            (Bits(log2ceil(self.MAX_REINSERT + 1)), "reinsert_cntr"),
+            (BIT, "item_vld"),
+            (ORIGIN_TYPE, "origin_op"),
+        )
+        stash = self._reg("stash", stash_t, def_val={"origin_op": ORIGIN_TYPE.DELETE})
+
+        cleanAck = self._sig("cleanAck")
+        cleanAddr, cleanLast = self.clean_addr_iterator(cleanAck)
+        lookupResRead = self._sig("lookupResRead")
+        isDelete = stash.origin_op._eq(ORIGIN_TYPE.DELETE)
+        isInsert = stash.origin_op._eq(ORIGIN_TYPE.INSERT)
+        insertAck = StreamNode(slaves=[t.insert for t in self.tables]).ack()
+
+        fsm_t = HEnum("insertFsm_t", ["idle", "cleaning",
+                                      "lookup", "lookupResWaitRd",
+                                      "lookupResAck"])
+        fsm = FsmBuilder(self, fsm_t, "insertFsm")
+        state = fsm.stateReg
+
+        # the item in the stash is not stored in any table
+        stash_in_flight = self._sig("stash_in_flight", Bits(1, force_vector=True))
+        stash_in_flight(~state._eq(fsm_t.idle) & isInsert & stash.item_vld)
+        lookupResNext = self._sig("lookupResNext")
+        fsm_lookup = rename_signal(
+            self,
+            state._eq(fsm_t.lookup) & ((stash.reinsert_cntr != 0) | isDelete),
+            "fsm_lookup")
+        lookupAck, lookupResVld = self.lookup_path(
+            fsm_lookup, stash.key, lookupResNext,
+            # the lookups are stalled while the FSM writes to tables
+            ~In(state, [fsm_t.cleaning, fsm_t.lookupResAck]),
+            stash_in_flight, [stash.key], [stash.data])
+
+        (_,
+         insertFinal,
+         _,
+         insertTargetOH) = self.tables_lookupRes_resolver(lookupResRead)
+        # tables_lookupRes_resolver uses the lookupRes.vld of tables directly
+        # which is also valid for the lookups from the lookup interface
+        lookupResRead(state._eq(fsm_t.lookupResWaitRd) & lookupResVld)
+
+        fsm.Trans(fsm_t.idle,
+                (self.clean.vld, fsm_t.cleaning),
+                # before each insert suitable place has to be searched first
+                (self.insert.vld | self.delete.vld, fsm_t.lookup)
+            ).Trans(fsm_t.cleaning,
+                # walk all items and clean it's item_vlds
+                (insertAck & cleanLast, fsm_t.idle),
+            ).Trans(fsm_t.lookup,
+                # insert timeout
+                (stash.reinsert_cntr._eq(0) & isInsert & self.insertRes.rd, fsm_t.idle),
+                # search and resolve in which table item
+                # should be stored
+                (((stash.reinsert_cntr != 0) | ~isInsert) & lookupAck, fsm_t.lookupResWaitRd)
+            ).Trans(fsm_t.lookupResWaitRd,
+                # process result of lookup and
+                (lookupResVld, fsm_t.lookupResAck)
+            ).Trans(fsm_t.lookupResAck,
+                # process lookupRes, if we are going to insert on place where
+                # valid item is, this item has to be stored to stash
+                (isDelete, fsm_t.idle),
+                # insert into specified table
+                (insertAck & insertFinal & (isDelete | self.insertRes.rd), fsm_t.idle),
+                # insert and swap with some valid item from the table
+                # which we need to store somewhere as well
+                (insertAck & ~insertFinal, fsm_t.lookup)
+            )
+
+        cleanAck(insertAck & state._eq(fsm_t.cleaning))
+        lookupResNext(state._eq(fsm_t.lookupResAck) & (state.next != fsm_t.lookupResAck))
+
+        self.stash_load(
+            state._eq(fsm_t.idle),
+            lookupResNext,
+            insertTargetOH,
+            stash)
+        insertIndex = self.insert_addr_select(insertTargetOH, state, cleanAddr)
+        self.insertRes_driver(state, stash, insertAck, insertFinal, isDelete)
+        self.tables_insert_driver(state, insertTargetOH, insertIndex, stash)
+
+
+class CuckooHashTableWithPipelinedLookupAndRam(CuckooHashTableWithRam, CuckooHashTableWithPipelinedLookup):
+    """
+    :class:`~.CuckooHashTableWithPipelinedLookup` with integrated memory
+
+    .. hwt-autodoc:: _example_CuckooHashTableWithPipelinedLookupAndRam
+    """
+    pass
+
+
+def _example_CuckooHashTableWithPipelinedLookupAndRam():
+    return CuckooHashTableWithPipelinedLookupAndRam([CRC_32, CRC_32C])
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = _example_CuckooHashTableWithPipelinedLookupAndRam()
+    print(to_rtl_str(u))
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.hdl.constants import NOP
+from hwtLib.logic.crcPoly import CRC_32, CRC_32C
+# imported as a module so the base test cases are not collected again from this file
+from hwtLib.mem import cuckooHashTableWithRam_test
+from hwtLib.mem.cuckooHashTableWithPipelinedLookup import CuckooHashTableWithPipelinedLookupAndRam
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer
+
+
+class CuckooHashTableWithPipelinedLookupTC(cuckooHashTableWithRam_test.CuckooHashTableWithRamTC):
+
+    @classmethod
+    def getUnit(cls):
+        u = CuckooHashTableWithPipelinedLookupAndRam([CRC_32, CRC_32C])
+        u.KEY_WIDTH = 16
+        u.DATA_WIDTH = 8
+        u.LOOKUP_KEY = True
+        u.TABLE_SIZE = 32 * 2
+        return u
+
+    def allItemsAsDict(self):
+        """
+        :return: dictionary of all items stored in the component
+        """
+        return self.hashTableAsDict()
+
+    def test_simpleInsert(self):
+        u = self.u
+        reference = {
+            56: 11,
+            99: 55,
+            105: 78,
+            15: 79,
+            16: 90
+        }
+
+        u.clean._ag.data.append(1)
+
+        def planInsert():
+            # wait because we want to execute clean first
+            yield Timer(3 * CLK_PERIOD)
+            for k, v in sorted(reference.items(), key=lambda x: x[0]):
+                u.insert._ag.data.append((k, v))
+
+        self.procs.append(planInsert())
+
+        self.runSim(120 * CLK_PERIOD)
+        self.assertValSequenceEqual(
+            [d[0] for d in u.insertRes._ag.data],
+            [0 for _ in range(len(reference))])
+        self.checkContains(reference)
+
+    def test_simpleInsertAndLookup(self, randomize=False):
+        u = self.u
+        self.cleanupMemory()
+        reference = {
+            15: 79,
+            16: 90,
+            56: 11,
+            99: 55,
+            105: 78,
+        }
+        expected = []
+        found = 1
+        occupied = 1
+
+        # the lookups are not blocked by the inserts, wait until the inserts are finished
+        lookup_delay = 15 * len(reference)
+        if randomize:
+            lookup_delay *= 3
+
+        u.lookup._ag.data.extend([NOP for _ in range(lookup_delay)])
+
+        for k, v in sorted(reference.items(), key=lambda x: x[0]):
+            u.insert._ag.data.append((k, v))
+            u.lookup._ag.data.append(k)
+            expected.append((k, v, found, occupied))
+
+        t = lookup_delay + 40
+        if randomize:
+            self.randomize_all()
+            t *= 3
+
+        self.runSim(t * CLK_PERIOD)
+        self.checkContains(reference)
+        self.assertValSequenceEqual([d[0] for d in u.insertRes._ag.data],
+                                    [0 for _ in range(len(reference))])
+        self.assertValSequenceEqual(u.lookupRes._ag.data, expected)
+
+    def test_lookup_during_insert(self, randomized=False):
+        """
+        The lookups are not blocked by the inserts
+        """
+        u = self.u
+        self.cleanupMemory()
+        CNT = 32
+        reference = {i + 1: i + 2 for i in range(CNT)}
+        for k, v in sorted(reference.items(), key=lambda x: x[0]):
+            u.insert._ag.data.append((k, v))
+        # lookups of the first item while it is being inserted
+        FIRST_KEY_LOOKUPS = 40
+        u.lookup._ag.data.extend(1 for _ in range(FIRST_KEY_LOOKUPS))
+        LOOKUPS = list(reference.keys())
+
+        t = CNT * 20
+        if randomized:
+            self.randomize_all()
+            t *= 3
+
+        def lookup_after_insert():
+            yield Timer(t * CLK_PERIOD)
+            u.lookup._ag.data.extend(LOOKUPS)
+
+        self.procs.append(lookup_after_insert())
+        self.runSim((t + 4 * CNT) * CLK_PERIOD)
+        self.checkContains(reference, self.allItemsAsDict())
+        res = u.lookupRes._ag.data
+        self.assertEqual(len(res), FIRST_KEY_LOOKUPS + len(LOOKUPS))
+        for (key, data, found, _), ref_key in zip(res, [1 for _ in range(FIRST_KEY_LOOKUPS)] + LOOKUPS):
+            if found:
+                self.assertValEqual(key, ref_key)
+                self.assertValEqual(data, reference[ref_key])
+        found = [int(d[2]) for d in res]
+        # the item is not found until the insert is finished and then it is always found
+        first_found = found.index(1)
+        self.assertGreater(first_found, 0)
+        self.assertEqual(found[first_found:], [1 for _ in range(len(found) - first_found)])
+
+    def test_lookup_during_insert_randomized(self):
+        self.test_lookup_during_insert(randomized=True)
+
+    def test_lookup_throughput(self):
+        """
+        One lookup per clock if there is not any insert in progress
+        """
+        u = self.u
+        self.cleanupMemory()
+        reference = {i + 1: i + 2 for i in range(16)}
+        for k, v in sorted(reference.items(), key=lambda x: x[0]):
+            u.insert._ag.data.append((k, v))
+
+        N = 64
+        LOOKUPS = [(i % 32) + 1 for i in range(N)]
+        t0 = len(reference) * 20 * CLK_PERIOD
+        # latency of the lookup
+        LATENCY = 10
+
+        def lookups():
+            yield Timer(t0)
+            self.assertEmpty(u.insert._ag.data)
+            u.lookup._ag.data.extend(LOOKUPS)
+            yield Timer((N + LATENCY) * CLK_PERIOD)
+            self.assertEqual(len(u.lookupRes._ag.data), N)
+
+        self.procs.append(lookups())
+        self.runSim(t0 + (N + LATENCY + 10) * CLK_PERIOD)
+        self.assertValSequenceEqual(
+            [(int(d[2]), int(d[1]) if d[2] else None) for d in u.lookupRes._ag.data],
+            [(1, reference[k]) if k in reference else (0, None) for k in LOOKUPS])
+
+
+class CuckooHashTableWithPipelinedLookup_2Table_collisionTC(cuckooHashTableWithRam_test.CuckooHashTableWithRam_common_TC):
+
+    @classmethod
+    def getUnit(cls):
+        u = CuckooHashTableWithPipelinedLookupAndRam([CRC_32, CRC_32C])
+        u.KEY_WIDTH = 8
+        u.DATA_WIDTH = 8
+        u.LOOKUP_KEY = True
+        u.TABLE_SIZE = 2 * 4
+        u.MAX_REINSERT = 4
+        return u
+
+    def test_lookup_consistency_during_insert(self, randomized=False):
+        """
+        Once the item is found by lookup it has to be found by all later lookups, even if it is
+        being moved to a different table by a later insert (unless it was popped out on insertRes)
+        """
+        u = self.u
+        self.cleanupMemory()
+        CNT = u.TABLE_SIZE
+        reference = {i + 1: i + 2 for i in range(CNT)}
+        for k, v in sorted(reference.items(), key=lambda x: x[0]):
+            u.insert._ag.data.append((k, v))
+        LOOKUPS = [(i % CNT) + 1 for i in range(CNT * 40)]
+        u.lookup._ag.data.extend(LOOKUPS)
+
+        t = CNT * 60
+        if randomized:
+            self.randomize_all()
+            t *= 4
+
+        self.runSim(t * CLK_PERIOD)
+        self.assertEqual(len(u.insertRes._ag.data), CNT)
+        table = self.hashTableAsDict()
+        popped = set()
+        for pop, key, data in u.insertRes._ag.data:
+            if pop:
+                key = int(key)
+                self.assertNotIn(key, table)
+                table[key] = data
+                popped.add(key)
+        self.checkContains(reference, table)
+
+        res = u.lookupRes._ag.data
+        self.assertEqual(len(res), len(LOOKUPS))
+        found_by_key = {}
+        for (key, data, found, _), ref_key in zip(res, LOOKUPS):
+            if found:
+                self.assertValEqual(key, ref_key)
+                self.assertValEqual(data, reference[ref_key])
+            found_by_key.setdefault(ref_key, []).append(int(found))
+
+        for k, found in found_by_key.items():
+            if k in popped:
+                continue
+            first_found = found.index(1)
+            self.assertEqual(found[first_found:], [1 for _ in range(len(found) - first_found)], k)
+
+    def test_lookup_consistency_during_insert_randomized(self):
+        self.test_lookup_consistency_during_insert(randomized=True)
+
+
+CuckooHashTableWithPipelinedLookupTCs = [
+    CuckooHashTableWithPipelinedLookupTC,
+    CuckooHashTableWithPipelinedLookup_2Table_collisionTC,
+]
+
+if __name__ == "__main__":
+    import unittest
+    suite = unittest.TestSuite()
+    # suite.addTest(CuckooHashTableWithPipelinedLookupTC('test_lookup_throughput'))
+    for tc in CuckooHashTableWithPipelinedLookupTCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
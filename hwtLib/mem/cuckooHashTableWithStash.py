@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import List, Tuple, Optional, Union
+
+from hwt.code import FsmBuilder, And, Or, If, SwitchLogic, Concat, Switch, \
+    In
+from hwt.code_utils import rename_signal
+from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.enum import HEnum
+from hwt.interfaces.utils import propagateClkRstn
+from hwt.math import log2ceil
+from hwt.synthesizer.param import Param
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwtLib.logic.crcPoly import CRC_32, CRC_32C
+from hwtLib.mem.cuckooHashTablWithRam import CuckooHashTableWithRam
+from hwtLib.mem.cuckooHashTable import ORIGIN_TYPE
+from hwtLib.mem.cuckooHashTableWithPipelinedLookup import CuckooHashTableWithPipelinedLookup
+from pyMathBitPrecise.bit_utils import mask
+
+
+class CuckooHashTableWithStash(CuckooHashTableWithPipelinedLookup):
+    """
+    :class:`~.CuckooHashTableWithPipelinedLookup` with a bounded insert time and a stash
+
+    The insert searches for an empty slot using a breadth-first search in the cuckoo graph.
+    The search tree is stored in registers, the root is the inserted item and the other nodes
+    are the items which may be moved to a different table. The nodes are expanded in BFS order
+    by a lookup of the key in all tables. Once an empty slot is found the items on the path
+    from the root to this empty slot are moved, starting from the end of the path
+    (the moved item is always present in the table).
+    If the empty slot is not found in MAX_BFS_DEPTH levels of the tree the item is stored in the stash
+    (a small CAM in registers). If the stash is full the item is returned on insertRes with pop=1.
+    After a delete, once there are no other requests, the first item of the stash is inserted again
+    using the same BFS (without insertRes). This is repeated until the stash is empty or the insert fails.
+
+    The stash is searched in parallel with the tables by the lookup path of :class:`~.CuckooHashTableWithPipelinedLookup`.
+
+    lookup time: O(1)
+    insert time: O(1), the number of the lookups is bounded by the number of the nodes in the search tree
+    (1 + TABLE_CNT + TABLE_CNT * (TABLE_CNT - 1) + ..., MAX_BFS_DEPTH + 1 levels)
+    and the number of the writes is bounded by MAX_BFS_DEPTH + 1
+
+    :ivar STASH_ITEMS: number of items in the stash
+    :ivar MAX_BFS_DEPTH: maximal number of items which can be moved during a single insert
+    :note: MAX_REINSERT of :class:`~.CuckooHashTable` is not used and it has to keep its default value.
+    :note: The item which is moved from the stash stays in the stash until it is written to the table,
+        the lookups are not affected.
+
+    .. hwt-autodoc:: _example_CuckooHashTableWithStashAndRam
+    """
+
+    def _config(self):
+        CuckooHashTableWithPipelinedLookup._config(self)
+        self.STASH_ITEMS = Param(4)
+        self.MAX_BFS_DEPTH = Param(2)
+
+    def _declr_outer_io(self):
+        CuckooHashTableWithPipelinedLookup._declr_outer_io(self)
+        assert self.STASH_ITEMS > 0, self.STASH_ITEMS
+        assert self.MAX_BFS_DEPTH > 0, self.MAX_BFS_DEPTH
+        MAX_REINSERT = [p for p in self._params if p._name == "MAX_REINSERT"][0]
+        assert self.MAX_REINSERT == MAX_REINSERT._initval, (
+            "MAX_REINSERT is not used, the insert is bounded by MAX_BFS_DEPTH", self.MAX_REINSERT)
+
+    def bfs_tree(self) -> List[Tuple[Optional[int], Optional[int], int]]:
+        """
+        :return: list of the nodes of the search tree in BFS order,
+            node is a tuple (parent index, table index, depth), the root is (None, None, 0)
+        """
+        nodes = [(None, None, 0)]
+        i = 0
+        while i < len(nodes):
+            _, table_i, depth = nodes[i]
+            if depth < self.MAX_BFS_DEPTH:
+                for t in range(self.TABLE_CNT):
+                    if t != table_i:
+                        nodes.append((i, t, depth + 1))
+            i += 1
+        return nodes
+
+    def _mux(self, name: str, sel: RtlSignal, t, values: List[Union[RtlSignal, int]]):
+        """
+        Select a value from the list by an index
+        """
+        s = self._sig(name, t)
+        sw = Switch(sel)
+        for i, v in enumerate(values):
+            sw.Case(i, s(v))
+        if 2 ** sel._dtype.bit_length() != len(values):
+            sw.Default(s(None))
+        return s
+
+    def _impl(self):
+        propagateClkRstn(self)
+        T = self.TABLE_CNT
+        S = self.STASH_ITEMS
+        tables = self.tables
+        nodes = self.bfs_tree()
+        NODE_CNT = len(nodes)
+        node_index_t = Bits(log2ceil(NODE_CNT))
+        table_index_t = Bits(log2ceil(T))
+        key_t = Bits(self.KEY_WIDTH)
+        data_t = Bits(self.DATA_WIDTH)
+        hash_t = Bits(self.HASH_WIDTH)
+
+        # the root of the search tree is the item from insert/delete
+        node_key = [self._reg("item_key", key_t), ]
+        node_data = [self._reg("item_data", data_t), ]
+        node_hash = [None, ]
+        for n in range(1, NODE_CNT):
+            node_key.append(self._reg(f"node{n:d}_key", key_t))
+            node_data.append(self._reg(f"node{n:d}_data", data_t))
+            node_hash.append(self._reg(f"node{n:d}_hash", hash_t))
+        op = self._reg("op", ORIGIN_TYPE, def_val=ORIGIN_TYPE.DELETE)
+        pop = self._reg("pop", def_val=0)
+
+        stash_vld = self._reg("stash_vld", Bits(S), def_val=0)
+        stash_key = [self._reg(f"stash{i:d}_key", key_t) for i in range(S)]
+        stash_data = [self._reg(f"stash{i:d}_data", data_t) for i in range(S)]
+        stash_index_t = Bits(log2ceil(S))
+        # the item from the stash is being inserted to the table
+        drain = self._reg("drain", def_val=0)
+        drain_i = self._reg("drain_i", stash_index_t)
+        # there was a delete since the last failed drain, the drain may succeed
+        drain_req = self._reg("drain_req", def_val=0)
+
+        # index of the node which is expanded
+        expand_i = self._reg("expand_i", node_index_t, def_val=0)
+        # the node which is going to be moved to path_table/path_hash
+        path_node = self._reg("path_node", node_index_t, def_val=0)
+        path_table = self._reg("path_table", table_index_t, def_val=0)
+        path_hash = self._reg("path_hash", hash_t, def_val=0)
+
+        fsm_t = HEnum("cuckooStashFsm_t", ["idle", "cleaning", "lookup", "lookupRes", "move", "insertRes"])
+        fsm = FsmBuilder(self, fsm_t, "cuckooStashFsm")
+        st = fsm.stateReg
+        fsm_lookup_key = self._mux("fsm_lookup_key", expand_i, key_t, node_key)
+        tables_lookup_ack, fsm_res_vld = self.lookup_path(
+            st._eq(fsm_t.lookup), fsm_lookup_key, st._eq(fsm_t.lookupRes),
+            ~In(st, [fsm_t.cleaning, fsm_t.move]),
+            stash_vld, stash_key, stash_data)
+        fsm_res = rename_signal(self, fsm_res_vld & st._eq(fsm_t.lookupRes), "fsm_res")
+
+        # table insert ports are used for cleaning and moving of the items
+        cleanAck = self._sig("cleanAck")
+        cleanAddr, cleanLast = self.clean_addr_iterator(cleanAck)
+        isCleaning = st._eq(fsm_t.cleaning)
+        isMove = st._eq(fsm_t.move)
+        move_key = self._mux("move_key", path_node, key_t, node_key)
+        move_data = self._mux("move_data", path_node, data_t, node_data)
+        for i, t in enumerate(tables):
+            ins = t.insert
+            ins.vld((isCleaning & And(*(t2.insert.rd for t2 in tables if t2 is not t))) |
+                    (isMove & path_table._eq(i)))
+            ins.hash(isCleaning._ternary(cleanAddr, path_hash))
+            ins.key(move_key)
+            ins.data(move_data)
+            ins.item_vld(~isCleaning & op._eq(ORIGIN_TYPE.INSERT))
+        cleanAck(isCleaning & And(*(t.insert.rd for t in tables)))
+        move_ack = rename_signal(
+            self,
+            isMove & Or(*(path_table._eq(i) & t.insert.rd for i, t in enumerate(tables))),
+            "move_ack")
+
+        # resolve the result of the node expansion
+        res = [t.lookupRes for t in tables]
+        is_own_table = [
+            Or(*(expand_i._eq(n) for n, (_, tn, _) in enumerate(nodes) if tn == t_i))
+            for t_i in range(T)
+        ]
+        res_found = [rename_signal(self, ~own & r.found, f"res{i:d}_found")
+                     for i, (own, r) in enumerate(zip(is_own_table, res))]
+        res_empty = [rename_signal(self, ~own & ~r.occupied, f"res{i:d}_empty")
+                     for i, (own, r) in enumerate(zip(is_own_table, res))]
+        res_found_any = Or(*res_found)
+        res_empty_any = Or(*res_empty)
+        isInsert = op._eq(ORIGIN_TYPE.INSERT)
+        # the slot for the item was found (or the key is already present in the table)
+        dst_found = rename_signal(self, res_found_any | (isInsert & res_empty_any), "dst_found")
+        If(fsm_res,
+            # the key found has the priority over the empty slot
+            SwitchLogic([
+                *((f, [path_table(i), path_hash(r.hash)]) for i, (f, r) in enumerate(zip(res_found, res))),
+                *((e, [path_table(i), path_hash(r.hash)]) for i, (e, r) in enumerate(zip(res_empty, res))),
+            ]),
+            path_node(expand_i),
+        ).Elif(move_ack,
+            path_table(self._mux("path_node_table", path_node, table_index_t,
+                                 [0 if tn is None else tn for (_, tn, _) in nodes])),
+            path_hash(self._mux("path_node_hash", path_node, hash_t,
+                                [None if h is None else h for h in node_hash])),
+            path_node(self._mux("path_node_parent", path_node, node_index_t,
+                                [0 if p is None else p for (p, _, _) in nodes])),
+        )
+
+        # store the items which can be moved (children of the expanded node)
+        store_children = rename_signal(self, fsm_res & isInsert & ~dst_found, "store_children")
+        for n, (parent, tn, _) in enumerate(nodes):
+            if parent is None:
+                continue
+            r = res[tn]
+            If(store_children & expand_i._eq(parent),
+               node_key[n](r.key),
+               node_data[n](r.data),
+               node_hash[n](r.hash),
+            )
+        bfs_last = rename_signal(self, expand_i._eq(NODE_CNT - 1), "bfs_last")
+        bfs_fail = rename_signal(self, store_children & bfs_last, "bfs_fail")
+
+        insert = self.insert
+        delete = self.delete
+        clean = self.clean
+        isIdle = st._eq(fsm_t.idle)
+        clean.rd(isIdle)
+        delete.rd(isIdle & ~clean.vld)
+        insert.rd(isIdle & ~clean.vld & ~delete.vld)
+
+        ins_stash_match = self.stash_match("ins_stash_match", stash_vld, stash_key, insert.key)
+        del_stash_match = self.stash_match("del_stash_match", stash_vld, stash_key, delete.key)
+        stash_free = ~stash_vld
+        stash_full = rename_signal(self, stash_vld._eq(mask(S)), "stash_full")
+        stash_head = self._sig("stash_head", stash_index_t)
+        SwitchLogic([(stash_vld[i], stash_head(i)) for i in range(S)],
+                     default=stash_head(None))
+        drain_start = rename_signal(
+            self,
+            isIdle & ~clean.vld & ~delete.vld & ~insert.vld & drain_req & (stash_vld != 0),
+            "drain_start")
+        drain_done = rename_signal(self, move_ack & path_node._eq(0) & drain, "drain_done")
+
+        If(isIdle,
+            If(clean.vld,
+                op(ORIGIN_TYPE.DELETE),
+            ).Elif(delete.vld,
+                op(ORIGIN_TYPE.DELETE),
+                node_key[0](delete.key),
+            ).Elif(insert.vld,
+                op(ORIGIN_TYPE.INSERT),
+                node_key[0](insert.key),
+                node_data[0](insert.data),
+                pop(0),
+            ).Elif(drain_start,
+                op(ORIGIN_TYPE.INSERT),
+                node_key[0](self._mux("stash_head_key", stash_head, key_t, stash_key)),
+                node_data[0](self._mux("stash_head_data", stash_head, data_t, stash_data)),
+                drain_i(stash_head),
+            ),
+            drain(drain_start),
+            expand_i(0),
+        ).Elif(fsm_res & ~dst_found & ~bfs_last,
+            expand_i(expand_i + 1),
+        ).Elif(bfs_fail & ~drain & stash_full,
+            pop(1),
+        )
+
+        If(isIdle & (clean.vld | stash_vld._eq(0)),
+            drain_req(0),
+        ).Elif(isIdle & delete.vld,
+            drain_req(1),
+        ).Elif(bfs_fail & drain,
+            # the item does not fit in to the tables, another attempt would fail as well
+            drain_req(0),
+        )
+
+        # stash update
+        stash_vld_next = []
+        for i, (k, d) in enumerate(zip(stash_key, stash_data)):
+            insert_to_this = bfs_fail & ~drain & stash_free[i]
+            if i > 0:
+                insert_to_this = insert_to_this & stash_vld[i:]._eq(mask(i))
+            If(isIdle & ~clean.vld & ~delete.vld & insert.vld & ins_stash_match[i],
+                d(insert.data),
+            ).Elif(insert_to_this,
+                k(node_key[0]),
+                d(node_data[0]),
+            )
+            stash_vld_next.append(
+                (stash_vld[i] | insert_to_this) &
+                ~(isIdle & (clean.vld | (delete.vld & del_stash_match[i]))) &
+                ~(drain_done & drain_i._eq(i))
+            )
+        stash_vld(Concat(*reversed(stash_vld_next)))
+
+        insertRes = self.insertRes
+        fsm.Trans(fsm_t.idle,
+                (clean.vld, fsm_t.cleaning),
+                (delete.vld, fsm_t.lookup),
+                # the key is in the stash, only the data is updated
+                (insert.vld & (ins_stash_match != 0), fsm_t.insertRes),
+                (insert.vld, fsm_t.lookup),
+                (drain_start, fsm_t.lookup),
+            ).Trans(fsm_t.cleaning,
+                (cleanAck & cleanLast, fsm_t.idle),
+            ).Trans(fsm_t.lookup,
+                (tables_lookup_ack, fsm_t.lookupRes),
+            ).Trans(fsm_t.lookupRes,
+                (fsm_res & dst_found, fsm_t.move),
+                # the key which should be deleted was not found
+                (fsm_res & ~isInsert, fsm_t.idle),
+                # the item stays in the stash
+                (bfs_fail & drain, fsm_t.idle),
+                (bfs_fail, fsm_t.insertRes),
+                (fsm_res, fsm_t.lookup),
+            ).Trans(fsm_t.move,
+                (move_ack & path_node._eq(0) & isInsert & ~drain, fsm_t.insertRes),
+                (move_ack & path_node._eq(0), fsm_t.idle),
+            ).Trans(fsm_t.insertRes,
+                (insertRes.rd, fsm_t.idle),
+            )
+
+        insertRes.vld(st._eq(fsm_t.insertRes))
+        insertRes.key(node_key[0])
+        insertRes.data(node_data[0])
+        insertRes.pop(pop)
+
+
+class CuckooHashTableWithStashAndRam(CuckooHashTableWithRam, CuckooHashTableWithStash):
+    """
+    :class:`~.CuckooHashTableWithStash` with integrated memory
+
+    .. hwt-autodoc:: _example_CuckooHashTableWithStashAndRam
+    """
+    pass
+
+
+def _example_CuckooHashTableWithStashAndRam():
+    return CuckooHashTableWithStashAndRam([CRC_32, CRC_32C])
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = _example_CuckooHashTableWithStashAndRam()
+    print(to_rtl_str(u))
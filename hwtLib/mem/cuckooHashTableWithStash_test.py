@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.synthesizer.utils import to_rtl_str
+from hwtLib.logic.crcPoly import CRC_32, CRC_32C
+# imported as a module so the base test cases are not collected again from this file
+from hwtLib.mem import cuckooHashTableWithRam_test, cuckooHashTableWithPipelinedLookup_test
+from hwtLib.mem.cuckooHashTableWithStash import CuckooHashTableWithStashAndRam
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer, WaitCombStable
+
+
+class CuckooHashTableWithStash_stashMixin():
+    """
+    Access to the content of the stash of :class:`~.CuckooHashTableWithStash` in simulation
+    """
+
+    def stashAsDict(self):
+        io = self.rtl_simulator.model.io
+        stash_vld = io.stash_vld.read()
+        d = {}
+        for i in range(self.u.STASH_ITEMS):
+            if stash_vld[i]:
+                key = int(getattr(io, f"stash{i:d}_key").read())
+                assert key not in d.keys(), key
+                d[key] = getattr(io, f"stash{i:d}_data").read()
+        return d
+
+    def allItemsAsDict(self):
+        d = self.hashTableAsDict()
+        for k, v in self.stashAsDict().items():
+            self.assertNotIn(k, d)
+            d[k] = v
+        return d
+
+
+class CuckooHashTableWithStashTC(CuckooHashTableWithStash_stashMixin,
+                                 cuckooHashTableWithPipelinedLookup_test.CuckooHashTableWithPipelinedLookupTC):
+
+    @classmethod
+    def getUnit(cls):
+        u = CuckooHashTableWithStashAndRam([CRC_32, CRC_32C])
+        u.KEY_WIDTH = 16
+        u.DATA_WIDTH = 8
+        u.LOOKUP_KEY = True
+        u.TABLE_SIZE = 32 * 2
+        return u
+
+    def test_80p_fill(self):
+        u = self.u
+        self.cleanupMemory()
+        CNT = int(self.u.TABLE_SIZE * 0.8)
+        reference = {i + 1: i + 2 for i in range(CNT)}
+        for k, v in sorted(reference.items(), key=lambda x: x[0]):
+            u.insert._ag.data.append((k, v))
+
+        self.runSim(CNT * 20 * CLK_PERIOD)
+        self.assertEmpty(u.insert._ag.data)
+        self.assertValSequenceEqual([d[0] for d in u.insertRes._ag.data],
+                                    [0 for _ in range(CNT)])
+        self.checkContains(reference, self.allItemsAsDict())
+
+    def test_high_fill(self, randomized=False):
+        """
+        Insert more items than there is slots in tables, the items which do not fit in to tables
+        are stored in the stash and the rest is returned with pop=1
+        """
+        u = self.u
+        self.cleanupMemory()
+        CNT = u.TABLE_SIZE + 2 * u.STASH_ITEMS
+        reference = {i + 1: (i + 2) & 0xff for i in range(CNT)}
+        for k, v in sorted(reference.items(), key=lambda x: x[0]):
+            u.insert._ag.data.append((k, v))
+
+        t = CNT * 40
+        if randomized:
+            self.randomize_all()
+            t *= 3
+        self.runSim(t * CLK_PERIOD)
+        self.assertEmpty(u.insert._ag.data)
+        self.assertEqual(len(u.insertRes._ag.data), CNT)
+
+        stash = self.stashAsDict()
+        self.assertEqual(len(stash), u.STASH_ITEMS)
+        table = self.allItemsAsDict()
+        # the bounded insert fills the table over 90%
+        self.assertGreater(len(table) - len(stash), u.TABLE_SIZE * 0.9)
+        for pop, key, data in u.insertRes._ag.data:
+            if pop:
+                key = int(key)
+                self.assertNotIn(key, table)
+                table[key] = data
+        self.checkContains(reference, table)
+
+    def test_high_fill_randomized(self):
+        self.test_high_fill(randomized=True)
+
+    def test_delete_from_stash(self):
+        u = self.u
+        self.cleanupMemory()
+        CNT = u.TABLE_SIZE + u.STASH_ITEMS
+        reference = {i + 1: (i + 2) & 0xff for i in range(CNT)}
+        for k, v in sorted(reference.items(), key=lambda x: x[0]):
+            u.insert._ag.data.append((k, v))
+
+        t = CNT * 40
+
+        def delete_and_lookup():
+            yield Timer(t * CLK_PERIOD)
+            yield WaitCombStable()
+            self.assertEmpty(u.insert._ag.data)
+            stash = self.stashAsDict()
+            self.assertGreater(len(stash), 0)
+            for pop, key, _ in u.insertRes._ag.data:
+                if pop:
+                    del reference[int(key)]
+            to_delete = [next(iter(stash.keys())), 1]
+            for k in to_delete:
+                del reference[k]
+            u.delete._ag.data.extend(to_delete)
+            # wait until the delete is finished
+            yield Timer(20 * CLK_PERIOD)
+            u.lookup._ag.data.extend(to_delete)
+            u.lookup._ag.data.extend(stash.keys())
+
+        self.procs.append(delete_and_lookup())
+        self.runSim((t + 70) * CLK_PERIOD)
+        self.checkContains(reference, self.allItemsAsDict())
+        res = u.lookupRes._ag.data
+        # the deleted items are not found anymore, the rest of the stash is found
+        self.assertValSequenceEqual([found for (_, _, found, _) in res],
+                                    [0, 0, *(0 if i == 0 else 1 for i in range(len(res) - 2))])
+
+
+    def test_stash_drain(self):
+        """
+        The items from the stash are moved to the tables after the delete frees some slots
+        """
+        u = self.u
+        self.cleanupMemory()
+        CNT = u.TABLE_SIZE + u.STASH_ITEMS
+        reference = {i + 1: (i + 2) & 0xff for i in range(CNT)}
+        for k, v in sorted(reference.items(), key=lambda x: x[0]):
+            u.insert._ag.data.append((k, v))
+
+        t = CNT * 40
+        stash_before = []
+
+        def delete():
+            yield Timer(t * CLK_PERIOD)
+            yield WaitCombStable()
+            self.assertEmpty(u.insert._ag.data)
+            stash = self.stashAsDict()
+            self.assertEqual(len(stash), u.STASH_ITEMS)
+            stash_before.extend(stash.keys())
+            for pop, key, _ in u.insertRes._ag.data:
+                if pop:
+                    del reference[int(key)]
+            to_delete = list(self.hashTableAsDict().keys())[:2 * u.STASH_ITEMS]
+            for k in to_delete:
+                del reference[k]
+            u.delete._ag.data.extend(to_delete)
+
+        self.procs.append(delete())
+        self.runSim((t + 2 * u.STASH_ITEMS * 40) * CLK_PERIOD)
+        self.assertEmpty(u.delete._ag.data)
+        self.assertLess(len(self.stashAsDict()), len(stash_before))
+        self.checkContains(reference, self.allItemsAsDict())
+
+    def test_MAX_REINSERT_rejected(self):
+        u = self.getUnit()
+        u.MAX_REINSERT = 4
+        with self.assertRaises(AssertionError):
+            to_rtl_str(u)
+
+class CuckooHashTableWithStash_2Table_collisionTC(CuckooHashTableWithStash_stashMixin,
+                                                  cuckooHashTableWithRam_test.CuckooHashTableWithRam_common_TC):
+
+    @classmethod
+    def getUnit(cls):
+        u = CuckooHashTableWithStashAndRam([CRC_32, CRC_32C])
+        u.KEY_WIDTH = 8
+        u.DATA_WIDTH = 8
+        u.LOOKUP_KEY = True
+        u.TABLE_SIZE = 2 * 2
+        u.STASH_ITEMS = 2
+        return u
+
+    def test_insert_coliding(self, N=10, randomized=False):
+        if randomized:
+            self.randomize_all()
+        self.cleanupMemory()
+
+        u = self.u
+        reference = {i + 1: i + 2 for i in range(N)}
+        for k, v in sorted(reference.items(), key=lambda x: x[0]):
+            u.insert._ag.data.append((k, v))
+
+        t = N
+        if randomized:
+            t *= 3
+
+        self.runSim((30 * t + 10) * CLK_PERIOD)
+        self.assertEmpty(u.lookupRes._ag.data)
+
+        table = self.allItemsAsDict()
+        self.assertGreater(len(table), 0)
+        self.assertEqual(len(u.insertRes._ag.data), N)
+        for pop, key, data in u.insertRes._ag.data:
+            if pop:
+                key = int(key)
+                self.assertNotIn(key, table)
+                table[key] = data
+
+        self.checkContains(reference, table)
+
+    def test_insert_coliding_randomized(self, N=10):
+        self.test_insert_coliding(N=N, randomized=True)
+
+
+CuckooHashTableWithStashTCs = [
+    CuckooHashTableWithStashTC,
+    CuckooHashTableWithStash_2Table_collisionTC,
+]
+
+if __name__ == "__main__":
+    import unittest
+    suite = unittest.TestSuite()
+    # suite.addTest(CuckooHashTableWithStashTC('test_high_fill'))
+    for tc in CuckooHashTableWithStashTCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
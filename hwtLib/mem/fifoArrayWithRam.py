@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import Tuple
+
+from hwt.code import If
+from hwt.code_utils import rename_signal
+from hwt.hdl.constants import WRITE, READ
+from hwt.hdl.types.bits import Bits
+from hwt.interfaces.std import Handshaked
+from hwt.interfaces.utils import addClkRstn, propagateClkRstn
+from hwt.math import log2ceil
+from hwt.serializer.mode import serializeParamsUniq
+from hwt.synthesizer.hObjList import HObjList
+from hwt.synthesizer.param import Param
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
+from hwt.synthesizer.unit import Unit
+from hwtLib.common_nonstd_interfaces.addr_data_hs import AddrDataHs, \
+    AddrDataVldHs
+from hwtLib.common_nonstd_interfaces.addr_hs import AddrHs
+from hwtLib.handshaked.fifo import HandshakedFifo
+from hwtLib.mem.ram import RamSingleClock
+
+
+@serializeParamsUniq
+class FifoArrayWithRam(Unit):
+    """
+    An array of FIFOs (queues) which share a single memory of list nodes,
+    unlike :class:`~.FifoArray` all state is stored in RAMs and the component
+    manages the head and tail of each queue itself.
+
+    Corresponds to data structure:
+
+    .. code-block:: cpp
+
+        // note that in implementation each part of struct item is stored in separate RAM
+        struct item {
+          value_t value;
+          item * next;
+        };
+
+        item items[ITEMS];
+        // each queue has a sentinel node at its tail, queue is empty if head == tail
+        item * head[QUEUE_CNT];
+        item * tail[QUEUE_CNT];
+        // nodes which were never used are allocated first,
+        // the nodes of popped items are reused from free_list
+        size_t alloc_cnt = QUEUE_CNT;
+        fifo<item *> free_list;
+
+    * push: the data is written to the sentinel node of the queue and a new sentinel node is allocated
+    * pop_req: pop an item from the queue, the result is returned on pop port with vld_flag=0
+      if the queue was empty
+
+    :note: The push and pop have separate pipelines and each of them can process a single request
+        per clock cycle (the hazards between the requests are resolved by forwarding).
+        The pop returns the result after 2 clock cycles.
+    :note: QUEUE_CNT nodes are always used as sentinel nodes, the capacity is ITEMS - QUEUE_CNT
+    :note: The tables for head/tail are initialized by INIT_DATA of the RAM (without reset)
+
+    :ivar ITEMS: number of list nodes
+    :ivar QUEUE_CNT: number of queues
+    :ivar DATA_WIDTH: width of the value stored in each node
+
+    .. hwt-autodoc::
+    """
+
+    def _config(self):
+        self.ITEMS = Param(64)
+        self.QUEUE_CNT = Param(4)
+        self.DATA_WIDTH = Param(8)
+
+    def _declr_ram(self, ADDR_WIDTH: int, DATA_WIDTH: int, INIT_DATA=None) -> RamSingleClock:
+        m = RamSingleClock()
+        m.PORT_CNT = (WRITE, READ)
+        m.ADDR_WIDTH = ADDR_WIDTH
+        m.DATA_WIDTH = DATA_WIDTH
+        m.INIT_DATA = INIT_DATA
+        return m
+
+    def _declr(self):
+        assert self.QUEUE_CNT >= 1, self.QUEUE_CNT
+        assert self.ITEMS - self.QUEUE_CNT >= 2, ("Not enough nodes for queues", self.ITEMS, self.QUEUE_CNT)
+        self.NODE_W = log2ceil(self.ITEMS)
+        self.QUEUE_W = log2ceil(self.QUEUE_CNT)
+
+        addClkRstn(self)
+        p = self.push = AddrDataHs()
+        p.ADDR_WIDTH = self.QUEUE_W
+        p.DATA_WIDTH = self.DATA_WIDTH
+
+        pr = self.pop_req = AddrHs()
+        pr.ID_WIDTH = 0
+        pr.ADDR_WIDTH = self.QUEUE_W
+
+        po = self.pop = AddrDataVldHs()._m()
+        po.ADDR_WIDTH = self.QUEUE_W
+        po.DATA_WIDTH = self.DATA_WIDTH
+
+        # the queue i has the node i as an initial sentinel node
+        queue_init = tuple(i if i < self.QUEUE_CNT else 0
+                           for i in range(2 ** self.QUEUE_W))
+        self.head = self._declr_ram(self.QUEUE_W, self.NODE_W, queue_init)
+        # tail[0] is used by push, tail[1] is a copy used by pop to resolve if the queue is empty
+        self.tail = HObjList(self._declr_ram(self.QUEUE_W, self.NODE_W, queue_init)
+                             for _ in range(2))
+        self.next_ptr = self._declr_ram(self.NODE_W, self.NODE_W)
+        self.values = self._declr_ram(self.NODE_W, self.DATA_WIDTH)
+
+        f = self.free_list = HandshakedFifo(Handshaked)
+        f.DATA_WIDTH = self.NODE_W
+        f.DEPTH = self.ITEMS - self.QUEUE_CNT
+
+    def _impl_push(self) -> Tuple[RtlSignal, RtlSignal, RtlSignal]:
+        """
+        :return: tuple (vld, queue, tail) of the tail update from previous clock cycle
+        """
+        node_t = Bits(self.NODE_W)
+        push = self.push
+
+        # node allocation
+        alloc_cnt = self._reg("alloc_cnt", Bits(log2ceil(self.ITEMS + 1)), def_val=self.QUEUE_CNT)
+        alloc_from_cnt = rename_signal(self, alloc_cnt != self.ITEMS, "alloc_from_cnt")
+        if alloc_cnt._dtype.bit_length() > self.NODE_W:
+            alloc_node = alloc_cnt[self.NODE_W:]
+        else:
+            alloc_node = alloc_cnt
+        free = self.free_list.dataOut
+
+        push.rd(alloc_from_cnt | free.vld)
+        free.rd(push.vld & ~alloc_from_cnt)
+        push_en = rename_signal(self, push.vld & (alloc_from_cnt | free.vld), "push_en")
+        If(push_en & alloc_from_cnt,
+           alloc_cnt(alloc_cnt + 1)
+        )
+
+        # stage 0: read tail of the queue
+        tail_r = self.tail[0].port[1]
+        tail_r.en(push_en)
+        tail_r.addr(push.addr)
+
+        st1_vld = self._reg("push_st1_vld", def_val=0)
+        st1_queue = self._reg("push_st1_queue", push.addr._dtype)
+        st1_data = self._reg("push_st1_data", push.data._dtype)
+        st1_node = self._reg("push_st1_node", node_t)
+        st1_vld(push_en)
+        st1_queue(push.addr)
+        st1_data(push.data)
+        st1_node(alloc_from_cnt._ternary(alloc_node, free.data))
+
+        # stage 1: write data to sentinel node and append new sentinel node
+        # the tail update from previous clock cycle was not visible for the read in stage 0
+        prev_vld = self._reg("push_prev_vld", def_val=0)
+        prev_queue = self._reg("push_prev_queue", push.addr._dtype)
+        prev_tail = self._reg("push_prev_tail", node_t)
+        tail = self._sig("push_st1_tail", node_t)
+        If(prev_vld & prev_queue._eq(st1_queue),
+           tail(prev_tail)
+        ).Else(
+           tail(tail_r.dout)
+        )
+        for t in self.tail:
+            w = t.port[0]
+            w.en(st1_vld)
+            w.addr(st1_queue)
+            w.din(st1_node)
+
+        for mem, d in [(self.values, st1_data), (self.next_ptr, st1_node)]:
+            w = mem.port[0]
+            w.en(st1_vld)
+            w.addr(tail)
+            w.din(d)
+
+        prev_vld(st1_vld)
+        prev_queue(st1_queue)
+        prev_tail(st1_node)
+        return prev_vld, prev_queue, prev_tail
+
+    def _impl_pop(self, push_prev_vld: RtlSignal, push_prev_queue: RtlSignal, push_prev_tail: RtlSignal):
+        node_t = Bits(self.NODE_W)
+        pop_req = self.pop_req
+        pop = self.pop
+
+        st2_vld = self._reg("pop_st2_vld", def_val=0)
+        pop_en = rename_signal(self, ~st2_vld | pop.rd, "pop_en")
+        pop_req.rd(pop_en)
+
+        # stage 0: read head and tail of the queue
+        for r in [self.head.port[1], self.tail[1].port[1]]:
+            r.en(pop_en)
+            r.addr(pop_req.addr)
+
+        st1_vld = self._reg("pop_st1_vld", def_val=0)
+        st1_queue = self._reg("pop_st1_queue", pop_req.addr._dtype)
+        If(pop_en,
+           st1_vld(pop_req.vld),
+           st1_queue(pop_req.addr),
+        )
+
+        # stage 1: resolve the head and tail and read the head node
+        st2_queue = self._reg("pop_st2_queue", pop_req.addr._dtype)
+        st2_head = self._reg("pop_st2_head", node_t)
+        st2_empty = self._reg("pop_st2_empty")
+        next_r = self.next_ptr.port[1]
+        # the head update from the previous pop, it was not visible for the read in stage 0
+        prev_vld = self._reg("pop_prev_vld", def_val=0)
+        prev_queue = self._reg("pop_prev_queue", pop_req.addr._dtype)
+        prev_head = self._reg("pop_prev_head", node_t)
+
+        head = self._sig("pop_st1_head", node_t)
+        If(st2_vld & ~st2_empty & st2_queue._eq(st1_queue),
+            # the head is just being updated by the pop in stage 2
+            head(next_r.dout)
+        ).Elif(prev_vld & prev_queue._eq(st1_queue),
+            head(prev_head)
+        ).Else(
+            head(self.head.port[1].dout)
+        )
+        # the tail update which happened while the pipeline was stalled
+        # (the read of the tail is not performed again and the push_prev is valid only for 1 clock)
+        tail_fwd_vld = self._reg("pop_st1_tail_fwd_vld", def_val=0)
+        tail_fwd = self._reg("pop_st1_tail_fwd", node_t)
+        push_prev_match = push_prev_vld & push_prev_queue._eq(st1_queue)
+        If(pop_en,
+           tail_fwd_vld(0),
+        ).Elif(push_prev_match,
+           tail_fwd_vld(1),
+           tail_fwd(push_prev_tail),
+        )
+        tail = self._sig("pop_st1_tail", node_t)
+        If(push_prev_match,
+            tail(push_prev_tail)
+        ).Elif(tail_fwd_vld,
+            tail(tail_fwd)
+        ).Else(
+            tail(self.tail[1].port[1].dout)
+        )
+        for mem in [self.next_ptr, self.values]:
+            r = mem.port[1]
+            r.en(pop_en)
+            r.addr(head)
+
+        If(pop_en,
+           st2_vld(st1_vld),
+           st2_queue(st1_queue),
+           st2_head(head),
+           st2_empty(head._eq(tail)),
+        )
+
+        # stage 2: update head, release the node and return the data
+        st2_ack = rename_signal(self, st2_vld & ~st2_empty & pop.rd, "pop_st2_ack")
+        head_w = self.head.port[0]
+        head_w.en(st2_ack)
+        head_w.addr(st2_queue)
+        head_w.din(next_r.dout)
+        If(pop_en,
+           prev_vld(st2_ack),
+           prev_queue(st2_queue),
+           prev_head(next_r.dout),
+        )
+
+        free = self.free_list.dataIn
+        free.vld(st2_ack)
+        free.data(st2_head)
+
+        pop.vld(st2_vld)
+        pop.addr(st2_queue)
+        pop.data(self.values.port[1].dout)
+        pop.vld_flag(~st2_empty)
+
+    def _impl(self):
+        push_prev = self._impl_push()
+        self._impl_pop(*push_prev)
+        propagateClkRstn(self)
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = FifoArrayWithRam()
+    print(to_rtl_str(u))
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from random import Random
+import unittest
+
+from hwt.simulator.simTestCase import SingleUnitSimTestCase
+from hwtLib.mem.fifoArrayWithRam import FifoArrayWithRam
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer, WaitWriteOnly
+
+
+class FifoArrayWithRamTC(SingleUnitSimTestCase):
+
+    @classmethod
+    def getUnit(cls):
+        u = cls.u = FifoArrayWithRam()
+        u.ITEMS = 32
+        u.QUEUE_CNT = 4
+        u.DATA_WIDTH = 8
+        return u
+
+    def pop_results(self):
+        """
+        :return: list of tuples (queue, data or None if queue was empty)
+        """
+        res = []
+        for q, d, vld in self.u.pop._ag.data:
+            q = int(q)
+            if int(vld):
+                res.append((q, int(d)))
+            else:
+                res.append((q, None))
+        return res
+
+    def pop_after(self, t, queues):
+        def proc():
+            yield Timer(t)
+            yield WaitWriteOnly()
+            self.u.pop_req._ag.data.extend(queues)
+
+        self.procs.append(proc())
+
+    def test_nop(self):
+        u = self.u
+        self.runSim(10 * CLK_PERIOD)
+        self.assertEmpty(u.pop._ag.data)
+
+    def test_pop_empty(self):
+        u = self.u
+        u.pop_req._ag.data.extend(range(u.QUEUE_CNT))
+        self.runSim(10 * CLK_PERIOD)
+        self.assertSequenceEqual(self.pop_results(),
+                                 [(q, None) for q in range(u.QUEUE_CNT)])
+
+    def test_push_pop_single_queue(self):
+        u = self.u
+        u.push._ag.data.extend((1, i) for i in range(5))
+        self.pop_after(10 * CLK_PERIOD, [1 for _ in range(6)])
+        self.runSim(25 * CLK_PERIOD)
+        self.assertSequenceEqual(self.pop_results(),
+                                 [(1, i) for i in range(5)] + [(1, None)])
+
+    def test_push_while_pop_stalled(self):
+        u = self.u
+        # the pop of queue 1 is resolved while the pop output is stalled
+        # and the queue 1 is not empty at the time when the pop result is consumed
+        u.pop_req._ag.data.extend([0, 1])
+
+        def proc():
+            yield WaitWriteOnly()
+            u.pop._ag.setEnable(False)
+            yield Timer(5 * CLK_PERIOD)
+            yield WaitWriteOnly()
+            u.push._ag.data.append((1, 10))
+            yield Timer(5 * CLK_PERIOD)
+            yield WaitWriteOnly()
+            u.pop._ag.setEnable(True)
+
+        self.procs.append(proc())
+        self.runSim(20 * CLK_PERIOD)
+        self.assertSequenceEqual(self.pop_results(), [(0, None), (1, 10)])
+
+    def test_push_pop_queues(self, N=24, randomized=False):
+        """
+        push N items to random queues, then pop all of them (+ a pop from empty queue for each queue),
+        both push and pop should have a throughput of 1 item per clock
+        """
+        u = self.u
+        rand = Random(0)
+        model = [deque() for _ in range(u.QUEUE_CNT)]
+        for i in range(N):
+            q = rand.randint(0, u.QUEUE_CNT - 1)
+            u.push._ag.data.append((q, i))
+            model[q].append(i)
+
+        pop_queues = [q for q, items in enumerate(model) for _ in range(len(items) + 1)]
+        rand.shuffle(pop_queues)
+        ref = []
+        for q in pop_queues:
+            if model[q]:
+                ref.append((q, model[q].popleft()))
+            else:
+                ref.append((q, None))
+
+        t_push = N + 5
+        t = t_push + len(pop_queues) + 5
+        if randomized:
+            t_push *= 3
+            t = t_push + len(pop_queues) * 3 + 5
+            self.randomize(u.push)
+            self.randomize(u.pop_req)
+            self.randomize(u.pop)
+
+        self.pop_after(t_push * CLK_PERIOD, pop_queues)
+        self.runSim(t * CLK_PERIOD)
+        self.assertSequenceEqual(self.pop_results(), ref)
+
+    def test_push_pop_queues_randomized(self):
+        self.test_push_pop_queues(randomized=True)
+
+    def test_simultaneous_push_pop(self, N=60, randomized=False):
+        """
+        Push and pop simultaneously to a same queues, the pop of the item which is being pushed
+        may be returned as empty, but the popped items have to be in the correct order
+        """
+        u = self.u
+        rand = Random(1)
+        Q = 2
+        pushed = [[] for _ in range(Q)]
+        for i in range(N):
+            q = rand.randint(0, Q - 1)
+            u.push._ag.data.append((q, i))
+            pushed[q].append(i)
+
+        u.pop_req._ag.data.extend(rand.randint(0, Q - 1) for _ in range(N))
+        t = N + 10
+        if randomized:
+            t *= 3
+            self.randomize(u.push)
+            self.randomize(u.pop_req)
+            self.randomize(u.pop)
+
+        # pop the rest of items
+        self.pop_after(t * CLK_PERIOD, [q for q in range(Q) for _ in range(len(pushed[q]) + 1)])
+        t += 2 * N + 20
+        self.runSim(t * CLK_PERIOD)
+
+        popped = [[] for _ in range(Q)]
+        for q, d in self.pop_results():
+            if d is not None:
+                popped[q].append(d)
+        self.assertSequenceEqual(popped, pushed)
+
+    def test_simultaneous_push_pop_randomized(self):
+        self.test_simultaneous_push_pop(randomized=True)
+
+
+class FifoArrayWithRam_smallTC(FifoArrayWithRamTC):
+    """
+    The nodes have to be reused from free list
+    """
+
+    @classmethod
+    def getUnit(cls):
+        u = cls.u = FifoArrayWithRam()
+        u.ITEMS = 8
+        u.QUEUE_CNT = 3
+        u.DATA_WIDTH = 8
+        return u
+
+    def test_push_pop_queues(self, N=5, randomized=False):
+        FifoArrayWithRamTC.test_push_pop_queues(self, N=N, randomized=randomized)
+
+    def test_simultaneous_push_pop(self, N=5, randomized=False):
+        FifoArrayWithRamTC.test_simultaneous_push_pop(self, N=N, randomized=randomized)
+
+    def test_reuse_nodes(self, ROUNDS=4):
+        u = self.u
+        CAPACITY = u.ITEMS - u.QUEUE_CNT
+        ref = []
+        for r in range(ROUNDS):
+            for i in range(CAPACITY):
+                q = (r + i) % u.QUEUE_CNT
+                u.push._ag.data.append((q, r * CAPACITY + i))
+
+        def pop_proc():
+            # pop all items after each round
+            for r in range(ROUNDS):
+                yield Timer((CAPACITY + 10) * CLK_PERIOD)
+                yield WaitWriteOnly()
+                queues = [(r + i) % u.QUEUE_CNT for i in range(CAPACITY)]
+                u.pop_req._ag.data.extend(queues)
+                items_per_queue = [[] for _ in range(u.QUEUE_CNT)]
+                for i, q in enumerate(queues):
+                    items_per_queue[q].append(r * CAPACITY + i)
+                for q in queues:
+                    ref.append((q, items_per_queue[q].pop(0)))
+
+        self.procs.append(pop_proc())
+        self.runSim((ROUNDS * (CAPACITY + 10) + CAPACITY + 10) * CLK_PERIOD)
+        # the push is blocked until there is a free node
+        self.assertEmpty(u.push._ag.data)
+        self.assertSequenceEqual(self.pop_results(), ref)
+
+
+FifoArrayWithRamTCs = [
+    FifoArrayWithRamTC,
+    FifoArrayWithRam_smallTC,
+]
+
+if __name__ == "__main__":
+    suite = unittest.TestSuite()
+    # suite.addTest(FifoArrayWithRamTC('test_simultaneous_push_pop'))
+    for tc in FifoArrayWithRamTCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
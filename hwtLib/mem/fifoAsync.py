@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from hwt.code import If, Concat
+from typing import Optional, Tuple
+
+from hwt.code import If, Concat, Switch
 from hwt.constraints import set_false_path, get_clock_of, set_max_delay
 from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.defs import BIT
 from hwt.interfaces.std import Clk, Rst_n, FifoWriter, FifoReader
 from hwt.math import log2ceil, isPow2
 from hwt.serializer.mode import serializeParamsUniq
 from hwt.synthesizer.param import Param
+from hwt.synthesizer.rtlLevel.rtlSignal import RtlSignal
 from hwtLib.clocking.cdc import SignalCdcBuilder
 from hwtLib.logic.cntrGray import binToGray
 from hwtLib.mem.fifo import Fifo
@@ -20,12 +24,45 @@ class FifoAsync(Fifo):
     * https://github.com/ZipCPU/website/blob/master/examples/afifo.v
     * https://github.com/alexforencich/verilog-axis/blob/master/rtl/axis_async_fifo.v
 
+    :ivar ~.OUT_DATA_WIDTH: width of dataOut, None means same as DATA_WIDTH,
+        the ratio of the DATA_WIDTH and OUT_DATA_WIDTH has to be an integer,
+        the memory is split to banks of the narrower width, the narrow side accesses
+        a single bank and the wide side all banks at once (the first narrow item is
+        in the lowest bits of the wide item)
+    :note: DEPTH is in items of the wider interface, the pointers which are transfered
+        to other clock domain are also for wide items, the wide item is visible to the reader
+        once all narrow items are written and the wide item is released to the writer once
+        all narrow items are read
+
     .. hwt-autodoc:: _example_FifoAsync
     """
     def _config(self):
         Fifo._config(self)
         self.IN_FREQ = Param(int(100e6))
         self.OUT_FREQ = Param(int(100e6))
+        self.OUT_DATA_WIDTH = Param(None)
+
+    def _get_out_data_width(self) -> int:
+        if self.OUT_DATA_WIDTH is None:
+            return self.DATA_WIDTH
+        else:
+            return self.OUT_DATA_WIDTH
+
+    def _get_width_ratio(self) -> Tuple[int, int]:
+        """
+        :return: tuple (number of items on dataIn per memory word,
+            number of items on dataOut per memory word)
+        """
+        IN_W = self.DATA_WIDTH
+        OUT_W = self._get_out_data_width()
+        if IN_W == OUT_W:
+            return (1, 1)
+        elif IN_W < OUT_W:
+            assert IN_W > 0 and OUT_W % IN_W == 0, ("The ratio of data widths has to be an integer", IN_W, OUT_W)
+            return (OUT_W // IN_W, 1)
+        else:
+            assert OUT_W > 0 and IN_W % OUT_W == 0, ("The ratio of data widths has to be an integer", IN_W, OUT_W)
+            return (1, IN_W // OUT_W)
 
     def _declr(self):
         assert int(self.DEPTH) > 0, "FifoAsync is disabled in this case, do not use it entirely"
@@ -40,16 +77,19 @@ class FifoAsync(Fifo):
         self.dataOut_clk = Clk()
         self.dataOut_clk.FREQ = self.OUT_FREQ
 
+        # check the ratio of data widths
+        self._get_width_ratio()
         with self._paramsShared():
             with self._associated(clk=self.dataIn_clk):
                 self.dataIn_rst_n = Rst_n()
                 with self._associated(rst=self.dataIn_rst_n):
                     self.dataIn = FifoWriter()
 
-            with self._associated(clk=self.dataOut_clk):
-                self.dataOut_rst_n = Rst_n()
-                with self._associated(rst=self.dataOut_rst_n):
-                    self.dataOut = FifoReader()._m()
+        with self._associated(clk=self.dataOut_clk):
+            self.dataOut_rst_n = Rst_n()
+            with self._associated(rst=self.dataOut_rst_n):
+                self.dataOut = FifoReader()._m()
+                self.dataOut.DATA_WIDTH = self._get_out_data_width()
         self.AW = log2ceil(self.DEPTH)
 
     def _addr_reg_and_cdc(self, reg_name, clk_in, clk_out):
@@ -77,6 +117,26 @@ class FifoAsync(Fifo):
         set_max_delay(reg_bin, cdc_builder.path[1], cdc_builder.META_PERIOD_NS)
         return reg_bin, reg_gray, reg_gray_out_clk
 
+    def _sub_item_index(self, name: str, ITEMS: int, en: RtlSignal, clk: dict)\
+            -> Tuple[Optional[RtlSignal], RtlSignal]:
+        """
+        Index of the narrow item in the memory word
+
+        :return: tuple (index register or None if ITEMS == 1, flag which tells that the index is last)
+        """
+        if ITEMS == 1:
+            return None, BIT.from_py(1)
+        sub = self._reg(name, Bits(log2ceil(ITEMS)), def_val=0, **clk)
+        is_last = sub._eq(ITEMS - 1)
+        If(en,
+           If(is_last,
+              sub(0)
+           ).Else(
+              sub(sub + 1)
+           )
+        )
+        return sub, is_last
+
     def _impl(self):
         AW = self.AW
         din = self.dataIn
@@ -99,32 +159,65 @@ class FifoAsync(Fifo):
                                        r_gray_in_clk[AW-1:])))
         din.wait(w_full)
         w_en = din.en & ~w_full
-        If(w_en,
+        IN_ITEMS, OUT_ITEMS = self._get_width_ratio()
+        w_sub, w_sub_last = self._sub_item_index("w_sub", IN_ITEMS, w_en, clk_in)
+        If(w_en & w_sub_last,
            w_bin(w_bin + 1)
         )
-        if self.DATA_WIDTH:
-            memory_t = Bits(self.DATA_WIDTH)[self.DEPTH]
-            memory = self._sig("memory", memory_t)
-            If(clk_in["clk"]._onRisingEdge(),
-               If(w_en,
-                  memory[w_bin[AW:]](din.data)
-               )
-            )
 
         r_empty = self._reg("r_empty", def_val=1, **clk_out)
         r_empty(r_gray.next._eq(w_gray_out_clk))
         dout.wait(r_empty)
         r_en = dout.en & ~r_empty
-        If(r_en,
+        r_sub, r_sub_last = self._sub_item_index("r_sub", OUT_ITEMS, r_en, clk_out)
+        If(r_en & r_sub_last,
            r_bin(r_bin + 1)
         )
 
         if self.DATA_WIDTH:
+            # the memory is split to banks of the narrower data width
+            BANKS = max(IN_ITEMS, OUT_ITEMS)
+            BANK_W = min(self.DATA_WIDTH, dout.DATA_WIDTH)
+            memory_t = Bits(BANK_W)[self.DEPTH]
+            if BANKS == 1:
+                banks = [self._sig("memory", memory_t), ]
+            else:
+                banks = [self._sig(f"memory{i:d}", memory_t) for i in range(BANKS)]
+
+            for i, memory in enumerate(banks):
+                if BANKS == 1:
+                    bank_w_en = w_en
+                    bank_din = din.data
+                elif IN_ITEMS == 1:
+                    # write all banks at once
+                    bank_w_en = w_en
+                    bank_din = din.data[(i + 1) * BANK_W:i * BANK_W]
+                else:
+                    bank_w_en = w_en & w_sub._eq(i)
+                    bank_din = din.data
+                If(clk_in["clk"]._onRisingEdge(),
+                   If(bank_w_en,
+                      memory[w_bin[AW:]](bank_din)
+                   )
+                )
+
             r_reg = self._reg("r_reg", dout.data._dtype, **clk_out)
             # set_false_path dataIn_clk -> r_reg
             set_false_path(get_clock_of(w_bin), r_reg)
+            if BANKS == 1:
+                r_data = banks[0][r_bin[AW:]]
+            elif OUT_ITEMS == 1:
+                r_data = Concat(*reversed([memory[r_bin[AW:]] for memory in banks]))
+            else:
+                r_data = self._sig("r_data", dout.data._dtype)
+                Switch(r_sub).add_cases(
+                    (i, r_data(memory[r_bin[AW:]]))
+                    for i, memory in enumerate(banks)
+                ).Default(
+                    r_data(None)
+                )
             If(r_en,
-               r_reg(memory[r_bin[AW:]])
+               r_reg(r_data)
             )
             dout.data(r_reg)
         # dout.data(memory[r_bin[AW:]])
@@ -136,6 +229,14 @@ def _example_FifoAsync():
     return u
 
 
+def _example_FifoAsync_upsize():
+    u = FifoAsync()
+    u.DATA_WIDTH = 8
+    u.OUT_DATA_WIDTH = 32
+    u.DEPTH = 4
+    return u
+
+
 if __name__ == "__main__":
     from hwt.synthesizer.utils import to_rtl_str
     u = _example_FifoAsync()
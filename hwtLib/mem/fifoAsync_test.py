@@ -4,7 +4,7 @@
 import unittest
 
 from hwt.hdl.constants import Time
-
+from hwt.simulator.simTestCase import SingleUnitSimTestCase
 from hwtLib.mem.fifoAsync import FifoAsync
 from hwtLib.mem.fifo_test import FifoTC
 
@@ -33,9 +33,98 @@ class FifoAsyncTC(FifoTC):
         FifoTC.test_tryMore2(self, capturedOffset=capturedOffset)
 
 
+def pack_items(items, ITEM_W, ITEMS_PER_WORD):
+    words = []
+    for i in range(0, len(items), ITEMS_PER_WORD):
+        w = 0
+        for item in reversed(items[i:i + ITEMS_PER_WORD]):
+            w = (w << ITEM_W) | item
+        words.append(w)
+    return words
+
+
+class FifoAsync_upsizeTC(SingleUnitSimTestCase):
+    """
+    Narrow items on fast input clock packed to wide words on slow output clock
+    """
+    IN_CLK = 10 * Time.ns
+    OUT_CLK = 40 * Time.ns
+    IN_W = 8
+    OUT_W = 32
+
+    @classmethod
+    def getUnit(cls):
+        u = cls.u = FifoAsync()
+        u.DATA_WIDTH = cls.IN_W
+        u.OUT_DATA_WIDTH = cls.OUT_W
+        u.DEPTH = 4
+        return u
+
+    def setUp(self):
+        SingleUnitSimTestCase.setUp(self)
+        u = self.u
+        u.dataIn_clk._ag.period = self.IN_CLK
+        u.dataOut_clk._ag.period = self.OUT_CLK
+        RST_DELAY = int(max(self.IN_CLK, self.OUT_CLK) * 1.6)
+        u.dataIn_rst_n._ag.initDelay = \
+            u.dataOut_rst_n._ag.initDelay = RST_DELAY
+
+    def test_pass_data(self, N=16 * 4, randomized=False):
+        u = self.u
+        NARROW_W = min(self.IN_W, self.OUT_W)
+        RATIO = max(self.IN_W, self.OUT_W) // NARROW_W
+        narrow = [i & 0xff for i in range(N * RATIO)]
+        wide = pack_items(narrow, NARROW_W, RATIO)
+        if self.IN_W < self.OUT_W:
+            din, dout = narrow, wide
+        else:
+            din, dout = wide, narrow
+        u.dataIn._ag.data.extend(din)
+
+        t = N * RATIO * max(self.IN_CLK, self.OUT_CLK) + 10 * self.OUT_CLK
+        if randomized:
+            self.randomize(u.dataIn)
+            self.randomize(u.dataOut)
+            t *= 3
+
+        self.runSim(t)
+        self.assertValSequenceEqual(u.dataOut._ag.data, dout)
+
+    def test_pass_data_randomized(self):
+        self.test_pass_data(randomized=True)
+
+    def test_tryMore(self):
+        u = self.u
+        RATIO = max(self.IN_W, self.OUT_W) // min(self.IN_W, self.OUT_W)
+        # whole fifo and one uncomplete word
+        ITEMS_IN = u.DEPTH * (RATIO if self.IN_W < self.OUT_W else 1)
+        u.dataIn._ag.data.extend(range(ITEMS_IN + 2))
+        u.dataOut._ag.setEnable(False)
+
+        self.runSim(ITEMS_IN * 4 * max(self.IN_CLK, self.OUT_CLK))
+        self.assertEqual(len(u.dataIn._ag.data), 2)
+
+
+class FifoAsync_downsizeTC(FifoAsync_upsizeTC):
+    """
+    Wide words on slow input clock unpacked to narrow items on fast output clock
+    """
+    IN_CLK = 40 * Time.ns
+    OUT_CLK = 10 * Time.ns
+    IN_W = 32
+    OUT_W = 8
+
+
+FifoAsyncTCs = [
+    FifoAsyncTC,
+    FifoAsync_upsizeTC,
+    FifoAsync_downsizeTC,
+]
+
 if __name__ == "__main__":
     suite = unittest.TestSuite()
     # suite.addTest(FifoAsyncTC('test_tryMore'))
-    suite.addTest(unittest.makeSuite(FifoAsyncTC))
+    for tc in FifoAsyncTCs:
+        suite.addTest(unittest.makeSuite(tc))
     runner = unittest.TextTestRunner(verbosity=3)
     runner.run(suite)
@@ -107,6 +107,7 @@ class HashTableCore(Unit):
         # tmp storage for original key and hash for later check
         origKeyIn = LookupKeyIntf()
         origKeyIn.KEY_WIDTH = self.KEY_WIDTH
+        origKeyIn.LOOKUP_ID_WIDTH = self.LOOKUP_ID_WIDTH
         self.origKeyIn = origKeyIn
 
         origKeyIn.key(lookup.key)
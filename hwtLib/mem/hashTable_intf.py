@@ -90,14 +90,14 @@ class LookupKeyIntfAgent(HandshakedAgent):
     def get_data(self):
         intf = self.intf
         if self.HAS_LOOKUP_ID:
-            return intf.lookup_id.read(), intf.key.read()
+            return intf.lookupId.read(), intf.key.read()
         return intf.key.read()
 
     def set_data(self, data):
         intf = self.intf
         if self.HAS_LOOKUP_ID:
             _id, _key = data
-            return intf.lookup_id.write(_id), intf.key.write(_key)
+            return intf.lookupId.write(_id), intf.key.write(_key)
 
         self.intf.key.write(data)
 
@@ -0,0 +1,638 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A bit exact functional (untimed) model of the hash tables
+:class:`hwtLib.mem.hashTableCore.HashTableCore`,
+:class:`hwtLib.mem.cuckooHashTable.CuckooHashTable` and
+:class:`hwtLib.mem.cuckooHashTableWithStash.CuckooHashTableWithStash`.
+
+The model uses the same CRC hash as the hardware and the same order of the operations,
+the items end up in the same slots of the same tables as in the hardware.
+It is meant as a scoreboard in simulation tests and for the design space exploration
+(load factor, length of the insert chains and the stash use for TABLE_SIZE/TABLE_CNT/MAX_REINSERT)
+on millions of keys.
+"""
+
+from random import Random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from hwt.math import log2ceil, isPow2
+from hwtLib.logic.crcComb import CrcComb
+from hwtLib.logic.crcPoly import CRC_32, CRC_32C
+from hwtLib.mem.cuckooHashTableWithStash import CuckooHashTableWithStash
+from pyMathBitPrecise.bit_utils import get_bit, mask, \
+    bit_list_reversed_endianity, bit_list_reversed_bits_in_bytes
+
+try:
+    import numpy as np
+except ImportError:
+    # numpy is optional, it is used only to speed up the hashing
+    np = None
+
+# item in the model memory, tuple (key, data, indexes of the key in all tables of cuckoo hash table)
+# or None for an invalid item, the content of the invalid items is not modeled
+HashTableItem = Optional[Tuple[int, int, Optional[Tuple[int, ...]]]]
+
+
+class CrcHash():
+    """
+    Bit exact software version of :class:`hwtLib.logic.crcComb.CrcComb`
+    used as a hash function in :class:`hwtLib.mem.hashTableCore.HashTableCore`
+
+    The CRC is an affine function of the input bits, the function is evaluated
+    for each input bit using the same XOR matrix as the hardware and the result
+    is stored in lookup tables for each byte of the input.
+
+    :ivar DATA_WIDTH: width of the input (KEY_WIDTH of the hash table)
+    :ivar OUT_WIDTH: number of the lower bits of the CRC used as a hash (None = all bits)
+    """
+
+    def __init__(self, crc_config, DATA_WIDTH: int, OUT_WIDTH: Optional[int]=None,
+                 IN_IS_BIGENDIAN: bool=False):
+        self.crc_config = crc_config
+        self.DATA_WIDTH = DATA_WIDTH
+        self.IN_IS_BIGENDIAN = IN_IS_BIGENDIAN
+        if OUT_WIDTH is None:
+            OUT_WIDTH = crc_config.WIDTH
+        self.OUT_WIDTH = OUT_WIDTH
+
+        self._crc_matrix = CrcComb.buildCrcXorMatrix(
+            DATA_WIDTH, CrcComb.parsePoly(crc_config.POLY, crc_config.WIDTH)[0])
+        out_mask = mask(OUT_WIDTH)
+        self.const = self.crc_reference(0) & out_mask
+        # contribution of each input bit to the result
+        cols = [(self.crc_reference(1 << i) & out_mask) ^ self.const
+                for i in range(DATA_WIDTH)]
+        self.byte_tables = []
+        for low in range(0, DATA_WIDTH, 8):
+            byte_cols = cols[low:low + 8]
+            t = [0 for _ in range(2 ** len(byte_cols))]
+            for v in range(1, len(t)):
+                # v = lowest set bit | the rest which is already resolved
+                lsb = (v & -v).bit_length() - 1
+                t[v] = t[v & (v - 1)] ^ byte_cols[lsb]
+            self.byte_tables.append(t)
+
+    def crc_reference(self, v: int) -> int:
+        """
+        Slow reference, the same algorithm as :meth:`hwtLib.logic.crcComb.CrcComb._impl`
+        """
+        cfg = self.crc_config
+        PW = cfg.WIDTH
+        inBits = [get_bit(v, i) for i in range(self.DATA_WIDTH)]
+        if not self.IN_IS_BIGENDIAN:
+            inBits = bit_list_reversed_endianity(inBits, extend=False)
+        if cfg.REFIN:
+            inBits = bit_list_reversed_bits_in_bytes(inBits, extend=False)
+
+        stateBits = [get_bit(cfg.INIT, i) for i in range(PW)]
+        finBits = [get_bit(cfg.XOROUT, i) for i in range(PW)]
+        res = []
+        for stateMask, dataMask in self._crc_matrix:
+            b = 0
+            for useBit, s in zip(stateMask, stateBits):
+                if useBit:
+                    b ^= s
+            for useBit, d in zip(dataMask, inBits):
+                if useBit:
+                    b ^= d
+            res.append(b)
+
+        if cfg.REFOUT:
+            res = list(reversed(res))
+            finBits = bit_list_reversed_bits_in_bytes(finBits, extend=False)
+
+        out = 0
+        for i, (b, f) in enumerate(zip(res, finBits)):
+            out |= (b ^ f) << i
+        return out
+
+    def __call__(self, v: int) -> int:
+        h = self.const
+        for t in self.byte_tables:
+            h ^= t[v & 0xff]
+            v >>= 8
+        return h
+
+    def hash_many(self, values: Sequence[int]) -> List[int]:
+        """
+        Batched version of :meth:`~.__call__`
+        """
+        if np is not None and self.DATA_WIDTH <= 64 and self.OUT_WIDTH <= 64:
+            v = np.asarray(values, dtype=np.uint64)
+            h = np.full(v.shape, self.const, dtype=np.uint64)
+            for i, t in enumerate(self.byte_tables):
+                t = np.asarray(t, dtype=np.uint64)
+                h ^= t[(v >> np.uint64(8 * i)) & np.uint64(len(t) - 1)]
+            return h.tolist()
+
+        return [self(v) for v in values]
+
+
+class HashTableCoreModel():
+    """
+    Model of :class:`hwtLib.mem.hashTableCore.HashTableCore`, a single table
+    where the item is stored on the index given by the hash of the key
+
+    :ivar mem: list of :data:`~.HashTableItem`
+    """
+
+    def __init__(self, POLYNOME, ITEMS_CNT: int, KEY_WIDTH: int):
+        assert isPow2(ITEMS_CNT), ITEMS_CNT
+        self.ITEMS_CNT = ITEMS_CNT
+        self.KEY_WIDTH = KEY_WIDTH
+        self.hash = CrcHash(POLYNOME, KEY_WIDTH, log2ceil(ITEMS_CNT))
+        self.mem: List[HashTableItem] = [None for _ in range(ITEMS_CNT)]
+
+    def lookup(self, key: int) -> Tuple[int, Optional[int], Optional[int], int, int]:
+        """
+        :return: tuple (hash, key, data, found, occupied) as on lookupRes interface
+        """
+        h = self.hash(key)
+        item = self.mem[h]
+        if item is None:
+            return (h, None, None, 0, 0)
+        _key, data, _ = item
+        return (h, _key, data, int(_key == key), 1)
+
+    def insert(self, hash_: int, key: int, data: int, item_vld: int):
+        """
+        Write to the table as on insert interface
+        """
+        if item_vld:
+            self.mem[hash_] = (key, data, None)
+        else:
+            self.mem[hash_] = None
+
+
+class CuckooHashTableModelStats():
+    """
+    Counters collected by :class:`~.CuckooHashTableModel`
+    """
+
+    def __init__(self):
+        self.inserts = 0
+        # inserts of the key which was already present (only the data was updated)
+        self.updates = 0
+        # number of the items moved to a different slot by inserts
+        self.moves = 0
+        # {number of moved items: number of inserts}
+        self.insert_chains: Dict[int, int] = {}
+        # items returned on insertRes with pop=1
+        self.pops = 0
+        # number of items stored in the table at the moment of the first pop
+        self.first_pop_items: Optional[int] = None
+        self.stash_inserts = 0
+        # items moved from the stash back to the tables
+        self.stash_drains = 0
+        self.max_stash_use = 0
+        self.deletes = 0
+        self.deletes_not_found = 0
+        self.lookups = 0
+        self.lookup_hits = 0
+
+    @property
+    def max_insert_chain(self) -> int:
+        return max(self.insert_chains.keys(), default=0)
+
+    @property
+    def avg_insert_chain(self) -> float:
+        cnt = sum(self.insert_chains.values())
+        if cnt == 0:
+            return 0.0
+        return sum(k * v for k, v in self.insert_chains.items()) / cnt
+
+    def as_dict(self):
+        return {
+            "inserts": self.inserts,
+            "updates": self.updates,
+            "moves": self.moves,
+            "max_insert_chain": self.max_insert_chain,
+            "avg_insert_chain": self.avg_insert_chain,
+            "pops": self.pops,
+            "first_pop_items": self.first_pop_items,
+            "stash_inserts": self.stash_inserts,
+            "stash_drains": self.stash_drains,
+            "max_stash_use": self.max_stash_use,
+            "deletes": self.deletes,
+            "deletes_not_found": self.deletes_not_found,
+            "lookups": self.lookups,
+            "lookup_hits": self.lookup_hits,
+        }
+
+    def __repr__(self):
+        return "<%s %s>" % (self.__class__.__name__, ", ".join(
+            "%s=%r" % kv for kv in self.as_dict().items()))
+
+
+class CuckooHashTableModel():
+    """
+    Model of :class:`hwtLib.mem.cuckooHashTable.CuckooHashTable`
+    (and :class:`hwtLib.mem.cuckooHashTableWithPipelinedLookup.CuckooHashTableWithPipelinedLookup`
+    which has the same insert algorithm)
+
+    * insert: if the key is found in some table the item is updated, else the item is stored
+      to the first table with an empty slot, else the item is swapped with the item in the table
+      selected by the rotation of the previous target table (insertTargetOH register)
+      and the insert continues with the swapped out item,
+      the item is returned with pop=1 after MAX_REINSERT swaps
+    * delete: the slot selected in the same way as for insert is invalidated
+
+    :note: The insertTargetOH register of the hardware is not reset, the model uses the last table
+        if its value is not known yet.
+    :note: The delete of a key which is not present in the table invalidates the selected
+        slot as the hardware does, if there is not any empty slot for the key
+        a valid item of a different key is deleted.
+
+    :ivar tables: list of :class:`~.HashTableCoreModel`
+    :ivar insert_target: index of the last table where an item was written by insert/delete
+    """
+
+    def __init__(self, POLYNOMIALS: Sequence, TABLE_SIZE: int=32, KEY_WIDTH: int=8,
+                 MAX_REINSERT: int=15):
+        TABLE_CNT = len(POLYNOMIALS)
+        assert TABLE_CNT > 0
+        assert TABLE_SIZE % TABLE_CNT == 0, (TABLE_SIZE, TABLE_CNT)
+        self.POLYNOMIALS = tuple(POLYNOMIALS)
+        self.TABLE_SIZE = TABLE_SIZE
+        self.TABLE_CNT = TABLE_CNT
+        self.KEY_WIDTH = KEY_WIDTH
+        self.MAX_REINSERT = MAX_REINSERT
+        self.tables = [HashTableCoreModel(p, TABLE_SIZE // TABLE_CNT, KEY_WIDTH)
+                       for p in self.POLYNOMIALS]
+        self._mems = [t.mem for t in self.tables]
+        self.insert_target: Optional[int] = None
+        self.items_cnt = 0
+        self.stats = CuckooHashTableModelStats()
+
+    @classmethod
+    def from_unit(cls, u, **kwargs) -> "CuckooHashTableModel":
+        """
+        Create a model with a configuration of a hash table component
+        """
+        return cls(u.POLYNOMIALS, TABLE_SIZE=int(u.TABLE_SIZE), KEY_WIDTH=int(u.KEY_WIDTH),
+                   MAX_REINSERT=int(u.MAX_REINSERT), **kwargs)
+
+    @property
+    def load_factor(self) -> float:
+        return self.items_cnt / self.TABLE_SIZE
+
+    def hashes(self, key: int) -> Tuple[int, ...]:
+        """
+        :return: index of the key in each table
+        """
+        return tuple(t.hash(key) for t in self.tables)
+
+    def hashes_many(self, keys: Sequence[int]) -> List[Tuple[int, ...]]:
+        """
+        Batched version of :meth:`~.hashes`
+        """
+        return list(zip(*(t.hash.hash_many(keys) for t in self.tables)))
+
+    def _insert_done(self, moves: int):
+        st = self.stats
+        st.moves += moves
+        st.insert_chains[moves] = st.insert_chains.get(moves, 0) + 1
+
+    def _pop(self, moves: int, item: HashTableItem) -> Tuple[int, int, int]:
+        st = self.stats
+        st.pops += 1
+        if st.first_pop_items is None:
+            st.first_pop_items = self.items_cnt
+        self._insert_done(moves)
+        return (1, item[0], item[1])
+
+    def _select_slot(self, key: int, hashes: Tuple[int, ...]) -> Tuple[int, bool, bool]:
+        """
+        :return: tuple (index of target table, found, final)
+        """
+        mems = self._mems
+        slots = [mems[t][h] for t, h in enumerate(hashes)]
+        for t, s in enumerate(slots):
+            if s is not None and s[0] == key:
+                return (t, True, True)
+        for t, s in enumerate(slots):
+            if s is None:
+                return (t, False, True)
+
+        prev = self.insert_target
+        if prev is None:
+            t = self.TABLE_CNT - 1
+        else:
+            t = (prev - 1) % self.TABLE_CNT
+        return (t, False, False)
+
+    def _insert(self, key: int, data: int, hashes: Tuple[int, ...]) -> Tuple[int, int, int]:
+        mems = self._mems
+        self.stats.inserts += 1
+        item = (key, data, hashes)
+        reinsert_cntr = self.MAX_REINSERT
+        moves = 0
+        while True:
+            if reinsert_cntr == 0:
+                return self._pop(moves, item)
+
+            key, data, hashes = item
+            t, found, final = self._select_slot(key, hashes)
+            self.insert_target = t
+            mem = mems[t]
+            h = hashes[t]
+            victim = mem[h]
+            mem[h] = item
+            if final:
+                if found:
+                    if moves == 0:
+                        self.stats.updates += 1
+                else:
+                    self.items_cnt += 1
+                self._insert_done(moves)
+                return (0, key, data)
+
+            item = victim
+            reinsert_cntr -= 1
+            moves += 1
+
+    def insert(self, key: int, data: int=0) -> Tuple[int, int, int]:
+        """
+        :return: tuple (pop, key, data) as on insertRes interface
+        """
+        return self._insert(key, data, self.hashes(key))
+
+    def insert_many(self, keys: Sequence[int], data: Optional[Sequence[int]]=None) -> List[Tuple[int, int, int]]:
+        """
+        Batched version of :meth:`~.insert`, the keys are hashed at once
+
+        :param data: data for each key, None = 0 for all keys
+        """
+        if data is None:
+            data = [0 for _ in range(len(keys))]
+        _insert = self._insert
+        return [_insert(k, d, h) for k, d, h in zip(keys, data, self.hashes_many(keys))]
+
+    def delete(self, key: int):
+        st = self.stats
+        st.deletes += 1
+        hashes = self.hashes(key)
+        t, found, _ = self._select_slot(key, hashes)
+        self.insert_target = t
+        mem = self._mems[t]
+        h = hashes[t]
+        if not found:
+            st.deletes_not_found += 1
+        if mem[h] is not None:
+            self.items_cnt -= 1
+        mem[h] = None
+
+    def clean(self):
+        for mem in self._mems:
+            for i in range(len(mem)):
+                mem[i] = None
+        self.items_cnt = 0
+
+    def lookup(self, key: int) -> Tuple[Optional[int], Optional[int], int, int]:
+        """
+        :return: tuple (key, data, found, occupied) as on lookupRes interface
+            (key is the key of the item in the first table if the item was not found)
+        """
+        st = self.stats
+        st.lookups += 1
+        res = [t.lookup(key) for t in self.tables]
+        for (_, _key, data, found, occupied) in res:
+            if found:
+                st.lookup_hits += 1
+                return (_key, data, found, occupied)
+
+        return res[0][1:]
+
+    def table_items(self) -> List[List[Optional[Tuple[int, int]]]]:
+        """
+        :return: list of lists of tuples (key, data) or None for each table
+        """
+        return [[None if item is None else item[:2] for item in mem]
+                for mem in self._mems]
+
+    def as_dict(self) -> Dict[int, int]:
+        """
+        :return: dictionary {key: data} of all items
+        """
+        d = {}
+        for mem in self._mems:
+            for item in mem:
+                if item is not None:
+                    d[item[0]] = item[1]
+        return d
+
+
+class CuckooHashTableWithStashModel(CuckooHashTableModel):
+    """
+    Model of :class:`hwtLib.mem.cuckooHashTableWithStash.CuckooHashTableWithStash`
+
+    * insert: the key is searched in the stash, then the empty slot (or the slot with the same key)
+      is searched by BFS in the cuckoo graph in the same order as in hardware,
+      if not found the item is stored in the first free slot of the stash
+    * delete: the key is deleted from the stash and from the table where it was found,
+      then the first item of the stash is inserted to the tables by the same BFS
+      until the stash is empty or the insert fails
+
+    :note: The hardware drains the stash only if there is not any other request after the delete,
+        the model matches the hardware only if the next request comes after the drain is finished.
+
+    :ivar stash: list of :data:`~.HashTableItem`
+    """
+
+    def __init__(self, POLYNOMIALS: Sequence, TABLE_SIZE: int=32, KEY_WIDTH: int=8,
+                 MAX_REINSERT: int=15, STASH_ITEMS: int=4, MAX_BFS_DEPTH: int=2):
+        super(CuckooHashTableWithStashModel, self).__init__(
+            POLYNOMIALS, TABLE_SIZE=TABLE_SIZE, KEY_WIDTH=KEY_WIDTH, MAX_REINSERT=MAX_REINSERT)
+        self.STASH_ITEMS = STASH_ITEMS
+        self.MAX_BFS_DEPTH = MAX_BFS_DEPTH
+        self.stash: List[HashTableItem] = [None for _ in range(STASH_ITEMS)]
+        self.bfs_nodes = CuckooHashTableWithStash.bfs_tree(self)
+        self.bfs_children = [[] for _ in self.bfs_nodes]
+        for n, (parent, _, _) in enumerate(self.bfs_nodes):
+            if parent is not None:
+                self.bfs_children[parent].append(n)
+
+    @classmethod
+    def from_unit(cls, u, **kwargs) -> "CuckooHashTableWithStashModel":
+        return super(CuckooHashTableWithStashModel, cls).from_unit(
+            u, STASH_ITEMS=int(u.STASH_ITEMS), MAX_BFS_DEPTH=int(u.MAX_BFS_DEPTH), **kwargs)
+
+    @property
+    def stash_use(self) -> int:
+        return sum(s is not None for s in self.stash)
+
+    def _bfs_insert(self, root: HashTableItem) -> Optional[Tuple[int, bool]]:
+        """
+        Search for the empty slot (or the slot with the same key) by BFS in the cuckoo graph
+        and move the items on the path to this slot
+
+        :return: tuple (number of moved items, True if the key was already present in the table)
+            or None if the slot was not found
+        """
+        mems = self._mems
+        nodes = self.bfs_nodes
+        node_item = [None for _ in nodes]
+        node_hash = [None for _ in nodes]
+        node_item[0] = root
+        for n, (_, own_table, depth) in enumerate(nodes):
+            k, _, hs = node_item[n]
+            dst = None
+            found = False
+            for t, h in enumerate(hs):
+                if t != own_table:
+                    s = mems[t][h]
+                    if s is not None and s[0] == k:
+                        dst = t
+                        found = True
+                        break
+            if dst is None:
+                for t, h in enumerate(hs):
+                    if t != own_table and mems[t][h] is None:
+                        dst = t
+                        break
+
+            if dst is not None:
+                # move the items on the path from this node to root, starting from this node
+                path_table = dst
+                path_hash = hs[dst]
+                p = n
+                while True:
+                    mems[path_table][path_hash] = node_item[p]
+                    if p == 0:
+                        break
+                    path_table = nodes[p][1]
+                    path_hash = node_hash[p]
+                    p = nodes[p][0]
+
+                return (depth, found and n == 0)
+
+            for c in self.bfs_children[n]:
+                t = nodes[c][1]
+                node_item[c] = mems[t][hs[t]]
+                node_hash[c] = hs[t]
+
+        return None
+
+    def _insert(self, key: int, data: int, hashes: Tuple[int, ...]) -> Tuple[int, int, int]:
+        st = self.stats
+        st.inserts += 1
+        root = (key, data, hashes)
+        stash = self.stash
+        for i, s in enumerate(stash):
+            if s is not None and s[0] == key:
+                stash[i] = root
+                st.updates += 1
+                self._insert_done(0)
+                return (0, key, data)
+
+        res = self._bfs_insert(root)
+        if res is not None:
+            depth, found = res
+            if found:
+                st.updates += 1
+            else:
+                self.items_cnt += 1
+            self._insert_done(depth)
+            return (0, key, data)
+
+        # the empty slot was not found, store the item to the stash
+        for i, s in enumerate(stash):
+            if s is None:
+                stash[i] = root
+                self.items_cnt += 1
+                st.stash_inserts += 1
+                st.max_stash_use = max(st.max_stash_use, self.stash_use)
+                self._insert_done(0)
+                return (0, key, data)
+
+        return self._pop(0, root)
+
+    def delete(self, key: int):
+        st = self.stats
+        st.deletes += 1
+        stash = self.stash
+        found = False
+        for i, s in enumerate(stash):
+            if s is not None and s[0] == key:
+                stash[i] = None
+                self.items_cnt -= 1
+                found = True
+
+        for mem, h in zip(self._mems, self.hashes(key)):
+            s = mem[h]
+            if s is not None and s[0] == key:
+                mem[h] = None
+                self.items_cnt -= 1
+                found = True
+                break
+
+        if not found:
+            st.deletes_not_found += 1
+        self.drain_stash()
+
+    def drain_stash(self):
+        """
+        Move the items from the stash to the tables as the hardware does after the delete
+        """
+        stash = self.stash
+        st = self.stats
+        for i, s in enumerate(stash):
+            if s is None:
+                continue
+            if self._bfs_insert(s) is None:
+                # the item does not fit in to the tables
+                return
+            stash[i] = None
+            st.stash_drains += 1
+
+    def clean(self):
+        super(CuckooHashTableWithStashModel, self).clean()
+        for i in range(len(self.stash)):
+            self.stash[i] = None
+
+    def lookup(self, key: int) -> Tuple[Optional[int], Optional[int], int, int]:
+        for s in self.stash:
+            if s is not None and s[0] == key:
+                st = self.stats
+                st.lookups += 1
+                st.lookup_hits += 1
+                return (key, s[1], 1, 1)
+
+        return super(CuckooHashTableWithStashModel, self).lookup(key)
+
+    def stash_as_dict(self) -> Dict[int, int]:
+        """
+        :return: dictionary {key: data} of the items in the stash
+        """
+        return {s[0]: s[1] for s in self.stash if s is not None}
+
+    def as_dict(self) -> Dict[int, int]:
+        d = super(CuckooHashTableWithStashModel, self).as_dict()
+        d.update(self.stash_as_dict())
+        return d
+
+
+def random_keys(cnt: int, KEY_WIDTH: int, seed: int=0) -> List[int]:
+    """
+    :return: list of unique random keys
+    """
+    assert cnt <= 2 ** KEY_WIDTH, (cnt, KEY_WIDTH)
+    rand = Random(seed)
+    return rand.sample(range(2 ** KEY_WIDTH), cnt)
+
+
+if __name__ == "__main__":
+    # fill tables of different configurations with random keys until the first pop
+    KEY_WIDTH = 32
+    for TABLE_SIZE in (1024, 4096, 16384):
+        keys = random_keys(TABLE_SIZE, KEY_WIDTH)
+        for model in (CuckooHashTableModel([CRC_32, CRC_32C], TABLE_SIZE, KEY_WIDTH),
+                      CuckooHashTableWithStashModel([CRC_32, CRC_32C], TABLE_SIZE, KEY_WIDTH)):
+            model.insert_many(keys)
+            st = model.stats
+            first_pop = st.first_pop_items
+            print(model.__class__.__name__, TABLE_SIZE,
+                  "load factor at first pop:", None if first_pop is None else first_pop / TABLE_SIZE,
+                  st)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from binascii import crc32
+import unittest
+
+from hwtLib.logic.crcPoly import CRC_32, CRC_32C
+# imported as a module so the base test cases are not collected again from this file
+from hwtLib.mem import cuckooHashTableWithRam_test
+from hwtLib.mem.cuckooHashTablWithRam import CuckooHashTableWithRam
+from hwtLib.mem.cuckooHashTableWithStash import CuckooHashTableWithStashAndRam
+from hwtLib.mem.hashTable_model import CrcHash, CuckooHashTableModel, \
+    CuckooHashTableWithStashModel, random_keys
+from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer
+
+
+class HashTableModel_TC(unittest.TestCase):
+
+    def test_crc_hash_same_as_binascii(self):
+        h = CrcHash(CRC_32, 32)
+        for k in [0, 1, 0x12345678, 0xdeadbeef, 0xffffffff]:
+            self.assertEqual(h(k), crc32(k.to_bytes(4, "little")), k)
+
+    def test_crc_hash_same_as_reference(self):
+        for KEY_WIDTH in [5, 8, 12, 13, 16, 33]:
+            for crc in [CRC_32, CRC_32C]:
+                h = CrcHash(crc, KEY_WIDTH, 10)
+                keys = random_keys(min(64, 2 ** KEY_WIDTH), KEY_WIDTH)
+                self.assertEqual([h(k) for k in keys],
+                                 [h.crc_reference(k) & 0x3ff for k in keys])
+                self.assertEqual(h.hash_many(keys), [h(k) for k in keys])
+
+    def test_insert_lookup_delete(self):
+        m = CuckooHashTableModel([CRC_32, CRC_32C], TABLE_SIZE=64, KEY_WIDTH=16)
+        reference = {k: k + 1 for k in random_keys(20, 16)}
+        for k, v in reference.items():
+            self.assertEqual(m.insert(k, v), (0, k, v))
+        self.assertEqual(m.as_dict(), reference)
+        self.assertEqual(m.items_cnt, len(reference))
+
+        k = next(iter(reference.keys()))
+        m.insert(k, 0xff)
+        reference[k] = 0xff
+        self.assertEqual(m.stats.updates, 1)
+        self.assertEqual(m.lookup(k), (k, 0xff, 1, 1))
+
+        m.delete(k)
+        del reference[k]
+        self.assertEqual(m.lookup(k)[2], 0)
+        self.assertEqual(m.as_dict(), reference)
+        self.assertEqual(m.items_cnt, len(reference))
+
+        m.clean()
+        self.assertEqual(m.as_dict(), {})
+        self.assertEqual(m.items_cnt, 0)
+
+    def assert_all_items_present(self, m, reference, insert_res):
+        table = m.as_dict()
+        for pop, k, v in insert_res:
+            if pop:
+                self.assertNotIn(k, table)
+                table[k] = v
+        self.assertEqual(table, reference)
+        self.assertEqual(m.items_cnt, len(m.as_dict()))
+
+    def test_overfill(self):
+        m = CuckooHashTableModel([CRC_32, CRC_32C], TABLE_SIZE=32, KEY_WIDTH=16, MAX_REINSERT=4)
+        keys = random_keys(40, 16)
+        reference = {k: i for i, k in enumerate(keys)}
+        res = m.insert_many(keys, [reference[k] for k in keys])
+        st = m.stats
+        self.assertGreater(st.pops, 0)
+        self.assertEqual(st.pops, sum(r[0] for r in res))
+        self.assertLessEqual(st.max_insert_chain, 4)
+        self.assertEqual(sum(st.insert_chains.values()), len(keys))
+        self.assert_all_items_present(m, reference, res)
+
+    def test_stash_overfill(self):
+        m = CuckooHashTableWithStashModel([CRC_32, CRC_32C], TABLE_SIZE=32, KEY_WIDTH=16,
+                                          STASH_ITEMS=2, MAX_BFS_DEPTH=2)
+        keys = random_keys(40, 16)
+        reference = {k: i for i, k in enumerate(keys)}
+        res = m.insert_many(keys, [reference[k] for k in keys])
+        st = m.stats
+        self.assertEqual(m.stash_use, 2)
+        self.assertEqual(st.max_stash_use, 2)
+        # all keys are unique, the key is stored or popped
+        self.assertEqual(st.pops, len(keys) - len(m.as_dict()))
+        self.assertLessEqual(st.max_insert_chain, 2)
+        self.assert_all_items_present(m, reference, res)
+
+        k = next(iter(m.stash_as_dict().keys()))
+        self.assertEqual(m.lookup(k), (k, reference[k], 1, 1))
+        m.delete(k)
+        self.assertEqual(m.lookup(k)[2], 0)
+        self.assertEqual(m.stash_use, 1)
+
+    def test_stash_drain(self):
+        m = CuckooHashTableWithStashModel([CRC_32, CRC_32C], TABLE_SIZE=32, KEY_WIDTH=16,
+                                          STASH_ITEMS=2, MAX_BFS_DEPTH=2)
+        keys = random_keys(40, 16)
+        reference = {k: i for i, k in enumerate(keys)}
+        res = m.insert_many(keys, [reference[k] for k in keys])
+        self.assertEqual(m.stash_use, 2)
+        # free the slot of the first item of the stash in the first table
+        k = m.tables[0].mem[m.hashes(m.stash[0][0])[0]][0]
+        m.delete(k)
+        del reference[k]
+        self.assertLess(m.stash_use, 2)
+        self.assertEqual(m.stats.stash_drains, 2 - m.stash_use)
+        self.assertEqual(m.items_cnt, len(m.as_dict()))
+        self.assert_all_items_present(m, reference, res)
+
+
+class CuckooHashTableModel_sim_TC(cuckooHashTableWithRam_test.CuckooHashTableWithRam_common_TC):
+    """
+    Check that the model stores the items to the same slots as the hardware
+    """
+
+    @classmethod
+    def getUnit(cls):
+        u = CuckooHashTableWithRam([CRC_32, CRC_32C])
+        u.KEY_WIDTH = 8
+        u.DATA_WIDTH = 8
+        u.LOOKUP_KEY = True
+        u.TABLE_SIZE = 2 * 4
+        u.MAX_REINSERT = 4
+        return u
+
+    def get_model(self):
+        return CuckooHashTableModel.from_unit(self.u)
+
+    def tableItemsFromSim(self):
+        res = []
+        for mem in self.TABLE_MEMS:
+            t = []
+            for i in range(len(mem)):
+                key, data, item_vld = self.parseItem(mem[i].read())
+                if item_vld:
+                    t.append((int(key), int(data)))
+                else:
+                    t.append(None)
+            res.append(t)
+        return res
+
+    def test_same_as_model(self, N=12, randomized=False):
+        u = self.u
+        self.cleanupMemory()
+        m = self.get_model()
+        keys = random_keys(N, u.KEY_WIDTH, seed=1)
+        to_delete = keys[:N // 2:2]
+        lookups = keys + [k ^ 0x80 for k in keys[:4]]
+
+        expected_insertRes = []
+        for i, k in enumerate(keys):
+            u.insert._ag.data.append((k, i))
+            expected_insertRes.append(m.insert(k, i))
+        for k in to_delete:
+            m.delete(k)
+        expected_lookupRes = [m.lookup(k) for k in lookups]
+
+        t = N * 40
+        if randomized:
+            self.randomize_all()
+            t *= 3
+
+        def delete_and_lookup():
+            yield Timer(t * CLK_PERIOD)
+            u.delete._ag.data.extend(to_delete)
+            yield Timer(len(to_delete) * 40 * CLK_PERIOD)
+            u.lookup._ag.data.extend(lookups)
+
+        self.procs.append(delete_and_lookup())
+        self.runSim((t + len(to_delete) * 40 + len(lookups) * 8 + 40) * CLK_PERIOD)
+
+        self.assertValSequenceEqual(u.insertRes._ag.data, expected_insertRes)
+        self.assertEqual(self.tableItemsFromSim(), m.table_items())
+        res = u.lookupRes._ag.data
+        self.assertEqual(len(res), len(expected_lookupRes))
+        for (key, data, found, occupied), (e_key, e_data, e_found, e_occupied) in zip(res, expected_lookupRes):
+            self.assertValEqual(found, e_found)
+            self.assertValEqual(occupied, e_occupied)
+            if found:
+                self.assertValEqual(key, e_key)
+                self.assertValEqual(data, e_data)
+
+    def test_same_as_model_randomized(self):
+        self.test_same_as_model(randomized=True)
+
+
+class CuckooHashTableWithStashModel_sim_TC(CuckooHashTableModel_sim_TC):
+
+    @classmethod
+    def getUnit(cls):
+        u = CuckooHashTableWithStashAndRam([CRC_32, CRC_32C])
+        u.KEY_WIDTH = 8
+        u.DATA_WIDTH = 8
+        u.LOOKUP_KEY = True
+        u.TABLE_SIZE = 2 * 4
+        u.STASH_ITEMS = 2
+        return u
+
+    def get_model(self):
+        return CuckooHashTableWithStashModel.from_unit(self.u)
+
+
+HashTableModelTCs = [
+    HashTableModel_TC,
+    CuckooHashTableModel_sim_TC,
+    CuckooHashTableWithStashModel_sim_TC,
+]
+
+if __name__ == "__main__":
+    suite = unittest.TestSuite()
+    # suite.addTest(CuckooHashTableModel_sim_TC('test_same_as_model'))
+    for tc in HashTableModelTCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
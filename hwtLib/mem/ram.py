@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from hwt.code import If, Concat
+from typing import List
+
+from hwt.code import If, Concat, Switch
 from hwt.hdl.constants import READ_WRITE, WRITE, READ
 from hwt.hdl.types.bits import Bits
 from hwt.interfaces.std import BramPort, Clk, BramPort_withoutClk
+from hwt.math import log2ceil, isPow2
 from hwt.serializer.mode import serializeParamsUniq
 from hwt.synthesizer.hObjList import HObjList
 from hwt.synthesizer.param import Param
@@ -23,6 +26,16 @@ class RamSingleClock(Unit):
         it can be int or tuple of READ_WRITE, WRITE, READ
         to specify rw access for each port separately
     :ivar HAS_BE: Param, if True the write ports will have byte enable signal
+    :ivar MAX_BLOCK_DATA_WIDTH: Param, if specified the memory is split to blocks
+        of this data width
+    :ivar MAX_BLOCK_DEPTH: Param, if specified the memory is split by address to banks
+        of this number of items (has to be power of 2), the data of read ports is selected
+        by an output mux tree
+    :ivar OUTPUT_MUX_ARITY: Param, the number of inputs of a single multiplexer
+        in output mux tree (has to be power of 2)
+    :ivar OUTPUT_MUX_REGISTERED: Param, if True the output of every level of output mux tree
+        is registered, this increases the read latency by the number of levels of the tree
+        (:meth:`~.get_read_latency`)
 
     .. hwt-autodoc::
     """
@@ -34,8 +47,45 @@ class RamSingleClock(Unit):
         self.PORT_CNT = Param(1)
         self.HAS_BE = Param(False)
         self.MAX_BLOCK_DATA_WIDTH = Param(None)
+        self.MAX_BLOCK_DEPTH = Param(None)
+        self.OUTPUT_MUX_ARITY = Param(4)
+        self.OUTPUT_MUX_REGISTERED = Param(False)
         self.INIT_DATA = Param(None)
 
+    def _get_depth_bank_cnt(self) -> int:
+        """
+        :return: number of banks the memory is split to by address (1 if not split)
+        """
+        MAX_DEPTH = self.MAX_BLOCK_DEPTH
+        DEPTH = 2 ** self.ADDR_WIDTH
+        if MAX_DEPTH is None or MAX_DEPTH >= DEPTH:
+            return 1
+        assert isPow2(MAX_DEPTH), MAX_DEPTH
+        return DEPTH // MAX_DEPTH
+
+    def _get_output_mux_levels(self) -> int:
+        """
+        :return: number of levels of output mux tree
+        """
+        BANKS = self._get_depth_bank_cnt()
+        ARITY = self.OUTPUT_MUX_ARITY
+        assert ARITY >= 2 and isPow2(ARITY), ARITY
+        levels = 0
+        while BANKS > 1:
+            BANKS = (BANKS + ARITY - 1) // ARITY
+            levels += 1
+        return levels
+
+    def get_read_latency(self) -> int:
+        """
+        :return: number of clock cycles between read request and the data on dout
+            (can be used before the component is declared)
+        """
+        if self.OUTPUT_MUX_REGISTERED:
+            return 1 + self._get_output_mux_levels()
+        else:
+            return 1
+
     def _declr_ports(self):
         PORTS = self.PORT_CNT
         with self._paramsShared():
@@ -63,7 +113,18 @@ class RamSingleClock(Unit):
         # for the case where this memory will be relized using multiple memory blocks
         children = HObjList()
         MAX_DW = self.MAX_BLOCK_DATA_WIDTH
-        if MAX_DW is not None and MAX_DW < self.DATA_WIDTH:
+        BANKS = self._get_depth_bank_cnt()
+        if BANKS > 1:
+            # split by address, the bank may be split by data width in the child
+            DEPTH = self.MAX_BLOCK_DEPTH
+            for i in range(BANKS):
+                c = self.__class__()
+                c._updateParamsFrom(self, exclude=({"ADDR_WIDTH", "INIT_DATA", "OUTPUT_MUX_REGISTERED"}, {}))
+                c.ADDR_WIDTH = log2ceil(DEPTH)
+                if self.INIT_DATA is not None:
+                    c.INIT_DATA = self.INIT_DATA[i * DEPTH:(i + 1) * DEPTH]
+                children.append(c)
+        elif MAX_DW is not None and MAX_DW < self.DATA_WIDTH:
             DW = self.DATA_WIDTH
             while DW > 0:
                 c = self.__class__()
@@ -133,7 +194,89 @@ class RamSingleClock(Unit):
         else:
             raise AssertionError("Bram port has to have at least write or read part")
 
+    def _connect_output_mux_tree(self, port_name: str, douts: List[RtlSignal],
+                                 bank_sel: RtlSignal, clk: RtlSignal) -> RtlSignal:
+        """
+        Build a tree of multiplexers which selects the data from the bank
+
+        :param douts: the outputs of banks
+        :param bank_sel: the index of the bank (already delayed to match the latency of the bank)
+        :return: the selected data
+        """
+        ARITY = self.OUTPUT_MUX_ARITY
+        SEL_W = log2ceil(ARITY)
+        BANK_SEL_W = bank_sel._dtype.bit_length()
+        REG = self.OUTPUT_MUX_REGISTERED
+        level = 0
+        while len(douts) > 1:
+            sel = bank_sel[min((level + 1) * SEL_W, BANK_SEL_W):level * SEL_W]
+            next_douts = []
+            for g_i in range(0, len(douts), ARITY):
+                group = douts[g_i:g_i + ARITY]
+                name = f"{port_name:s}_mux{level:d}_{g_i // ARITY:d}"
+                if REG:
+                    o = self._reg(name, group[0]._dtype, clk=clk)
+                else:
+                    o = self._sig(name, group[0]._dtype)
+
+                if len(group) == 1:
+                    o(group[0])
+                else:
+                    Switch(sel).add_cases(
+                        (i, o(d)) for i, d in enumerate(group)
+                    ).Default(
+                        o(None)
+                    )
+                next_douts.append(o)
+
+            if REG:
+                # delay the select to be aligned with the data
+                bank_sel_delayed = self._reg(f"{port_name:s}_bank_sel{level + 1:d}", bank_sel._dtype, clk=clk)
+                bank_sel_delayed(bank_sel)
+                bank_sel = bank_sel_delayed
+
+            douts = next_douts
+            level += 1
+
+        return douts[0]
+
+    def _delegate_to_children_by_depth(self):
+        BANK_AW = self.children[0].ADDR_WIDTH
+        for p_i, ports in enumerate(zip(self.port, *[c.port for c in self.children])):
+            p = ports[0]
+            p_clk = getattr(p, "clk", None)
+
+            bank_addr = p.addr[BANK_AW:]
+            bank_index = p.addr[:BANK_AW]
+            for i, cp in enumerate(ports[1:]):
+                cp.en(p.en & bank_index._eq(i))
+                cp.addr(bank_addr)
+                if p.HAS_W:
+                    if p.HAS_R or p.HAS_BE:
+                        cp.we(p.we)
+                    cp.din(p.din)
+                if p_clk is not None:
+                    cp.clk(p_clk)
+
+            if p.HAS_R:
+                clk = self.clk if p_clk is None else p_clk
+                # the index of the bank has to be stored because the data comes in next clock cycle
+                bank_sel = self._reg(f"port_{p_i:d}_bank_sel", bank_index._dtype, clk=clk)
+                If(p.en,
+                   bank_sel(bank_index)
+                )
+                p.dout(self._connect_output_mux_tree(
+                    f"port_{p_i:d}", [cp.dout for cp in ports[1:]], bank_sel, clk))
+
+        clk = getattr(self, "clk", None)
+        if clk is not None:
+            for c in self.children:
+                c.clk(clk)
+
     def delegate_to_children(self):
+        if self._get_depth_bank_cnt() > 1:
+            return self._delegate_to_children_by_depth()
+
         MAX_DW = self.MAX_BLOCK_DATA_WIDTH
         DW = self.DATA_WIDTH
 
@@ -160,8 +303,9 @@ class RamSingleClock(Unit):
                 p.dout(Concat(*reversed(dout)))
 
         clk = getattr(self, "clk", None)
-        for c in self.children:
-            c.clk(clk)
+        if clk is not None:
+            for c in self.children:
+                c.clk(clk)
 
     def _impl(self):
         if self.children:
@@ -186,6 +330,13 @@ class RamMultiClock(Unit):
     """
     PORT_CLS = BramPort
 
+    _get_depth_bank_cnt = RamSingleClock._get_depth_bank_cnt
+    _get_output_mux_levels = RamSingleClock._get_output_mux_levels
+    get_read_latency = RamSingleClock.get_read_latency
+    _connect_output_mux_tree = RamSingleClock._connect_output_mux_tree
+    _delegate_to_children_by_depth = RamSingleClock._delegate_to_children_by_depth
+    delegate_to_children = RamSingleClock.delegate_to_children
+
     def _config(self):
         RamSingleClock._config(self)
         self.PORT_CNT = 2
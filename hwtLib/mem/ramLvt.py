@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from hwt.code import If, Switch, Xor
+from hwt.hdl.constants import WRITE, READ
+from hwt.hdl.types.bits import Bits
+from hwt.hdl.types.defs import BIT
+from hwt.interfaces.utils import propagateClk
+from hwt.math import log2ceil
+from hwt.serializer.mode import serializeParamsUniq
+from hwt.synthesizer.hObjList import HObjList
+from hwtLib.mem.ram import RamSingleClock
+from hwtLib.mem.ramXor import RamXorSingleClock
+
+
+@serializeParamsUniq
+class RamLvtSingleClock(RamXorSingleClock):
+    """
+    Multiport Live-Value-Table (LVT) based RAM with only one clock signal
+
+    Each write port has own copy of the memory for each read port (W x R primitive memories).
+    The live value table is a small memory (usually mapped to LUTRAM) which stores the index
+    of the write port which was last to write to a specific address. The read port reads the
+    memory of each write port and the LVT in parallel and selects the data using the value from LVT.
+    In comparison with :class:`~.RamXorSingleClock` which needs W x (W - 1 + R) primitive memories
+    and XOR trees in write and read path, this memory needs only W x R primitive memories and
+    a multiplexer in the read path. The LVT itself is implemented as W tables of log2(W) bit items
+    with asynchronous read which are combined using XOR in the same way as in :class:`~.RamXorSingleClock`.
+
+    :note: the timing of ports is the same as for :class:`~.RamXorSingleClock`
+        (write is registered and applied in next clock cycle, the read port forwards
+        the data of the write which is in progress)
+    :attention: the write from multiple ports to the same address in the same clock cycle
+        results in undefined value (same as for :class:`~.RamXorSingleClock`)
+
+    :see: :class:`~.RamSingleClock`
+
+    .. hwt-autodoc:: _example_RamLvtSingleClock
+    """
+
+    def _impl(self):
+        if self._can_be_primitive_ram:
+            RamSingleClock._impl(self)
+            return
+
+        if self.PRIMITIVE_MEMORY_PORTS != (WRITE, READ):
+            raise NotImplementedError(self.PRIMITIVE_MEMORY_PORTS)
+        if self._rw_ports:
+            raise NotImplementedError("RW ports (supports only write and read ports)")
+
+        r_ports = self._r_ports
+        assert r_ports
+        w_ports = self._w_ports
+        assert w_ports
+
+        # 1. construct a matrix M x N where M is number of read ports and N is a number of write ports
+        r_rams = HObjList(HObjList(RamSingleClock() for _ in w_ports)
+                          for _ in r_ports)
+        for row in r_rams:
+            for w_i, r in enumerate(row):
+                r._updateParamsFrom(self, exclude=(("PORT_CNT",), ()))
+                r.PORT_CNT = self.PRIMITIVE_MEMORY_PORTS
+                if w_i != 0 or self.INIT_DATA is None:
+                    # the LVT is initialized to 0 so only first memory uses INIT_DATA
+                    r.INIT_DATA = tuple(0 for _ in range(2 ** r.ADDR_WIDTH))
+        self.r_rams = r_rams
+
+        # 2. construct the LVT, it is composed of a table for each write port,
+        # the index of the last written port is a XOR of values from all tables
+        # (same as in RamXorSingleClock, but the tables are small and with asynchronous read)
+        LVT_W = log2ceil(len(w_ports))
+        lvt_t = Bits(LVT_W)[2 ** self.ADDR_WIDTH]
+        lvt = [self._sig(f"lvt{i}", lvt_t, def_val=[0 for _ in range(2 ** self.ADDR_WIDTH)])
+               for i in range(len(w_ports))]
+
+        # :type: List[Tuple[RtlSignal, RtlSignal, RtlSignal]]
+        # List of tuples (en, address, write data), used for write forwarding on read ports
+        write_in_progress_staus = []
+
+        # 3. connect write ports to memories and to LVT
+        # add the register on write address and data to have same timing as RamXorSingleClock
+        for i, w in enumerate(w_ports):
+            w_addr_reg = self._reg(f"{w._name}_addr_reg", w.addr._dtype)
+            w_addr_reg(w.addr)
+            w_en_reg = self._reg(f"{w._name}_en_reg", def_val=0)
+            w_en_reg(w.en)
+            w_data_reg = self._reg(f"{w._name}_data_reg", w.din._dtype)
+            w_data_reg(w.din)
+
+            for ram_row in r_rams:
+                dst = ram_row[i].port[0]
+                dst.addr(w_addr_reg)
+                dst.en(w_en_reg)
+                dst.din(w_data_reg)
+
+            write_in_progress_staus.append((w_en_reg, w_addr_reg, w_data_reg))
+
+        if LVT_W:
+            for i, (w_en_reg, w_addr_reg, _) in enumerate(write_in_progress_staus):
+                lvt_other = [t[w_addr_reg] for t_i, t in enumerate(lvt) if t_i != i]
+                If(self.clk._onRisingEdge(),
+                   If(w_en_reg,
+                      lvt[i][w_addr_reg](Xor(lvt_t.element_t.from_py(i), *lvt_other))
+                   )
+                )
+
+        # 4. connect read ports to memories and select the data by LVT
+        for r, r_ram_row in zip(r_ports, r_rams):
+            for r_ram in r_ram_row:
+                r_ram = r_ram.port[1]
+                r_ram.addr(r.addr)
+                r_ram.en(r.en)
+
+            if LVT_W:
+                lvt_r = self._reg(f"{r._name}_lvt", lvt_t.element_t)
+                If(r.en,
+                   lvt_r(Xor(*(t[r.addr] for t in lvt)))
+                )
+                r_data = self._sig(f"{r._name}_data", r.dout._dtype)
+                Switch(lvt_r).add_cases(
+                    (w_i, r_data(r_ram.port[1].dout))
+                    for w_i, r_ram in enumerate(r_ram_row)
+                ).Default(
+                    r_data(None)
+                )
+            else:
+                r_data = r_ram_row[0].port[1].dout
+
+            # forward the data of the write in progress (the memory and LVT are updated
+            # at the same clock edge when the read is performed)
+            fwd_en = self._reg(f"{r._name}_fwd_en", def_val=0)
+            fwd_data = self._reg(f"{r._name}_fwd_data", r.dout._dtype)
+            fwd_en_next = BIT.from_py(0)
+            fwd_data_next = fwd_data
+            for w_en_reg, w_addr_reg, w_data_reg in write_in_progress_staus:
+                w_match = w_en_reg & w_addr_reg._eq(r.addr)
+                fwd_en_next = fwd_en_next | w_match
+                fwd_data_next = w_match._ternary(w_data_reg, fwd_data_next)
+
+            If(r.en,
+               fwd_en(fwd_en_next),
+               fwd_data(fwd_data_next),
+            )
+            r.dout(fwd_en._ternary(fwd_data, r_data))
+
+        propagateClk(self)
+
+
+def _example_RamLvtSingleClock():
+    u = RamLvtSingleClock()
+    u.ADDR_WIDTH = 10
+    u.DATA_WIDTH = 32
+    u.PORT_CNT = (*(WRITE for _ in range(4)), *(READ for _ in range(8)))
+    return u
+
+
+if __name__ == "__main__":
+    from hwt.synthesizer.utils import to_rtl_str
+    u = _example_RamLvtSingleClock()
+    print(to_rtl_str(u))
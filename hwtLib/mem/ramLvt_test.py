@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from random import Random
+
+from hwt.hdl.constants import WRITE, READ, NOP
+from hwt.interfaces.std import BramPort_withoutClk
+from hwt.interfaces.utils import addClkRst, propagateClk
+from hwt.simulator.simTestCase import SingleUnitSimTestCase
+from hwt.synthesizer.hObjList import HObjList
+from hwt.synthesizer.unit import Unit
+from hwtLib.mem.ramLvt import RamLvtSingleClock
+from hwtSimApi.constants import CLK_PERIOD
+
+
+class RamLvtSingleClockRwPorts(Unit):
+    """
+    Wrapper of :class:`~.RamLvtSingleClock` which has read/write ports
+    because the simulation agent does not support write only and read only ports
+    """
+
+    def _config(self):
+        RamLvtSingleClock._config(self)
+
+    def _declr(self):
+        addClkRst(self)
+        with self._paramsShared():
+            self.mem = RamLvtSingleClock()
+            self.port = HObjList(BramPort_withoutClk() for _ in self.PORT_CNT)
+
+    def _impl(self):
+        propagateClk(self)
+        for p, mp in zip(self.port, self.mem.port):
+            mp.addr(p.addr)
+            if mp.HAS_W:
+                mp.en(p.en & p.we)
+                mp.din(p.din)
+                p.dout(None)
+            else:
+                mp.en(p.en & ~p.we)
+                p.dout(mp.dout)
+        self.mem.rst(self.rst)
+
+
+class RamLvtSingleClockTC(SingleUnitSimTestCase):
+
+    @classmethod
+    def getUnit(cls):
+        u = RamLvtSingleClockRwPorts()
+        u.PORT_CNT = (WRITE, WRITE, READ)
+        u.DATA_WIDTH = 8
+        u.ADDR_WIDTH = 3
+        cls.u = u
+        return u
+
+    def test_writeAndRead(self):
+        u = self.u
+        u.port[0]._ag.requests.extend([
+            (WRITE, 0, 5), (WRITE, 1, 7),
+        ])
+        u.port[1]._ag.requests.extend([
+            NOP, NOP, (WRITE, 1, 9),
+        ])
+        u.port[2]._ag.requests.extend([
+            (READ, 0), (READ, 1),
+            (READ, 0), (READ, 1),
+            (READ, 0), (READ, 1), (READ, 2)
+        ])
+
+        self.runSim(11 * CLK_PERIOD)
+        aeq = self.assertValSequenceEqual
+        aeq(u.port[2]._ag.r_data, [0, 0, 5, 9, 5, 9, 0])
+
+
+class RamLvtSingleClock_3w2rTC(SingleUnitSimTestCase):
+
+    @classmethod
+    def getUnit(cls):
+        u = RamLvtSingleClockRwPorts()
+        u.PORT_CNT = (WRITE, WRITE, WRITE, READ, READ)
+        u.DATA_WIDTH = 8
+        u.ADDR_WIDTH = 4
+        cls.u = u
+        return u
+
+    def test_random_writes(self, N=40):
+        u = self.u
+        rand = Random(0)
+        w_ports = u.port[:3]
+        r_ports = u.port[3:]
+        ITEMS = 2 ** u.ADDR_WIDTH
+        mem = [0 for _ in range(ITEMS)]
+        for _ in range(N):
+            # each clock cycle a random subset of write ports writes to a different addresses
+            addrs = rand.sample(range(ITEMS), len(w_ports))
+            for w, addr in zip(w_ports, addrs):
+                if rand.random() < 0.6:
+                    d = rand.getrandbits(8)
+                    w._ag.requests.append((WRITE, addr, d))
+                    mem[addr] = d
+                else:
+                    w._ag.requests.append(NOP)
+
+        # read after all writes are finished
+        for r in r_ports:
+            r._ag.requests.extend(NOP for _ in range(N + 2))
+            r._ag.requests.extend((READ, addr) for addr in range(ITEMS))
+
+        self.runSim((N + ITEMS + 10) * CLK_PERIOD)
+        for r in r_ports:
+            self.assertValSequenceEqual(r._ag.r_data, mem)
+
+
+RamLvtSingleClockTCs = [
+    RamLvtSingleClockTC,
+    RamLvtSingleClock_3w2rTC,
+]
+
+if __name__ == "__main__":
+    import unittest
+    suite = unittest.TestSuite()
+    # suite.addTest(RamLvtSingleClock_3w2rTC('test_random_writes'))
+    for tc in RamLvtSingleClockTCs:
+        suite.addTest(unittest.makeSuite(tc))
+    runner = unittest.TextTestRunner(verbosity=3)
+    runner.run(suite)
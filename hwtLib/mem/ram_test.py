@@ -5,6 +5,7 @@ from hwt.hdl.constants import WRITE, READ
 from hwt.simulator.simTestCase import SingleUnitSimTestCase
 from hwtLib.mem.ram import RamSingleClock
 from hwtSimApi.constants import CLK_PERIOD
+from hwtSimApi.triggers import Timer, WaitCombRead
 
 
 class RamTC(SingleUnitSimTestCase):
@@ -30,10 +31,78 @@ class RamTC(SingleUnitSimTestCase):
         aeq(u.port[0]._ag.r_data, [5, 7, 5, 7, None])
 
 
+class Ram_depthBankingTC(SingleUnitSimTestCase):
+
+    @classmethod
+    def getUnit(cls):
+        u = RamSingleClock()
+        u.DATA_WIDTH = 8
+        u.ADDR_WIDTH = 4
+        u.MAX_BLOCK_DEPTH = 2
+        u.OUTPUT_MUX_ARITY = 2
+        cls.u = u
+        return u
+
+    def test_read_latency(self):
+        self.assertEqual(self.u.get_read_latency(), 1)
+
+    def test_writeAndRead(self):
+        u = self.u
+        ITEMS = 2 ** u.ADDR_WIDTH
+        ref = [(i * 7 + 3) & 0xff for i in range(ITEMS)]
+        u.port[0]._ag.requests.extend((WRITE, i, d) for i, d in enumerate(ref))
+        u.port[0]._ag.requests.extend((READ, i) for i in reversed(range(ITEMS)))
+
+        self.runSim((2 * ITEMS + 4) * CLK_PERIOD)
+        self.assertValSequenceEqual(u.port[0]._ag.r_data, list(reversed(ref)))
+
+
+class Ram_depthBankingRegisteredMuxTC(Ram_depthBankingTC):
+
+    @classmethod
+    def getUnit(cls):
+        u = Ram_depthBankingTC.getUnit()
+        u.OUTPUT_MUX_REGISTERED = True
+        return u
+
+    def test_read_latency(self):
+        self.assertEqual(self.u.get_read_latency(), 4)
+
+    def test_writeAndRead(self):
+        u = self.u
+        ITEMS = 2 ** u.ADDR_WIDTH
+        ref = [(i * 7 + 3) & 0xff for i in range(ITEMS)]
+        u.port[0]._ag.requests.extend((WRITE, i, d) for i, d in enumerate(ref))
+        u.port[0]._ag.requests.extend((READ, i) for i in reversed(range(ITEMS)))
+        dout = []
+
+        def dout_collector():
+            # collect the data in every clock cycle after the clock edge
+            yield Timer(CLK_PERIOD + 1)
+            while True:
+                yield WaitCombRead()
+                dout.append(u.port[0].dout.read())
+                yield Timer(CLK_PERIOD)
+
+        self.procs.append(dout_collector())
+        self.runSim((2 * ITEMS + 8) * CLK_PERIOD)
+        # the agent sends first request in first clock cycle
+        # and the data of the first read is available after the read latency
+        first_data = ITEMS + u.get_read_latency() - 1
+        self.assertValSequenceEqual(dout[first_data: first_data + ITEMS], list(reversed(ref)))
+
+
+RamTCs = [
+    RamTC,
+    Ram_depthBankingTC,
+    Ram_depthBankingRegisteredMuxTC,
+]
+
 if __name__ == "__main__":
     import unittest
     suite = unittest.TestSuite()
     # suite.addTest(TwoCntrsTC('test_withStops'))
-    suite.addTest(unittest.makeSuite(RamTC))
+    for tc in RamTCs:
+        suite.addTest(unittest.makeSuite(tc))
     runner = unittest.TextTestRunner(verbosity=3)
     runner.run(suite)
@@ -19,6 +19,7 @@ from hwtLib.amba.axiLite_comp.endpoint_struct_test import \
 from hwtLib.amba.axiLite_comp.endpoint_test import AxiLiteEndpointTCs
 from hwtLib.amba.axiLite_comp.to_axi_test import AxiLite_to_Axi_TC
 from hwtLib.amba.axi_comp.cache.caheWriteAllocWawOnlyWritePropagating_test import AxiCaheWriteAllocWawOnlyWritePropagatingTCs
+from hwtLib.amba.axi_comp.cache.model_test import CacheModel_TC
 from hwtLib.amba.axi_comp.cache.pseudo_lru_test import PseudoLru_TC
 from hwtLib.amba.axi_comp.interconnect.matrixAddrCrossbar_test import\
     AxiInterconnectMatrixAddrCrossbar_TCs
@@ -26,10 +27,13 @@ from hwtLib.amba.axi_comp.interconnect.matrixCrossbar_test import \
     AxiInterconnectMatrixCrossbar_TCs
 from hwtLib.amba.axi_comp.interconnect.matrixR_test import AxiInterconnectMatrixR_TCs
 from hwtLib.amba.axi_comp.interconnect.matrixW_test import AxiInterconnectMatrixW_TCs
+from hwtLib.amba.axi_comp.lsu.read_aggregator_hashed_test import AxiReadAggregatorHashed_TCs
 from hwtLib.amba.axi_comp.lsu.read_aggregator_test import AxiReadAggregator_TCs
 from hwtLib.amba.axi_comp.lsu.store_queue_write_propagating_test import AxiStoreQueueWritePropagating_TCs
 from hwtLib.amba.axi_comp.lsu.write_aggregator_test import AxiWriteAggregator_TCs
+from hwtLib.amba.axi_comp.lsu.write_aggregator_write_combining_test import AxiWriteAggregatorWriteCombining_TCs
 from hwtLib.amba.axi_comp.oooOp.examples.counterArray_test import OooOpExampleCounterArray_TCs
+from hwtLib.amba.axi_comp.oooOp.examples.counterArrayMultiLane_test import OooOpExampleCounterArrayMultiLane_TCs
 from hwtLib.amba.axi_comp.oooOp.examples.counterHashTable_test import OooOpExampleCounterHashTable_TC
 from hwtLib.amba.axi_comp.resize_test import AxiResizeTC
 from hwtLib.amba.axi_comp.sim.ag_test import Axi_ag_TC
@@ -39,17 +43,23 @@ from hwtLib.amba.axi_comp.stream_to_mem_test import Axi4_streamToMemTC
 from hwtLib.amba.axi_comp.tester_test import AxiTesterTC
 from hwtLib.amba.axi_comp.to_axiLite_test import Axi_to_AxiLite_TC
 from hwtLib.amba.axi_test import AxiTC
+from hwtLib.amba.axis_comp.checksum_test import AxiS_checksum_TCs
 from hwtLib.amba.axis_comp.en_test import AxiS_en_TC
 from hwtLib.amba.axis_comp.fifoDrop_test import AxiSFifoDropTC
-from hwtLib.amba.axis_comp.fifoMeasuring_test import AxiS_fifoMeasuringTC
+from hwtLib.amba.axis_comp.fifoMeasuring_test import AxiS_fifoMeasuringTCs
+from hwtLib.amba.axis_comp.fifo_async_test import AxiSFifoAsyncTCs
 from hwtLib.amba.axis_comp.frameGen_test import AxisFrameGenTC
-from hwtLib.amba.axis_comp.frame_deparser.test import AxiS_frameDeparser_TC
+from hwtLib.amba.axis_comp.frame_deparser.test import AxiS_frameDeparser_TCs
 from hwtLib.amba.axis_comp.frame_join.test import AxiS_FrameJoin_TCs
-from hwtLib.amba.axis_comp.frame_parser.footer_split_test import AxiS_footerSplitTC
+from hwtLib.amba.axis_comp.frame_parser.footer_split_test import AxiS_footerSplitTC, \
+    AxiS_footerSplit_unaligned_TC
 from hwtLib.amba.axis_comp.frame_parser.test import AxiS_frameParserTC
+from hwtLib.amba.axis_comp.packetBuffer_test import AxiSPacketBufferTCs
 from hwtLib.amba.axis_comp.resizer_test import AxiS_resizer_TCs
+from hwtLib.amba.axis_comp.segmented_lanes_test import AxiS_segmentedToLanes_TCs
 from hwtLib.amba.axis_comp.storedBurst_test import AxiSStoredBurstTC
-from hwtLib.amba.axis_comp.strformat_test import AxiS_strFormat_TC
+from hwtLib.amba.axis_comp.strformat_test import AxiS_strFormat_TCs
+from hwtLib.amba.axis_comp.trafficGen_test import AxiSTrafficGenTCs
 from hwtLib.amba.datapump.interconnect.rStrictOrder_test import \
     RStrictOrderInterconnectTC
 from hwtLib.amba.datapump.interconnect.wStrictOrderComplex_test import \
@@ -135,10 +145,9 @@ from hwtLib.examples.statements.switchStm_test import SwitchStmTC
 from hwtLib.examples.statements.vldMaskConflictsResolving_test import \
     VldMaskConflictsResolvingTC
 from hwtLib.examples.timers import TimerTC
-from hwtLib.handshaked.cdc_test import HandshakedCdc_slow_to_fast_TC, \
-    HandshakedCdc_fast_to_slow_TC
-from hwtLib.handshaked.fifoAsync_test import HsFifoAsyncTC
-from hwtLib.handshaked.fifo_test import HsFifoTC
+from hwtLib.handshaked.cdc_test import HandshakedCdcTCs
+from hwtLib.handshaked.fifoAsync_test import HsFifoAsyncTCs
+from hwtLib.handshaked.fifo_test import HsFifoTCs
 from hwtLib.handshaked.joinFair_test import HsJoinFair_2inputs_TC, \
     HsJoinFair_3inputs_TC
 from hwtLib.handshaked.joinPrioritized_test import HsJoinPrioritizedTC, \
@@ -164,14 +173,20 @@ from hwtLib.mem.atomic.flipRam_test import FlipRamTC
 from hwtLib.mem.atomic.flipReg_test import FlipRegTC
 from hwtLib.mem.bramEndpoint_test import BramPortEndpointTCs
 from hwtLib.mem.cam_test import CamTC
+from hwtLib.mem.camTransposedRam_test import CamTransposedRamTCs
 from hwtLib.mem.cuckooHashTableWithRam_test import CuckooHashTableWithRamTCs
+from hwtLib.mem.cuckooHashTableWithPipelinedLookup_test import CuckooHashTableWithPipelinedLookupTCs
+from hwtLib.mem.cuckooHashTableWithStash_test import CuckooHashTableWithStashTCs
+from hwtLib.mem.hashTable_model_test import HashTableModelTCs
 from hwtLib.mem.fifoArray_test import FifoArrayTC
-from hwtLib.mem.fifoAsync_test import FifoAsyncTC
+from hwtLib.mem.fifoArrayWithRam_test import FifoArrayWithRamTCs
+from hwtLib.mem.fifoAsync_test import FifoAsyncTCs
 from hwtLib.mem.fifo_test import FifoWriterAgentTC, FifoReaderAgentTC, FifoTC
 from hwtLib.mem.hashTableCoreWithRam_test import HashTableCoreWithRamTC
 from hwtLib.mem.lutRam_test import LutRamTC
 from hwtLib.mem.ramXor_test import RamXorSingleClockTC
-from hwtLib.mem.ram_test import RamTC
+from hwtLib.mem.ramLvt_test import RamLvtSingleClockTCs
+from hwtLib.mem.ram_test import RamTCs
 from hwtLib.peripheral.displays.hd44780.driver_test import Hd44780Driver8bTC
 from hwtLib.peripheral.displays.segment7_test import Segment7TC
 from hwtLib.peripheral.ethernet.mac_rx_test import EthernetMac_rx_TCs
@@ -318,6 +333,7 @@ suite = testSuiteFromTCs(
     FrameJoinUtilsTC,
     HwExceptionCatch_TC,
     PseudoLru_TC,
+    CacheModel_TC,
 
     # tests of simple units
     TimerTC,
@@ -327,8 +343,9 @@ suite = testSuiteFromTCs(
     WidthCastingExampleTC,
     SimpleTC,
     SimpleSubunitTC,
-    RamTC,
+    *RamTCs,
     RamXorSingleClockTC,
+    *RamLvtSingleClockTCs,
     BramWireTC,
     LutRamTC,
     FsmSerializationTC,
@@ -336,7 +353,7 @@ suite = testSuiteFromTCs(
     HadrcodedFsmExampleTC,
     OneHotToBinTC,
     BinToBcdTC,
-    AxiS_strFormat_TC,
+    *AxiS_strFormat_TCs,
     BinToOneHotTC,
     GrayCntrTC,
     TwoCntrsTC,
@@ -352,14 +369,14 @@ suite = testSuiteFromTCs(
     FifoWriterAgentTC,
     FifoReaderAgentTC,
     FifoTC,
-    FifoAsyncTC,
+    *FifoAsyncTCs,
     FifoArrayTC,
+    *FifoArrayWithRamTCs,
     HsJoinPrioritizedTC,
     HsJoinPrioritized_randomized_TC,
     HsJoinFair_2inputs_TC,
     HsJoinFair_3inputs_TC,
-    HandshakedCdc_slow_to_fast_TC,
-    HandshakedCdc_fast_to_slow_TC,
+    *HandshakedCdcTCs,
     *RamAsHs_TCs,
     LfsrTC,
     ClkDiv3TC,
@@ -371,12 +388,13 @@ suite = testSuiteFromTCs(
     FlipRamTC,
     HsSplitCopyTC,
     HsSplitCopy_randomized_TC,
-    HsFifoTC,
-    HsFifoAsyncTC,
+    *HsFifoTCs,
+    *HsFifoAsyncTCs,
     *HandshakedRegTCs,
     HsResizerTC,
     HsBuilderSplit_TC,
     CamTC,
+    *CamTransposedRamTCs,
     UartTxTC,
     UartRxBasicTC,
     UartRxTC,
@@ -418,6 +436,8 @@ suite = testSuiteFromTCs(
     AxiResizeTC,
 
     AxisFrameGenTC,
+    *AxiSTrafficGenTCs,
+    *AxiS_checksum_TCs,
     *AddrDataHs_to_Axi_TCs,
     Axi4BRam_TC,
     *Axi_rDatapump_alignedTCs,
@@ -426,14 +446,18 @@ suite = testSuiteFromTCs(
     AxiSlaveTimeoutTC,
     AxiSStoredBurstTC,
     AxiS_en_TC,
-    AxiS_fifoMeasuringTC,
+    *AxiS_fifoMeasuringTCs,
+    *AxiSFifoAsyncTCs,
     AxiSFifoDropTC,
+    *AxiSPacketBufferTCs,
     *AxiS_resizer_TCs,
-    AxiS_frameDeparser_TC,
+    *AxiS_frameDeparser_TCs,
     AxiS_localLinkConvTC,
     AxiS_footerSplitTC,
+    AxiS_footerSplit_unaligned_TC,
     AxiS_frameParserTC,
     *AxiS_FrameJoin_TCs,
+    *AxiS_segmentedToLanes_TCs,
     HandshakedBuilderSimpleTC,
     *EthAddrUpdaterTCs,
 
@@ -448,7 +472,9 @@ suite = testSuiteFromTCs(
     *AxiInterconnectMatrixW_TCs,
 
     *AxiWriteAggregator_TCs,
+    *AxiWriteAggregatorWriteCombining_TCs,
     *AxiReadAggregator_TCs,
+    *AxiReadAggregatorHashed_TCs,
     *AxiStoreQueueWritePropagating_TCs,
     *AxiCaheWriteAllocWawOnlyWritePropagatingTCs,
 
@@ -463,6 +489,7 @@ suite = testSuiteFromTCs(
     StructWriter_TC,
     StructReaderTC,
     *OooOpExampleCounterArray_TCs,
+    *OooOpExampleCounterArrayMultiLane_TCs,
     OooOpExampleCounterHashTable_TC,
 
     # ipif tests
@@ -487,6 +514,9 @@ suite = testSuiteFromTCs(
     CharToBitmapTC,
     HashTableCoreWithRamTC,
     *CuckooHashTableWithRamTCs,
+    *CuckooHashTableWithPipelinedLookupTCs,
+    *CuckooHashTableWithStashTCs,
+    *HashTableModelTCs,
     PingResponderTC,
     DebugBusMonitorExampleAxiTC,
 